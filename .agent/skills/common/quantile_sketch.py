@@ -0,0 +1,141 @@
+"""Mergeable streaming quantile sketch (KLL-style) for probe / eval error stats.
+
+Probes and evaluators feed per-batch error values with `update`; memory stays
+O(k log(n / k)) instead of O(n), and sketches from different seeds or worker
+processes combine with `merge` (or `from_dict(...)` of serialized ones).
+
+Layout: level h holds values each standing for 2**h inputs. When a level
+exceeds its capacity it is sorted and every other value (random offset)
+moves up one level with double weight (a KLL compactor); capacities shrink
+by 2/3 per level below the top, so total size is ~3k. Rank error is about
+1/k of n with high probability.
+
+Exact fallback: until the first compaction (n <= max(k, exact_limit)) every
+value is kept and `quantile` is np.percentile's linear interpolation, so
+small runs report exactly what they did before. min, max and mean are
+always exact.
+"""
+import math
+
+import numpy as np
+
+_C = 2.0 / 3.0
+
+
+class QuantileSketch:
+    def __init__(self, k: int = 256, exact_limit: int = 4096, seed: int = 0):
+        if k < 8:
+            raise ValueError(f"k must be >= 8, got {k}")
+        self.k = int(k)
+        self.exact_limit = int(exact_limit)
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    # --- building ---
+
+    def update(self, values) -> "QuantileSketch":
+        """Add a batch of values (numpy array, list, or torch tensor; any shape)."""
+        if hasattr(values, "detach"):
+            values = values.detach().cpu().numpy()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sum += float(values.sum())
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold `other` into this sketch (in place). Returns self."""
+        if other.n == 0:
+            return self
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], level))
+        self._compress()
+        return self
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - 1 - h
+        cap = max(2, int(math.ceil(self.k * _C ** depth)))
+        if len(self.levels) == 1:
+            cap = max(cap, self.exact_limit)     # exact until the first compaction
+        return cap
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.size > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                level = np.sort(level)
+                # odd count: the largest stays behind so weights stay exact
+                keep, level = (level[-1:], level[:-1]) if level.size % 2 else (level[:0], level)
+                promoted = level[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            h += 1
+
+    # --- queries ---
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self.levels) == 1
+
+    @property
+    def n_retained(self) -> int:
+        return sum(level.size for level in self.levels)
+
+    def quantile(self, q):
+        """Value(s) at quantile q in [0, 1] (scalar or array-like)."""
+        if self.n == 0:
+            raise ValueError("quantile of an empty sketch")
+        q = np.asarray(q, dtype=np.float64)
+        if self.is_exact:
+            return np.percentile(self.levels[0], q * 100)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        # Midpoint rank of each retained value, interpolated like np.percentile
+        mid = (cum - weights[order] / 2) / cum[-1]
+        out = np.interp(q, mid, values)
+        return np.clip(out, self.min, self.max)
+
+    def percentiles(self, ps=(50, 75, 90, 95, 99)) -> dict:
+        """{"p50": ..., "mean": ..., "max": ...} in the probes' percentile layout."""
+        out = {f"p{p}": float(v) for p, v in zip(ps, np.atleast_1d(self.quantile(np.asarray(ps) / 100)))}
+        out["mean"] = self.sum / self.n
+        out["max"] = self.max
+        return out
+
+    # --- serialization ---
+
+    def to_dict(self) -> dict:
+        """JSON-friendly state; `from_dict` round-trips it exactly."""
+        return {
+            "k": self.k, "exact_limit": self.exact_limit, "n": self.n,
+            "min": self.min, "max": self.max, "sum": self.sum,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict, seed: int = 0) -> "QuantileSketch":
+        sketch = cls(k=d["k"], exact_limit=d["exact_limit"], seed=seed)
+        sketch.n, sketch.min, sketch.max, sketch.sum = d["n"], d["min"], d["max"], d["sum"]
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in d["levels"]]
+        return sketch
@@ -6,6 +6,15 @@ class WorkspaceProbeResult(BaseModel):
     x: tuple[float, float]
     y: tuple[float, float]
     z: tuple[float, float]
+    reachability_map_path: Optional[str] = None   # voxel map .npz (probes/reachability.py)
+    voxel_size_m: Optional[float] = None
+    reachability_coverage: Optional[float] = None  # ReachabilityMap.coverage()
+    pose_reachability_map_path: Optional[str] = None   # (voxel, SO(3) cell) map .npz
+    orientation_bins: Optional[int] = None
+    # PoseReachabilityMap.coverage over the reach command's cells, on the
+    # position block (m) for_command picked; block None: the map is too sparse
+    pose_reachability_coverage: Optional[float] = None
+    pose_block_m: Optional[float] = None
 
 
 class JointLimitsProbeResult(BaseModel):
@@ -24,6 +33,7 @@ class SuccessThresholdProbeResult(BaseModel):
     statistic: str                                     
     position_error_percentiles_m: dict[str, float]    
     orientation_error_percentiles_deg: Optional[dict[str, float]] = None
+    position_error_sketch: Optional[dict] = None       # QuantileSketch.to_dict(), mergeable
     n_targets: int
     n_measured: int
     convergence_rate: float                                          
@@ -31,7 +41,7 @@ class SuccessThresholdProbeResult(BaseModel):
     n_steps: int                                       
     physics_dt: float
     gravity_z: Optional[float] = None
-    target_orientation_rpy: Optional(tuple[float, float, float]) = None
+    target_orientation_rpy: Optional[tuple[float, float, float]] = None
     units: str = "meters"
     seed: int
 
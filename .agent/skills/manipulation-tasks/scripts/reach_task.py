@@ -5,7 +5,11 @@ Run manipulation tasks in Isaac Sim using Isaac Lab framework.
 Supports three Fluxa pipeline injection points, all optional:
 - --config:        Path to discovered_config.json from workspace-exploration.
                    Overrides Isaac Lab's hardcoded target sampling ranges with
-                   the discovered workspace bounds.
+                   the discovered workspace bounds. If the config also names
+                   a voxel reachability map, targets that fall in unreachable
+                   voxels are redrawn; with a pose reachability map, so are
+                   targets whose orientation cell was never reached in their
+                   position block.
 - --reward-file:   Path to a Python file containing reward modifications
                    (future: produced by reward-designer Stage 1). The file's
                    code is executed after env_cfg is created and should
@@ -147,34 +151,275 @@ env_cfg = task_configs[task_name]()
 # === Joint-limits reset override (from workspace-exploration) ===
 safe_config_path = {safe_config_path_override}
 _jl_status = {{"requested": safe_config_path is not None, "applied": False,
-              "n_configs": 0, "path": safe_config_path, "error": None}}
+              "n_configs": 0, "dtype": None, "path": safe_config_path, "error": None}}
+# Safe set is either a legacy .npy or the header + raw-array file of
+# workspace-exploration/probes/safe_set.py (loaded inline, same layout).
+# It is memory-mapped here and decoded onto env.device once, on the first
+# reset; later resets only index the cached device tensor.
 if safe_config_path is not None:
+    import json as _json
     import numpy as _np
     import torch as _torch
     from isaaclab.managers import EventTermCfg as _EventTerm, SceneEntityCfg as _SceneEntityCfg
     try:
-        _safe = _torch.tensor(_np.load(safe_config_path), dtype=_torch.float32)
-
-        def _reset_joints_from_safe_set(env, env_ids, asset_cfg, safe_configs):
+        with open(safe_config_path, "rb") as _f:
+            _magic = _f.read(8)
+            _ss_header = (_json.loads(_f.read(4088).decode().rstrip())
+                          if _magic == b"SAFESET1" else None)
+        if _ss_header is None:
+            _safe_codes = _np.load(safe_config_path, mmap_mode="r")
+            _ss_header = {{"dtype": str(_safe_codes.dtype), "joint_names": None}}
+        else:
+            _safe_codes = _np.memmap(
+                safe_config_path, dtype=_ss_header["dtype"], mode="r", offset=4096,
+                shape=(_ss_header["n_configs"], _ss_header["n_joints"]))
+        _safe_on_device = {{}}
+
+        def _safe_set_on(device, asset):
+            safe = _safe_on_device.get(device)
+            if safe is not None:
+                return safe
+            codes = _np.array(_safe_codes)
+            if _ss_header["dtype"] == "uint16":
+                codes = _torch.from_numpy(codes.view(_np.int16)).to(device).int() & 0xFFFF
+                lo = _torch.tensor(_ss_header["joint_lower"], dtype=_torch.float32, device=device)
+                hi = _torch.tensor(_ss_header["joint_upper"], dtype=_torch.float32, device=device)
+                safe = lo + codes.float() * ((hi - lo) / 65535)
+            else:
+                safe = _torch.from_numpy(codes).to(device).float()
+            names = _ss_header["joint_names"]
+            if names is not None and list(names) != list(asset.joint_names):
+                safe = safe[:, [names.index(n) for n in asset.joint_names]]
+            _safe_on_device[device] = safe
+            return safe
+
+        def _reset_joints_from_safe_set(env, env_ids, asset_cfg):
             asset = env.scene[asset_cfg.name]
-            safe = safe_configs.to(env.device)
+            safe = _safe_set_on(env.device, asset)
             pick = _torch.randint(0, safe.shape[0], (len(env_ids),), device=env.device)
             q = safe[pick]
             asset.write_joint_state_to_sim(q, _torch.zeros_like(q), env_ids=env_ids)
 
         env_cfg.events.reset_robot_joints = _EventTerm(
             func=_reset_joints_from_safe_set, mode="reset",
-            params={{"asset_cfg": _SceneEntityCfg("robot"), "safe_configs": _safe}},
+            params={{"asset_cfg": _SceneEntityCfg("robot")}},
         )
         _jl_status["applied"] = True
-        _jl_status["n_configs"] = int(_safe.shape[0])
-        print("[reach_task] OVERRIDE: joint reset from safe set,", _safe.shape[0], "configs")
+        _jl_status["n_configs"] = int(_safe_codes.shape[0])
+        _jl_status["dtype"] = _ss_header["dtype"]
+        print("[reach_task] OVERRIDE: joint reset from safe set,", _safe_codes.shape[0],
+              "configs,", _ss_header["dtype"])
     except Exception as _e:
         _jl_status["error"] = repr(_e)
         print("[reach_task] ERROR applying joint-reset override:", repr(_e))
 else:
     print("[reach_task] DEFAULT: Isaac Lab built-in joint reset")
 
+# === Reachable-target override (voxel map from workspace-exploration) ===
+# Targets are still drawn uniformly from the ranges above; the ones whose
+# voxel was never reached by the FK probe are redrawn (up to _MAX_REDRAWS
+# times). The map is loaded inline (same sparse .npz layout as
+# workspace-exploration/probes/reachability.py) so the server needs no
+# extra import path. A map whose Good-Turing coverage (1 - voxels hit once /
+# samples, ReachabilityMap.coverage) is below _MIN_COVERAGE would reject a
+# large share of reachable targets, so it is not applied: targets stay
+# uniform over the box.
+reachability_map_path = {reachability_map_path_override}
+_rm_status = {{"requested": reachability_map_path is not None, "applied": False,
+              "n_voxels": 0, "coverage": None, "path": reachability_map_path, "error": None}}
+_MIN_COVERAGE = 0.98
+if reachability_map_path is not None:
+    import numpy as _np
+    import torch as _torch
+    try:
+        with _np.load(reachability_map_path) as _rm:
+            _rm_shape = tuple(int(d) for d in _rm["shape"])
+            _rm_occ = _torch.zeros(int(_np.prod(_rm_shape)), dtype=_torch.bool)
+            _rm_occ[_torch.as_tensor(_rm["flat_index"].astype(_np.int64))] = True
+            _rm_origin = _torch.as_tensor(_rm["origin"], dtype=_torch.float32)
+            _rm_voxel = float(_rm["voxel_size"])
+            _rm_counts = _rm["counts"].astype(_np.int64)
+        _rm_status["coverage"] = float(1.0 - (_rm_counts == 1).sum() / max(_rm_counts.sum(), 1))
+        if _rm_status["coverage"] < _MIN_COVERAGE:
+            raise ValueError(
+                f"map coverage {{_rm_status['coverage']:.3f}} < {{_MIN_COVERAGE}}: too few FK "
+                f"samples for its voxel size; rerun workspace-exploration with more "
+                f"--n_samples. Falling back to box sampling.")
+        _MAX_REDRAWS = 10
+
+        class _ReachableUniformPoseCommand(mdp.UniformPoseCommand):
+            def __init__(self, cfg, env):
+                self._occ = _rm_occ.to(env.device)
+                self._origin = _rm_origin.to(env.device)
+                self._dims = _torch.tensor(_rm_shape, device=env.device)
+                self._n_unresolved = 0
+                super().__init__(cfg, env)
+
+            def _reachable(self, pos_b):
+                ijk = _torch.floor((pos_b - self._origin) / _rm_voxel).long()
+                inside = ((ijk >= 0) & (ijk < self._dims)).all(dim=-1)
+                ijk = ijk.clamp(min=0) * inside[:, None]
+                flat = (ijk[:, 0] * self._dims[1] + ijk[:, 1]) * self._dims[2] + ijk[:, 2]
+                return inside & self._occ[flat]
+
+            def _resample_command(self, env_ids):
+                super()._resample_command(env_ids)
+                ids = _torch.as_tensor(env_ids, device=self.device, dtype=_torch.long)
+                for _ in range(_MAX_REDRAWS):
+                    ids = ids[~self._reachable(self.pose_command_b[ids, :3])]
+                    if ids.numel() == 0:
+                        return
+                    super()._resample_command(ids)
+                ids = ids[~self._reachable(self.pose_command_b[ids, :3])]
+                if ids.numel():
+                    # Kept as drawn; warn at 1, 10, 100, ... unresolved targets
+                    before = self._n_unresolved
+                    self._n_unresolved += ids.numel()
+                    if len(str(self._n_unresolved)) > len(str(before)) or before == 0:
+                        print("[reach_task] WARNING:", self._n_unresolved, "targets still "
+                              "outside the reachability map after", _MAX_REDRAWS,
+                              "redraws; kept as drawn")
+
+        env_cfg.commands.ee_pose.class_type = _ReachableUniformPoseCommand
+        _rm_status["applied"] = True
+        _rm_status["n_voxels"] = int(_rm_occ.sum())
+        print("[reach_task] OVERRIDE: reachable-target rejection,", _rm_status["n_voxels"],
+              "voxels of", _rm_voxel, "m, coverage", round(_rm_status["coverage"], 3))
+    except Exception as _e:
+        _rm_status["error"] = repr(_e)
+        print("[reach_task] ERROR applying reachability override:", repr(_e))
+        print("[reach_task] WARNING: targets from the box ranges only")
+else:
+    print("[reach_task] DEFAULT: targets from the box ranges only")
+
+# === Reachable-pose override (6-DoF map from workspace-exploration) ===
+# Stacks on the voxel rejection above: a target is also redrawn unless its
+# orientation cell was reached in its position block. Keys and cells are
+# computed inline as in workspace-exploration/probes/reachability.py
+# (PoseReachabilityMap: key = flat_block * 4m^3 + orientation_bin(quat, m)).
+# FK samples rarely take any one orientation, so, as in
+# PoseReachabilityMap.for_command, coverage is taken only over the cells the
+# command ranges can hit (euler_range_cells), on the finest position block
+# (a multiple of the map's voxel, at most _POSE_BLOCK_MAX_M) where it reaches
+# _MIN_COVERAGE. If no block does, orientations are not checked.
+pose_reachability_map_path = {pose_reachability_map_path_override}
+_pm_status = {{"requested": pose_reachability_map_path is not None, "applied": False,
+              "n_pairs": 0, "coverage": None, "block_m": None,
+              "path": pose_reachability_map_path, "error": None}}
+_POSE_BLOCK_MAX_M = 0.16
+if pose_reachability_map_path is not None:
+    import math as _math
+    import numpy as _np
+    import torch as _torch
+    try:
+        with _np.load(pose_reachability_map_path) as _pm:
+            _pm_keys = _pm["keys"].astype(_np.int64)
+            _pm_counts = _pm["counts"].astype(_np.int64)
+            _pm_origin = _torch.as_tensor(_pm["origin"], dtype=_torch.float64)
+            _pm_voxel = float(_pm["voxel_size"])
+            _pm_shape = _np.asarray(_pm["shape"], dtype=_np.int64)
+            _pm_m = int(_pm["orientation_bins"])
+        if _pm_keys.size == 0:
+            raise ValueError("pose map is empty")
+        _pm_n_cells = 4 * _pm_m ** 3
+        # Quaternion components other than the largest one, per largest component
+        _PM_OTHERS = _torch.tensor([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+
+        def _pm_orientation_bin(q, others):
+            q = q / q.norm(dim=-1, keepdim=True)
+            face = q.abs().argmax(dim=-1)
+            ratio = q.gather(-1, others[face]) / q.gather(-1, face[:, None])
+            idx = ((_torch.atan(ratio) * (4 / _math.pi) + 1) * (_pm_m / 2)).floor().long()
+            idx = idx.clamp(0, _pm_m - 1)
+            return ((face * _pm_m + idx[:, 0]) * _pm_m + idx[:, 1]) * _pm_m + idx[:, 2]
+
+        # Cells of the command's roll / pitch / yaw ranges (quat_from_euler_xyz),
+        # each range widened by 1e-4 rad for commands on a cell boundary
+        _rng = env_cfg.commands.ee_pose.ranges
+        _grid = [_torch.cat((_torch.linspace(lo, hi, 64 if hi > lo else 1, dtype=_torch.float64),
+                             _torch.tensor([lo - 1e-4, hi + 1e-4], dtype=_torch.float64))) / 2
+                 for lo, hi in (_rng.roll, _rng.pitch, _rng.yaw)]
+        _r, _p, _y = _torch.meshgrid(*_grid, indexing="ij")
+        _cr, _sr, _cp, _sp, _cy, _sy = _r.cos(), _r.sin(), _p.cos(), _p.sin(), _y.cos(), _y.sin()
+        _q = _torch.stack((_cy * _cp * _cr + _sy * _sp * _sr, _cy * _cp * _sr - _sy * _sp * _cr,
+                           _cy * _sp * _cr + _sy * _cp * _sr, _sy * _cp * _cr - _cy * _sp * _sr),
+                          dim=-1).reshape(-1, 4)
+        _pm_cmd_cells = _pm_orientation_bin(_q, _PM_OTHERS).unique().numpy()
+
+        # Finest block (factor * voxel) whose coverage over those cells passes
+        _pm_vox, _pm_cell = _np.divmod(_pm_keys, _pm_n_cells)
+        _pm_ijk = _np.stack(_np.unravel_index(_pm_vox, tuple(_pm_shape)))
+        _pm_block = None
+        for _f in range(1, int(_POSE_BLOCK_MAX_M / _pm_voxel + 1e-9) + 1):
+            _dims = -(-_pm_shape // _f)
+            _k = _np.ravel_multi_index(tuple(_pm_ijk // _f), tuple(_dims)) * _pm_n_cells + _pm_cell
+            _k, _inv = _np.unique(_k, return_inverse=True)
+            _c = _np.bincount(_inv, weights=_pm_counts)[_np.isin(_k % _pm_n_cells, _pm_cmd_cells)]
+            _pm_status["coverage"] = float(1.0 - (_c == 1).sum() / _c.sum()) if _c.sum() else 0.0
+            if _pm_status["coverage"] >= _MIN_COVERAGE:
+                _pm_block = (_f, _dims, _k)
+                break
+        if _pm_block is None:
+            raise ValueError(
+                f"pose map coverage over the command orientations is "
+                f"{{_pm_status['coverage']:.3f}} < {{_MIN_COVERAGE}} even on "
+                f"{{_POSE_BLOCK_MAX_M}} m blocks; rerun workspace-exploration with more "
+                f"--n_samples or fewer --orientation_bins.")
+        _pm_f, _pm_dims, _pm_block_keys = _pm_block
+        _pm_status["block_m"] = _pm_voxel * _pm_f
+        _MAX_POSE_REDRAWS = 10
+        _PoseBase = env_cfg.commands.ee_pose.class_type    # voxel rejection, if applied
+
+        class _ReachablePoseCommand(_PoseBase):
+            def __init__(self, cfg, env):
+                self._keys = _torch.as_tensor(_pm_block_keys, device=env.device)
+                self._origin = _pm_origin.to(env.device)
+                self._dims = _torch.as_tensor(_pm_dims, device=env.device)
+                self._others = _PM_OTHERS.to(env.device)
+                self._n_unresolved_poses = 0
+                super().__init__(cfg, env)
+
+            def _pose_reachable(self, pose_b):
+                block = _pm_voxel * _pm_f
+                ijk = _torch.floor((pose_b[:, :3].double() - self._origin) / block).long()
+                inside = ((ijk >= 0) & (ijk < self._dims)).all(dim=-1)
+                ijk = ijk.clamp(min=0) * inside[:, None]
+                flat = (ijk[:, 0] * self._dims[1] + ijk[:, 1]) * self._dims[2] + ijk[:, 2]
+                key = flat * _pm_n_cells + _pm_orientation_bin(pose_b[:, 3:7].double(),
+                                                              self._others)
+                pos = _torch.searchsorted(self._keys, key).clamp(max=self._keys.numel() - 1)
+                return inside & (self._keys[pos] == key)
+
+            def _resample_command(self, env_ids):
+                super()._resample_command(env_ids)
+                ids = _torch.as_tensor(env_ids, device=self.device, dtype=_torch.long)
+                for _ in range(_MAX_POSE_REDRAWS):
+                    ids = ids[~self._pose_reachable(self.pose_command_b[ids])]
+                    if ids.numel() == 0:
+                        return
+                    super()._resample_command(ids)
+                ids = ids[~self._pose_reachable(self.pose_command_b[ids])]
+                if ids.numel():
+                    # Kept as drawn; warn at 1, 10, 100, ... unresolved targets
+                    before = self._n_unresolved_poses
+                    self._n_unresolved_poses += ids.numel()
+                    if len(str(self._n_unresolved_poses)) > len(str(before)) or before == 0:
+                        print("[reach_task] WARNING:", self._n_unresolved_poses, "target poses "
+                              "still outside the pose reachability map after",
+                              _MAX_POSE_REDRAWS, "redraws; kept as drawn")
+
+        env_cfg.commands.ee_pose.class_type = _ReachablePoseCommand
+        _pm_status["applied"] = True
+        _pm_status["n_pairs"] = int(_pm_block_keys.size)
+        print("[reach_task] OVERRIDE: reachable-pose rejection on", _pm_status["block_m"],
+              "m blocks, orientation_bins", _pm_m, "command-orientation coverage",
+              round(_pm_status["coverage"], 3))
+    except Exception as _e:
+        _pm_status["error"] = repr(_e)
+        print("[reach_task] ERROR applying pose reachability override:", repr(_e))
+        print("[reach_task] WARNING: target orientations are not checked;",
+              "voxel rejection only" if _rm_status["applied"] else "box ranges only")
+
 # === Apply-status marker (durable receipt of what actually applied) ===
 import json as _json, os as _os, time as _time
 _ws_x = {pos_x_override}
@@ -183,6 +428,8 @@ _status = {{
     "task": "{task_name}",
     "workspace": {{"applied": _ws_x is not None, "bounds_x": _ws_x}},
     "joint_limits": _jl_status,
+    "reachability": _rm_status,
+    "pose_reachability": _pm_status,
 }}
 _status_path = "/isaac-sim/outputs/reach_task_status.json"
 try:
@@ -259,7 +506,11 @@ def extract_template_overrides(config):
         
         # joint limits defaults
         "safe_config_path_override": "None",
-        
+
+        # reachability map defaults
+        "reachability_map_path_override": "None",
+        "pose_reachability_map_path_override": "None",
+
         # success threshold defaults (future)
         # controller gain defaults (future)
     }
@@ -271,6 +522,11 @@ def extract_template_overrides(config):
         overrides["pos_x_override"] = repr(ws.x)
         overrides["pos_y_override"] = repr(ws.y)
         overrides["pos_z_override"] = repr(ws.z)
+        if ws.reachability_map_path is not None:
+            overrides["reachability_map_path_override"] = repr(ws.reachability_map_path)
+        if ws.pose_reachability_map_path is not None:
+            overrides["pose_reachability_map_path_override"] = repr(
+                ws.pose_reachability_map_path)
 
     # joint limits, success threshold, controller gains: same pattern,
     # added here as each probe is implemented
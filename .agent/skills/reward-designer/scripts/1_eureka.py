@@ -15,7 +15,9 @@ import time
 from pathlib import Path
 
 from google import genai
-import wandb
+
+from experiment_store import ExperimentStore
+from tracking import Tracker
 
 
 class EurekaManager:
@@ -29,17 +31,22 @@ class EurekaManager:
 
         self.designer_root = Path(self.cfg['designer_root']).expanduser()
 
-        # W&B
-        wandb.init(
+        # W&B (buffered; spools to outputs/tracking/ when offline)
+        self.tracker = Tracker(
             project="Fluxa-Reward-Designer",
             name=f"eureka-{self.cfg['task_name']}",
             config=self.cfg,
+            spool_dir=self.designer_root / "outputs" / "tracking",
         )
 
         # Paths
         self.candidates_dir = self.designer_root / "outputs" / "candidates"
         self.candidates_dir.mkdir(parents=True, exist_ok=True)
 
+        # Experiment store (queryable history across runs)
+        self.store = ExperimentStore(self.designer_root / "outputs" / "experiments.db")
+        self.run_id = None
+
         # Docker config
         self.docker_container = self.cfg.get('docker', {}).get('container', 'fluxa-isaacsim')
         self.docker_python = self.cfg.get('docker', {}).get('python', '/isaac-sim/python.sh')
@@ -321,7 +328,14 @@ class EurekaManager:
 
     def main_loop(self, task):
         print(f"Starting Fluxa Stage 1 (Eureka) for {task}...")
+        self.run_id = self.store.start_run("eureka", task, name=f"eureka-{task}", config=self.cfg)
+        try:
+            self._main_loop(task)
+        except BaseException:
+            self.store.fail_run(self.run_id)
+            raise
 
+    def _main_loop(self, task):
         best_metrics = None
         best_reward_path = None
         feedback = ""
@@ -373,6 +387,14 @@ class EurekaManager:
 
                 # Evaluate
                 metrics = self.run_evaluation(task, candidate_id=candidate_id)
+                cand_db_id = self.store.add_candidate(
+                    self.run_id, candidate_id, metrics=metrics, iteration=i,
+                )
+                self.store.add_artifact(raw_output_path, "raw_llm_output", candidate_id=cand_db_id)
+                self.store.add_artifact(self.candidates_dir / f"{candidate_id}_reward.py",
+                                        "reward_code", candidate_id=cand_db_id)
+                self.store.add_artifact(self.candidates_dir / f"{candidate_id}.log",
+                                        "log", candidate_id=cand_db_id)
                 candidate_results.append({
                     "metrics": metrics,
                     "reward_path": output_file,
@@ -411,14 +433,14 @@ class EurekaManager:
 
             # --- W&B logging ---
             exec_rate = len(valid_results) / K
-            wandb.log({
-                "iteration": i,
-                "best_success_rate": best_metrics["success_rate"],
-                "best_mean_reward": best_metrics["mean_reward"],
-                "execute_rate": exec_rate,
-                "num_valid_candidates": len(valid_results),
-                "generated_code": wandb.Html(f"<pre><code>{best['raw_text']}</code></pre>"),
-            })
+            self.tracker.log_file(
+                "generated_code", self.candidates_dir / f"{best['candidate_id']}_reward.py",
+                iteration=i,
+                best_success_rate=best_metrics["success_rate"],
+                best_mean_reward=best_metrics["mean_reward"],
+                execute_rate=exec_rate,
+                num_valid_candidates=len(valid_results),
+            )
 
         # --- Final long training with best reward ---
         if best_reward_path_overall:
@@ -467,7 +489,14 @@ class EurekaManager:
                         print(f"  Final training complete!")
                         print(f"  mean_reward={final_metrics['mean_reward']:.4f}")
                         print(f"  Policy saved to: {policy_path}")
-                        wandb.log({"final_mean_reward": final_metrics["mean_reward"]})
+                        self.tracker.log({"final_mean_reward": final_metrics["mean_reward"]})
+
+                        final_id = self.store.add_candidate(self.run_id, "final",
+                                                            metrics=final_metrics)
+                        self.store.add_artifact(final_output, "reward_code", candidate_id=final_id)
+                        self.store.add_artifact(self.designer_root / "outputs" / "eureka_policy.pt",
+                                                "policy", candidate_id=final_id)
+                        self.store.add_artifact(log_file, "log", candidate_id=final_id)
                     else:
                         print(f"  Training finished but metrics file not found")
                         self._print_log_tail(log_file)
@@ -482,7 +511,12 @@ class EurekaManager:
         else:
             print("\n All iterations failed to produce valid reward code.")
 
-        wandb.finish()
+        self.store.finish_run(
+            self.run_id,
+            status="finished" if best_reward_path_overall else "failed",
+            summary=best_metrics_overall,
+        )
+        self.tracker.finish()
 
 
 if __name__ == "__main__":
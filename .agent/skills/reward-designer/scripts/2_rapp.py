@@ -28,6 +28,8 @@ import subprocess
 import argparse
 from pathlib import Path
 
+from experiment_store import ExperimentStore
+
 # --- Parameter definitions --------------------------------------------
 # Following DrEureka's convention:
 #   min_0      = values >= 0 at varying magnitudes
@@ -111,116 +113,140 @@ def main():
                         help="Inference steps per evaluation")
     parser.add_argument("--success-threshold", type=float, default=0.10,
                         help="Position error threshold in meters (default: 0.10m)")
+    parser.add_argument("--task", type=str, default="franka-reach",
+                        help="Task name recorded in the experiment store")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Experiment store DB (default: experiments.db next to --output)")
     args = parser.parse_args()
 
-    tmp_dir = f"/tmp/rapp_{os.getpid()}"
-    os.makedirs(tmp_dir, exist_ok=True)
-
-    # ── Step 1: Baseline evaluation (all default parameters) ────────────
-    print("\n" + "#"*60)
-    print("STEP 1: Baseline evaluation (default physics)")
-    print(f"Success threshold: position_error < {args.success_threshold}m")
-    print("#"*60)
-
-    baseline_output = os.path.join(tmp_dir, "baseline.json")
-    baseline_result = run_eval(
-        args.checkpoint, "default", 0.0,
-        args.num_envs, args.eval_steps, args.success_threshold,
-        baseline_output
-    )
-
-    if baseline_result is None or baseline_result.get("status") != "success":
-        print("ERROR: Baseline evaluation failed. Cannot proceed.")
-        sys.exit(1)
-
-    baseline_pos_error = baseline_result["mean_position_error"]
-    baseline_success = baseline_result["success"]
-
-    print(f"\nBaseline position error: {baseline_pos_error:.4f}m")
-    print(f"Baseline success: {baseline_success}")
-
-    if not baseline_success:
-        print(f"\nWARNING: Baseline FAILS the success threshold "
-              f"({baseline_pos_error:.4f}m >= {args.success_threshold}m).")
-        print("The Stage 1 policy may need more training iterations,")
-        print("or increase --success-threshold to be more lenient.")
-        print("Proceeding anyway — bounds may be empty.\n")
-
-    # --- Step 2: Sweep each parameter ------------------------------------
-    print("\n" + "#"*60)
-    print("STEP 2: Sweeping physics parameters")
-    print("#"*60)
-
-    rapp_bounds = {}
-    all_results = {}
-
-    for param_name, param_cfg in PARAMETERS.items():
-        test_values = param_cfg["test_values"]
-        print(f"\n--- Parameter: {param_name} ({len(test_values)} values to test) ---")
-
-        lowest_ok = float("inf")
-        highest_ok = float("-inf")
-        param_results = []
-
-        for val in test_values:
-            output_path = os.path.join(tmp_dir, f"{param_name}_{val}.json")
-            result = run_eval(
-                args.checkpoint, param_name, val,
-                args.num_envs, args.eval_steps, args.success_threshold,
-                output_path
-            )
-
-            if result is None or result.get("status") != "success":
-                ok = False
-                pos_err = None
+    store = ExperimentStore(args.store or os.path.join(
+        os.path.dirname(os.path.abspath(args.output)), "experiments.db"))
+    run_id = store.start_run("rapp", args.task, config=vars(args))
+
+    try:
+        tmp_dir = f"/tmp/rapp_{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        # ── Step 1: Baseline evaluation (all default parameters) ────────────
+        print("\n" + "#"*60)
+        print("STEP 1: Baseline evaluation (default physics)")
+        print(f"Success threshold: position_error < {args.success_threshold}m")
+        print("#"*60)
+
+        baseline_output = os.path.join(tmp_dir, "baseline.json")
+        baseline_result = run_eval(
+            args.checkpoint, "default", 0.0,
+            args.num_envs, args.eval_steps, args.success_threshold,
+            baseline_output
+        )
+
+        if baseline_result is None or baseline_result.get("status") != "success":
+            print("ERROR: Baseline evaluation failed. Cannot proceed.")
+            store.finish_run(run_id, status="failed")
+            sys.exit(1)
+        store.add_candidate(run_id, "baseline", metrics=baseline_result)
+
+        baseline_pos_error = baseline_result["mean_position_error"]
+        baseline_success = baseline_result["success"]
+
+        print(f"\nBaseline position error: {baseline_pos_error:.4f}m")
+        print(f"Baseline success: {baseline_success}")
+
+        if not baseline_success:
+            print(f"\nWARNING: Baseline FAILS the success threshold "
+                  f"({baseline_pos_error:.4f}m >= {args.success_threshold}m).")
+            print("The Stage 1 policy may need more training iterations,")
+            print("or increase --success-threshold to be more lenient.")
+            print("Proceeding anyway — bounds may be empty.\n")
+
+        # --- Step 2: Sweep each parameter ------------------------------------
+        print("\n" + "#"*60)
+        print("STEP 2: Sweeping physics parameters")
+        print("#"*60)
+
+        rapp_bounds = {}
+        all_results = {}
+
+        for param_name, param_cfg in PARAMETERS.items():
+            test_values = param_cfg["test_values"]
+            print(f"\n--- Parameter: {param_name} ({len(test_values)} values to test) ---")
+
+            lowest_ok = float("inf")
+            highest_ok = float("-inf")
+            param_results = []
+
+            for val in test_values:
+                output_path = os.path.join(tmp_dir, f"{param_name}_{val}.json")
+                result = run_eval(
+                    args.checkpoint, param_name, val,
+                    args.num_envs, args.eval_steps, args.success_threshold,
+                    output_path
+                )
+
+                if result is None or result.get("status") != "success":
+                    ok = False
+                    pos_err = None
+                else:
+                    ok = result["success"]
+                    pos_err = result["mean_position_error"]
+
+                param_results.append({
+                    "value": val,
+                    "mean_position_error": pos_err,
+                    "success": ok,
+                })
+                store.add_candidate(
+                    run_id, f"{param_name}={val}",
+                    metrics=result or {"status": "error"},
+                    params={param_name: val},
+                    status="pass" if ok else ("fail" if pos_err is not None else "error"),
+                )
+
+                status = "PASS" if ok else "FAIL"
+                err_str = f"{pos_err:.4f}m" if pos_err is not None else "N/A"
+                print(f"  {param_name} = {val:>8} → pos_error = {err_str}  [{status}]")
+
+                if ok:
+                    lowest_ok = min(lowest_ok, val)
+                    highest_ok = max(highest_ok, val)
+
+            all_results[param_name] = param_results
+
+            if lowest_ok == float("inf"):
+                print(f"  WARNING: No successful values for {param_name}!")
+                rapp_bounds[param_name] = {
+                    "min": None,
+                    "max": None,
+                    "hint": param_cfg.get("hint", ""),
+                    "status": "no_feasible_range",
+                }
             else:
-                ok = result["success"]
-                pos_err = result["mean_position_error"]
-
-            param_results.append({
-                "value": val,
-                "mean_position_error": pos_err,
-                "success": ok,
-            })
-
-            status = "PASS" if ok else "FAIL"
-            err_str = f"{pos_err:.4f}m" if pos_err is not None else "N/A"
-            print(f"  {param_name} = {val:>8} → pos_error = {err_str}  [{status}]")
-
-            if ok:
-                lowest_ok = min(lowest_ok, val)
-                highest_ok = max(highest_ok, val)
-
-        all_results[param_name] = param_results
-
-        if lowest_ok == float("inf"):
-            print(f"  WARNING: No successful values for {param_name}!")
-            rapp_bounds[param_name] = {
-                "min": None,
-                "max": None,
-                "hint": param_cfg.get("hint", ""),
-                "status": "no_feasible_range",
-            }
-        else:
-            print(f"  RAPP bounds for {param_name}: [{lowest_ok}, {highest_ok}]")
-            rapp_bounds[param_name] = {
-                "min": lowest_ok,
-                "max": highest_ok,
-                "hint": param_cfg.get("hint", ""),
-                "status": "ok",
-            }
-
-    # --- Step 3: Write output --------------------------------------------
-    output = {
-        "baseline_position_error": baseline_pos_error,
-        "success_threshold": args.success_threshold,
-        "bounds": rapp_bounds,
-        "detailed_results": all_results,
-    }
-
-    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
-    with open(args.output, 'w') as f:
-        json.dump(output, f, indent=2)
+                print(f"  RAPP bounds for {param_name}: [{lowest_ok}, {highest_ok}]")
+                rapp_bounds[param_name] = {
+                    "min": lowest_ok,
+                    "max": highest_ok,
+                    "hint": param_cfg.get("hint", ""),
+                    "status": "ok",
+                }
+
+        # --- Step 3: Write output --------------------------------------------
+        output = {
+            "baseline_position_error": baseline_pos_error,
+            "success_threshold": args.success_threshold,
+            "bounds": rapp_bounds,
+            "detailed_results": all_results,
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+
+        store.add_artifact(args.output, "rapp_bounds", run_id=run_id)
+        store.finish_run(run_id, summary={"bounds": rapp_bounds})
+    except BaseException:
+        store.fail_run(run_id)
+        raise
+    store.close()
 
     # --- Summary ------------------------------------------------------------
     print("\n" + "="*60)
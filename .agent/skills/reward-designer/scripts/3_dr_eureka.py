@@ -25,12 +25,14 @@ import argparse
 from pathlib import Path
 
 from google import genai
-import wandb
+
+from experiment_store import ExperimentStore
+from tracking import Tracker
 
 
 # --- Inject DR into template ---
-def inject_dr_into_template(dr_config, template_path, output_path):
-    """Inject LLM-generated DR ranges into the template file."""
+def inject_dr_into_template(dr_config, template_path, output_path, schedule=None):
+    """Inject LLM-generated DR ranges (and optional DR schedule) into the template file."""
     with open(template_path, 'r') as f:
         template = f.read()
 
@@ -38,6 +40,16 @@ def inject_dr_into_template(dr_config, template_path, output_path):
     lines = []
     for param_name, rng in dr_config.items():
         lines.append(f"{param_name}_range = [{rng[0]}, {rng[1]}]")
+    if schedule:
+        # dr_eureka.schedule in the YAML: {type, initial_width, ...} -> dr_schedule_* globals
+        lines.append(f"dr_schedule = {schedule['type']!r}")
+        for key, val in schedule.items():
+            if key == 'type':
+                continue
+            if key == 'nominals':
+                lines += [f"{p}_nominal = {v!r}" for p, v in val.items()]
+            else:
+                lines.append(f"dr_schedule_{key} = {val!r}")
     code_block = "\n".join(lines)
 
     final_code = template.replace("# INSERT EUREKA DR HERE", code_block)
@@ -164,120 +176,136 @@ def main():
     num_samples = args.num_samples or dr_cfg.get('num_samples', 3)
     model_name = dr_cfg.get('model', cfg['eureka'].get('model', 'gemini-2.5-flash-lite'))
 
-    # W&B
-    wandb.init(
+    # W&B (buffered; spools to outputs/tracking/ when offline)
+    tracker = Tracker(
         project="Fluxa-Reward-Designer",
         name=f"dr-eureka-{cfg['task_name']}",
         config=cfg,
+        spool_dir=designer_root / "outputs" / "tracking",
     )
 
-    # --- Load RAPP bounds ---
-    bounds_dict = None
-
-    if args.use_placeholders:
-        print("Using placeholder bounds (--use-placeholders)")
-        bounds_dict = PLACEHOLDER_BOUNDS
-    else:
-        # Try to load from file
-        rapp_path = args.rapp_bounds or (designer_root / cfg.get('rapp_bounds_file', 'outputs/rapp_bounds.json'))
-        rapp_path = Path(rapp_path)
-
-        if rapp_path.exists():
-            with open(rapp_path, 'r') as f:
-                rapp_data = json.load(f)
-
-            raw_bounds = rapp_data.get("bounds", {})
-
-            # Filter to only params with feasible ranges
-            bounds_dict = {}
-            for param_name, info in raw_bounds.items():
-                if info.get("status") == "ok" and info["min"] is not None:
-                    bounds_dict[param_name] = info
-                else:
-                    print(f"  Skipping {param_name}: no feasible range from RAPP")
-
-            if not bounds_dict:
-                print("\nNo feasible RAPP bounds found. Falling back to placeholders.")
-                bounds_dict = PLACEHOLDER_BOUNDS
-        else:
-            print(f"\nRAPP bounds file not found at {rapp_path}. Using placeholders.")
-            bounds_dict = PLACEHOLDER_BOUNDS
-
-    print(f"\nDR parameters ({len(bounds_dict)} total):")
-    for name, info in bounds_dict.items():
-        print(f"  {name}: [{info['min']}, {info['max']}]")
-
-    # --- Query LLM for DR configurations ---
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-    task_description = cfg['task_description']
-    user_prompt = build_user_prompt(task_description, bounds_dict)
-
-    print(f"\nGenerating {num_samples} DR configurations...")
-
-    all_configs = []
-    output_dir = designer_root / "outputs" / "dr_candidates"
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    for i in range(num_samples):
-        print(f"\n{'='*60}")
-        print(f"  DR Sample {i+1}/{num_samples}")
-        print(f"{'='*60}")
+    store = ExperimentStore(designer_root / "outputs" / "experiments.db")
+    run_id = store.start_run("dr_eureka", cfg['task_name'], config=cfg)
 
-        response = client.models.generate_content(
-            model=model_name,
-            contents=[
-                {"role": "user", "parts": [{"text": SYSTEM_PROMPT + "\n\n" + user_prompt}]}
-            ],
-        )
+    try:
+        # --- Load RAPP bounds ---
+        bounds_dict = None
 
-        raw_text = response.text
-
-        # Save raw output
-        raw_path = output_dir / f"dr_sample_{i}_raw.txt"
-        with open(raw_path, 'w') as f:
-            f.write(raw_text)
-
-        # Parse
-        dr_config = parse_dr_config(raw_text)
-
-        if not dr_config:
-            print(f"  Warning: Failed to parse DR config from sample {i}")
-            continue
+        if args.use_placeholders:
+            print("Using placeholder bounds (--use-placeholders)")
+            bounds_dict = PLACEHOLDER_BOUNDS
+        else:
+            # Try to load from file
+            rapp_path = args.rapp_bounds or (designer_root / cfg.get('rapp_bounds_file', 'outputs/rapp_bounds.json'))
+            rapp_path = Path(rapp_path)
+
+            if rapp_path.exists():
+                with open(rapp_path, 'r') as f:
+                    rapp_data = json.load(f)
+
+                raw_bounds = rapp_data.get("bounds", {})
+
+                # Filter to only params with feasible ranges
+                bounds_dict = {}
+                for param_name, info in raw_bounds.items():
+                    if info.get("status") == "ok" and info["min"] is not None:
+                        bounds_dict[param_name] = info
+                    else:
+                        print(f"  Skipping {param_name}: no feasible range from RAPP")
+
+                if not bounds_dict:
+                    print("\nNo feasible RAPP bounds found. Falling back to placeholders.")
+                    bounds_dict = PLACEHOLDER_BOUNDS
+            else:
+                print(f"\nRAPP bounds file not found at {rapp_path}. Using placeholders.")
+                bounds_dict = PLACEHOLDER_BOUNDS
 
-        print(f"  Parsed {len(dr_config)} parameter ranges:")
-        for name, rng in dr_config.items():
-            print(f"    {name}: {rng}")
-
-        all_configs.append({
-            "sample_id": i,
-            "config": dr_config,
-        })
-
-        # Template injection: save as importable .py file
-        template_path = designer_root / cfg['dr_eureka'].get('dr_template_file',
-                                                              'templates/dr_template.py')
-        dr_py_path = output_dir / f"dr_config_{i}.py"
-        inject_dr_into_template(dr_config, template_path, dr_py_path)
-        print(f"  Saved to: {dr_py_path}")
-
-        # Log to W&B
-        wandb.log({
-            "dr_sample": i,
-            "num_params_randomized": len(dr_config),
-            "raw_output": wandb.Html(f"<pre><code>{raw_text}</code></pre>"),
-        })
-
-    # --- Save all configs -----------------------
-    output = {
-        "task": cfg['task_name'],
-        "num_samples": len(all_configs),
-        "bounds_used": {k: {"min": v["min"], "max": v["max"]} for k, v in bounds_dict.items()},
-        "configs": all_configs,
-    }
-
-    output_path = designer_root / "outputs" / "dr_configs.json"
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
+        print(f"\nDR parameters ({len(bounds_dict)} total):")
+        for name, info in bounds_dict.items():
+            print(f"  {name}: [{info['min']}, {info['max']}]")
+
+        # --- Query LLM for DR configurations ---
+        client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        task_description = cfg['task_description']
+        user_prompt = build_user_prompt(task_description, bounds_dict)
+
+        print(f"\nGenerating {num_samples} DR configurations...")
+
+        all_configs = []
+        output_dir = designer_root / "outputs" / "dr_candidates"
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for i in range(num_samples):
+            print(f"\n{'='*60}")
+            print(f"  DR Sample {i+1}/{num_samples}")
+            print(f"{'='*60}")
+
+            response = client.models.generate_content(
+                model=model_name,
+                contents=[
+                    {"role": "user", "parts": [{"text": SYSTEM_PROMPT + "\n\n" + user_prompt}]}
+                ],
+            )
+
+            raw_text = response.text
+
+            # Save raw output
+            raw_path = output_dir / f"dr_sample_{i}_raw.txt"
+            with open(raw_path, 'w') as f:
+                f.write(raw_text)
+
+            # Parse
+            dr_config = parse_dr_config(raw_text)
+
+            if not dr_config:
+                print(f"  Warning: Failed to parse DR config from sample {i}")
+                cand_id = store.add_candidate(run_id, f"dr_sample_{i}", status="parse_failed")
+                store.add_artifact(raw_path, "raw_llm_output", candidate_id=cand_id)
+                continue
+
+            print(f"  Parsed {len(dr_config)} parameter ranges:")
+            for name, rng in dr_config.items():
+                print(f"    {name}: {rng}")
+
+            all_configs.append({
+                "sample_id": i,
+                "config": dr_config,
+            })
+
+            # Template injection: save as importable .py file
+            template_path = designer_root / cfg['dr_eureka'].get('dr_template_file',
+                                                                  'templates/dr_template.py')
+            dr_py_path = output_dir / f"dr_config_{i}.py"
+            inject_dr_into_template(dr_config, template_path, dr_py_path,
+                                    schedule=dr_cfg.get('schedule'))
+            print(f"  Saved to: {dr_py_path}")
+
+            cand_id = store.add_candidate(run_id, f"dr_sample_{i}", params=dr_config, status="ok")
+            store.add_artifact(raw_path, "raw_llm_output", candidate_id=cand_id)
+            store.add_artifact(dr_py_path, "dr_config", candidate_id=cand_id)
+
+            # Log to W&B
+            tracker.log_file("raw_output", raw_path, dr_sample=i,
+                             num_params_randomized=len(dr_config))
+
+        # --- Save all configs -----------------------
+        output = {
+            "task": cfg['task_name'],
+            "num_samples": len(all_configs),
+            "bounds_used": {k: {"min": v["min"], "max": v["max"]} for k, v in bounds_dict.items()},
+            "configs": all_configs,
+        }
+
+        output_path = designer_root / "outputs" / "dr_configs.json"
+        with open(output_path, 'w') as f:
+            json.dump(output, f, indent=2)
+
+        store.add_artifact(output_path, "dr_configs", run_id=run_id)
+        store.finish_run(run_id, summary={"num_samples": len(all_configs)})
+    except BaseException:
+        store.fail_run(run_id)
+        raise
+    store.close()
 
     # --- Summary -----------------------
     print(f"\n{'='*60}")
@@ -297,7 +325,7 @@ def main():
 
     print(f"Full output saved to: {output_path}")
 
-    wandb.finish()
+    tracker.finish()
 
 
 if __name__ == "__main__":
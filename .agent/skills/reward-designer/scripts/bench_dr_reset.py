@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+bench_dr_reset.py — Per-reset cost of the domain randomization events.
+
+Times the legacy layout (one EventTerm per DR parameter, as registered by
+`add_dr_events(..., fused=False)`) against FusedDomainRandomizationReset while
+the number of active DR parameters and the number of resetting envs grow.
+Both variants are called directly on a live env, so the numbers include the
+PhysX writes, not just the sampling.
+
+Runs INSIDE Docker (needs Isaac Sim):
+    docker exec fluxa-isaacsim /isaac-sim/python.sh bench_dr_reset.py \
+        --num-envs 4096 --repeats 50
+"""
+
+import os
+import sys
+import time
+import argparse
+
+parser = argparse.ArgumentParser(description="Benchmark DR reset events")
+parser.add_argument("--num-envs", type=int, default=4096,
+                    help="Envs in the scene; reset batches go up to this size")
+parser.add_argument("--repeats", type=int, default=50,
+                    help="Timed resets per (n_params, n_envs) cell")
+args = parser.parse_args()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import eval_headless as eh  # noqa: E402  (launches Isaac Sim headless)
+
+import torch  # noqa: E402
+from isaaclab.envs import ManagerBasedRLEnv  # noqa: E402
+from isaaclab.managers import EventTermCfg as EventTerm  # noqa: E402
+from isaaclab.managers import SceneEntityCfg  # noqa: E402
+
+# Same ranges as outputs/dr_candidates/dr_config_0.py
+BENCH_RANGES = {
+    "joint_friction": [0.1, 2.0],
+    "joint_armature": [0.05, 0.5],
+    "joint_stiffness_scale": [0.7, 1.3],
+    "joint_damping_scale": [0.7, 1.3],
+}
+
+
+def time_ms(fn, repeats):
+    """Mean wall time of fn() in milliseconds, synchronized on the GPU."""
+    fn()  # warm-up (first PhysX write per property is slower)
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def main():
+    env = ManagerBasedRLEnv(cfg=eh.build_env_cfg(args.num_envs))
+    asset_cfg = SceneEntityCfg("robot")
+    asset_cfg.resolve(env.scene)
+
+    sizes = [n for n in (16, 64, 256, 1024) if n < env.num_envs] + [env.num_envs]
+    names = list(BENCH_RANGES)
+
+    print(f"\n{'params':>6} {'envs':>6} {'legacy ms':>10} {'fused ms':>9} {'speedup':>8}")
+    for k in range(1, len(names) + 1):
+        ranges = {p: BENCH_RANGES[p] for p in names[:k]}
+        fused = eh.FusedDomainRandomizationReset(
+            EventTerm(func=eh.FusedDomainRandomizationReset, mode="reset",
+                      params={"ranges": ranges, "asset_cfg": asset_cfg}),
+            env,
+        )
+        for n in sizes:
+            env_ids = torch.arange(n, device=env.device)
+
+            def legacy():
+                for p, (low, high) in ranges.items():
+                    eh.DR_FUNC_MAP[p](env, env_ids, low, high, asset_cfg)
+
+            def fused_reset():
+                fused(env, env_ids, ranges, asset_cfg)
+
+            t_legacy = time_ms(legacy, args.repeats)
+            t_fused = time_ms(fused_reset, args.repeats)
+            print(f"{k:>6} {n:>6} {t_legacy:>10.3f} {t_fused:>9.3f} "
+                  f"{t_legacy / t_fused:>7.2f}x")
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
+    eh.simulation_app.close()
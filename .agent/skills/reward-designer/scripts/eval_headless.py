@@ -45,9 +45,13 @@ import isaaclab_tasks.manager_based.manipulation.reach.mdp as mdp
 from isaaclab_tasks.manager_based.manipulation.reach.reach_env_cfg import ReachEnvCfg
 from isaaclab.envs import ManagerBasedRLEnv
 
+from isaaclab.managers import CurriculumTermCfg as CurrTerm
 from isaaclab.managers import EventTermCfg as EventTerm
+from isaaclab.managers import ManagerTermBase
 from isaaclab.managers import SceneEntityCfg
 
+from policy_export import export_policy
+
 # Force-overwrite asset paths
 asset_utils.NUCLEUS_ASSET_ROOT_DIR = S3_ROOT_50
 asset_utils.NVIDIA_NUCLEUS_DIR     = S3_ROOT_50 + "/NVIDIA"
@@ -62,35 +66,69 @@ torch.backends.cudnn.deterministic = False
 torch.backends.cudnn.benchmark = False
 
 # --- Domain randomization reset functions ----------------------------------------
-def randomize_joint_friction_reset(env, env_ids, low: float, high: float, asset_cfg):
+def dr_width(env, initial_width: float = 1.0) -> torch.Tensor:
+    """Current DR curriculum width in [0, 1], as a 0-dim tensor on env.device.
+
+    Shared by the DR reset events (readers) and dr_width_curriculum (writer).
+    It lives on the env rather than in the term params so every term sees the
+    same counter no matter how the managers copy their cfgs. Created lazily
+    by whichever term touches it first.
+    """
+    width = getattr(env, "dr_width", None)
+    if width is None:
+        width = torch.full((), float(initial_width), device=env.device)
+        env.dr_width = width
+    return width
+
+
+def _scheduled(env, values, nominal, initial_width):
+    """Pull sampled values toward `nominal` by the curriculum width, in place.
+
+    width == 1 leaves the full [low, high] range; width == 0 pins every env
+    to nominal. No-op when no schedule is configured (nominal is None).
+    """
+    if nominal is None:
+        return values
+    return values.sub_(nominal).mul_(dr_width(env, initial_width)).add_(nominal)
+
+
+def randomize_joint_friction_reset(env, env_ids, low: float, high: float, asset_cfg,
+                                   nominal=None, initial_width: float = 1.0):
     """Sample a fresh joint friction value per env on reset."""
     asset = env.scene[asset_cfg.name]
     num_joints = asset.num_joints
     values = torch.empty(len(env_ids), num_joints, device=asset.device).uniform_(low, high)
+    values = _scheduled(env, values, nominal, initial_width)
     asset.write_joint_friction_coefficient_to_sim(values, env_ids=env_ids)
 
 
-def randomize_joint_armature_reset(env, env_ids, low: float, high: float, asset_cfg):
+def randomize_joint_armature_reset(env, env_ids, low: float, high: float, asset_cfg,
+                                   nominal=None, initial_width: float = 1.0):
     """Sample a fresh joint armature value per env on reset."""
     asset = env.scene[asset_cfg.name]
     num_joints = asset.num_joints
     values = torch.empty(len(env_ids), num_joints, device=asset.device).uniform_(low, high)
+    values = _scheduled(env, values, nominal, initial_width)
     asset.write_joint_armature_to_sim(values, env_ids=env_ids)
 
 
-def randomize_joint_stiffness_scale_reset(env, env_ids, low: float, high: float, asset_cfg):
+def randomize_joint_stiffness_scale_reset(env, env_ids, low: float, high: float, asset_cfg,
+                                          nominal=None, initial_width: float = 1.0):
     """Scale default joint stiffness by a random factor on reset."""
     asset = env.scene[asset_cfg.name]
     default = asset.data.default_joint_stiffness[env_ids].clone()
     scale = torch.empty(len(env_ids), 1, device=asset.device).uniform_(low, high)
+    scale = _scheduled(env, scale, nominal, initial_width)
     asset.write_joint_stiffness_to_sim(default * scale, env_ids=env_ids)
 
 
-def randomize_joint_damping_scale_reset(env, env_ids, low: float, high: float, asset_cfg):
+def randomize_joint_damping_scale_reset(env, env_ids, low: float, high: float, asset_cfg,
+                                        nominal=None, initial_width: float = 1.0):
     """Scale default joint damping by a random factor on reset."""
     asset = env.scene[asset_cfg.name]
     default = asset.data.default_joint_damping[env_ids].clone()
     scale = torch.empty(len(env_ids), 1, device=asset.device).uniform_(low, high)
+    scale = _scheduled(env, scale, nominal, initial_width)
     asset.write_joint_damping_to_sim(default * scale, env_ids=env_ids)
 
 
@@ -102,12 +140,208 @@ DR_FUNC_MAP = {
     "joint_damping_scale": randomize_joint_damping_scale_reset,
 }
 
+# Value each parameter widens out from under a DR schedule: the physics the
+# Stage 1 policy was trained on. Overridable per param with `<param>_nominal`
+# in the DR config, and clamped into the param's [low, high].
+DR_NOMINALS = {
+    "joint_friction": 0.0,
+    "joint_armature": 0.0,
+    "joint_stiffness_scale": 1.0,
+    "joint_damping_scale": 1.0,
+}
 
-def load_dr_config(dr_file_path):
-    """Load a DR config .py file and extract parameter ranges."""
+
+# Parameters the fused event knows how to apply, and how many random columns
+# each one draws per env: per-joint values need num_joints, scales need one.
+FUSED_PER_JOINT_PARAMS = ("joint_friction", "joint_armature")
+FUSED_SCALE_PARAMS = ("joint_stiffness_scale", "joint_damping_scale")
+
+
+class FusedDomainRandomizationReset(ManagerTermBase):
+    """All DR parameters in one reset event.
+
+    The per-parameter events above each allocate their own random tensor,
+    clone the defaults and make their own PhysX write. This term instead draws
+    every parameter for the reset env_ids with a single `torch.rand` into a
+    preallocated (num_envs, n_cols) buffer, maps it onto [low, high] per column
+    in place, and issues exactly one sim write per physical property.
+
+    Params (passed through EventTerm.params):
+        ranges:        {param_name: [low, high]} as returned by load_dr_config
+        asset_cfg:     SceneEntityCfg of the randomized articulation
+        nominals:      optional {param_name: nominal}; when given, samples are
+                       pulled toward nominal by the shared dr_width counter
+        initial_width: width used if this term creates the counter
+    """
+    def __init__(self, cfg, env):
+        super().__init__(cfg, env)
+        asset = env.scene[cfg.params["asset_cfg"].name]
+        ranges = cfg.params["ranges"]
+        num_joints = asset.num_joints
+        device = asset.device
+
+        unknown = [p for p in ranges
+                   if p not in FUSED_PER_JOINT_PARAMS + FUSED_SCALE_PARAMS]
+        if unknown:
+            raise ValueError(f"Fused DR event has no handler for {unknown}")
+
+        # Column slices into the shared random buffer, one block per param.
+        nominals = cfg.params.get("nominals")
+        self.slices = {}
+        low, span, nom = [], [], []
+        col = 0
+        for name in FUSED_PER_JOINT_PARAMS + FUSED_SCALE_PARAMS:
+            if name not in ranges:
+                continue
+            width = num_joints if name in FUSED_PER_JOINT_PARAMS else 1
+            lo, hi = ranges[name]
+            self.slices[name] = slice(col, col + width)
+            low += [lo] * width
+            span += [hi - lo] * width
+            if nominals is not None:
+                nom += [nominals[name]] * width
+            col += width
+
+        self.low = torch.tensor(low, device=device)       # (n_cols,)
+        self.span = torch.tensor(span, device=device)     # (n_cols,)
+        self.nominal = torch.tensor(nom, device=device) if nominals is not None else None
+        self._u = torch.empty(env.num_envs, col, device=device)
+        self._vals = torch.empty_like(self._u)
+        self._stiffness = torch.empty(env.num_envs, num_joints, device=device)
+        self._damping = torch.empty_like(self._stiffness)
+
+    def __call__(self, env, env_ids, ranges, asset_cfg, nominals=None, initial_width=1.0):
+        asset = env.scene[asset_cfg.name]
+        n = len(env_ids)
+        u = self._u[:n]
+        vals = self._vals[:n]
+        torch.rand(u.shape, out=u, device=u.device)       # one RNG launch for every param
+        torch.addcmul(self.low, u, self.span, out=vals)    # low + u * (high - low), per column
+        if self.nominal is not None:                       # curriculum: nominal + w * (v - nominal)
+            vals.sub_(self.nominal).mul_(dr_width(env, initial_width)).add_(self.nominal)
+
+        sl = self.slices
+        if "joint_friction" in sl:
+            asset.write_joint_friction_coefficient_to_sim(vals[:, sl["joint_friction"]], env_ids=env_ids)
+        if "joint_armature" in sl:
+            asset.write_joint_armature_to_sim(vals[:, sl["joint_armature"]], env_ids=env_ids)
+        if "joint_stiffness_scale" in sl:
+            out = self._stiffness[:n]
+            torch.index_select(asset.data.default_joint_stiffness, 0, env_ids, out=out)
+            out.mul_(vals[:, sl["joint_stiffness_scale"]])
+            asset.write_joint_stiffness_to_sim(out, env_ids=env_ids)
+        if "joint_damping_scale" in sl:
+            out = self._damping[:n]
+            torch.index_select(asset.data.default_joint_damping, 0, env_ids, out=out)
+            out.mul_(vals[:, sl["joint_damping_scale"]])
+            asset.write_joint_damping_to_sim(out, env_ids=env_ids)
+
+
+def dr_width_curriculum(env, env_ids, schedule: str, initial_width: float = 0.0,
+                        ramp_steps: int = 1, command_name: str = "ee_pose",
+                        success_threshold: float = 0.05, target_success: float = 0.8,
+                        step: float = 0.05):
+    """Curriculum term that advances the shared DR width counter.
+
+    linear:   width ramps from initial_width to 1 over `ramp_steps` env steps.
+    adaptive: each time the envs being reset finished with at least
+              `target_success` of them inside `success_threshold` (EE position
+              error, m), width grows by `step`. Evaluated entirely on device,
+              so no host sync is added to the reset path.
+    """
+    width = dr_width(env, initial_width)
+    if schedule == "linear":
+        progress = min(1.0, env.common_step_counter / max(ramp_steps, 1))
+        width.fill_(initial_width + (1.0 - initial_width) * progress)
+    elif schedule == "adaptive":
+        pos_err = env.command_manager.get_term(command_name).metrics["position_error"][env_ids]
+        success = (pos_err < success_threshold).float().mean()
+        width.add_(step * (success >= target_success).float()).clamp_(max=1.0)
+    else:
+        raise ValueError(f"Unknown DR schedule: {schedule!r}")
+    return width
+
+
+def add_dr_events(env_cfg, dr_ranges, fused=True, schedule=None, steps_per_iteration=24):
+    """Register DR reset events on env_cfg.events for the given ranges.
+
+    fused=True registers a single FusedDomainRandomizationReset covering every
+    supported parameter; fused=False keeps the legacy one-EventTerm-per-param
+    layout (useful for benchmarking the two against each other).
+
+    schedule (from load_dr_schedule) additionally registers dr_width_curriculum
+    and makes every DR event widen from its nominal value with the counter.
+    """
+    supported = {}
+    for param_name, (low, high) in dr_ranges.items():
+        if param_name not in DR_FUNC_MAP:
+            print(f"  Warning: No DR function for '{param_name}', skipping")
+            continue
+        supported[param_name] = [low, high]
+        print(f"  Added DR event: {param_name} ∈ [{low}, {high}]")
+
+    if not supported:
+        return
+
+    sched_params = {}
+    if schedule is not None:
+        nominals = {}
+        for param_name, (low, high) in supported.items():
+            nominal = schedule["nominals"].get(param_name, DR_NOMINALS[param_name])
+            nominals[param_name] = min(max(nominal, low), high)
+        sched_params = {"nominals": nominals, "initial_width": schedule["initial_width"]}
+
+        curr_params = {
+            "schedule": schedule["type"],
+            "initial_width": schedule["initial_width"],
+        }
+        if schedule["type"] == "linear":
+            curr_params["ramp_steps"] = schedule["ramp_iterations"] * steps_per_iteration
+        else:
+            curr_params.update(
+                success_threshold=schedule["success_threshold"],
+                target_success=schedule["target_success"],
+                step=schedule["step"],
+            )
+        env_cfg.curriculum.dr_width = CurrTerm(func=dr_width_curriculum, params=curr_params)
+        print(f"  DR schedule: {schedule['type']} from width "
+              f"{schedule['initial_width']} around nominals {nominals}")
+
+    if fused:
+        env_cfg.events.randomize_physics_fused = EventTerm(
+            func=FusedDomainRandomizationReset,
+            mode="reset",
+            params={"ranges": supported, "asset_cfg": SceneEntityCfg("robot"), **sched_params},
+        )
+        print(f"  Fused {len(supported)} DR parameters into one reset event")
+        return
+
+    for param_name, (low, high) in supported.items():
+        params = {
+            "low": low,
+            "high": high,
+            "asset_cfg": SceneEntityCfg("robot"),
+        }
+        if sched_params:
+            params["nominal"] = sched_params["nominals"][param_name]
+            params["initial_width"] = sched_params["initial_width"]
+        setattr(env_cfg.events, f"randomize_{param_name}", EventTerm(
+            func=DR_FUNC_MAP[param_name],
+            mode="reset",
+            params=params,
+        ))
+
+
+def _exec_dr_file(dr_file_path):
     dr_globals = {}
     with open(dr_file_path, 'r') as f:
         exec(f.read(), dr_globals)
+    return dr_globals
+
+
+def load_dr_config(dr_file_path):
+    """Load a DR config .py file and extract parameter ranges."""
+    dr_globals = _exec_dr_file(dr_file_path)
 
     ranges = {}
     for name, val in dr_globals.items():
@@ -116,6 +350,35 @@ def load_dr_config(dr_file_path):
             ranges[param_name] = [float(val[0]), float(val[1])]
     return ranges
 
+
+def load_dr_schedule(dr_file_path):
+    """Load the optional DR curriculum declared in a DR config .py file.
+
+    Returns None when the file sets no `dr_schedule` (fixed ranges), else a
+    dict with the schedule type, its knobs (defaults filled in) and any
+    `<param>_nominal` overrides.
+    """
+    dr_globals = _exec_dr_file(dr_file_path)
+    kind = dr_globals.get("dr_schedule")
+    if kind is None:
+        return None
+    if kind not in ("linear", "adaptive"):
+        raise ValueError(f"dr_schedule must be 'linear' or 'adaptive', got {kind!r}")
+
+    return {
+        "type": kind,
+        "initial_width": float(dr_globals.get("dr_schedule_initial_width", 0.0)),
+        "ramp_iterations": int(dr_globals.get("dr_schedule_ramp_iterations", 200)),
+        "success_threshold": float(dr_globals.get("dr_schedule_success_threshold", 0.05)),
+        "target_success": float(dr_globals.get("dr_schedule_target_success", 0.8)),
+        "step": float(dr_globals.get("dr_schedule_step", 0.05)),
+        "nominals": {
+            name[:-len('_nominal')]: float(val)
+            for name, val in dr_globals.items()
+            if name.endswith('_nominal') and isinstance(val, (int, float))
+        },
+    }
+
 # ---------------------------------------------------------------------------
 
 
@@ -130,6 +393,40 @@ def load_reward_code(reward_file_path):
     return reward_globals.get("reward_dict", None)
 
 
+def build_env_cfg(num_envs):
+    """Franka reach env config used for Eureka evaluation (and the DR benchmark)."""
+    @configclass
+    class EvalFrankaReachEnvCfg(ReachEnvCfg):
+        def __post_init__(self):
+            super().__post_init__()
+            self.scene.robot = FRANKA_PANDA_CFG.replace(
+                prim_path="/World/envs/env_.*/Robot"
+            )
+            self.rewards.end_effector_position_tracking.params["asset_cfg"].body_names = ["panda_hand"]
+            self.rewards.end_effector_position_tracking_fine_grained.params["asset_cfg"].body_names = ["panda_hand"]
+            self.rewards.end_effector_orientation_tracking.params["asset_cfg"].body_names = ["panda_hand"]
+            self.actions.arm_action = mdp.JointPositionActionCfg(
+                asset_name="robot",
+                joint_names=["panda_joint.*"],
+                scale=0.5,
+                use_default_offset=True,
+            )
+            self.commands.ee_pose.body_name = "panda_hand"
+            self.commands.ee_pose.ranges.pitch = (math.pi, math.pi)
+            self.scene.num_envs = num_envs
+            self.scene.env_spacing = 2.0
+
+    env_cfg = EvalFrankaReachEnvCfg()
+    env_cfg.commands.ee_pose.debug_vis = False
+    env_cfg.scene.ground.spawn.usd_path = ISAAC_DIR + "/Environments/Grid/default_environment.usd"
+
+    if hasattr(env_cfg.scene, "table"):
+        env_cfg.scene.table.spawn.usd_path = (
+            ISAAC_DIR + "/Props/Mounts/SeattleLabTable/table_instanceable.usd"
+        )
+    return env_cfg
+
+
 def run_evaluation(args):
     """Run a short rollout and write metrics to a JSON file."""
     
@@ -203,35 +500,7 @@ def run_evaluation(args):
             return
 
     # --- Build environment config ---
-    @configclass
-    class EvalFrankaReachEnvCfg(ReachEnvCfg):
-        def __post_init__(self):
-            super().__post_init__()
-            self.scene.robot = FRANKA_PANDA_CFG.replace(
-                prim_path="/World/envs/env_.*/Robot"
-            )
-            self.rewards.end_effector_position_tracking.params["asset_cfg"].body_names = ["panda_hand"]
-            self.rewards.end_effector_position_tracking_fine_grained.params["asset_cfg"].body_names = ["panda_hand"]
-            self.rewards.end_effector_orientation_tracking.params["asset_cfg"].body_names = ["panda_hand"]
-            self.actions.arm_action = mdp.JointPositionActionCfg(
-                asset_name="robot",
-                joint_names=["panda_joint.*"],
-                scale=0.5,
-                use_default_offset=True,
-            )
-            self.commands.ee_pose.body_name = "panda_hand"
-            self.commands.ee_pose.ranges.pitch = (math.pi, math.pi)
-            self.scene.num_envs = args.num_envs
-            self.scene.env_spacing = 2.0
-
-    env_cfg = EvalFrankaReachEnvCfg()
-    env_cfg.commands.ee_pose.debug_vis = False
-    env_cfg.scene.ground.spawn.usd_path = ISAAC_DIR + "/Environments/Grid/default_environment.usd"
-
-    if hasattr(env_cfg.scene, "table"):
-        env_cfg.scene.table.spawn.usd_path = (
-            ISAAC_DIR + "/Props/Mounts/SeattleLabTable/table_instanceable.usd"
-        )
+    env_cfg = build_env_cfg(args.num_envs)
 
     # Patch rewards if we loaded a reward_dict
     if reward_dict is not None:
@@ -241,23 +510,11 @@ def run_evaluation(args):
     if args.dr_config and os.path.exists(args.dr_config):
         dr_ranges = load_dr_config(args.dr_config)
         print(f"Loaded {len(dr_ranges)} DR ranges from {args.dr_config}")
+        dr_schedule = load_dr_schedule(args.dr_config)
 
-        for param_name, (low, high) in dr_ranges.items():
-            if param_name not in DR_FUNC_MAP:
-                print(f"  Warning: No DR function for '{param_name}', skipping")
-                continue
-
-            event_name = f"randomize_{param_name}"
-            setattr(env_cfg.events, event_name, EventTerm(
-                func=DR_FUNC_MAP[param_name],
-                mode="reset",
-                params={
-                    "low": low,
-                    "high": high,
-                    "asset_cfg": SceneEntityCfg("robot"),
-                },
-            ))
-            print(f"  Added DR event: {param_name} ∈ [{low}, {high}]")
+        add_dr_events(env_cfg, dr_ranges, fused=not args.unfused_dr,
+                      schedule=dr_schedule,
+                      steps_per_iteration=EurekaEvalPPORunnerCfg.num_steps_per_env)
 
     # --- Create environment ---
     env = ManagerBasedRLEnv(cfg=env_cfg)
@@ -326,6 +583,14 @@ def run_evaluation(args):
         os.makedirs(os.path.dirname(args.save_policy), exist_ok=True)
         runner.save(args.save_policy)
         print(f"Policy saved to {args.save_policy}")
+
+    if args.export_policy:
+        # Export from a saved checkpoint so both paths read the same file format
+        checkpoint = args.save_policy or os.path.join(log_dir, "export_src.pt")
+        if not args.save_policy:
+            runner.save(checkpoint)
+        export_policy(checkpoint, args.export_policy,
+                      activation=agent_cfg.policy.activation)
  
     # --- Clean up ---
     env.close()
@@ -337,6 +602,7 @@ def run_evaluation(args):
     # ── Write metrics ────────────────────────────────────────────────────────
     metrics = {
         "policy_checkpoint": args.save_policy,
+        "policy_export": args.export_policy,
         "train_iterations": args.train_iterations,
         "train_duration_seconds": train_duration,
         "status": "success",
@@ -363,8 +629,14 @@ if __name__ == "__main__":
                         help="Path to write metrics JSON")
     parser.add_argument("--save-policy", type=str, default=None,
                         help="Path to save trained policy checkpoint")
+    parser.add_argument("--export-policy", type=str, default=None,
+                        help="Directory to write a standalone inference export "
+                             "(actor + obs normalizer, see policy_export.py)")
     parser.add_argument("--dr-config", type=str, default=None,
                         help="Path to DR config .py file (applies randomization at reset time)")
+    parser.add_argument("--unfused-dr", action="store_true",
+                        help="Register one reset event per DR parameter instead of "
+                             "the single fused event (for benchmarking)")
     args = parser.parse_args()
  
     run_evaluation(args)
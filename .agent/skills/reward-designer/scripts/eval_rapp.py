@@ -9,6 +9,10 @@ For each (parameter, value) pair, this script:
   4. Runs inference for N steps
   5. Reports position error and success to a JSON file
 
+Besides the mean, the per-env, per-step errors go into a streaming
+QuantileSketch (common/quantile_sketch.py), so the result also carries error
+percentiles and the serialized sketch; sketches from several runs merge.
+
 Success criterion (matching DrEureka's approach):
   "Does the end-effector stay within X meters of the target on average?"
   This is a task-specific binary check.
@@ -59,6 +63,11 @@ asset_utils.ISAAC_NUCLEUS_DIR      = ISAAC_DIR
 asset_utils.ISAACLAB_NUCLEUS_DIR   = LAB_DIR
 FRANKA_PANDA_CFG.spawn.usd_path = LAB_DIR + "/Robots/FrankaEmika/panda_instanceable.usd"
 
+from policy_export import is_exported_policy, load_policy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from common.quantile_sketch import QuantileSketch
+
 torch.backends.cuda.matmul.allow_tf32 = True
 torch.backends.cudnn.allow_tf32 = True
 torch.backends.cudnn.deterministic = False
@@ -105,7 +114,7 @@ def apply_parameter(env, param_name, param_value):
 def compute_position_error(env, robot, ee_body_idx):
     """Compute the distance between end-effector and commanded target.
 
-    Returns mean position error across all environments (meters).
+    Returns the per-environment position error, shape (num_envs,), meters.
     """
     # End-effector position in world frame
     ee_pos_w = robot.data.body_pos_w[:, ee_body_idx, :]  # (num_envs, 3)
@@ -118,13 +127,123 @@ def compute_position_error(env, robot, ee_body_idx):
     target_pos = command[:, :3]  # (num_envs, 3)
 
     # Euclidean distance
-    pos_error = torch.norm(ee_pos_local - target_pos, dim=-1)  # (num_envs,)
-    return pos_error.mean().item()
+    return torch.norm(ee_pos_local - target_pos, dim=-1)  # (num_envs,)
 
 
 # --- Main evaluation --------------------------------------------------------
 
 def run_rapp_eval(args):
+    # --- Build environment (same config as eval_headless.py) ---
+    @configclass
+    class RAPPFrankaReachEnvCfg(ReachEnvCfg):
+        def __post_init__(self):
+            super().__post_init__()
+            self.scene.robot = FRANKA_PANDA_CFG.replace(
+                prim_path="/World/envs/env_.*/Robot"
+            )
+            self.rewards.end_effector_position_tracking.params["asset_cfg"].body_names = ["panda_hand"]
+            self.rewards.end_effector_position_tracking_fine_grained.params["asset_cfg"].body_names = ["panda_hand"]
+            self.rewards.end_effector_orientation_tracking.params["asset_cfg"].body_names = ["panda_hand"]
+            self.actions.arm_action = mdp.JointPositionActionCfg(
+                asset_name="robot",
+                joint_names=["panda_joint.*"],
+                scale=0.5,
+                use_default_offset=True,
+            )
+            self.commands.ee_pose.body_name = "panda_hand"
+            self.commands.ee_pose.ranges.pitch = (math.pi, math.pi)
+            self.scene.num_envs = args.num_envs
+            self.scene.env_spacing = 2.0
+
+    env_cfg = RAPPFrankaReachEnvCfg()
+    env_cfg.commands.ee_pose.debug_vis = False
+    env_cfg.scene.ground.spawn.usd_path = ISAAC_DIR + "/Environments/Grid/default_environment.usd"
+    if hasattr(env_cfg.scene, "table"):
+        env_cfg.scene.table.spawn.usd_path = (
+            ISAAC_DIR + "/Props/Mounts/SeattleLabTable/table_instanceable.usd"
+        )
+
+    # --- Create environment ---
+    env = ManagerBasedRLEnv(cfg=env_cfg)
+
+    # --- Apply physics parameter modification ---
+    if args.param_name != "default":
+        apply_parameter(env, args.param_name, args.param_value)
+
+    # --- Cache end-effector body index for position error computation ---
+    robot = env.scene["robot"]
+    ee_body_ids, _ = robot.find_bodies("panda_hand")
+    ee_body_idx = ee_body_ids[0]
+
+    # --- Exported policy: plain torch module, no runner needed ---
+    if is_exported_policy(args.checkpoint):
+        policy = load_policy(args.checkpoint, device=env.device)
+        print(f"Loaded exported policy from {args.checkpoint}")
+        obs, _ = env.reset()
+        policy_obs = obs["policy"]
+        log_dir = None
+        env_wrapped = None
+    else:
+        policy, policy_obs, env_wrapped, log_dir = _load_runner_policy(env, args.checkpoint)
+
+    # --- Run inference (no training) ---
+    print(f"Running inference: {args.eval_steps} steps, {args.num_envs} envs")
+
+    eval_steps = args.eval_steps
+    total_position_error = 0.0
+    total_reward = 0.0
+    error_sketch = QuantileSketch()
+
+    with torch.no_grad():
+        for step in range(eval_steps):
+            actions = policy(policy_obs)
+            obs, rewards, dones, truncated, info = env.step(actions)
+            policy_obs = env_wrapped.get_observations() if env_wrapped else obs["policy"]
+
+            total_reward += rewards.mean().item()
+            pos_error = compute_position_error(env, robot, ee_body_idx)
+            total_position_error += pos_error.mean().item()
+            error_sketch.update(pos_error)
+
+    mean_position_error = total_position_error / max(eval_steps, 1)
+    mean_reward = total_reward / max(eval_steps, 1)
+
+    # --- Task-specific success check ---
+    # "Does the end-effector stay within threshold of the target?"
+    success = mean_position_error < args.success_threshold
+
+    # --- Clean up ---
+    env.close()
+    if log_dir:
+        import shutil
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    # --- Write result ---
+    result = {
+        "param_name": args.param_name,
+        "param_value": args.param_value,
+        "mean_position_error": mean_position_error,
+        "position_error_percentiles": error_sketch.percentiles(),
+        "position_error_sketch": error_sketch.to_dict(),
+        "mean_reward": mean_reward,
+        "success": success,
+        "success_threshold": args.success_threshold,
+        "eval_steps": eval_steps,
+        "status": "success",
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    status_str = "PASS" if success else "FAIL"
+    print(f"param={args.param_name} value={args.param_value} "
+          f"pos_error={mean_position_error:.4f}m [{status_str}]")
+    print(f"Result written to {args.output}")
+
+
+def _load_runner_policy(env, checkpoint):
+    """Rebuild an OnPolicyRunner around `env` to load a raw rsl_rl checkpoint."""
     from rsl_rl.runners import OnPolicyRunner
     from isaaclab_rl.rsl_rl import (
         RslRlOnPolicyRunnerCfg,
@@ -168,48 +287,6 @@ def run_rapp_eval(args):
             max_grad_norm=1.0,
         )
 
-    # --- Build environment (same config as eval_headless.py) ---
-    @configclass
-    class RAPPFrankaReachEnvCfg(ReachEnvCfg):
-        def __post_init__(self):
-            super().__post_init__()
-            self.scene.robot = FRANKA_PANDA_CFG.replace(
-                prim_path="/World/envs/env_.*/Robot"
-            )
-            self.rewards.end_effector_position_tracking.params["asset_cfg"].body_names = ["panda_hand"]
-            self.rewards.end_effector_position_tracking_fine_grained.params["asset_cfg"].body_names = ["panda_hand"]
-            self.rewards.end_effector_orientation_tracking.params["asset_cfg"].body_names = ["panda_hand"]
-            self.actions.arm_action = mdp.JointPositionActionCfg(
-                asset_name="robot",
-                joint_names=["panda_joint.*"],
-                scale=0.5,
-                use_default_offset=True,
-            )
-            self.commands.ee_pose.body_name = "panda_hand"
-            self.commands.ee_pose.ranges.pitch = (math.pi, math.pi)
-            self.scene.num_envs = args.num_envs
-            self.scene.env_spacing = 2.0
-
-    env_cfg = RAPPFrankaReachEnvCfg()
-    env_cfg.commands.ee_pose.debug_vis = False
-    env_cfg.scene.ground.spawn.usd_path = ISAAC_DIR + "/Environments/Grid/default_environment.usd"
-    if hasattr(env_cfg.scene, "table"):
-        env_cfg.scene.table.spawn.usd_path = (
-            ISAAC_DIR + "/Props/Mounts/SeattleLabTable/table_instanceable.usd"
-        )
-
-    # --- Create environment ---
-    env = ManagerBasedRLEnv(cfg=env_cfg)
-
-    # --- Apply physics parameter modification ---
-    if args.param_name != "default":
-        apply_parameter(env, args.param_name, args.param_value)
-
-    # --- Cache end-effector body index for position error computation ---
-    robot = env.scene["robot"]
-    ee_body_ids, _ = robot.find_bodies("panda_hand")
-    ee_body_idx = ee_body_ids[0]
-
     # --- Wrap for RSL-RL and build runner ---
     env_wrapped = RslRlVecEnvWrapper(env)
 
@@ -256,66 +333,18 @@ def run_rapp_eval(args):
     runner = OnPolicyRunner(env_wrapped, runner_dict, log_dir=log_dir, device="cuda:0")
 
     # --- Load trained policy checkpoint ---
-    runner.load(args.checkpoint)
-    print(f"Loaded checkpoint from {args.checkpoint}")
+    runner.load(checkpoint)
+    print(f"Loaded checkpoint from {checkpoint}")
 
     policy = runner.get_inference_policy(device="cuda:0")
-
-    # --- Run inference (no training) ---
-    print(f"Running inference: {args.eval_steps} steps, {args.num_envs} envs")
-
-    eval_steps = args.eval_steps
-    total_position_error = 0.0
-    total_reward = 0.0
-    policy_obs = env_wrapped.get_observations()
-
-    with torch.no_grad():
-        for step in range(eval_steps):
-            actions = policy(policy_obs)
-            obs, rewards, dones, truncated, info = env.step(actions)
-            policy_obs = env_wrapped.get_observations()
-
-            total_reward += rewards.mean().item()
-            total_position_error += compute_position_error(env, robot, ee_body_idx)
-
-    mean_position_error = total_position_error / max(eval_steps, 1)
-    mean_reward = total_reward / max(eval_steps, 1)
-
-    # --- Task-specific success check ---
-    # "Does the end-effector stay within threshold of the target?"
-    success = mean_position_error < args.success_threshold
-
-    # --- Clean up ---
-    env.close()
-    import shutil
-    shutil.rmtree(log_dir, ignore_errors=True)
-
-    # --- Write result ---
-    result = {
-        "param_name": args.param_name,
-        "param_value": args.param_value,
-        "mean_position_error": mean_position_error,
-        "mean_reward": mean_reward,
-        "success": success,
-        "success_threshold": args.success_threshold,
-        "eval_steps": eval_steps,
-        "status": "success",
-    }
-
-    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
-    with open(args.output, 'w') as f:
-        json.dump(result, f, indent=2)
-
-    status_str = "PASS" if success else "FAIL"
-    print(f"param={args.param_name} value={args.param_value} "
-          f"pos_error={mean_position_error:.4f}m [{status_str}]")
-    print(f"Result written to {args.output}")
+    return policy, env_wrapped.get_observations(), env_wrapped, log_dir
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="RAPP single-parameter evaluation")
     parser.add_argument("--checkpoint", type=str, required=True,
-                        help="Path to trained policy checkpoint from Stage 1")
+                        help="Path to trained policy checkpoint from Stage 1, or a "
+                             "policy_export.py directory (skips building a runner)")
     parser.add_argument("--param-name", type=str, required=True,
                         help="Physics parameter to modify (or 'default' for baseline)")
     parser.add_argument("--param-value", type=float, default=0.0,
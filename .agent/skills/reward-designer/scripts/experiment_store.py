@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+experiment_store.py — SQLite-backed record of every pipeline stage.
+
+One database (default: outputs/experiments.db) holds:
+  runs       one row per stage invocation (stage, task, config, status)
+  candidates one row per evaluated thing: a reward candidate (Stage 1), a
+             physics sweep point (Stage 2), a DR sample (Stage 3) or a
+             DR config x seed training (Stage 4), with headline metrics
+  metrics    (candidate, name, step) -> value time series, e.g. training curves
+  artifacts  files stored by sha256 under outputs/artifacts/, linked to the
+             runs/candidates that produced them (reward code, DR configs,
+             raw LLM output, logs, policies)
+
+The JSON files the stages exchange (metrics_*.json, rapp_bounds.json,
+dr_configs.json, ...) are still written: they are how subprocesses hand
+results back. This store is the queryable history across runs.
+
+Usage (queries, from host):
+    python3 scripts/experiment_store.py runs --task franka-reach
+    python3 scripts/experiment_store.py best --metric success_rate --stage eureka
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "outputs" / "experiments.db"
+
+# Headline metrics get their own (indexed) candidate columns; everything else
+# stays in metrics_json / the metrics table.
+HEADLINE_METRICS = ("mean_reward", "success_rate", "mean_position_error")
+
+# Candidate statuses of evaluations that did not complete. Their headline
+# columns are stored as NULL (the placeholder 0.0s a stage fills in would
+# otherwise compete in best-of queries); metrics_json keeps what was reported.
+FAILED_STATUSES = ("error", "process_error", "timeout", "no_metrics",
+                   "reward_load_error", "parse_failed", "failed")
+_FAILED_SQL = ", ".join(f"'{s}'" for s in FAILED_STATUSES)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    stage       TEXT NOT NULL,
+    task        TEXT NOT NULL,
+    name        TEXT,
+    status      TEXT NOT NULL DEFAULT 'running',
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    config_json TEXT,
+    summary_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_task_stage ON runs(task, stage, started_at);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    id                  INTEGER PRIMARY KEY,
+    run_id              INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    key                 TEXT NOT NULL,
+    iteration           INTEGER,
+    seed                INTEGER,
+    status              TEXT,
+    mean_reward         REAL,
+    success_rate        REAL,
+    mean_position_error REAL,
+    params_json         TEXT,
+    metrics_json        TEXT,
+    created_at          REAL NOT NULL,
+    UNIQUE (run_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_reward ON candidates(mean_reward);
+CREATE INDEX IF NOT EXISTS idx_candidates_success ON candidates(success_rate);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    name         TEXT NOT NULL,
+    step         INTEGER NOT NULL,
+    value        REAL,
+    PRIMARY KEY (candidate_id, name, step)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    sha256     TEXT PRIMARY KEY,
+    size_bytes INTEGER NOT NULL,
+    stored_path TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS artifact_links (
+    sha256       TEXT NOT NULL REFERENCES artifacts(sha256),
+    run_id       INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+    candidate_id INTEGER REFERENCES candidates(id) ON DELETE CASCADE,
+    kind         TEXT NOT NULL,
+    source_path  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_links_candidate ON artifact_links(candidate_id, kind);
+CREATE INDEX IF NOT EXISTS idx_links_run ON artifact_links(run_id, kind);
+CREATE INDEX IF NOT EXISTS idx_links_sha ON artifact_links(sha256);
+"""
+
+
+def _dumps(obj):
+    return json.dumps(obj, default=str) if obj is not None else None
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExperimentStore:
+    """Thin wrapper around one SQLite connection.
+
+    Safe to open from several processes at once (WAL journal, busy timeout),
+    which is what happens when Stage 2 runs in the container while the host
+    still has the database open.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.artifact_dir = self.db_path.parent / "artifacts"
+
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writing -----------------------------------------------------------
+
+    def start_run(self, stage, task, name=None, config=None):
+        """Open a run for one stage invocation. Returns the run id."""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (stage, task, name, started_at, config_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (stage, task, name, time.time(), _dumps(config)),
+            )
+        return cur.lastrowid
+
+    def finish_run(self, run_id, status="finished", summary=None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, summary_json = ? WHERE id = ?",
+                (status, time.time(), _dumps(summary), run_id),
+            )
+
+    def fail_run(self, run_id):
+        """Mark a run 'failed' unless it was already finished. For a stage's
+        exception handler, so a run that raises does not stay 'running'."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET status = 'failed', finished_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                (time.time(), run_id),
+            )
+
+    def add_candidate(self, run_id, key, metrics=None, params=None,
+                      iteration=None, seed=None, status=None):
+        """Record (or replace) one evaluated candidate. Returns its id.
+
+        `metrics` is the flat dict a stage already has (e.g. the JSON written
+        by eval_headless.py); headline values are copied into indexed columns,
+        or left NULL if `status` is one of FAILED_STATUSES.
+        """
+        metrics = metrics or {}
+        status = status or metrics.get("status")
+        headline = [None if status in FAILED_STATUSES else metrics.get(m)
+                    for m in HEADLINE_METRICS]
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO candidates (run_id, key, iteration, seed, status, "
+                "mean_reward, success_rate, mean_position_error, params_json, "
+                "metrics_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, key) DO UPDATE SET "
+                "iteration = excluded.iteration, seed = excluded.seed, "
+                "status = excluded.status, mean_reward = excluded.mean_reward, "
+                "success_rate = excluded.success_rate, "
+                "mean_position_error = excluded.mean_position_error, "
+                "params_json = excluded.params_json, metrics_json = excluded.metrics_json",
+                (run_id, key, iteration, seed, status, *headline,
+                 _dumps(params), _dumps(metrics), time.time()),
+            )
+            row = self.conn.execute(
+                "SELECT id FROM candidates WHERE run_id = ? AND key = ?", (run_id, key)
+            ).fetchone()
+        return row["id"]
+
+    def log_series(self, candidate_id, points, step_key="iteration"):
+        """Store a time series: list of dicts that each carry `step_key`.
+
+        Every other numeric field becomes its own named series, so a parsed
+        training log goes in with one call.
+        """
+        rows = []
+        for point in points:
+            step = int(point[step_key])
+            for name, value in point.items():
+                if name != step_key and isinstance(value, (int, float)):
+                    rows.append((candidate_id, name, step, float(value)))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (candidate_id, name, step, value) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def add_artifact(self, path, kind, run_id=None, candidate_id=None):
+        """Copy a file into the content-addressed artifact dir and link it.
+
+        Identical content (the same reward code evaluated twice, the same
+        policy re-exported) is stored once. Returns the sha256, or None if the
+        file does not exist.
+        """
+        path = Path(path)
+        if not path.is_file():
+            return None
+        sha = _sha256_file(path)
+        stored = self.artifact_dir / sha[:2] / (sha + path.suffix)
+        if not stored.exists():
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            tmp = stored.with_name(stored.name + f".tmp{os.getpid()}")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, stored)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO artifacts (sha256, size_bytes, stored_path, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                # Relative to the DB so host and container paths both resolve.
+                (sha, stored.stat().st_size, str(stored.relative_to(self.db_path.parent)),
+                 time.time()),
+            )
+            self.conn.execute(
+                "INSERT INTO artifact_links (sha256, run_id, candidate_id, kind, source_path) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sha, run_id, candidate_id, kind, str(path)),
+            )
+        return sha
+
+    # --- Queries -----------------------------------------------------------
+
+    def runs(self, task=None, stage=None):
+        sql = "SELECT * FROM runs WHERE 1=1"
+        args = []
+        if task:
+            sql += " AND task = ?"
+            args.append(task)
+        if stage:
+            sql += " AND stage = ?"
+            args.append(stage)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY started_at", args)]
+
+    def best_reward_by_task(self, metric="mean_reward", stage=None):
+        """Per run: best candidate `metric`, and the running best per task.
+
+        Rows are ordered by task, then run start time, so the `running_best`
+        column reads directly as "best reward for this task over time".
+        Candidates with a FAILED_STATUSES status never count.
+        """
+        if metric not in HEADLINE_METRICS:
+            raise ValueError(f"metric must be one of {HEADLINE_METRICS}, got {metric!r}")
+        # Lower is better for position error.
+        agg = "MIN" if metric == "mean_position_error" else "MAX"
+        sql = f"""
+            SELECT task, run_id, stage, started_at, best,
+                   {agg}(best) OVER (PARTITION BY task ORDER BY started_at
+                                     ROWS UNBOUNDED PRECEDING) AS running_best
+            FROM (
+                SELECT r.task, r.id AS run_id, r.stage, r.started_at,
+                       {agg}(c.{metric}) AS best
+                FROM runs r JOIN candidates c ON c.run_id = r.id
+                WHERE c.{metric} IS NOT NULL
+                  AND (c.status IS NULL OR c.status NOT IN ({_FAILED_SQL}))
+                  {"AND r.stage = ?" if stage else ""}
+                GROUP BY r.id
+            )
+            ORDER BY task, started_at
+        """
+        return [dict(r) for r in self.conn.execute(sql, [stage] if stage else [])]
+
+    def best_candidate(self, task, metric="mean_reward", stage=None):
+        """The single best candidate for a task across all runs, or None.
+        Candidates with a FAILED_STATUSES status never count."""
+        if metric not in HEADLINE_METRICS:
+            raise ValueError(f"metric must be one of {HEADLINE_METRICS}, got {metric!r}")
+        order = "ASC" if metric == "mean_position_error" else "DESC"
+        sql = (f"SELECT c.*, r.stage, r.task FROM candidates c JOIN runs r ON c.run_id = r.id "
+               f"WHERE r.task = ? AND c.{metric} IS NOT NULL "
+               f"AND (c.status IS NULL OR c.status NOT IN ({_FAILED_SQL}))")
+        args = [task]
+        if stage:
+            sql += " AND r.stage = ?"
+            args.append(stage)
+        row = self.conn.execute(sql + f" ORDER BY c.{metric} {order} LIMIT 1", args).fetchone()
+        return dict(row) if row else None
+
+    def series(self, candidate_id, name):
+        """[(step, value), ...] for one metric of one candidate."""
+        return [tuple(r) for r in self.conn.execute(
+            "SELECT step, value FROM metrics WHERE candidate_id = ? AND name = ? ORDER BY step",
+            (candidate_id, name),
+        )]
+
+    def artifacts(self, candidate_id=None, run_id=None, kind=None):
+        sql = ("SELECT l.kind, l.source_path, a.sha256, a.stored_path, a.size_bytes "
+               "FROM artifact_links l JOIN artifacts a ON a.sha256 = l.sha256 WHERE 1=1")
+        args = []
+        for col, val in (("l.candidate_id", candidate_id), ("l.run_id", run_id), ("l.kind", kind)):
+            if val is not None:
+                sql += f" AND {col} = ?"
+                args.append(val)
+        rows = [dict(r) for r in self.conn.execute(sql, args)]
+        for r in rows:
+            r["stored_path"] = str(self.db_path.parent / r["stored_path"])
+        return rows
+
+
+# --- CLI ----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the experiment store")
+    parser.add_argument("--db", default=str(DEFAULT_DB))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_runs = sub.add_parser("runs", help="List runs")
+    p_runs.add_argument("--task")
+    p_runs.add_argument("--stage")
+
+    p_best = sub.add_parser("best", help="Best metric per run and running best per task")
+    p_best.add_argument("--metric", default="mean_reward", choices=HEADLINE_METRICS)
+    p_best.add_argument("--stage")
+    args = parser.parse_args()
+
+    with ExperimentStore(args.db) as store:
+        if args.cmd == "runs":
+            for r in store.runs(task=args.task, stage=args.stage):
+                started = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started_at"]))
+                print(f"{r['id']:>5}  {started}  {r['stage']:<10} {r['task']:<16} {r['status']}")
+        else:
+            print(f"{'task':<16} {'run':>5} {'stage':<10} {'started':<16} "
+                  f"{'best':>10} {'running':>10}")
+            for r in store.best_reward_by_task(metric=args.metric, stage=args.stage):
+                started = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started_at"]))
+                print(f"{r['task']:<16} {r['run_id']:>5} {r['stage']:<10} {started:<16} "
+                      f"{r['best']:>10.4f} {r['running_best']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
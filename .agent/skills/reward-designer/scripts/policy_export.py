@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+policy_export.py — Turn an rsl_rl checkpoint into a standalone inference artifact.
+
+Checkpoints written by `runner.save` (eval_headless.py --save-policy) can only
+be reloaded through a full OnPolicyRunner, which needs a live Isaac Lab env.
+This module extracts just what inference needs — the actor MLP and, if the
+run used empirical normalization, its observation normalizer — and writes:
+
+    <out_dir>/
+    ├── manifest.json   ← dims, activation, normalizer, source checkpoint hash
+    ├── actor.pt        ← plain state_dict for ActorMLP
+    └── policy.ts       ← TorchScript module (optional, same weights)
+
+`load_policy(out_dir)` rebuilds it with plain torch (no rsl_rl, no Isaac Lab)
+and returns a module mapping (N, obs_dim) observations to (N, action_dim)
+deterministic actions on CPU or GPU.
+
+Usage:
+    python3 scripts/policy_export.py export --checkpoint outputs/eureka_policy.pt \
+        --out outputs/eureka_policy_export
+    python3 scripts/policy_export.py bench outputs/eureka_policy_export --batch 4096
+"""
+
+import re
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+FORMAT_VERSION = 1
+
+ACTIVATIONS = {
+    "elu": nn.ELU,
+    "relu": nn.ReLU,
+    "selu": nn.SELU,
+    "tanh": nn.Tanh,
+    "sigmoid": nn.Sigmoid,
+    "lrelu": nn.LeakyReLU,
+}
+
+
+class ActorMLP(nn.Module):
+    """Observation normalizer (optional) followed by the rsl_rl actor MLP."""
+
+    def __init__(self, obs_dim, action_dim, hidden_dims, activation="elu",
+                 normalize=False, norm_eps=1e-2):
+        super().__init__()
+        layers = []
+        dims = [obs_dim] + list(hidden_dims)
+        for d_in, d_out in zip(dims[:-1], dims[1:]):
+            layers += [nn.Linear(d_in, d_out), ACTIVATIONS[activation]()]
+        layers.append(nn.Linear(dims[-1], action_dim))
+        # Same layout as rsl_rl's ActorCritic.actor, so its keys load 1:1
+        self.actor = nn.Sequential(*layers)
+
+        self.normalize = normalize
+        self.norm_eps = norm_eps
+        self.register_buffer("obs_mean", torch.zeros(obs_dim))
+        self.register_buffer("obs_std", torch.ones(obs_dim))
+
+    def forward(self, obs: torch.Tensor) -> torch.Tensor:
+        if self.normalize:
+            obs = (obs - self.obs_mean) / (self.obs_std + self.norm_eps)
+        return self.actor(obs)
+
+
+def _actor_layers(model_state):
+    """[(index, weight, bias), ...] of the actor's Linear layers, in order."""
+    idx = sorted({int(m.group(1)) for k in model_state
+                  if (m := re.fullmatch(r"actor\.(\d+)\.weight", k))})
+    if not idx:
+        raise ValueError("Checkpoint has no 'actor.<i>.weight' entries; "
+                         "not an rsl_rl ActorCritic state_dict?")
+    return [(i, model_state[f"actor.{i}.weight"], model_state[f"actor.{i}.bias"]) for i in idx]
+
+
+def _normalizer_stats(ckpt, model_state):
+    """(mean, std) of the observation normalizer, or None if the run had none.
+
+    rsl_rl 2.x stores it as a separate `obs_norm_state_dict`; later versions
+    keep it inside the model as `actor_obs_normalizer.*`.
+    """
+    norm = ckpt.get("obs_norm_state_dict")
+    if norm is None:
+        prefix = "actor_obs_normalizer."
+        norm = {k[len(prefix):]: v for k, v in model_state.items() if k.startswith(prefix)}
+    if not norm or "_mean" not in norm:
+        return None
+    mean = norm["_mean"].reshape(-1)
+    std = norm["_std"].reshape(-1) if "_std" in norm else norm["_var"].reshape(-1).sqrt()
+    return mean, std
+
+
+def export_policy(checkpoint, out_dir, activation="elu", torchscript=True):
+    """Write manifest.json + actor.pt (+ policy.ts) for an rsl_rl checkpoint."""
+    checkpoint = Path(checkpoint)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    ckpt = torch.load(checkpoint, map_location="cpu", weights_only=False)
+    model_state = ckpt["model_state_dict"]
+    layers = _actor_layers(model_state)
+    obs_dim = layers[0][1].shape[1]
+    action_dim = layers[-1][1].shape[0]
+    hidden_dims = [w.shape[0] for _, w, _ in layers[:-1]]
+    norm = _normalizer_stats(ckpt, model_state)
+
+    model = ActorMLP(obs_dim, action_dim, hidden_dims, activation, normalize=norm is not None)
+    linears = [m for m in model.actor if isinstance(m, nn.Linear)]
+    with torch.no_grad():
+        for lin, (_, w, b) in zip(linears, layers):
+            lin.weight.copy_(w)
+            lin.bias.copy_(b)
+        if norm is not None:
+            model.obs_mean.copy_(norm[0])
+            model.obs_std.copy_(norm[1])
+    model.eval()
+
+    torch.save(model.state_dict(), out_dir / "actor.pt")
+    if torchscript:
+        torch.jit.script(model).save(str(out_dir / "policy.ts"))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "obs_dim": obs_dim,
+        "action_dim": action_dim,
+        "hidden_dims": hidden_dims,
+        "activation": activation,
+        "normalize": norm is not None,
+        "norm_eps": model.norm_eps,
+        "torchscript": torchscript,
+        "source_checkpoint": str(checkpoint),
+        "source_sha256": hashlib.sha256(checkpoint.read_bytes()).hexdigest(),
+        "iteration": ckpt.get("iter"),
+    }
+    with open(out_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Exported policy ({obs_dim} -> {hidden_dims} -> {action_dim}, "
+          f"normalizer={'yes' if norm is not None else 'no'}) to {out_dir}")
+    return out_dir
+
+
+def is_exported_policy(path):
+    """True if `path` is an export dir (or its manifest.json)."""
+    path = Path(path)
+    return (path / "manifest.json").is_file() or path.name == "manifest.json"
+
+
+def load_policy(path, device="cpu", prefer_torchscript=False):
+    """Load an exported policy as an eval-mode module on `device`.
+
+    Rebuilds ActorMLP from actor.pt by default (no JIT warm-up); pass
+    prefer_torchscript=True to load policy.ts instead.
+    """
+    path = Path(path)
+    if path.name == "manifest.json":
+        path = path.parent
+    with open(path / "manifest.json") as f:
+        manifest = json.load(f)
+    if manifest["format_version"] > FORMAT_VERSION:
+        raise ValueError(f"{path}: format_version {manifest['format_version']} "
+                         f"is newer than this loader ({FORMAT_VERSION})")
+
+    if prefer_torchscript and manifest.get("torchscript") and (path / "policy.ts").is_file():
+        model = torch.jit.load(str(path / "policy.ts"), map_location=device)
+    else:
+        model = ActorMLP(
+            manifest["obs_dim"], manifest["action_dim"], manifest["hidden_dims"],
+            manifest["activation"], normalize=manifest["normalize"],
+            norm_eps=manifest["norm_eps"],
+        )
+        model.load_state_dict(torch.load(path / "actor.pt", map_location="cpu"))
+        model.to(device)
+    return model.eval()
+
+
+def _bench(path, batch, device, repeats=100):
+    policy = load_policy(path, device=device)
+    obs = torch.randn(batch, policy.actor[0].in_features, device=device)
+    with torch.inference_mode():
+        policy(obs)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            policy(obs)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+    dt = (time.perf_counter() - start) / repeats
+    print(f"batch={batch} device={device}: {dt * 1e3:.3f} ms/step, "
+          f"{batch / dt / 1e6:.2f} M obs/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / benchmark rsl_rl policies")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_exp = sub.add_parser("export", help="Export an rsl_rl checkpoint")
+    p_exp.add_argument("--checkpoint", required=True)
+    p_exp.add_argument("--out", required=True)
+    p_exp.add_argument("--activation", default="elu", choices=sorted(ACTIVATIONS))
+    p_exp.add_argument("--no-torchscript", action="store_true")
+
+    p_bench = sub.add_parser("bench", help="Time batched inference of an export")
+    p_bench.add_argument("path")
+    p_bench.add_argument("--batch", type=int, default=4096)
+    p_bench.add_argument("--device", default="cuda:0" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        export_policy(args.checkpoint, args.out, activation=args.activation,
+                      torchscript=not args.no_torchscript)
+    else:
+        _bench(args.path, args.batch, args.device)
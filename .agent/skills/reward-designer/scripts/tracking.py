@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+tracking.py — Non-blocking experiment tracking for the pipeline stages.
+
+`Tracker` is a drop-in for the wandb.init / wandb.log / wandb.summary /
+wandb.finish calls the stages used to make inline. Calls only enqueue; a
+background thread does the (lazy) wandb.init and writes records in batches,
+so a slow or unreachable W&B backend never stalls the orchestration loop.
+
+When W&B is disabled (WANDB_MODE=disabled/offline, wandb not installed),
+wandb.init takes longer than `init_timeout`, or the backend fails at any
+point, records go to a JSONL spool instead:
+    outputs/tracking/<run-name>-<timestamp>.jsonl
+and can be pushed later with:
+    python3 scripts/tracking.py replay outputs/tracking/<file>.jsonl
+If `finish` times out (backend hung mid-write), whatever is still queued or
+in flight is spooled by the caller, so no record is lost; a record in
+flight may then appear both in W&B and in the spool.
+
+Large payloads (raw LLM output, generated code, logs) are logged with
+`log_file`, which records the file path instead of embedding the content.
+"""
+
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from pathlib import Path
+
+_STOP = object()
+
+
+class Tracker:
+    def __init__(self, project, name, config=None, spool_dir="outputs/tracking",
+                 mode=None, batch_size=64, flush_interval=2.0, init_timeout=60.0):
+        self.project = project
+        self.name = name
+        self.config = config or {}
+        self.mode = mode or os.environ.get("WANDB_MODE", "online")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.init_timeout = init_timeout
+
+        self.spool_path = Path(spool_dir) / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+        self._queue = queue.Queue()
+        self._run = None          # wandb run, created on the worker thread
+        self._spooling = self.mode in ("disabled", "offline")
+        self._lock = threading.Lock()    # guards _inflight / _closed and the spool file
+        self._inflight = deque()         # batch the worker is writing to W&B
+        self._closed = False             # finish() timed out and took over the records
+        self._thread = threading.Thread(target=self._worker, name=f"tracker-{name}", daemon=True)
+        self._thread.start()
+
+    # --- Producer side (called from the orchestration loop) ---------------
+
+    def log(self, data):
+        """Queue one metrics record. Never blocks on the backend."""
+        self._queue.put(("log", dict(data), time.time()))
+
+    def log_file(self, key, path, **extra):
+        """Record a reference to a large file (code, raw LLM output, log)."""
+        self.log({key: str(path), **extra})
+
+    def summary(self, key, value):
+        self._queue.put(("summary", {key: value}, time.time()))
+
+    def finish(self, timeout=30.0):
+        """Flush what is queued (bounded by `timeout`) and close the run."""
+        self._queue.put((_STOP, None, None))
+        self._thread.join(timeout=timeout)
+        if not self._thread.is_alive():
+            return
+        # Worker is stuck in wandb.init or a write: spool the rest from here
+        with self._lock:
+            self._closed = True
+            self._spooling = True
+            batch = list(self._inflight)
+            self._inflight.clear()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] is not _STOP:
+                batch.append(item)
+        if batch:
+            self._spool(batch)
+        print(f"[tracking] flush timed out after {timeout}s; "
+              f"spooled {len(batch)} unsent records to {self.spool_path}")
+
+    # --- Worker side -------------------------------------------------------
+
+    def _worker(self):
+        if not self._spooling:
+            self._init_wandb()
+
+        stop = False
+        while not stop and not self._closed:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch and batch[-1][0] is _STOP:
+                batch.pop()
+                stop = True
+            if batch:
+                self._write(batch)
+
+        if self._run is not None and not self._closed:
+            try:
+                self._run.finish()
+            except Exception as e:  # backend gone at shutdown: records already written
+                print(f"[tracking] wandb.finish failed: {e}")
+
+    def _init_wandb(self):
+        # wandb.init can hang on an unreachable backend: run it on its own
+        # thread and give up (spool) after init_timeout
+        result = {}
+
+        def init():
+            try:
+                import wandb
+                result["run"] = wandb.init(project=self.project, name=self.name,
+                                           config=self.config)
+            except Exception as e:
+                result["error"] = e
+                return
+            if self._spooling:       # gave up waiting: close the late run
+                try:
+                    result["run"].finish()
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=init, name=f"tracker-init-{self.name}", daemon=True)
+        thread.start()
+        thread.join(timeout=self.init_timeout)
+        if "run" in result:
+            self._run = result["run"]
+            return
+        reason = result.get("error") or f"wandb.init took over {self.init_timeout}s"
+        print(f"[tracking] W&B unavailable ({reason}); spooling to {self.spool_path}")
+        self._spooling = True
+
+    def _write(self, batch):
+        if not self._spooling:
+            with self._lock:
+                self._inflight.extend(batch)
+            while True:
+                with self._lock:
+                    if self._closed or not self._inflight:
+                        break
+                    kind, data, _ = self._inflight[0]
+                try:
+                    if kind == "log":
+                        self._run.log(data)
+                    else:
+                        self._run.summary.update(data)
+                except Exception as e:
+                    print(f"[tracking] W&B write failed ({e}); spooling to {self.spool_path}")
+                    self._spooling = True
+                    break
+                with self._lock:
+                    if self._inflight:   # finish() may have spooled it meanwhile
+                        self._inflight.popleft()
+            with self._lock:
+                batch = list(self._inflight)
+                self._inflight.clear()
+            if not batch:
+                return
+        self._spool(batch)
+
+    def _spool(self, batch):
+        with self._lock:
+            if not self.spool_path.exists():  # first spooled batch: lead with the run config
+                self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+                batch = [("config", self.config, time.time())] + batch
+            with open(self.spool_path, "a") as f:
+                for kind, data, t in batch:
+                    f.write(json.dumps({"kind": kind, "time": t, "data": data},
+                                       default=str) + "\n")
+
+
+def replay(spool_path, project="Fluxa-Reward-Designer", name=None):
+    """Push a spooled JSONL run to W&B after the fact."""
+    import wandb
+
+    spool_path = Path(spool_path)
+    with open(spool_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    config = next((r["data"] for r in records if r["kind"] == "config"), {})
+    run = wandb.init(project=project, name=name or spool_path.stem, config=config)
+    for r in records:
+        if r["kind"] == "log":
+            run.log(r["data"])
+        elif r["kind"] == "summary":
+            run.summary.update(r["data"])
+    run.finish()
+    print(f"Replayed {len(records)} records from {spool_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tracking spool utilities")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_replay = sub.add_parser("replay", help="Upload a spooled run to W&B")
+    p_replay.add_argument("spool")
+    p_replay.add_argument("--project", default="Fluxa-Reward-Designer")
+    p_replay.add_argument("--name", default=None)
+    args = parser.parse_args()
+    replay(args.spool, project=args.project, name=args.name)
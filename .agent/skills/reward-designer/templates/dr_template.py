@@ -7,6 +7,10 @@ The LLM-generated parameter ranges are inserted below.
 Each variable should be named `<param>_range` and contain a two-element list
 [low, high]. eval_headless.py loads this file and applies these ranges as
 event terms that sample fresh values on every episode reset.
+
+Optionally, `dr_schedule = "linear" | "adaptive"` (plus `dr_schedule_*` knobs
+and `<param>_nominal` overrides) turns the ranges into a curriculum: samples
+start near nominal physics and widen to the full range during training.
 """
 
 # INSERT EUREKA DR HERE
\ No newline at end of file
@@ -1,9 +1,14 @@
 """I/O helpers: JSON saving, matplotlib scatter + bbox plotting."""
 import json
 import os
+import subprocess
+import sys
+import tempfile
 from dataclasses import is_dataclass, asdict
+from types import SimpleNamespace
 
 import matplotlib.pyplot as plt
+import numpy as np
 from mpl_toolkits.mplot3d import Axes3D  # registers 3D projection
 
 SKILL_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,25 +28,62 @@ def save_json(obj, path: str):
         json.dump(obj, f, indent=2, default=str)
 
 
-def save_scatter_plot(result, path: str, title_suffix: str = ""):
-    """Save a 3D scatter plot of the reachable workspace point cloud.
+def save_scatter_plot(result, path: str, title_suffix: str = "", mode: str = "auto",
+                      max_points_3d: int | None = 20_000, bins: int = 256,
+                      density_above: int = 200_000, seed: int = 0,
+                      background: bool = False):
+    """Save a plot of the reachable workspace point cloud.
     
     `result` must be a WorkspaceProbeResult (has .point_cloud, .bounds, .n_sampled).
+
+    mode:
+        "scatter"  3D scatter of at most `max_points_3d` points (uniform
+                   random decimation; None plots every point).
+        "density"  XY / XZ / YZ 2D histograms (`bins` per axis, log counts)
+                   drawn as images, plus the decimated 3D scatter. Points
+                   are binned once with NumPy, so a few million points plot
+                   in about a second.
+        "auto"     "density" above `density_above` points, else "scatter".
+
+    background=True writes the points to a temporary .npz and renders in a
+    separate Python process; returns its subprocess.Popen (None otherwise).
     """
     path = _resolve(path)
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    pc = result.point_cloud
+    kwargs = dict(title_suffix=title_suffix, mode=mode, max_points_3d=max_points_3d,
+                  bins=bins, density_above=density_above, seed=seed)
+    if background:
+        return _plot_in_background(result, path, kwargs)
+    pc = np.asarray(result.point_cloud)
+    if mode == "auto":
+        mode = "density" if len(pc) > density_above else "scatter"
+    if mode not in ("scatter", "density"):
+        raise ValueError(f"Unknown mode {mode!r}; expected 'auto', 'scatter' or 'density'")
 
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection="3d")
-    ax.scatter(pc[:, 0], pc[:, 1], pc[:, 2], s=0.5, alpha=0.3)
-    ax.set_xlabel("X (m)")
-    ax.set_ylabel("Y (m)")
-    ax.set_zlabel("Z (m)")
     title = f"Reachable workspace (N={result.n_sampled})"
     if title_suffix:
         title += f" — {title_suffix}"
-    ax.set_title(title)
+    shown = _decimate(pc, max_points_3d, seed)
+
+    if mode == "scatter":
+        fig = plt.figure(figsize=(10, 8))
+        ax = fig.add_subplot(111, projection="3d")
+    else:
+        fig = plt.figure(figsize=(14, 11))
+        idx, ranges = _bin_indices(pc, result.bounds, bins)
+        for k, (a, b) in enumerate(((0, 1), (0, 2), (1, 2))):
+            _draw_density(fig.add_subplot(2, 2, k + 1), idx, ranges, a, b, result.bounds, bins)
+        ax = fig.add_subplot(2, 2, 4, projection="3d")
+        if len(shown) < len(pc):
+            ax.set_title(f"{len(shown)} of {len(pc)} points", fontsize=9)
+    ax.scatter(shown[:, 0], shown[:, 1], shown[:, 2], s=0.5, alpha=0.3, rasterized=True)
+    ax.set_xlabel("X (m)")
+    ax.set_ylabel("Y (m)")
+    ax.set_zlabel("Z (m)")
+    if mode == "scatter":
+        ax.set_title(title)
+    else:
+        fig.suptitle(title)
 
     _draw_bbox(ax, result.bounds)
     fig.tight_layout()
@@ -49,6 +91,53 @@ def save_scatter_plot(result, path: str, title_suffix: str = ""):
     plt.close(fig)
 
 
+_AXES = ("x", "y", "z")
+
+
+def _decimate(pc: np.ndarray, max_points: int | None, seed: int) -> np.ndarray:
+    if max_points is None or len(pc) <= max_points:
+        return pc
+    idx = np.random.default_rng(seed).choice(len(pc), max_points, replace=False)
+    return pc[np.sort(idx)]
+
+
+def _bin_indices(pc: np.ndarray, bounds: dict, bins: int):
+    """Per-axis histogram bin of every point over the bbox padded by 2%, plus
+    the padded (lo, hi) ranges. Points are binned once and shared by all
+    three projections (np.histogram2d would re-bin per pair)."""
+    idx, ranges = [], []
+    for i, ax in enumerate(_AXES):
+        lo, hi = bounds[ax]
+        pad = 0.02 * (hi - lo) + 1e-9
+        lo, hi = lo - pad, hi + pad
+        k = ((pc[:, i] - lo) * (bins / (hi - lo))).astype(np.int32)
+        idx.append(np.clip(k, 0, bins - 1, out=k))
+        ranges.append((lo, hi))
+    return idx, ranges
+
+
+def _draw_density(ax, idx, ranges, a: int, b: int, bounds: dict, bins: int):
+    """log(1 + count) image of the cloud projected onto axes (a, b), with the
+    bbox face as a red rectangle."""
+    counts = np.bincount(idx[b] * bins + idx[a], minlength=bins * bins).reshape(bins, bins)
+    ax.imshow(np.log1p(counts), origin="lower", extent=(*ranges[a], *ranges[b]),
+              aspect="equal", cmap="viridis", interpolation="nearest")
+    (a_lo, a_hi), (b_lo, b_hi) = bounds[_AXES[a]], bounds[_AXES[b]]
+    ax.plot([a_lo, a_hi, a_hi, a_lo, a_lo], [b_lo, b_lo, b_hi, b_hi, b_lo], "r-", linewidth=1)
+    ax.set_xlabel(f"{_AXES[a].upper()} (m)")
+    ax.set_ylabel(f"{_AXES[b].upper()} (m)")
+    ax.set_title(f"{_AXES[a].upper()}{_AXES[b].upper()} density (log count)", fontsize=9)
+
+
+def _plot_in_background(result, path: str, kwargs: dict):
+    fd, npz = tempfile.mkstemp(suffix=".npz")
+    os.close(fd)
+    np.savez(npz, point_cloud=np.asarray(result.point_cloud),
+             bounds=json.dumps(result.bounds), n_sampled=result.n_sampled)
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), npz, path,
+                             json.dumps(kwargs)])
+
+
 def _draw_bbox(ax, bounds: dict):
     """Draw the 12 edges of an axis-aligned bounding box on a 3D axis."""
     x_lo, x_hi = bounds["x"]
@@ -69,4 +158,16 @@ def _draw_bbox(ax, bounds: dict):
         xs = [corners[i][0], corners[j][0]]
         ys = [corners[i][1], corners[j][1]]
         zs = [corners[i][2], corners[j][2]]
-        ax.plot(xs, ys, zs, "r-", linewidth=1)
\ No newline at end of file
+        ax.plot(xs, ys, zs, "r-", linewidth=1)
+
+
+if __name__ == "__main__":
+    # Background renderer: python helpers/io.py <points.npz> <out.png> <kwargs json>
+    npz_path, out_path, kw = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+    with np.load(npz_path) as data:
+        res = SimpleNamespace(point_cloud=data["point_cloud"],
+                              bounds=json.loads(str(data["bounds"])),
+                              n_sampled=int(data["n_sampled"]))
+    os.remove(npz_path)
+    plt.switch_backend("Agg")
+    save_scatter_plot(res, out_path, **kw)
@@ -0,0 +1,158 @@
+"""Content-addressed cache of probe results.
+
+A probe result is a pure function of the robot asset, its soft joint limits,
+the probe's parameters and the probe code. ProbeCache keys entries by the
+SHA-256 of exactly those:
+
+    key = ProbeCache.key("joint_limits", asset=asset_fingerprint(usd_path),
+                         limits=soft_limits, params={...},
+                         code=code_version(joint_limits_probe, safe_set))
+
+and stores, under outputs/cache/<key[:2]>/<key>/,
+
+    result.pkl     the pickled probe result
+    files/         copies of the probe's on-disk artifacts (safe set, maps)
+    meta.json      where the artifacts came from, plus any caller metadata
+
+An entry is written to a temporary directory and renamed into place, so a
+crashed run never leaves a half-written entry that later reads as a hit.
+`load` copies the artifacts back to the paths they were stored from (or to
+new ones).
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+_CHUNK = 1 << 20
+
+
+def asset_fingerprint(path: str, layout: Optional[dict] = None) -> str:
+    """Identify a robot asset by what it contains, not where it lives.
+
+    Local files are hashed by their bytes. Remote assets (Nucleus / S3 URLs)
+    are read through omni.client and hashed the same way; if the bytes cannot
+    be read, the server's version/modified time from omni.client.stat stands
+    in. Without omni.client (or with a server that answers neither), a remote
+    asset is keyed by its URL only, and a USD replaced behind the same URL
+    is a stale hit unless `layout` catches it.
+
+    layout: optional description of the loaded articulation (joint and body
+    names, ...) folded into the fingerprint, so a changed joint/body layout
+    misses the cache whatever the asset's path.
+    """
+    if path and os.path.isfile(path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        fingerprint = "sha256:" + h.hexdigest()
+    else:
+        fingerprint = _remote_fingerprint(path)
+    if layout:
+        blob = json.dumps(layout, sort_keys=True, default=str).encode()
+        fingerprint += "+layout:" + hashlib.sha256(blob).hexdigest()[:16]
+    return fingerprint
+
+
+def _remote_fingerprint(path: str) -> str:
+    try:
+        import omni.client
+    except ImportError:
+        return "path:" + str(path)
+    if path:
+        result, _, content = omni.client.read_file(path)
+        if result == omni.client.Result.OK:
+            return "sha256:" + hashlib.sha256(memoryview(content)).hexdigest()
+        result, entry = omni.client.stat(path)
+        if result == omni.client.Result.OK:
+            stamp = entry.version or entry.hash or str(entry.modified_time)
+            if stamp:
+                return f"path:{path}@{stamp}:{entry.size}"
+    return "path:" + str(path)
+
+
+def code_version(*modules) -> str:
+    """SHA-256 over the source files of `modules` (probe code + its helpers)."""
+    h = hashlib.sha256()
+    for module in modules:
+        with open(inspect.getsourcefile(module), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _jsonable(x):
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().numpy()
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, dict):
+        return {str(k): _jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_jsonable(v) for v in x]
+    if isinstance(x, np.generic):
+        return x.item()
+    return x
+
+
+class ProbeCache:
+    def __init__(self, root: str):
+        self.root = root
+
+    @staticmethod
+    def key(probe: str, *, asset: str, limits, params: dict, code: str) -> str:
+        """Hex key over (asset fingerprint, soft limits, probe name, params, code version)."""
+        fields = {"probe": probe, "asset": asset, "limits": _jsonable(limits),
+                  "params": _jsonable(params), "code": code}
+        blob = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def store(self, key: str, result, artifacts: Optional[dict] = None, meta: Optional[dict] = None):
+        """Save `result` and copies of `artifacts` ({name: path}) under `key`,
+        replacing any existing entry."""
+        final = self._dir(key)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(final), prefix=".tmp-")
+        try:
+            os.makedirs(os.path.join(tmp, "files"))
+            with open(os.path.join(tmp, "result.pkl"), "wb") as f:
+                pickle.dump(result, f)
+            paths = {}
+            for name, path in (artifacts or {}).items():
+                shutil.copyfile(path, os.path.join(tmp, "files", name))
+                paths[name] = os.path.abspath(path)
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"key": key, "artifacts": paths, **_jsonable(meta or {})}, f, indent=2)
+            if os.path.exists(final):
+                shutil.rmtree(final)
+            os.replace(tmp, final)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def load(self, key: str, restore: Optional[dict] = None):
+        """Cached result for `key`, or None on a miss.
+
+        Artifacts are copied back to where they were stored from, or to
+        restore[name] when given.
+        """
+        entry = self._dir(key)
+        if not os.path.exists(os.path.join(entry, "meta.json")):
+            return None
+        with open(os.path.join(entry, "meta.json")) as f:
+            meta = json.load(f)
+        for name, path in meta["artifacts"].items():
+            dest = (restore or {}).get(name, path)
+            os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+            shutil.copyfile(os.path.join(entry, "files", name), dest)
+        with open(os.path.join(entry, "result.pkl"), "rb") as f:
+            return pickle.load(f)
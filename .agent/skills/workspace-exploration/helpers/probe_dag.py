@@ -0,0 +1,156 @@
+"""Dependency-aware probe scheduling: in-process tasks + worker processes.
+
+A probe that needs the simulator (joint limits, FK validation) has to run in
+the process that owns the Isaac Sim app. A probe that does not (the
+analytical workspace probe) can run at the same time in a separate Python
+process. ProbeDAG runs both kinds:
+
+    dag = ProbeDAG(workdir)
+    dag.add("workspace", worker="workspace", params={...})          # subprocess
+    dag.add("joint_limits", fn=lambda inputs: ..., deps=("validation",))
+    dag.add("write", fn=lambda inputs: ..., deps=("workspace", "joint_limits"))
+    results = dag.run()
+
+Worker tasks run `scripts/probe_worker.py <worker> --params P --out O
+[--input dep=path ...]` as soon as their dependencies are done, so they
+overlap with in-process tasks, which run one at a time on the calling
+thread. Results cross process boundaries as pickles in `workdir`
+(<name>.pkl): a worker's result is loaded when it exits, and an in-process
+result is written only if a worker depends on it.
+"""
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "scripts", "probe_worker.py")
+
+
+@dataclass
+class ProbeTask:
+    name: str
+    fn: Optional[Callable[[dict], Any]] = None    # in-process: fn({dep: result}) -> result
+    worker: Optional[str] = None                  # probe_worker.py entry name
+    params: dict = field(default_factory=dict)    # JSON params for the worker
+    deps: tuple = ()
+
+
+class ProbeDAG:
+    def __init__(self, workdir: str, python: str = sys.executable,
+                 worker_script: str = WORKER_SCRIPT, poll_s: float = 0.05):
+        self.workdir = workdir
+        self.python = python
+        self.worker_script = worker_script
+        self.poll_s = poll_s
+        self.tasks: dict = {}
+        self.timings: dict = {}          # name -> (start, end), time.monotonic()
+
+    def add(self, name: str, fn: Optional[Callable[[dict], Any]] = None, *,
+            worker: Optional[str] = None, params: Optional[dict] = None,
+            deps=()) -> "ProbeDAG":
+        if name in self.tasks:
+            raise ValueError(f"duplicate task {name!r}")
+        if (fn is None) == (worker is None):
+            raise ValueError(f"task {name!r}: give exactly one of fn / worker")
+        self.tasks[name] = ProbeTask(name, fn, worker, dict(params or {}), tuple(deps))
+        return self
+
+    def order(self) -> list:
+        """Topological order (insertion order among ready tasks).
+
+        Raises:
+            ValueError: on an unknown dependency or a cycle.
+        """
+        for t in self.tasks.values():
+            missing = [d for d in t.deps if d not in self.tasks]
+            if missing:
+                raise ValueError(f"task {t.name!r} depends on unknown {missing}")
+        done, out = set(), []
+        while len(out) < len(self.tasks):
+            ready = [n for n, t in self.tasks.items()
+                     if n not in done and all(d in done for d in t.deps)]
+            if not ready:
+                cycle = sorted(set(self.tasks) - done)
+                raise ValueError(f"dependency cycle among {cycle}")
+            out += ready
+            done.update(ready)
+        return out
+
+    def _artifact(self, name: str) -> str:
+        return os.path.join(self.workdir, f"{name}.pkl")
+
+    def _start(self, task: ProbeTask, results: dict):
+        for dep in task.deps:
+            path = self._artifact(dep)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    pickle.dump(results[dep], f)
+        cmd = [self.python, self.worker_script, task.worker,
+               "--params", json.dumps(task.params), "--out", self._artifact(task.name)]
+        for dep in task.deps:
+            cmd += ["--input", f"{dep}={self._artifact(dep)}"]
+        log = open(os.path.join(self.workdir, f"{task.name}.log"), "w")
+        return subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log
+
+    def _reap(self, running: dict, results: dict, block: bool) -> bool:
+        """Collect finished workers. Returns True if any finished."""
+        while True:
+            finished = [n for n, (p, _) in running.items() if p.poll() is not None]
+            if finished or not block:
+                break
+            time.sleep(self.poll_s)
+        for name in finished:
+            proc, log = running.pop(name)
+            log.close()
+            self.timings[name] = (self.timings[name][0], time.monotonic())
+            if proc.returncode != 0:
+                with open(log.name) as f:
+                    tail = f.read()[-2000:]
+                self._kill(running)
+                raise RuntimeError(f"probe worker {name!r} exited with {proc.returncode}:\n{tail}")
+            with open(self._artifact(name), "rb") as f:
+                results[name] = pickle.load(f)
+            print(f"[dag] {name} done (worker, {self.timings[name][1] - self.timings[name][0]:.1f}s)")
+        return bool(finished)
+
+    @staticmethod
+    def _kill(running: dict):
+        for proc, log in running.values():
+            proc.kill()
+            proc.wait()
+            log.close()
+        running.clear()
+
+    def run(self) -> dict:
+        """Run every task; returns {name: result}."""
+        self.order()
+        os.makedirs(self.workdir, exist_ok=True)
+        for name in self.tasks:                       # no stale artifacts from a previous run
+            if os.path.exists(self._artifact(name)):
+                os.remove(self._artifact(name))
+        results, running = {}, {}
+        try:
+            while len(results) < len(self.tasks):
+                pending = [t for n, t in self.tasks.items()
+                           if n not in results and n not in running
+                           and all(d in results for d in t.deps)]
+                for t in (t for t in pending if t.worker is not None):
+                    self.timings[t.name] = (time.monotonic(), None)
+                    running[t.name] = self._start(t, results)
+                local = [t for t in pending if t.fn is not None]
+                if local:
+                    t = local[0]
+                    start = time.monotonic()
+                    results[t.name] = t.fn({d: results[d] for d in t.deps})
+                    self.timings[t.name] = (start, time.monotonic())
+                    self._reap(running, results, block=False)
+                elif running:
+                    self._reap(running, results, block=True)
+        finally:
+            self._kill(running)
+        return results
@@ -0,0 +1,217 @@
+"""Batched analytical forward kinematics for serial revolute chains.
+
+A chain is described the way a URDF describes it: each revolute joint has a
+fixed origin transform (xyz + rpy, relative to the parent link) followed by a
+rotation of q about a unit axis in the joint frame. Fixed joints after the
+last revolute (flange, hand) collapse into a single tool transform.
+
+Everything is plain vectorized torch: no simulator, no per-config Python
+loop. The loop is over joints only, so cost is O(n_joints) kernels for any
+batch size.
+"""
+import math
+from dataclasses import dataclass, replace
+
+import torch
+
+
+@dataclass(frozen=True)
+class JointSpec:
+    name: str
+    xyz: tuple = (0.0, 0.0, 0.0)     # origin translation in the parent link frame
+    rpy: tuple = (0.0, 0.0, 0.0)     # origin rotation (URDF fixed-axis roll, pitch, yaw)
+    axis: tuple = (0.0, 0.0, 1.0)    # rotation axis in the joint frame
+    lower: float = -math.pi
+    upper: float = math.pi
+
+
+def rpy_to_matrix(rpy) -> torch.Tensor:
+    """URDF rpy -> 3x3 rotation, R = Rz(yaw) @ Ry(pitch) @ Rx(roll). float64."""
+    r, p, y = rpy
+    cr, sr = math.cos(r), math.sin(r)
+    cp, sp = math.cos(p), math.sin(p)
+    cy, sy = math.cos(y), math.sin(y)
+    return torch.tensor([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp,     cp * sr,                cp * cr],
+    ], dtype=torch.float64)
+
+
+def matrix_to_quat(R: torch.Tensor) -> torch.Tensor:
+    """Rotation matrices (..., 3, 3) -> unit quaternions (..., 4), (w, x, y, z)
+    with w >= 0 (Isaac Lab convention).
+
+    Each of the four standard extraction formulas divides by one component;
+    the one with the largest component is used, so it is stable everywhere.
+    """
+    m = R.reshape(-1, 3, 3)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    # 4 * component^2 for w, x, y, z
+    sq = torch.stack((1 + m00 + m11 + m22, 1 + m00 - m11 - m22,
+                      1 - m00 + m11 - m22, 1 - m00 - m11 + m22), dim=1)
+    # Row k is 4 * component_k * (w, x, y, z)
+    cand = torch.stack((
+        torch.stack((sq[:, 0], m21 - m12, m02 - m20, m10 - m01), dim=1),
+        torch.stack((m21 - m12, sq[:, 1], m10 + m01, m02 + m20), dim=1),
+        torch.stack((m02 - m20, m10 + m01, sq[:, 2], m12 + m21), dim=1),
+        torch.stack((m10 - m01, m20 + m02, m21 + m12, sq[:, 3]), dim=1),
+    ), dim=1)
+    best = sq.argmax(dim=1)
+    q = cand[torch.arange(m.shape[0], device=R.device), best]
+    q = q / q.norm(dim=1, keepdim=True)
+    q = torch.where(q[:, :1] < 0, -q, q)
+    return q.reshape(*R.shape[:-2], 4)
+
+
+class SerialChain:
+    """Revolute serial chain with batched FK and geometric Jacobian.
+
+    Args:
+        joints: revolute joints, base to tip.
+        tool_xyz, tool_rpy: fixed transform from the last joint's child link
+            to the end-effector frame (composition of trailing fixed joints).
+        ee_name: name of the end-effector body (matches the sim body name).
+        device, dtype: where the precomputed constants live.
+    """
+
+    def __init__(self, joints, tool_xyz=(0.0, 0.0, 0.0), tool_rpy=(0.0, 0.0, 0.0),
+                 ee_name: str = "ee", device="cpu", dtype=torch.float32):
+        self.joints = list(joints)
+        self.joint_names = [j.name for j in self.joints]
+        self.ee_name = ee_name
+        self._tool = (tuple(tool_xyz), tuple(tool_rpy))
+        self.device = torch.device(device)
+        self.dtype = dtype
+
+        kw = dict(device=self.device, dtype=dtype)
+        self.origin_t = torch.tensor([j.xyz for j in self.joints], dtype=torch.float64).to(**kw)
+        self.origin_R = torch.stack([rpy_to_matrix(j.rpy) for j in self.joints]).to(**kw)
+        axes = torch.tensor([j.axis for j in self.joints], dtype=torch.float64)
+        axes = axes / axes.norm(dim=1, keepdim=True)
+        self.axes = axes.to(**kw)
+        # z-axis joints (every Franka joint) take a cheaper column-mixing path
+        self._z_axis = [bool(torch.allclose(a, torch.tensor([0., 0., 1.], dtype=torch.float64)))
+                        for a in axes]
+        # Rodrigues precompute for the others: R(q) = I + sin q K + (1 - cos q) K^2
+        K = torch.zeros(len(self.joints), 3, 3, dtype=torch.float64)
+        K[:, 0, 1], K[:, 0, 2] = -axes[:, 2], axes[:, 1]
+        K[:, 1, 0], K[:, 1, 2] = axes[:, 2], -axes[:, 0]
+        K[:, 2, 0], K[:, 2, 1] = -axes[:, 1], axes[:, 0]
+        self._K = K.to(**kw)
+        self._K2 = (K @ K).to(**kw)
+        self.tool_t = torch.tensor(tool_xyz, dtype=torch.float64).to(**kw)
+        self.tool_R = rpy_to_matrix(tool_rpy).to(**kw)
+
+        self.lower = torch.tensor([j.lower for j in self.joints], **kw)
+        self.upper = torch.tensor([j.upper for j in self.joints], **kw)
+
+    @property
+    def n_joints(self) -> int:
+        return len(self.joints)
+
+    def to(self, device=None, dtype=None) -> "SerialChain":
+        """Copy of this chain with constants on `device` / in `dtype`."""
+        return SerialChain(self.joints, *self._tool, ee_name=self.ee_name,
+                           device=device or self.device, dtype=dtype or self.dtype)
+
+    def with_limits(self, lower, upper) -> "SerialChain":
+        """Copy of this chain with joint limits replaced (e.g. the sim's soft limits)."""
+        joints = [replace(j, lower=float(lo), upper=float(hi))
+                  for j, lo, hi in zip(self.joints, lower, upper)]
+        return SerialChain(joints, *self._tool, ee_name=self.ee_name,
+                           device=self.device, dtype=self.dtype)
+
+    def _rotate(self, R: torch.Tensor, i: int, c: torch.Tensor, s: torch.Tensor) -> torch.Tensor:
+        """R @ Rot(axis_i, q) given c = cos q, s = sin q, each shape (N,)."""
+        if self._z_axis[i]:
+            c, s = c[:, None], s[:, None]
+            x, y = R[:, :, 0], R[:, :, 1]
+            return torch.stack((c * x + s * y, c * y - s * x, R[:, :, 2]), dim=2)
+        Rq = (torch.eye(3, device=R.device, dtype=R.dtype)
+              + s[:, None, None] * self._K[i] + (1 - c)[:, None, None] * self._K2[i])
+        return R @ Rq
+
+    def _walk(self, q: torch.Tensor, keep_links: bool):
+        q = q.to(device=self.device, dtype=self.dtype)
+        if q.shape[-1] != self.n_joints:
+            raise ValueError(f"Expected q[..., {self.n_joints}], got shape {tuple(q.shape)}")
+        batch_shape = q.shape[:-1]
+        q = q.reshape(-1, self.n_joints)
+        n = q.shape[0]
+        cos, sin = q.cos(), q.sin()
+
+        R = torch.eye(3, device=self.device, dtype=self.dtype).expand(n, 3, 3)
+        p = torch.zeros(n, 3, device=self.device, dtype=self.dtype)
+        joint_pos, joint_axis, link_R, link_p = [], [], [], []
+        for i in range(self.n_joints):
+            p = p + R @ self.origin_t[i]
+            R = R @ self.origin_R[i]
+            if keep_links:
+                joint_pos.append(p)
+                joint_axis.append(R @ self.axes[i])
+            R = self._rotate(R, i, cos[:, i], sin[:, i])
+            if keep_links:
+                link_R.append(R)
+                link_p.append(p)
+        p_ee = p + R @ self.tool_t
+        R_ee = R @ self.tool_R
+        return batch_shape, p_ee, R_ee, joint_pos, joint_axis, link_p, link_R
+
+    def forward(self, q: torch.Tensor):
+        """EE pose in the chain base frame.
+
+        Args:
+            q: shape (..., n_joints)
+
+        Returns:
+            pos: shape (..., 3)
+            rot: shape (..., 3, 3)
+        """
+        shape, p, R, *_ = self._walk(q, keep_links=False)
+        return p.reshape(*shape, 3), R.reshape(*shape, 3, 3)
+
+    def ee_position(self, q: torch.Tensor) -> torch.Tensor:
+        """EE position only, shape (..., 3)."""
+        return self.forward(q)[0]
+
+    def link_poses(self, q: torch.Tensor):
+        """Poses of each revolute joint's child link, then the EE.
+
+        Returns:
+            pos: shape (..., n_joints + 1, 3)
+            rot: shape (..., n_joints + 1, 3, 3)
+        """
+        shape, p_ee, R_ee, _, _, link_p, link_R = self._walk(q, keep_links=True)
+        pos = torch.stack(link_p + [p_ee], dim=1)
+        rot = torch.stack(link_R + [R_ee], dim=1)
+        return pos.reshape(*shape, self.n_joints + 1, 3), rot.reshape(*shape, self.n_joints + 1, 3, 3)
+
+    def jacobian(self, q: torch.Tensor) -> torch.Tensor:
+        """Geometric Jacobian of the EE frame origin, in the base frame.
+
+        Rows 0-2 are linear velocity, rows 3-5 angular velocity.
+
+        Returns:
+            J: shape (..., 6, n_joints)
+        """
+        shape, p_ee, _, joint_pos, joint_axis, _, _ = self._walk(q, keep_links=True)
+        z = torch.stack(joint_axis, dim=2)                      # (N, 3, n)
+        r = p_ee[:, :, None] - torch.stack(joint_pos, dim=2)    # (N, 3, n)
+        J = torch.cat((torch.linalg.cross(z, r, dim=1), z), dim=1)
+        return J.reshape(*shape, 6, self.n_joints)
+
+    def position_jacobian(self, q: torch.Tensor):
+        """EE position and the linear rows of its Jacobian from a single walk.
+
+        Returns:
+            pos: shape (..., 3)
+            J: shape (..., 3, n_joints)
+        """
+        shape, p_ee, _, joint_pos, joint_axis, _, _ = self._walk(q, keep_links=True)
+        z = torch.stack(joint_axis, dim=2)
+        r = p_ee[:, :, None] - torch.stack(joint_pos, dim=2)
+        Jv = torch.linalg.cross(z, r, dim=1)
+        return p_ee.reshape(*shape, 3), Jv.reshape(*shape, 3, self.n_joints)
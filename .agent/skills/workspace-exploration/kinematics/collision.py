@@ -0,0 +1,173 @@
+"""Vectorized self-collision check on capsule link approximations.
+
+Each link is one or more capsules (segment a-b in the link frame + radius),
+posed with the batched analytical FK from kinematics/chain.py. A config is
+self-colliding if any checked pair of capsules on different bodies overlaps;
+the checked pairs are all body pairs minus an ignore dict in cuRobo's
+`self_collision_ignore` format (joint-connected / rigid pairs, the ones
+PhysX auto-excludes).
+
+This is a pre-filter, not ground truth: capsules are coarser than the
+convex meshes PhysX uses. `CapsuleSelfCollisionLabeler(fallback=...)` sends
+only configs whose minimum clearance lies within +-band_m of zero to the
+fallback labeler (e.g. probes.joint_limits_probe.PhysxSelfCollisionLabeler),
+so clear-cut configs never touch the simulator.
+"""
+import itertools
+from dataclasses import dataclass
+
+import torch
+
+
+@dataclass(frozen=True)
+class Capsule:
+    body: str        # collision body name (the names used in the ignore dict)
+    frame: str       # kinematic frame the segment is expressed in
+    a: tuple         # segment endpoints in that frame (m)
+    b: tuple
+    radius: float
+
+
+def segment_distance(p1, q1, p2, q2, eps: float = 1e-12) -> torch.Tensor:
+    """Closest distance between segments p1-q1 and p2-q2, batched over (..., 3).
+
+    Clamped closest-point parametrization (Ericson, Real-Time Collision
+    Detection 5.1.9); degenerate (zero-length) segments are points.
+    """
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a = (d1 * d1).sum(-1)
+    e = (d2 * d2).sum(-1)
+    b = (d1 * d2).sum(-1)
+    c = (d1 * r).sum(-1)
+    f = (d2 * r).sum(-1)
+    a_safe, e_safe = a.clamp(min=eps), e.clamp(min=eps)
+
+    denom = a * e - b * b
+    s = torch.where(denom > eps, ((b * f - c * e) / denom.clamp(min=eps)).clamp(0, 1),
+                    torch.zeros_like(a))
+    t = (b * s + f) / e_safe
+    s = torch.where(t < 0, (-c / a_safe).clamp(0, 1),
+                    torch.where(t > 1, ((b - c) / a_safe).clamp(0, 1), s))
+    t = t.clamp(0, 1)
+    # Second segment is a point: closest point on the first to it
+    s = torch.where(e <= eps, (-c / a_safe).clamp(0, 1), s)
+    t = torch.where(e <= eps, torch.zeros_like(t), t)
+
+    closest = (p1 + s[..., None] * d1) - (p2 + t[..., None] * d2)
+    return closest.norm(dim=-1)
+
+
+def checked_pairs(capsules, ignore: dict):
+    """Index pairs (i, j) of capsules on different, non-ignored bodies."""
+    skip = {frozenset((u, v)) for u, vs in ignore.items() for v in vs}
+    return [(i, j) for i, j in itertools.combinations(range(len(capsules)), 2)
+            if capsules[i].body != capsules[j].body
+            and frozenset((capsules[i].body, capsules[j].body)) not in skip]
+
+
+class CapsuleSelfCollisionLabeler:
+    """(configs) -> bool mask labeler from capsule clearances. Drop-in for
+    joint_limits_probe(labeler=...).
+
+    Args:
+        chain: SerialChain for the arm; link_poses() gives its frames.
+        capsules: list of Capsule.
+        ignore: {body: [bodies]} pairs never checked (symmetric).
+        frames: names of [base] + chain.link_poses() frames, in order.
+        arm_joint_ids: columns of the incoming configs that are the chain's
+            joints (e.g. the 7 arm joints of Isaac Lab's 9-joint Franka
+            vector). Default: the first chain.n_joints columns.
+        margin_m: safety margin; clearance < margin_m counts as colliding.
+        fallback: optional labeler for borderline configs (|clearance -
+            margin_m| <= band_m). Its labels replace the capsule labels.
+        band_m: half-width of the borderline band.
+        fallback_batch_size: if set, the fallback is called with exactly
+            this many rows (PhysX: scene.num_envs), padding the last call.
+        chunk_size: configs per FK/distance pass, bounds peak memory.
+    """
+
+    def __init__(self, chain, capsules, ignore: dict, frames, arm_joint_ids=None,
+                 margin_m: float = 0.0, fallback=None, band_m: float = 0.01,
+                 fallback_batch_size: int | None = None, chunk_size: int = 65536):
+        self.chain = chain
+        self.capsules = list(capsules)
+        self.arm_joint_ids = (list(range(chain.n_joints)) if arm_joint_ids is None
+                              else list(arm_joint_ids))
+        self.margin_m = margin_m
+        self.fallback = fallback
+        self.band_m = band_m
+        self.fallback_batch_size = fallback_batch_size
+        self.chunk_size = chunk_size
+        self.n_labeled = 0
+        self.n_escalated = 0
+
+        kw = dict(device=chain.device, dtype=chain.dtype)
+        frame_idx = {name: i for i, name in enumerate(frames)}
+        self._frame = torch.tensor([frame_idx[c.frame] for c in self.capsules],
+                                   device=chain.device)
+        self._a = torch.tensor([c.a for c in self.capsules], **kw)
+        self._b = torch.tensor([c.b for c in self.capsules], **kw)
+        radius = torch.tensor([c.radius for c in self.capsules], **kw)
+        pairs = checked_pairs(self.capsules, ignore)
+        self.pairs = pairs
+        self._i = torch.tensor([i for i, _ in pairs], device=chain.device)
+        self._j = torch.tensor([j for _, j in pairs], device=chain.device)
+        self._rsum = radius[self._i] + radius[self._j]
+        # Broad phase: each capsule fits in a sphere around its midpoint
+        half = (self._b - self._a).norm(dim=1) / 2
+        self._broad = half[self._i] + half[self._j] + self._rsum
+
+    def clearance(self, configs: torch.Tensor, cutoff: float = float("inf")) -> torch.Tensor:
+        """Minimum capsule-surface distance over checked pairs (m), shape (B,).
+        Negative = penetration.
+
+        Pairs whose bounding spheres are further apart than `cutoff` skip the
+        exact segment test, so results are exact below `cutoff` and only a
+        lower bound (still >= cutoff) above it.
+        """
+        q = configs[:, self.arm_joint_ids].to(device=self.chain.device, dtype=self.chain.dtype)
+        out = []
+        for chunk in q.split(self.chunk_size):
+            pos, rot = self.chain.link_poses(chunk)                     # (B, n+1, 3[, 3])
+            n = chunk.shape[0]
+            eye = torch.eye(3, device=pos.device, dtype=pos.dtype).expand(n, 1, 3, 3)
+            pos = torch.cat((pos.new_zeros(n, 1, 3), pos), dim=1)      # prepend base frame
+            rot = torch.cat((eye, rot), dim=1)
+            p, R = pos[:, self._frame], rot[:, self._frame]             # (B, C, 3[, 3])
+            a = p + (R @ self._a[..., None]).squeeze(-1)
+            b = p + (R @ self._b[..., None]).squeeze(-1)
+
+            mid = (a + b) / 2
+            d = torch.cdist(mid, mid)[:, self._i, self._j] - self._broad      # (B, P)
+            near = (d < cutoff).nonzero()
+            if near.numel():
+                row, pair = near[:, 0], near[:, 1]
+                i, j = self._i[pair], self._j[pair]
+                d[row, pair] = segment_distance(a[row, i], b[row, i], a[row, j], b[row, j]) \
+                    - self._rsum[pair]
+            out.append(d.amin(dim=1))
+        return torch.cat(out)
+
+    def _call_fallback(self, configs: torch.Tensor) -> torch.Tensor:
+        size = self.fallback_batch_size
+        if size is None:
+            return self.fallback(configs).to(configs.device)
+        labels = []
+        for chunk in configs.split(size):
+            n = chunk.shape[0]
+            if n < size:
+                chunk = torch.cat((chunk, chunk[-1:].expand(size - n, -1)))
+            labels.append(self.fallback(chunk)[:n].to(configs.device))
+        return torch.cat(labels)
+
+    def __call__(self, configs: torch.Tensor) -> torch.Tensor:
+        cutoff = self.margin_m + (self.band_m if self.fallback is not None else 0.0)
+        slack = self.clearance(configs, cutoff=cutoff).to(configs.device) - self.margin_m
+        labels = slack < 0
+        self.n_labeled += configs.shape[0]
+        if self.fallback is not None:
+            border = (slack.abs() <= self.band_m).nonzero().squeeze(1)
+            if border.numel():
+                labels[border] = self._call_fallback(configs[border])
+                self.n_escalated += border.numel()
+        return labels
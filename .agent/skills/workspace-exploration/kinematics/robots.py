@@ -0,0 +1,109 @@
+"""Kinematic chains for the robots in parser.task_parser.ROBOT_REGISTRY.
+
+Values are copied from each robot's URDF (joint <origin>, <axis>, <limit>).
+Collision capsules are a coarse hand fit to the URDF collision meshes, for
+the fast pre-filter in kinematics/collision.py (PhysX stays the reference).
+"""
+import math
+
+import torch
+
+from kinematics.chain import JointSpec, SerialChain
+from kinematics.collision import Capsule, CapsuleSelfCollisionLabeler
+
+_PI_2 = math.pi / 2
+
+# franka_description panda_arm.urdf; EE = panda_hand (joint8 flange + hand joint)
+FRANKA_PANDA_JOINTS = [
+    JointSpec("panda_joint1", xyz=(0.0, 0.0, 0.333), lower=-2.8973, upper=2.8973),
+    JointSpec("panda_joint2", rpy=(-_PI_2, 0.0, 0.0), lower=-1.7628, upper=1.7628),
+    JointSpec("panda_joint3", xyz=(0.0, -0.316, 0.0), rpy=(_PI_2, 0.0, 0.0),
+              lower=-2.8973, upper=2.8973),
+    JointSpec("panda_joint4", xyz=(0.0825, 0.0, 0.0), rpy=(_PI_2, 0.0, 0.0),
+              lower=-3.0718, upper=-0.0698),
+    JointSpec("panda_joint5", xyz=(-0.0825, 0.384, 0.0), rpy=(-_PI_2, 0.0, 0.0),
+              lower=-2.8973, upper=2.8973),
+    JointSpec("panda_joint6", rpy=(_PI_2, 0.0, 0.0), lower=-0.0175, upper=3.7525),
+    JointSpec("panda_joint7", xyz=(0.088, 0.0, 0.0), rpy=(_PI_2, 0.0, 0.0),
+              lower=-2.8973, upper=2.8973),
+]
+FRANKA_PANDA_TOOL = dict(tool_xyz=(0.0, 0.0, 0.107), tool_rpy=(0.0, 0.0, -math.pi / 4))
+
+# Self-collision pairs PhysX auto-excludes: joint-connected / rigidly attached
+# links only. Every other pair (e.g. link5/link6 vs hand and fingers, arm pairs
+# (0,2),(1,3),(1,4),(2,4),(3,6),(4,6),(4,7),(5,7)) is checked. Also the
+# relaxed cuRobo `self_collision_ignore` in tests/test_jointlimits_validation.py.
+FRANKA_SELF_COLLISION_IGNORE = {
+    "panda_link0": ["panda_link1"],
+    "panda_link1": ["panda_link2"],
+    "panda_link2": ["panda_link3"],
+    "panda_link3": ["panda_link4"],
+    "panda_link4": ["panda_link5", "panda_link8"],
+    "panda_link5": ["panda_link6"],
+    "panda_link6": ["panda_link7"],
+    "panda_link7": ["panda_hand", "panda_leftfinger", "panda_rightfinger", "attached_object"],
+    "panda_hand": ["panda_leftfinger", "panda_rightfinger", "attached_object"],
+    "panda_leftfinger": ["panda_rightfinger", "attached_object"],
+    "panda_rightfinger": ["attached_object"],
+}
+
+# Kinematic frames, as returned by SerialChain.link_poses plus the base
+FRANKA_PANDA_LINK_FRAMES = ["panda_link0"] + [f"panda_link{i}" for i in range(1, 8)] + ["panda_hand"]
+
+# (body, frame, a, b, radius): frame is "panda_link0".."panda_link7" or the
+# chain EE "panda_hand"; fingers ride on the hand frame at the default
+# opening (the probe only varies the 7 arm joints). panda_link8 (flange) has
+# no collision geometry of its own.
+FRANKA_PANDA_CAPSULES = [
+    Capsule("panda_link0", "panda_link0", (-0.04, 0.0, 0.05), (-0.01, 0.0, 0.12), 0.08),
+    Capsule("panda_link1", "panda_link1", (0.0, 0.0, -0.19), (0.0, 0.0, -0.04), 0.065),
+    Capsule("panda_link2", "panda_link2", (0.0, 0.0, -0.06), (0.0, 0.0, 0.06), 0.06),
+    Capsule("panda_link2", "panda_link2", (0.0, 0.0, 0.0), (0.0, -0.17, 0.0), 0.06),
+    Capsule("panda_link3", "panda_link3", (0.0, 0.0, -0.14), (0.0, 0.0, -0.03), 0.055),
+    Capsule("panda_link3", "panda_link3", (0.0, 0.0, 0.0), (0.0825, 0.0, 0.0), 0.055),
+    Capsule("panda_link4", "panda_link4", (0.0, 0.0, -0.05), (0.0, 0.0, 0.05), 0.055),
+    Capsule("panda_link4", "panda_link4", (0.0, 0.0, 0.0), (-0.0825, 0.1, 0.0), 0.055),
+    Capsule("panda_link5", "panda_link5", (0.0, 0.0, -0.25), (0.0, 0.0, -0.11), 0.055),
+    Capsule("panda_link5", "panda_link5", (0.0, 0.08, -0.23), (0.0, 0.08, -0.12), 0.035),
+    Capsule("panda_link6", "panda_link6", (0.0, 0.0, -0.04), (0.0, 0.0, 0.01), 0.055),
+    Capsule("panda_link6", "panda_link6", (0.0, 0.0, 0.0), (0.088, 0.0, 0.0), 0.045),
+    Capsule("panda_link7", "panda_link7", (0.0, 0.0, 0.0), (0.0, 0.0, 0.07), 0.04),
+    Capsule("panda_hand", "panda_hand", (0.0, -0.08, 0.03), (0.0, 0.08, 0.03), 0.035),
+    Capsule("panda_leftfinger", "panda_hand", (0.0, 0.04, 0.07), (0.0, 0.04, 0.10), 0.012),
+    Capsule("panda_rightfinger", "panda_hand", (0.0, -0.04, 0.07), (0.0, -0.04, 0.10), 0.012),
+]
+
+
+def get_chain(robot_name: str, device="cpu", dtype=torch.float32) -> SerialChain:
+    """Analytical chain for a registry robot name.
+
+    Raises:
+        ValueError: if no chain is defined for `robot_name`.
+    """
+    if robot_name == "franka":
+        return SerialChain(FRANKA_PANDA_JOINTS, **FRANKA_PANDA_TOOL,
+                           ee_name="panda_hand", device=device, dtype=dtype)
+    raise ValueError(
+        f"No analytical kinematic chain for robot '{robot_name}'. "
+        f"Supported: ['franka']"
+    )
+
+
+def get_self_collision_labeler(robot_name: str, device="cpu", **kwargs):
+    """CapsuleSelfCollisionLabeler for a registry robot name.
+
+    kwargs go to CapsuleSelfCollisionLabeler (arm_joint_ids, margin_m,
+    fallback, band_m, fallback_batch_size, ...).
+
+    Raises:
+        ValueError: if no capsule model is defined for `robot_name`.
+    """
+    if robot_name == "franka":
+        return CapsuleSelfCollisionLabeler(
+            get_chain("franka", device=device), FRANKA_PANDA_CAPSULES,
+            FRANKA_SELF_COLLISION_IGNORE, FRANKA_PANDA_LINK_FRAMES, **kwargs,
+        )
+    raise ValueError(
+        f"No collision capsule model for robot '{robot_name}'. "
+        f"Supported: ['franka']"
+    )
@@ -1,16 +1,27 @@
 """Deterministic parser: natural-language task description → TaskSpec.
 
-v1 supports only reach tasks on Franka. Other inputs raise explicit errors.
+v1 supports only reach tasks, on the robots in ROBOT_REGISTRY. Other inputs
+raise explicit errors.
 """
 from dataclasses import dataclass, asdict, field
 
 
 # Robot registry. URDF path is unused for v1 (we use Isaac Lab's built-in
-# FRANKA_PANDA_CFG asset config), but kept for forward compatibility.
+# asset configs, named by `asset_cfg` in isaaclab_assets), but kept for
+# forward compatibility. `arm_joint_expr` selects the joints the
+# success-threshold IK drives.
 ROBOT_REGISTRY = {
     "franka": {
         "urdf_path": None,  # use FRANKA_PANDA_CFG asset config in v1
+        "asset_cfg": "FRANKA_PANDA_CFG",
         "ee_body_name": "panda_hand",
+        "arm_joint_expr": "panda_joint.*",
+    },
+    "ur10": {
+        "urdf_path": None,
+        "asset_cfg": "UR10_CFG",
+        "ee_body_name": "ee_link",
+        "arm_joint_expr": ".*",
     },
     # add so100 here once you have the URDF set up
 }
@@ -52,6 +63,8 @@ def parse_task_description(description: str) -> TaskSpec:
     # --- Robot ---
     if "franka" in desc:
         robot_name = "franka"
+    elif "ur10" in desc or "ur-10" in desc:
+        robot_name = "ur10"
     elif "so100" in desc or "so-100" in desc:
         robot_name = "so100"
     else:
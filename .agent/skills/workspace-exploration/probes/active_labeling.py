@@ -0,0 +1,214 @@
+"""Active-learning self-collision labeling for the joint-limits probe.
+
+Labeling every Sobol config with PhysX spends as much effort on configs that
+are obviously free as on the ones near the collision boundary. Here:
+
+1. Label a random seed set (plus a held-out set, never trained on).
+2. Fit a small MLP classifier p(collide | q) in batched torch.
+3. Query the labeler on the unlabeled configs the classifier is least sure
+   about (p closest to 0.5), refit, repeat until every remaining config is
+   predicted with confidence >= `confidence` or the query budget runs out.
+4. Safe set = verified-free configs + unverified configs predicted free with
+   confidence >= `confidence`. Uncertain unverified configs are dropped, so
+   the safe set errs toward excluding configs rather than admitting them.
+
+The labeler is any joint_limits_probe.CollisionLabeler; it is always called
+with exactly `label_batch_size` rows (padded), so PhysX works unchanged.
+"""
+import time
+from dataclasses import dataclass, field
+
+import torch
+import torch.nn as nn
+
+from probes.joint_limits_probe import JointLimitsProbeResult, sample_configs_sobol
+
+
+@dataclass
+class ActiveLabelingResult:
+    labels: torch.Tensor          # (N,) bool, verified where queried, else predicted
+    verified: torch.Tensor        # (N,) bool, True where the labeler was called
+    p_collide: torch.Tensor       # (N,) classifier probability of collision
+    safe: torch.Tensor            # (N,) bool, the safe-set mask described above
+    n_label_calls: int            # configs sent to the labeler (seed + queries + holdout)
+    n_rounds: int
+    holdout_accuracy: float | None
+    history: list = field(default_factory=list)   # per-round diagnostics
+
+
+class CollisionClassifier(nn.Module):
+    """MLP on joint positions scaled to [-1, 1] by the joint limits."""
+
+    def __init__(self, lo: torch.Tensor, hi: torch.Tensor, hidden=(128, 128)):
+        super().__init__()
+        layers, d = [], lo.shape[0]
+        for h in hidden:
+            layers += [nn.Linear(d, h), nn.SiLU()]
+            d = h
+        layers.append(nn.Linear(d, 1))
+        self.net = nn.Sequential(*layers)
+        self.register_buffer("q_mid", (hi + lo) / 2)
+        self.register_buffer("q_half", (hi - lo) / 2)
+
+    def forward(self, q: torch.Tensor) -> torch.Tensor:
+        """Collision logits, shape (B,)."""
+        return self.net((q - self.q_mid) / self.q_half).squeeze(-1)
+
+
+def _fit(model, q, y, epochs, lr, batch, generator):
+    opt = torch.optim.Adam(model.parameters(), lr=lr)
+    pos_weight = ((~y).sum() / y.sum().clamp(min=1)).clamp(max=20.0)
+    loss_fn = nn.BCEWithLogitsLoss(pos_weight=pos_weight)
+    y = y.float()
+    model.train()
+    for _ in range(epochs):
+        perm = torch.randperm(q.shape[0], generator=generator, device=q.device)
+        for idx in perm.split(batch):
+            opt.zero_grad()
+            loss_fn(model(q[idx]), y[idx]).backward()
+            opt.step()
+    model.eval()
+
+
+@torch.no_grad()
+def _predict(model, q, chunk=65536):
+    return torch.cat([torch.sigmoid(model(c)) for c in q.split(chunk)])
+
+
+def _label(labeler, configs, batch_size):
+    out = []
+    for chunk in configs.split(batch_size):
+        n = chunk.shape[0]
+        if n < batch_size:
+            chunk = torch.cat((chunk, chunk[-1:].expand(batch_size - n, -1)))
+        out.append(labeler(chunk)[:n].to(configs.device))
+    return torch.cat(out)
+
+
+def active_label(configs: torch.Tensor, labeler, lo: torch.Tensor, hi: torch.Tensor, *,
+                 label_batch_size: int, seed_size: int = 4096, query_size: int = 2048,
+                 max_label_calls: int | None = None, holdout_size: int = 2048,
+                 confidence: float = 0.98, hidden=(128, 128), epochs: int = 30,
+                 lr: float = 3e-3, train_batch: int = 1024, seed: int = 0
+                 ) -> ActiveLabelingResult:
+    """Label `configs` with as few labeler calls as the classifier allows.
+
+    Args:
+        configs: (N, J) configs to label, robot joint order.
+        labeler: (B, J) -> (B,) bool, True = self-colliding.
+        lo, hi: (J,) joint limits, for input scaling.
+        label_batch_size: rows per labeler call (PhysX: scene.num_envs).
+        seed_size: random configs labeled before the first fit.
+        query_size: configs queried per round (rounded up to full batches).
+        max_label_calls: total labeling budget incl. seed and holdout.
+            Default: half of N.
+        holdout_size: random configs labeled only to score the classifier.
+        confidence: min max(p, 1 - p) to trust a prediction without a label.
+        hidden, epochs, lr, train_batch: classifier and per-round training.
+        seed: RNG seed for the seed/holdout split and training.
+
+    Returns:
+        ActiveLabelingResult.
+    """
+    n = configs.shape[0]
+    device = configs.device
+    if max_label_calls is None:
+        max_label_calls = n // 2
+    round_up = lambda k: -(-k // label_batch_size) * label_batch_size
+    seed_size, query_size, holdout_size = (round_up(k) for k in (seed_size, query_size,
+                                                                 holdout_size))
+    if seed_size + holdout_size > n:
+        raise ValueError(f"seed_size + holdout_size ({seed_size + holdout_size}) > N ({n})")
+
+    gen = torch.Generator(device=device).manual_seed(seed)
+    torch.manual_seed(seed)
+    perm = torch.randperm(n, generator=gen, device=device)
+    holdout_idx, seed_idx = perm[:holdout_size], perm[holdout_size:holdout_size + seed_size]
+
+    labels = torch.zeros(n, dtype=torch.bool, device=device)
+    verified = torch.zeros(n, dtype=torch.bool, device=device)
+    train = torch.zeros(n, dtype=torch.bool, device=device)
+    for idx, is_train in ((holdout_idx, False), (seed_idx, True)):
+        labels[idx] = _label(labeler, configs[idx], label_batch_size)
+        verified[idx] = True
+        train[idx] = is_train
+    n_calls = seed_size + holdout_size
+
+    model = CollisionClassifier(lo.to(device), hi.to(device), hidden).to(device)
+    history, n_rounds = [], 0
+    while True:
+        _fit(model, configs[train], labels[train], epochs, lr, train_batch, gen)
+        p = _predict(model, configs)
+        n_rounds += 1
+
+        uncertain = (~verified) & (torch.maximum(p, 1 - p) < confidence)
+        n_uncertain = int(uncertain.sum())
+        history.append({"round": n_rounds, "n_label_calls": n_calls,
+                        "n_uncertain": n_uncertain})
+        budget = min(query_size, max_label_calls - n_calls)
+        budget -= budget % label_batch_size
+        if n_uncertain == 0 or budget <= 0:
+            break
+        # Most uncertain first; pad with the next-most-uncertain to a full batch
+        score = (p - 0.5).abs().masked_fill(verified, float("inf"))
+        k = min(budget, round_up(n_uncertain), int((~verified).sum()))
+        query = score.topk(k, largest=False).indices
+        labels[query] = _label(labeler, configs[query], label_batch_size)
+        verified[query] = True
+        train[query] = True
+        n_calls += k
+
+    predicted = p > 0.5
+    final = torch.where(verified, labels, predicted)
+    confident_free = (~verified) & (p <= 1 - confidence)
+    safe = (verified & ~labels) | confident_free
+
+    holdout_accuracy = None
+    if holdout_size:
+        holdout_accuracy = float((predicted[holdout_idx] == labels[holdout_idx]).float().mean())
+    return ActiveLabelingResult(
+        labels=final, verified=verified, p_collide=p, safe=safe,
+        n_label_calls=n_calls, n_rounds=n_rounds,
+        holdout_accuracy=holdout_accuracy, history=history,
+    )
+
+
+def active_joint_limits_probe(sim, scene, robot, n_samples: int, seed: int = 0,
+                              labeler=None, label_batch_size: int | None = None,
+                              sobol_offset: int = 0, **active_kwargs) -> JointLimitsProbeResult:
+    """joint_limits_probe with active labeling. Same Sobol sample and result
+    type; `labels` are verified-or-predicted, `safe_configs` the safe set
+    described in the module docstring, plus labeling-call and holdout stats.
+    """
+    from probes.joint_limits_probe import PhysxSelfCollisionLabeler
+
+    start = time.time()
+    batch = label_batch_size or scene.num_envs
+    n_actual = -(-n_samples // batch) * batch
+
+    jl = robot.data.soft_joint_pos_limits[0]
+    lo, hi = jl[:, 0].contiguous(), jl[:, 1].contiguous()
+    configs_all = sample_configs_sobol(lo, hi, n_actual, seed, sobol_offset)
+
+    if labeler is None:
+        labeler = PhysxSelfCollisionLabeler(sim, scene, robot)
+    r = active_label(configs_all, labeler, lo, hi, label_batch_size=batch, seed=seed,
+                     **active_kwargs)
+
+    labels_np = r.labels.cpu().numpy()
+    configs_np = configs_all.cpu().numpy()
+    return JointLimitsProbeResult(
+        safe_configs=configs_np[r.safe.cpu().numpy()],
+        labels=labels_np,
+        all_configs=configs_np,
+        joint_lower=lo.cpu().numpy(),
+        joint_upper=hi.cpu().numpy(),
+        n_sampled=n_actual,
+        n_safe=int(r.safe.sum()),
+        collision_rate=float(labels_np.mean()),
+        seed=seed,
+        runtime_seconds=time.time() - start,
+        sobol_offset=sobol_offset,
+        n_label_calls=r.n_label_calls,
+        classifier_holdout_accuracy=r.holdout_accuracy,
+    )
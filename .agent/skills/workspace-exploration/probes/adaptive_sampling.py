@@ -0,0 +1,139 @@
+"""Boundary-focused adaptive sampling for the workspace AABB.
+
+Uniform joint-space sampling spends almost every FK evaluation deep inside
+the workspace; the six box faces are set by rare near-extreme configs, so
+they converge slowly (see scripts/convergence_analysis.py). Here, after a
+uniform warm-up, each face keeps an elite set of the configs that push it
+furthest out and runs a batched (mu, lambda)-style local search around them:
+
+    for each iteration:
+        children[f] = clamp(elite[f][random parent] + sigma[f] * N(0, I) * range)
+        one FK call on all 6 * pop_size children
+        elite[f] = top n_elite of (elite[f] U all children) along face f
+        sigma[f] *= grow if face f moved outward by > tol_m, else shrink
+
+Every evaluated point is a real FK result, so the box only ever grows toward
+the true one (inner approximation), same as uniform sampling.
+
+`fk` is any callable mapping (N, n_joints) configs to (N, 3) EE positions in
+the robot-base frame: kinematics.chain.SerialChain.ee_position, or
+run_fk_batch wrapped for PhysX.
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import torch
+
+from probes.workspace_probe import sample_configs
+
+# (axis, sign): sign=+1 pushes the max face out, -1 the min face
+FACES = [(0, -1), (0, 1), (1, -1), (1, 1), (2, -1), (2, 1)]
+FACE_NAMES = ["x_min", "x_max", "y_min", "y_max", "z_min", "z_max"]
+
+
+@dataclass
+class AdaptiveSamplingResult:
+    bounds: dict                # {"x": [min, max], ...}, robot-base frame
+    n_evals: int                # FK evaluations, warm-up included
+    n_iters: int
+    warmup_points: np.ndarray   # (n_warmup, 3) uniform sample, for plotting
+    extreme_configs: np.ndarray  # (6, n_joints) config reaching each face, FACES order
+    runtime_seconds: float
+    history: list = field(default_factory=list)  # [(n_evals, bounds), ...] per iteration
+
+
+def _face_scores(points: torch.Tensor) -> torch.Tensor:
+    """(N, 3) -> (6, N): signed coordinate along each face's outward direction."""
+    axes = torch.tensor([a for a, _ in FACES], device=points.device)
+    signs = torch.tensor([s for _, s in FACES], device=points.device, dtype=points.dtype)
+    return points[:, axes].T * signs[:, None]
+
+
+def _bounds(best: torch.Tensor) -> dict:
+    b = (best * torch.tensor([s for _, s in FACES], device=best.device,
+                             dtype=best.dtype)).tolist()
+    return {"x": [b[0], b[1]], "y": [b[2], b[3]], "z": [b[4], b[5]]}
+
+
+def adaptive_bounds(fk, lo: torch.Tensor, hi: torch.Tensor, *,
+                    n_warmup: int = 4096, max_evals: int = 200_000,
+                    pop_size: int = 256, n_elite: int = 16,
+                    sigma0: float = 0.05, sigma_min: float = 1e-4,
+                    grow: float = 1.5, shrink: float = 0.7,
+                    tol_m: float = 1e-5, patience: int = 8,
+                    generator: torch.Generator | None = None) -> AdaptiveSamplingResult:
+    """Estimate the workspace AABB by per-face local search in joint space.
+
+    Args:
+        fk: (N, n_joints) configs -> (N, 3) EE positions, robot-base frame.
+        lo, hi: shape (n_joints,) joint limits; children are clamped to them.
+        n_warmup: uniform samples before the search starts.
+        max_evals: FK budget, warm-up included.
+        pop_size: children per face per iteration (6 * pop_size per FK call).
+        n_elite: configs kept per face as parents.
+        sigma0: initial step, as a fraction of each joint's range.
+        sigma_min: a face whose step falls below this is considered converged.
+        grow, shrink: step multipliers after an improving / stalled iteration.
+        tol_m: outward movement (m) that counts as an improvement.
+        patience: stop once no face improved for this many iterations.
+        generator: torch.Generator on lo.device for reproducibility.
+
+    Returns:
+        AdaptiveSamplingResult.
+    """
+    start = time.time()
+    device, dtype = lo.device, lo.dtype
+    n_joints = lo.shape[0]
+    span = hi - lo
+
+    q = sample_configs(lo, hi, n_warmup, generator)
+    p = fk(q)
+    warmup_points = p.detach().cpu().numpy()
+    n_evals = n_warmup
+
+    scores = _face_scores(p)                                     # (6, N)
+    top, idx = scores.topk(min(n_elite, q.shape[0]), dim=1)      # (6, k)
+    elite_q, elite_s = q[idx], top                               # (6, k, J), (6, k)
+    best = elite_s[:, 0].clone()
+    sigma = torch.full((len(FACES),), sigma0, device=device, dtype=dtype)
+
+    history = [(n_evals, _bounds(best))]
+    stalled = 0
+    n_iters = 0
+    while n_evals + len(FACES) * pop_size <= max_evals:
+        parent = torch.randint(0, elite_q.shape[1], (len(FACES), pop_size),
+                               generator=generator, device=device)
+        parents = torch.gather(elite_q, 1, parent[..., None].expand(-1, -1, n_joints))
+        noise = torch.randn((len(FACES), pop_size, n_joints), generator=generator,
+                            device=device, dtype=dtype)
+        children = torch.clamp(parents + sigma[:, None, None] * span * noise, lo, hi)
+        children = children.reshape(-1, n_joints)
+        child_s = _face_scores(fk(children))                     # (6, 6 * pop)
+        n_evals += children.shape[0]
+        n_iters += 1
+
+        # Every child competes on every face, not just the one it was bred for
+        all_s = torch.cat((elite_s, child_s), dim=1)
+        all_q = torch.cat((elite_q, children.expand(len(FACES), -1, -1)), dim=1)
+        elite_s, idx = all_s.topk(elite_q.shape[1], dim=1)
+        elite_q = torch.gather(all_q, 1, idx[..., None].expand(-1, -1, n_joints))
+
+        improved = elite_s[:, 0] > best + tol_m
+        sigma = torch.where(improved, sigma * grow, sigma * shrink).clamp(max=0.5)
+        best = torch.maximum(best, elite_s[:, 0])
+        history.append((n_evals, _bounds(best)))
+
+        stalled = 0 if bool(improved.any()) else stalled + 1
+        if stalled >= patience or bool((sigma < sigma_min).all()):
+            break
+
+    return AdaptiveSamplingResult(
+        bounds=_bounds(best),
+        n_evals=n_evals,
+        n_iters=n_iters,
+        warmup_points=warmup_points,
+        extreme_configs=elite_q[:, 0].cpu().numpy(),
+        runtime_seconds=time.time() - start,
+        history=history,
+    )
@@ -13,7 +13,10 @@ Labeling backend (default): PhysX contacts inside Isaac Lab. The scene must be
 built with self-collisions enabled, contact reporting on, a ContactSensor over
 the robot bodies, gravity off, and a fixed base (see run_probe.py / run_skill.py).
 The labeler is swappable: pass any callable (configs)->bool_mask to use a
-different backend (e.g. CuRobo in the validation test).
+different backend (e.g. CuRobo in the validation test). make_labeler("capsule")
+gives the vectorized capsule check from kinematics/collision.py (no physics
+steps, any batch size), and "capsule+physx" escalates only its borderline
+configs to PhysX.
 """
 import time
 from dataclasses import dataclass
@@ -22,6 +25,8 @@ from typing import Callable, Optional
 import numpy as np
 import torch
 
+from probes.sobol_stream import SobolStream
+
 # configs (B, J) -> bool mask (B,), True == self-colliding
 CollisionLabeler = Callable[[torch.Tensor], torch.Tensor]
 
@@ -38,20 +43,73 @@ class JointLimitsProbeResult:
     collision_rate: float
     seed: int
     runtime_seconds: float
+    sobol_offset: int = 0                    # first Sobol index drawn (continued runs)
+    n_label_calls: Optional[int] = None      # configs sent to the labeler (active labeling)
+    classifier_holdout_accuracy: Optional[float] = None
 
 
 def sample_configs_sobol(lo: torch.Tensor, hi: torch.Tensor, n: int,
-                         seed: int) -> torch.Tensor:
+                         seed: int, offset: int = 0) -> torch.Tensor:
     """Low-discrepancy Sobol sample of n configs in [lo, hi]. Returns (n, J).
 
-    Sobol's equidistribution is best at powers of two; n is taken as given here
-    (the orchestrator pads to a multiple of num_envs). Round n up to 2**k if you
-    want the strict low-discrepancy guarantee.
+    All n configs at once; probes stream the same points block by block
+    through probes/sobol_stream.py instead. Sobol's equidistribution is best
+    over aligned power-of-two blocks; round n up to 2**k if you want the
+    strict low-discrepancy guarantee.
+
+    offset skips the first `offset` points of the (seed-scrambled) sequence, so
+    draws (n1, offset=0) then (n2, offset=n1) are one sequence of n1 + n2.
+    """
+    return SobolStream(lo, hi, seed, start=offset, stop=offset + n).take(n)
+
+
+class SlotScheduler:
+    """Streams N work items through a fixed set of env slots, one item per slot.
+
+    Pure tensor bookkeeping, no sim. Each physics step the caller reports a
+    per-slot `hit` mask; a slot's item is finished at its first hit (label
+    True) or after `max_steps` steps without one (label False), and the slot
+    is refilled with the next pending item at once. Slots never wait for the
+    slowest env of a batch; they only go idle (slot_item == -1) once the
+    queue is empty.
     """
-    j = lo.shape[0]
-    engine = torch.quasirandom.SobolEngine(dimension=j, scramble=True, seed=seed)
-    u = engine.draw(n).to(device=lo.device, dtype=lo.dtype)   # (n, J) in [0,1]
-    return lo + u * (hi - lo)
+    def __init__(self, n_items: int, n_slots: int, max_steps: int, device="cpu"):
+        self.n_items = n_items
+        self.max_steps = max_steps
+        self.labels = torch.zeros(n_items, dtype=torch.bool, device=device)
+        self.steps_used = torch.zeros(n_items, dtype=torch.long, device=device)
+        self.slot_item = torch.full((n_slots,), -1, dtype=torch.long, device=device)
+        self.slot_steps = torch.zeros(n_slots, dtype=torch.long, device=device)
+        self.next_item = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.next_item >= self.n_items and bool((self.slot_item < 0).all())
+
+    def fill(self, slots: torch.Tensor):
+        """Load the next pending items into `slots` (ids). Returns the
+        (slots, items) actually loaded; slots beyond the queue go idle."""
+        n = min(slots.numel(), self.n_items - self.next_item)
+        items = torch.arange(self.next_item, self.next_item + n, device=slots.device)
+        self.next_item += n
+        self.slot_item[slots] = -1
+        self.slot_item[slots[:n]] = items
+        self.slot_steps[slots[:n]] = 0
+        return slots[:n], items
+
+    def observe(self, hit: torch.Tensor, steps: int = 1) -> torch.Tensor:
+        """Record `steps` steps (callers that check every k steps pass k;
+        steps_used is then a multiple of k). Returns ids of the slots whose
+        item finished."""
+        active = self.slot_item >= 0
+        self.slot_steps += active * steps
+        done = active & (hit | (self.slot_steps >= self.max_steps))
+        slots = done.nonzero().squeeze(1)
+        items = self.slot_item[slots]
+        self.labels[items] = hit[slots]
+        self.steps_used[items] = self.slot_steps[slots]
+        self.slot_item[slots] = -1
+        return slots
 
 
 class PhysxSelfCollisionLabeler:
@@ -60,58 +118,162 @@ class PhysxSelfCollisionLabeler:
     One config per parallel env per call. Reads net contact force per body after
     a short step; with no ground and gravity off, the only contacts are link-link
     self-collisions (PhysX auto-excludes joint-connected pairs).
+
+    early_exit=True checks contacts after every physics step instead: a config
+    is colliding at its first contact and free after n_settle_steps clear
+    steps. Finished envs are refilled with the next configs straight away
+    (SlotScheduler), so a call takes any number of configs and only the
+    colliding ones end early; use it with n_settle_steps > 1.
     """
     def __init__(self, sim, scene, robot, contact_sensor_key="contact_forces",
-                 force_threshold=1e-3, n_settle_steps=1):
+                 force_threshold=1e-3, n_settle_steps=1, early_exit: bool = False):
         self.sim = sim
         self.scene = scene
         self.robot = robot
         self.sensor = scene[contact_sensor_key]
         self.force_threshold = force_threshold
         self.n_settle_steps = n_settle_steps
+        self.early_exit = early_exit
         self.dt = sim.get_physics_dt()
+        self.n_labeled = 0
+        self.n_steps = 0
 
-    def __call__(self, configs: torch.Tensor) -> torch.Tensor:
-        assert configs.shape[0] == self.scene.num_envs, \
-            "labeler expects exactly one config per env"
+    @property
+    def needs_full_batch(self) -> bool:
+        """True if every call must carry exactly scene.num_envs configs."""
+        return not self.early_exit
+
+    def _write(self, configs: torch.Tensor, env_ids=None):
         zero_vel = torch.zeros_like(configs)
-        self.robot.write_joint_state_to_sim(configs, zero_vel)
-        self.robot.set_joint_position_target(configs)   # hold pose under the drive
+        self.robot.write_joint_state_to_sim(configs, zero_vel, env_ids=env_ids)
+        self.robot.set_joint_position_target(configs, env_ids=env_ids)   # hold pose under the drive
         self.scene.write_data_to_sim()
-        for _ in range(self.n_settle_steps):
-            self.sim.step(render=False)
-            self.scene.update(self.dt)
+
+    def _step(self):
+        self.sim.step(render=False)
+        self.scene.update(self.dt)
+        self.n_steps += 1
+
+    def _contacts(self) -> torch.Tensor:
         net = self.sensor.data.net_forces_w            # (num_envs, num_bodies, 3)
         mag = torch.linalg.norm(net, dim=-1)           # (num_envs, num_bodies)
         return (mag > self.force_threshold).any(dim=-1)  # (num_envs,) bool
 
+    def __call__(self, configs: torch.Tensor) -> torch.Tensor:
+        if self.early_exit:
+            return self._label_streaming(configs)
+        assert configs.shape[0] == self.scene.num_envs, \
+            "labeler expects exactly one config per env"
+        self._write(configs)
+        for _ in range(self.n_settle_steps):
+            self._step()
+        self.n_labeled += configs.shape[0]
+        return self._contacts()
 
-def joint_limits_probe(sim, scene, robot, n_samples: int, seed: int = 0,
-                       labeler: Optional[CollisionLabeler] = None
-                       ) -> JointLimitsProbeResult:
-    """Probe the self-collision-free region via Sobol-sampled FK + collision label."""
-    start = time.time()
-    device = robot.device
-    num_envs = scene.num_envs
+    def _label_streaming(self, configs: torch.Tensor) -> torch.Tensor:
+        device = self.robot.device
+        configs = configs.to(device)
+        sched = SlotScheduler(configs.shape[0], self.scene.num_envs, self.n_settle_steps,
+                              device=device)
+        slots, items = sched.fill(torch.arange(self.scene.num_envs, device=device))
+        # Idle envs (fewer configs than envs) hold the first config; never read
+        q0 = configs[:1].expand(self.scene.num_envs, -1).clone()
+        q0[slots] = configs[items]
+        self._write(q0)
+        while not sched.finished:
+            self._step()
+            done = sched.observe(self._contacts())
+            if done.numel():
+                slots, items = sched.fill(done)
+                if slots.numel():
+                    self._write(configs[items], env_ids=slots)
+        self.n_labeled += configs.shape[0]
+        return sched.labels
 
-    n_batches = (n_samples + num_envs - 1) // num_envs
-    n_actual = n_batches * num_envs
 
-    jl = robot.data.soft_joint_pos_limits[0]
-    lo, hi = jl[:, 0].contiguous(), jl[:, 1].contiguous()
+def make_labeler(kind: str, sim, scene, robot, robot_name: str = "franka",
+                  band_m: float = 0.01, n_settle_steps: int = 1,
+                  early_exit: bool = False) -> CollisionLabeler:
+    """Build a labeler by name: "physx", "capsule" or "capsule+physx".
+
+    "capsule+physx" labels with capsules and re-labels configs whose capsule
+    clearance is within band_m of contact with PhysX (num_envs at a time).
+    n_settle_steps / early_exit configure the PhysX labeler; with early_exit
+    it takes any batch size, so the fallback is not padded to num_envs.
+    """
+    physx = lambda: PhysxSelfCollisionLabeler(sim, scene, robot, n_settle_steps=n_settle_steps,
+                                              early_exit=early_exit)
+    if kind == "physx":
+        return physx()
+    if kind not in ("capsule", "capsule+physx"):
+        raise ValueError(f"Unknown labeler {kind!r}; expected 'physx', 'capsule' "
+                         f"or 'capsule+physx'")
+    from kinematics.robots import get_self_collision_labeler, get_chain
+
+    arm_ids = [robot.joint_names.index(name) for name in get_chain(robot_name).joint_names]
+    if kind == "capsule":
+        return get_self_collision_labeler(robot_name, arm_joint_ids=arm_ids)
+    return get_self_collision_labeler(
+        robot_name, arm_joint_ids=arm_ids, band_m=band_m,
+        fallback=physx(),
+        fallback_batch_size=None if early_exit else scene.num_envs,
+    )
 
-    configs_all = sample_configs_sobol(lo, hi, n_actual, seed)   # (n_actual, J)
 
+def joint_limits_probe(sim, scene, robot, n_samples: int, seed: int = 0,
+                       labeler: Optional[CollisionLabeler] = None,
+                       label_batch_size: Optional[int] = None,
+                       sobol_offset: int = 0,
+                       shard: Optional[tuple] = None) -> JointLimitsProbeResult:
+    """Probe the self-collision-free region via Sobol-sampled FK + collision label.
+
+    label_batch_size: configs per labeler call. Default scene.num_envs, which
+    PhysxSelfCollisionLabeler requires; labelers that take any batch size
+    (capsules, early-exit PhysX) run much faster with larger calls, which are
+    capped at n_samples.
+
+    Exactly n_samples configs are drawn, except for a labeler whose
+    `needs_full_batch` is True (PhysX without early exit): it labels whole
+    batches of label_batch_size anyway, so n_samples is rounded up to a
+    multiple of it and the extra Sobol points are labeled in the same steps.
+    sobol_offset: continue the seed's Sobol sequence from this index instead
+    of its start (see probes/safe_set.py: SafeSet.append_to).
+    shard: (worker, n_workers) labels only that worker's contiguous share
+    (SobolStream.shard) of the run's Sobol range; results of shards
+    0..n_workers-1 together equal the unsharded run. n_sampled and
+    sobol_offset then describe the shard.
+
+    Configs are drawn from a SobolStream one label batch at a time, so only
+    the current batch is on the device; a short shard tail is padded for
+    labelers that need full batches.
+    """
+    start = time.time()
+    num_envs = label_batch_size or scene.num_envs
     if labeler is None:
         labeler = PhysxSelfCollisionLabeler(sim, scene, robot)
+    full_batches = getattr(labeler, "needs_full_batch", False)
+    if full_batches:
+        n_actual = -(-n_samples // num_envs) * num_envs
+    else:
+        n_actual = n_samples
+        num_envs = max(1, min(num_envs, n_samples))
+
+    jl = robot.data.soft_joint_pos_limits[0]
+    lo, hi = jl[:, 0].contiguous(), jl[:, 1].contiguous()
 
-    labels = torch.empty(n_actual, dtype=torch.bool, device=device)
-    for b in range(n_batches):
-        sl = slice(b * num_envs, (b + 1) * num_envs)
-        labels[sl] = labeler(configs_all[sl]).to(device)
+    stream = SobolStream(lo, hi, seed, start=sobol_offset, stop=sobol_offset + n_actual)
+    if shard is not None:
+        stream = stream.shard(*shard)
 
-    labels_np = labels.cpu().numpy()
-    configs_np = configs_all.cpu().numpy()
+    configs_np = np.empty((len(stream), lo.shape[0]), dtype=lo.cpu().numpy().dtype)
+    labels_np = np.empty(len(stream), dtype=bool)
+    for index, configs in stream.batches(num_envs):
+        n = configs.shape[0]
+        if full_batches and n < num_envs:
+            configs = torch.cat((configs, configs[-1:].expand(num_envs - n, -1)))
+        sl = slice(index - stream.start, index - stream.start + n)
+        labels_np[sl] = labeler(configs)[:n].cpu().numpy()
+        configs_np[sl] = configs[:n].cpu().numpy()
     safe = configs_np[~labels_np]
 
     return JointLimitsProbeResult(
@@ -120,9 +282,10 @@ def joint_limits_probe(sim, scene, robot, n_samples: int, seed: int = 0,
         all_configs=configs_np,
         joint_lower=lo.cpu().numpy(),
         joint_upper=hi.cpu().numpy(),
-        n_sampled=n_actual,
+        n_sampled=len(stream),
         n_safe=int((~labels_np).sum()),
-        collision_rate=float(labels_np.mean()),
+        collision_rate=float(labels_np.mean()) if len(stream) else 0.0,
         seed=seed,
         runtime_seconds=time.time() - start,
+        sobol_offset=stream.start,
     ) 
\ No newline at end of file
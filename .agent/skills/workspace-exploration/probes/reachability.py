@@ -0,0 +1,544 @@
+"""Voxel reachability map built from workspace-probe FK samples.
+
+The AABB from workspace_probe is a loose outer bound: for a 7-DOF arm a
+large part of it (behind the shoulder, inside the base column, the far
+corners) is not reachable at all. This map keeps per-voxel reach counts
+instead, so a target can be checked with one index computation and one
+gather, no simulation.
+
+Building is sparse (VoxelAccumulator keeps only occupied voxel keys, so the
+extent need not be known up front and memory scales with the reachable
+volume, not the sample count). The finished ReachabilityMap is a dense
+count grid over the occupied extent; on disk it is stored sparsely as a
+compressed .npz of occupied flat indices + counts:
+
+    origin      float64 (3,)  min corner of voxel (0, 0, 0), robot-base frame
+    voxel_size  float64 ()    edge length in meters
+    shape       int64   (3,)  grid dims (nx, ny, nz)
+    flat_index  uint32  (K,)  C-order flat index of each occupied voxel
+    counts      uint32  (K,)  FK samples that landed in that voxel
+
+PoseReachabilityMap adds the EE orientation: each FK sample is binned by
+(voxel, SO(3) cell), so a target pose (position + quaternion) can be checked
+the same way. Only occupied (voxel, cell) pairs are kept, as a sorted int64
+key array (flat_voxel * n_orientation_cells + cell); a query is one
+searchsorted. The .npz layout is origin / voxel_size / shape as above, plus
+
+    orientation_bins  int64   ()    m, see orientation_bin
+    keys              int64   (K,)  sorted occupied (voxel, cell) keys
+    counts            uint32  (K,)  FK samples per key
+
+Uniform joint sampling rarely produces any one orientation (the reach task's
+hand-down commands are ~1% of Franka FK samples), so a pose map is only
+trustworthy over the cells a command can hit (euler_range_cells) and on
+coarser position blocks than the voxel map: PoseReachabilityMap.for_command
+picks the finest block, up to POSE_BLOCK_MAX_M, whose coverage over those
+cells reaches MIN_COVERAGE.
+"""
+import math
+
+import numpy as np
+import torch
+
+# 21 bits per axis: +-1M voxels, i.e. +-20 km at 2 cm. Keys fit in int64.
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+# Below this coverage() a map rejects a noticeable share of reachable targets
+# (Franka, 2 cm voxels: coverage 0.99 -> ~93% of volume-uniform reachable
+# targets accepted, 0.24 at 64k samples -> ~18%). Consumers fall back to the
+# box instead of using such a map.
+MIN_COVERAGE = 0.98
+
+# Coarsest position block for_command may use: beyond it an orientation
+# check says little about a target (Franka, 2M samples, m = 4: 0.12 m blocks
+# reach MIN_COVERAGE over the hand-down cells and reject ~1.6% of reachable
+# hand-down poses).
+POSE_BLOCK_MAX_M = 0.16
+
+# (roll, pitch, yaw) ranges of Isaac Lab's reach command: EE pointing down,
+# any yaw. Argument triple for euler_range_cells.
+REACH_COMMAND_RANGES = ((0.0, 0.0), (math.pi, math.pi), (-math.pi, math.pi))
+
+
+def _encode(ijk: torch.Tensor) -> torch.Tensor:
+    ijk = ijk + _KEY_OFFSET
+    return (ijk[:, 0] << (2 * _KEY_BITS)) | (ijk[:, 1] << _KEY_BITS) | ijk[:, 2]
+
+
+def _decode(keys: torch.Tensor) -> torch.Tensor:
+    ijk = torch.stack(((keys >> (2 * _KEY_BITS)) & _KEY_MASK,
+                       (keys >> _KEY_BITS) & _KEY_MASK,
+                       keys & _KEY_MASK), dim=1)
+    return ijk - _KEY_OFFSET
+
+
+# Pose keys: 16 bits per voxel axis (+-655 m at 2 cm) above a 15-bit
+# orientation cell, so 4 * m^3 <= 2^15, i.e. m <= 20.
+_POSE_KEY_BITS = 16
+_POSE_KEY_OFFSET = 1 << (_POSE_KEY_BITS - 1)
+_POSE_KEY_MASK = (1 << _POSE_KEY_BITS) - 1
+_CELL_BITS = 15
+_MAX_ORIENTATION_BINS = 20
+
+# Quaternion components other than the largest one, for each choice of largest
+_OTHERS = torch.tensor([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+
+
+def _check_orientation_bins(m: int) -> int:
+    if not 1 <= int(m) <= _MAX_ORIENTATION_BINS:
+        raise ValueError(f"orientation_bins must be in [1, {_MAX_ORIENTATION_BINS}], got {m}")
+    return int(m)
+
+
+def orientation_bin(quat: torch.Tensor, m: int) -> torch.Tensor:
+    """SO(3) cell of each unit quaternion (w, x, y, z), shape (...,) long in
+    [0, 4 * m^3).
+
+    Cubed-hypersphere discretization: the largest-magnitude component picks
+    one of 4 cube faces (sign flipped so it is positive, which also
+    identifies q with -q); the other three, divided by it, lie in [-1, 1]
+    and are binned into m equal-angle steps each (atan keeps the cells
+    close to equal size). A cell spans about 180 / m degrees of rotation
+    angle per edge, e.g. m = 8 -> 22.5 degrees, 2048 cells.
+    """
+    q = quat / quat.norm(dim=-1, keepdim=True)
+    face = q.abs().argmax(dim=-1)
+    others = _OTHERS.to(q.device)[face]
+    top = q.gather(-1, face[..., None])
+    ratio = q.gather(-1, others) / top                      # in [-1, 1]
+    u = torch.atan(ratio) * (4 / math.pi)                   # equal-angle, [-1, 1]
+    idx = ((u + 1) * (m / 2)).floor().long().clamp_(0, m - 1)
+    return ((face * m + idx[..., 0]) * m + idx[..., 1]) * m + idx[..., 2]
+
+
+def orientation_bin_center(cell: torch.Tensor, m: int) -> torch.Tensor:
+    """Center quaternion (w, x, y, z), w >= 0, of each cell from orientation_bin."""
+    idx = torch.stack((cell // (m * m) % m, cell // m % m, cell % m), dim=-1)
+    face = cell // (m ** 3)
+    ratio = torch.tan(((idx.double() + 0.5) * (2 / m) - 1) * (math.pi / 4))
+    q = torch.ones((*cell.shape, 4), dtype=torch.float64, device=cell.device)
+    q.scatter_(-1, _OTHERS.to(cell.device)[face], ratio)
+    q = q / q.norm(dim=-1, keepdim=True)
+    return torch.where(q[..., :1] < 0, -q, q)
+
+
+def euler_range_cells(roll, pitch, yaw, m: int, steps: int = 64) -> torch.Tensor:
+    """Sorted orientation cells (orientation_bin) hit by the quaternions of
+    the (lo, hi) roll / pitch / yaw ranges, e.g. a UniformPoseCommand's
+    ranges. Same convention as Isaac Lab's quat_from_euler_xyz:
+    q = qz(yaw) * qy(pitch) * qx(roll). Each non-degenerate range is
+    gridded at `steps` angles (64 over 2 pi is ~6 degrees, finer than any
+    cell for m <= 20), and every range is widened by 1e-4 rad: a fixed angle
+    such as pitch = pi sits on a cell boundary, where float32 commands fall
+    on either side."""
+    eps = 1e-4
+    grid = [torch.cat((torch.linspace(lo, hi, steps if hi > lo else 1, dtype=torch.float64),
+                       torch.tensor([lo - eps, hi + eps], dtype=torch.float64))) / 2
+            for lo, hi in (roll, pitch, yaw)]
+    r, p, y = torch.meshgrid(*grid, indexing="ij")
+    cr, sr, cp, sp, cy, sy = r.cos(), r.sin(), p.cos(), p.sin(), y.cos(), y.sin()
+    q = torch.stack((cy * cp * cr + sy * sp * sr, cy * cp * sr - sy * sp * cr,
+                     cy * sp * cr + sy * cp * sr, sy * cp * cr - cy * sp * sr), dim=-1)
+    return orientation_bin(q.reshape(-1, 4), m).unique()
+
+
+def _encode_pose(ijk: torch.Tensor, cells: torch.Tensor) -> torch.Tensor:
+    ijk = ijk + _POSE_KEY_OFFSET
+    voxel = (ijk[:, 0] << (2 * _POSE_KEY_BITS)) | (ijk[:, 1] << _POSE_KEY_BITS) | ijk[:, 2]
+    return (voxel << _CELL_BITS) | cells
+
+
+def _decode_pose(keys: torch.Tensor):
+    voxel = keys >> _CELL_BITS
+    ijk = torch.stack(((voxel >> (2 * _POSE_KEY_BITS)) & _POSE_KEY_MASK,
+                       (voxel >> _POSE_KEY_BITS) & _POSE_KEY_MASK,
+                       voxel & _POSE_KEY_MASK), dim=1)
+    return ijk - _POSE_KEY_OFFSET, keys & ((1 << _CELL_BITS) - 1)
+
+
+class VoxelAccumulator:
+    """Sparse per-voxel hit counts over a stream of (N, 3) point batches.
+
+    Voxel (i, j, k) covers [i, i+1) * voxel_size on x, etc., in the frame
+    the points are given in. State moves to the device of the first batch
+    and stays there.
+    """
+
+    def __init__(self, voxel_size: float, device="cpu"):
+        if voxel_size <= 0:
+            raise ValueError(f"voxel_size must be > 0, got {voxel_size}")
+        self.voxel_size = float(voxel_size)
+        self.keys = torch.empty((0,), dtype=torch.long, device=device)
+        self.counts = torch.empty((0,), dtype=torch.long, device=device)
+        self.n_points = 0
+
+    def update(self, points: torch.Tensor):
+        if self.n_points == 0:
+            self.keys, self.counts = self.keys.to(points.device), self.counts.to(points.device)
+        ijk = torch.floor(points.double() / self.voxel_size).long()
+        keys = torch.cat((self.keys, _encode(ijk)))
+        counts = torch.cat((self.counts, torch.ones_like(keys[self.keys.shape[0]:])))
+        self.keys, inverse = torch.unique(keys, return_inverse=True)
+        self.counts = torch.zeros_like(self.keys).index_add_(0, inverse, counts)
+        self.n_points += points.shape[0]
+
+    def to_map(self) -> "ReachabilityMap":
+        if self.keys.numel() == 0:
+            raise ValueError("VoxelAccumulator is empty; call update() first")
+        ijk = _decode(self.keys).cpu().numpy()
+        lo = ijk.min(axis=0)
+        shape = ijk.max(axis=0) - lo + 1
+        grid = np.zeros(tuple(shape), dtype=np.uint32)
+        idx = ijk - lo
+        grid[idx[:, 0], idx[:, 1], idx[:, 2]] = self.counts.cpu().numpy()
+        return ReachabilityMap(grid, origin=lo * self.voxel_size, voxel_size=self.voxel_size)
+
+
+class ReachabilityMap:
+    """Dense voxel grid of FK reach counts with vectorized point queries.
+
+    Args:
+        counts: shape (nx, ny, nz), samples per voxel (0 = never reached).
+        origin: shape (3,), min corner of voxel (0, 0, 0), robot-base frame.
+        voxel_size: voxel edge length in meters.
+    """
+
+    def __init__(self, counts: np.ndarray, origin, voxel_size: float):
+        self.counts = np.asarray(counts, dtype=np.uint32)
+        self.origin = np.asarray(origin, dtype=np.float64).reshape(3)
+        self.voxel_size = float(voxel_size)
+        self._device_grids = {}
+
+    @classmethod
+    def from_points(cls, points, voxel_size: float) -> "ReachabilityMap":
+        acc = VoxelAccumulator(voxel_size)
+        acc.update(torch.as_tensor(np.asarray(points)))
+        return acc.to_map()
+
+    @property
+    def shape(self) -> tuple:
+        return self.counts.shape
+
+    @property
+    def n_occupied(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    @property
+    def occupied_volume_m3(self) -> float:
+        return self.n_occupied * self.voxel_size ** 3
+
+    def coverage(self) -> float:
+        """Good-Turing estimate of the chance that a fresh FK sample lands
+        in an occupied voxel: 1 - (voxels hit exactly once) / (samples).
+        Volume-uniform targets fare somewhat worse; see MIN_COVERAGE."""
+        total = int(self.counts.sum(dtype=np.int64))
+        return 1.0 - int(np.count_nonzero(self.counts == 1)) / total if total else 0.0
+
+    def bounds(self) -> dict:
+        """AABB of the occupied voxels, same layout as workspace_probe.fit_aabb."""
+        occ = np.argwhere(self.counts > 0)
+        lo = self.origin + occ.min(axis=0) * self.voxel_size
+        hi = self.origin + (occ.max(axis=0) + 1) * self.voxel_size
+        return {axis: [float(lo[i]), float(hi[i])] for i, axis in enumerate("xyz")}
+
+    def _grid(self, device) -> torch.Tensor:
+        """Flat int32 counts on `device`, cached so repeated queries don't re-upload."""
+        device = torch.device(device)
+        if device not in self._device_grids:
+            flat = torch.from_numpy(self.counts.reshape(-1).astype(np.int32))
+            self._device_grids[device] = flat.to(device)
+        return self._device_grids[device]
+
+    def count_at(self, points):
+        """Reach count of the voxel containing each point (0 outside the grid).
+
+        Args:
+            points: shape (..., 3), torch tensor or array-like, robot-base frame.
+
+        Returns:
+            Same type as `points` (torch on its device, else numpy), shape (...,).
+        """
+        is_torch = isinstance(points, torch.Tensor)
+        p = points if is_torch else torch.as_tensor(np.asarray(points, dtype=np.float64))
+        origin = torch.as_tensor(self.origin, device=p.device, dtype=torch.float64)
+        ijk = torch.floor((p.double() - origin) / self.voxel_size).long()
+        dims = torch.as_tensor(self.shape, device=p.device)
+        inside = ((ijk >= 0) & (ijk < dims)).all(dim=-1)
+        ijk = torch.where(inside[..., None], ijk, torch.zeros_like(ijk))
+        flat = (ijk[..., 0] * dims[1] + ijk[..., 1]) * dims[2] + ijk[..., 2]
+        counts = torch.where(inside, self._grid(p.device)[flat], 0)
+        return counts if is_torch else counts.numpy()
+
+    def is_reachable(self, points, min_count: int = 1):
+        """Boolean mask, True where the point's voxel was hit >= min_count times."""
+        return self.count_at(points) >= min_count
+
+    def sample_reachable(self, n: int, generator: torch.Generator | None = None,
+                         min_count: int = 1, weighted: bool = False,
+                         device="cpu") -> torch.Tensor:
+        """Sample n points uniformly inside the reachable voxels.
+
+        Args:
+            n: number of points.
+            generator: torch.Generator (on `device`) for reproducibility.
+            min_count: voxels with fewer hits are treated as unreachable.
+            weighted: pick voxels proportional to their reach count (the FK
+                sample density) instead of uniformly over reachable volume.
+            device: where the returned points live.
+
+        Returns:
+            points: shape (n, 3), float32, robot-base frame.
+        """
+        flat = self._grid(device)
+        mask = flat >= min_count
+        occupied = mask.nonzero().squeeze(1)
+        if occupied.numel() == 0:
+            raise ValueError(f"No voxel has count >= {min_count}")
+        if weighted:
+            pick = torch.multinomial(flat[occupied].double(), n, replacement=True,
+                                     generator=generator)
+        else:
+            pick = torch.randint(0, occupied.numel(), (n,), generator=generator, device=device)
+        flat_idx = occupied[pick]
+        ny, nz = self.shape[1], self.shape[2]
+        ijk = torch.stack((flat_idx // (ny * nz), (flat_idx // nz) % ny, flat_idx % nz), dim=1)
+        jitter = torch.rand((n, 3), generator=generator, device=device, dtype=torch.float64)
+        origin = torch.as_tensor(self.origin, device=device, dtype=torch.float64)
+        return (origin + (ijk.double() + jitter) * self.voxel_size).float()
+
+    def save(self, path: str):
+        """Write the compressed sparse .npz described in the module docstring."""
+        flat = self.counts.reshape(-1)
+        flat_index = np.flatnonzero(flat)
+        np.savez_compressed(
+            path,
+            origin=self.origin,
+            voxel_size=np.float64(self.voxel_size),
+            shape=np.asarray(self.shape, dtype=np.int64),
+            flat_index=flat_index.astype(np.uint32),
+            counts=flat[flat_index],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ReachabilityMap":
+        with np.load(path) as data:
+            counts = np.zeros(int(np.prod(data["shape"])), dtype=np.uint32)
+            counts[data["flat_index"]] = data["counts"]
+            return cls(counts.reshape(tuple(data["shape"])), origin=data["origin"],
+                       voxel_size=float(data["voxel_size"]))
+
+
+class PoseAccumulator:
+    """Sparse per-(voxel, orientation cell) hit counts over a stream of EE
+    pose batches. Same voxel convention as VoxelAccumulator."""
+
+    def __init__(self, voxel_size: float, orientation_bins: int = 8, device="cpu"):
+        if voxel_size <= 0:
+            raise ValueError(f"voxel_size must be > 0, got {voxel_size}")
+        self.voxel_size = float(voxel_size)
+        self.orientation_bins = _check_orientation_bins(orientation_bins)
+        self.keys = torch.empty((0,), dtype=torch.long, device=device)
+        self.counts = torch.empty((0,), dtype=torch.long, device=device)
+        self.n_points = 0
+
+    def update(self, points: torch.Tensor, quats: torch.Tensor):
+        """points: (N, 3); quats: (N, 4) EE orientations (w, x, y, z), same frame."""
+        if self.n_points == 0:
+            self.keys, self.counts = self.keys.to(points.device), self.counts.to(points.device)
+        ijk = torch.floor(points.double() / self.voxel_size).long()
+        new = _encode_pose(ijk, orientation_bin(quats.double(), self.orientation_bins))
+        keys = torch.cat((self.keys, new))
+        counts = torch.cat((self.counts, torch.ones_like(new)))
+        self.keys, inverse = torch.unique(keys, return_inverse=True)
+        self.counts = torch.zeros_like(self.keys).index_add_(0, inverse, counts)
+        self.n_points += points.shape[0]
+
+    def to_map(self) -> "PoseReachabilityMap":
+        if self.keys.numel() == 0:
+            raise ValueError("PoseAccumulator is empty; call update() first")
+        ijk, cells = _decode_pose(self.keys)
+        ijk, cells = ijk.cpu().numpy(), cells.cpu().numpy()
+        lo = ijk.min(axis=0)
+        shape = ijk.max(axis=0) - lo + 1
+        flat = np.ravel_multi_index((ijk - lo).T, tuple(shape))
+        keys = flat.astype(np.int64) * (4 * self.orientation_bins ** 3) + cells
+        order = np.argsort(keys)
+        return PoseReachabilityMap(keys[order], self.counts.cpu().numpy()[order],
+                                   origin=lo * self.voxel_size, voxel_size=self.voxel_size,
+                                   shape=tuple(shape), orientation_bins=self.orientation_bins)
+
+
+class PoseReachabilityMap:
+    """Sparse (voxel x SO(3) cell) FK reach counts with vectorized pose queries.
+
+    Args:
+        keys: shape (K,), sorted flat_voxel * n_cells + cell of occupied pairs.
+        counts: shape (K,), samples per key.
+        origin: shape (3,), min corner of voxel (0, 0, 0), robot-base frame.
+        voxel_size: voxel edge length in meters.
+        shape: voxel grid dims (nx, ny, nz).
+        orientation_bins: m in orientation_bin (4 * m^3 cells).
+    """
+
+    def __init__(self, keys: np.ndarray, counts: np.ndarray, origin, voxel_size: float,
+                 shape, orientation_bins: int):
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.uint32)
+        self.origin = np.asarray(origin, dtype=np.float64).reshape(3)
+        self.voxel_size = float(voxel_size)
+        self.shape = tuple(int(d) for d in shape)
+        self.orientation_bins = _check_orientation_bins(orientation_bins)
+        self._device_keys = {}
+
+    @classmethod
+    def from_poses(cls, points, quats, voxel_size: float,
+                   orientation_bins: int = 8) -> "PoseReachabilityMap":
+        acc = PoseAccumulator(voxel_size, orientation_bins)
+        acc.update(torch.as_tensor(np.asarray(points)), torch.as_tensor(np.asarray(quats)))
+        return acc.to_map()
+
+    @property
+    def n_cells(self) -> int:
+        """Orientation cells per voxel."""
+        return 4 * self.orientation_bins ** 3
+
+    @property
+    def n_occupied(self) -> int:
+        """Occupied (voxel, orientation cell) pairs."""
+        return int(self.keys.shape[0])
+
+    def coverage(self, cells=None) -> float:
+        """ReachabilityMap.coverage over (voxel, orientation cell) pairs,
+        restricted to orientation `cells` if given (e.g. euler_range_cells of
+        a command): over all of SO(3) it stays far below the position
+        map's for the same samples."""
+        counts = self.counts
+        if cells is not None:
+            counts = counts[np.isin(self.keys % self.n_cells, np.asarray(cells))]
+        total = int(counts.sum(dtype=np.int64))
+        return 1.0 - int(np.count_nonzero(counts == 1)) / total if total else 0.0
+
+    def coarsen(self, factor: int) -> "PoseReachabilityMap":
+        """Same counts on blocks of factor^3 voxels (same origin)."""
+        if factor == 1:
+            return self
+        shape = np.asarray(self.shape)
+        voxel, cells = np.divmod(self.keys, self.n_cells)
+        ijk = np.stack(np.unravel_index(voxel, self.shape)) // factor
+        coarse_shape = -(-shape // factor)
+        keys = np.ravel_multi_index(tuple(ijk), tuple(coarse_shape)) * self.n_cells + cells
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=self.counts, minlength=keys.shape[0])
+        return PoseReachabilityMap(keys, counts.astype(np.uint32), origin=self.origin,
+                                   voxel_size=self.voxel_size * factor,
+                                   shape=tuple(coarse_shape),
+                                   orientation_bins=self.orientation_bins)
+
+    def for_command(self, cells, min_coverage: float = MIN_COVERAGE,
+                    max_block_m: float = POSE_BLOCK_MAX_M):
+        """The finest coarsening whose coverage(cells) reaches min_coverage,
+        with blocks of at most max_block_m; None if there is none (too few
+        samples: the map would reject reachable command poses)."""
+        for factor in range(1, int(max_block_m / self.voxel_size + 1e-9) + 1):
+            coarse = self.coarsen(factor)
+            if coarse.coverage(cells) >= min_coverage:
+                return coarse
+        return None
+
+    def position_map(self) -> ReachabilityMap:
+        """Voxel map with the orientation marginalized out."""
+        n_voxels = int(np.prod(self.shape))
+        grid = np.bincount(self.keys // self.n_cells, weights=self.counts, minlength=n_voxels)
+        return ReachabilityMap(grid.astype(np.uint32).reshape(self.shape), origin=self.origin,
+                               voxel_size=self.voxel_size)
+
+    def _tables(self, device):
+        """(keys, counts) on `device`, cached so repeated queries don't re-upload."""
+        device = torch.device(device)
+        if device not in self._device_keys:
+            self._device_keys[device] = (
+                torch.from_numpy(self.keys).to(device),
+                torch.from_numpy(self.counts.astype(np.int32)).to(device),
+            )
+        return self._device_keys[device]
+
+    def _query_keys(self, p: torch.Tensor, q: torch.Tensor):
+        """(key, inside-grid mask) of each pose."""
+        origin = torch.as_tensor(self.origin, device=p.device, dtype=torch.float64)
+        ijk = torch.floor((p.double() - origin) / self.voxel_size).long()
+        dims = torch.as_tensor(self.shape, device=p.device)
+        inside = ((ijk >= 0) & (ijk < dims)).all(dim=-1)
+        ijk = torch.where(inside[..., None], ijk, torch.zeros_like(ijk))
+        flat = (ijk[..., 0] * dims[1] + ijk[..., 1]) * dims[2] + ijk[..., 2]
+        return flat * self.n_cells + orientation_bin(q.double(), self.orientation_bins), inside
+
+    def count_at(self, points, quats):
+        """Reach count of each pose's (voxel, orientation cell); 0 if never reached.
+
+        Args:
+            points: shape (..., 3), robot-base frame.
+            quats: shape (..., 4), (w, x, y, z), robot-base frame; broadcast
+                against points, so one (4,) orientation checks many positions.
+
+        Returns:
+            Same type as `points` (torch on its device, else numpy), shape (...,).
+        """
+        is_torch = isinstance(points, torch.Tensor)
+        p = points if is_torch else torch.as_tensor(np.asarray(points, dtype=np.float64))
+        q = torch.as_tensor(quats, device=p.device)
+        q = q.expand(*p.shape[:-1], 4)
+        keys, counts = self._tables(p.device)
+        query, inside = self._query_keys(p, q)
+        pos = torch.searchsorted(keys, query).clamp_(max=max(keys.numel() - 1, 0))
+        hit = inside & (keys[pos] == query)
+        out = torch.where(hit, counts[pos], 0)
+        return out if is_torch else out.numpy()
+
+    def is_reachable(self, points, quats, min_count: int = 1):
+        """Boolean mask, True where the pose's cell was hit >= min_count times."""
+        return self.count_at(points, quats) >= min_count
+
+    def sample_reachable(self, n: int, quat, generator: torch.Generator | None = None,
+                         min_count: int = 1, device="cpu") -> torch.Tensor:
+        """Sample n positions uniformly inside the voxels where the fixed EE
+        orientation `quat` (w, x, y, z) was reached, e.g. the reach task's
+        pitch = pi command. For an orientation range, sample candidates and
+        filter with is_reachable.
+
+        Returns:
+            points: shape (n, 3), float32, robot-base frame.
+        """
+        keys, counts = self._tables(device)
+        cell = orientation_bin(torch.as_tensor(quat, device=device, dtype=torch.float64),
+                               self.orientation_bins)
+        voxels = (keys // self.n_cells)[(keys % self.n_cells == cell) & (counts >= min_count)]
+        if voxels.numel() == 0:
+            raise ValueError(f"No voxel reaches orientation {quat} >= {min_count} times")
+        flat_idx = voxels[torch.randint(0, voxels.numel(), (n,), generator=generator,
+                                        device=device)]
+        ny, nz = self.shape[1], self.shape[2]
+        ijk = torch.stack((flat_idx // (ny * nz), (flat_idx // nz) % ny, flat_idx % nz), dim=1)
+        jitter = torch.rand((n, 3), generator=generator, device=device, dtype=torch.float64)
+        origin = torch.as_tensor(self.origin, device=device, dtype=torch.float64)
+        return (origin + (ijk.double() + jitter) * self.voxel_size).float()
+
+    def save(self, path: str):
+        """Write the compressed .npz described in the module docstring."""
+        np.savez_compressed(
+            path,
+            origin=self.origin,
+            voxel_size=np.float64(self.voxel_size),
+            shape=np.asarray(self.shape, dtype=np.int64),
+            orientation_bins=np.int64(self.orientation_bins),
+            keys=self.keys,
+            counts=self.counts,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PoseReachabilityMap":
+        with np.load(path) as data:
+            return cls(data["keys"], data["counts"], origin=data["origin"],
+                       voxel_size=float(data["voxel_size"]), shape=tuple(data["shape"]),
+                       orientation_bins=int(data["orientation_bins"]))
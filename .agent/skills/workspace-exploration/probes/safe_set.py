@@ -0,0 +1,267 @@
+"""Safe-set artifact: joint-limits probe safe configs plus their provenance.
+
+A plain safe_configs.npy carries no robot, joint order or limits, and
+consumers load the whole array into memory and push it to the device again
+on every reset. This format is one flat file, memory-mappable as is:
+
+    bytes [0, 8)          magic b"SAFESET1"
+    bytes [8, 4096)       UTF-8 JSON header, space padded
+    bytes [4096, ...)     C-order (n_configs, n_joints) array of `dtype`
+
+Header keys: version, robot, joint_names, joint_lower, joint_upper, seed,
+n_configs, n_joints, dtype. Storage dtypes:
+
+    float32   exact
+    float16   half the size; ~1e-3 rad resolution at |q| ~ 3 rad
+    uint16    half the size; per-joint linear code over [lower, upper],
+              q = lower + code / 65535 * (upper - lower), error <= range / 131070
+
+The data offset is page aligned, so np.memmap maps it without copying and
+`SafeSet.to_tensor(device)` moves the compact codes to the device before
+decoding (one float16/uint16 transfer, decoded to float32 there).
+Legacy .npy safe sets still load (float32 codes, no header fields).
+
+Growing a set across runs: the header also records the labeling stats
+(n_sampled, n_colliding) and the Sobol range [sobol_start, sobol_next) the
+configs came from. A new joint_limits_probe run with the same seed and
+sobol_offset=sobol_next labels only points not seen before;
+`SafeSet.append_to(path)` then writes just its unique new rows after the
+existing ones and rewrites the fixed-size header with the summed stats. The
+rows go first and the header last, so an interrupted append leaves the old
+set readable.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import torch
+
+MAGIC = b"SAFESET1"
+HEADER_BYTES = 4096
+VERSION = 1
+DTYPES = ("float32", "float16", "uint16")
+_UINT16_MAX = 65535
+
+
+@dataclass
+class SafeSet:
+    data: np.ndarray                      # (N, J) stored codes, `dtype`; np.memmap when loaded
+    dtype: str = "float32"
+    joint_lower: Optional[np.ndarray] = None
+    joint_upper: Optional[np.ndarray] = None
+    robot: Optional[str] = None
+    joint_names: Optional[list] = None
+    seed: Optional[int] = None
+    n_sampled: Optional[int] = None       # configs labeled to produce this set
+    n_colliding: Optional[int] = None
+    sobol_start: Optional[int] = None     # Sobol index range [start, next) they came from
+    sobol_next: Optional[int] = None
+    _device_cache: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_configs(cls, configs: np.ndarray, joint_lower, joint_upper, *,
+                     dtype: str = "float32", robot: Optional[str] = None,
+                     joint_names=None, seed: Optional[int] = None,
+                     n_sampled: Optional[int] = None, n_colliding: Optional[int] = None,
+                     sobol_start: Optional[int] = None) -> "SafeSet":
+        """Encode (N, J) configs in `dtype`. Limits are required for uint16
+        and recorded in the header for every dtype. With sobol_start, the
+        configs are taken to come from Sobol indices
+        [sobol_start, sobol_start + n_sampled)."""
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        configs = np.asarray(configs, dtype=np.float32)
+        if configs.ndim != 2:
+            raise ValueError(f"configs must be (N, J), got shape {configs.shape}")
+        lo = np.asarray(joint_lower, dtype=np.float64)
+        hi = np.asarray(joint_upper, dtype=np.float64)
+        if lo.shape != (configs.shape[1],) or hi.shape != lo.shape:
+            raise ValueError(f"limits of shape {lo.shape}/{hi.shape} do not match "
+                             f"{configs.shape[1]} joints")
+        if joint_names is not None and len(joint_names) != configs.shape[1]:
+            raise ValueError(f"{len(joint_names)} joint names for {configs.shape[1]} joints")
+
+        if dtype == "uint16":
+            span = np.where(hi > lo, hi - lo, 1.0)
+            u = np.clip((configs - lo) / span, 0.0, 1.0)
+            data = np.rint(u * _UINT16_MAX).astype(np.uint16)
+        else:
+            data = configs.astype(dtype)
+        return cls(data, dtype=dtype, joint_lower=lo, joint_upper=hi, robot=robot,
+                   joint_names=None if joint_names is None else list(joint_names),
+                   seed=None if seed is None else int(seed),
+                   n_sampled=n_sampled, n_colliding=n_colliding, sobol_start=sobol_start,
+                   sobol_next=(None if sobol_start is None or n_sampled is None
+                               else sobol_start + n_sampled))
+
+    @classmethod
+    def from_probe_result(cls, result, *, dtype: str = "float32", robot: Optional[str] = None,
+                          joint_names=None) -> "SafeSet":
+        """Safe set of a joint_limits_probe run, with its stats and Sobol range."""
+        return cls.from_configs(
+            result.safe_configs, result.joint_lower, result.joint_upper, dtype=dtype,
+            robot=robot, joint_names=joint_names, seed=result.seed,
+            n_sampled=result.n_sampled, n_colliding=result.n_sampled - result.n_safe,
+            sobol_start=result.sobol_offset,
+        )
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def n_joints(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def collision_rate(self) -> Optional[float]:
+        if not self.n_sampled:
+            return None
+        return self.n_colliding / self.n_sampled
+
+    def header(self) -> dict:
+        return {
+            "version": VERSION,
+            "robot": self.robot,
+            "joint_names": self.joint_names,
+            "joint_lower": None if self.joint_lower is None else self.joint_lower.tolist(),
+            "joint_upper": None if self.joint_upper is None else self.joint_upper.tolist(),
+            "seed": self.seed,
+            "n_sampled": self.n_sampled,
+            "n_colliding": self.n_colliding,
+            "sobol_start": self.sobol_start,
+            "sobol_next": self.sobol_next,
+            "n_configs": len(self),
+            "n_joints": self.n_joints,
+            "dtype": self.dtype,
+        }
+
+    def _header_bytes(self) -> bytes:
+        header = json.dumps(self.header()).encode()
+        if len(MAGIC) + len(header) > HEADER_BYTES:
+            raise ValueError(f"header is {len(header)} bytes, limit "
+                             f"{HEADER_BYTES - len(MAGIC)}")
+        return MAGIC + header.ljust(HEADER_BYTES - len(MAGIC))
+
+    def save(self, path: str):
+        """Write the header + raw array layout described in the module docstring."""
+        with open(path, "wb") as f:
+            f.write(self._header_bytes())
+            f.write(np.ascontiguousarray(self.data).tobytes())
+
+    def _check_appendable(self, new: "SafeSet"):
+        for key in ("dtype", "robot", "joint_names", "seed"):
+            if getattr(self, key) != getattr(new, key):
+                raise ValueError(f"cannot merge safe sets with different {key}: "
+                                 f"{getattr(self, key)!r} vs {getattr(new, key)!r}")
+        for key in ("joint_lower", "joint_upper"):
+            a, b = getattr(self, key), getattr(new, key)
+            if (a is None) != (b is None) or (a is not None and not np.allclose(a, b)):
+                raise ValueError(f"cannot merge safe sets with different {key}")
+        if None in (self.n_sampled, new.n_sampled, self.n_colliding, new.n_colliding):
+            raise ValueError("cannot merge safe sets without n_sampled / n_colliding stats")
+        if (self.sobol_next is not None and new.sobol_start is not None
+                and new.sobol_start < self.sobol_next):
+            raise ValueError(f"new configs start at Sobol index {new.sobol_start}, inside "
+                             f"the existing range (next unlabeled: {self.sobol_next}); "
+                             f"rerun with sobol_offset={self.sobol_next}")
+
+    def append_to(self, path: str) -> "SafeSet":
+        """Merge this set into the safe-set file at `path` in place (or create it).
+
+        Rows already in the file (or repeated here) are dropped; stats are
+        summed and the Sobol range extended. Returns the merged set, loaded
+        from `path`.
+        """
+        if not os.path.exists(path):
+            self.save(path)
+            return SafeSet.load(path)
+        old = SafeSet.load(path)
+        old._check_appendable(self)
+        new_rows = _unique_new_rows(old.data, self.data)
+
+        merged = SafeSet(
+            np.empty((len(old) + len(new_rows), self.n_joints), dtype=self.dtype),
+            dtype=self.dtype, joint_lower=old.joint_lower, joint_upper=old.joint_upper,
+            robot=old.robot, joint_names=old.joint_names, seed=old.seed,
+            n_sampled=old.n_sampled + self.n_sampled,
+            n_colliding=old.n_colliding + self.n_colliding,
+            sobol_start=old.sobol_start if old.sobol_start is not None else self.sobol_start,
+            sobol_next=self.sobol_next if self.sobol_next is not None else old.sobol_next,
+        )
+        with open(path, "r+b") as f:
+            f.seek(HEADER_BYTES + len(old) * old.data.itemsize * old.n_joints)
+            f.write(np.ascontiguousarray(new_rows).tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(merged._header_bytes())
+        return SafeSet.load(path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SafeSet":
+        """Read a safe-set file, memory-mapped by default. A legacy .npy of
+        float configs loads as float32 with no header fields."""
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                if magic.startswith(b"\x93NUMPY"):
+                    data = np.load(path, mmap_mode="r" if mmap else None)
+                    return cls(data.astype(np.float32, copy=False))
+                raise ValueError(f"{path} is neither a safe-set file nor a .npy")
+            header = json.loads(f.read(HEADER_BYTES - len(MAGIC)).decode().rstrip())
+        if header["version"] > VERSION:
+            raise ValueError(f"{path}: safe-set version {header['version']} is newer "
+                             f"than supported ({VERSION})")
+        shape = (header["n_configs"], header["n_joints"])
+        if mmap and shape[0] > 0:
+            data = np.memmap(path, dtype=header["dtype"], mode="r",
+                             offset=HEADER_BYTES, shape=shape)
+        else:
+            data = np.fromfile(path, dtype=header["dtype"], offset=HEADER_BYTES)
+            data = data.reshape(shape)
+        limit = lambda k: None if header[k] is None else np.asarray(header[k])
+        return cls(data, dtype=header["dtype"], joint_lower=limit("joint_lower"),
+                   joint_upper=limit("joint_upper"), robot=header["robot"],
+                   joint_names=header["joint_names"], seed=header["seed"],
+                   n_sampled=header.get("n_sampled"), n_colliding=header.get("n_colliding"),
+                   sobol_start=header.get("sobol_start"), sobol_next=header.get("sobol_next"))
+
+    def to_tensor(self, device="cpu") -> torch.Tensor:
+        """Decoded (N, J) float32 configs on `device`, built once per device.
+
+        The stored codes are moved first and decoded on the device, so a
+        float16/uint16 set costs one half-size transfer.
+        """
+        key = str(torch.device(device))
+        cached = self._device_cache.get(key)
+        if cached is not None:
+            return cached
+        data = np.array(self.data)            # pages in the map; writable for torch
+        if self.dtype == "uint16":
+            # torch has no general uint16 ops; move the bits as int16, widen there
+            codes = torch.from_numpy(data.view(np.int16)).to(device).int() & 0xFFFF
+            lo = torch.as_tensor(self.joint_lower, dtype=torch.float32, device=device)
+            hi = torch.as_tensor(self.joint_upper, dtype=torch.float32, device=device)
+            out = lo + codes.float() * ((hi - lo) / _UINT16_MAX)
+        else:
+            out = torch.from_numpy(data).to(device).float()
+        self._device_cache[key] = out
+        return out
+
+
+def _row_keys(a: np.ndarray) -> np.ndarray:
+    """(N, J) -> (N,) opaque keys, equal iff the rows are bitwise equal."""
+    a = np.ascontiguousarray(a)
+    return a.view(np.dtype((np.void, a.dtype.itemsize * a.shape[1]))).ravel()
+
+
+def _unique_new_rows(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Rows of `new` not in `old`, first occurrence only, in their original order."""
+    if len(new) == 0:
+        return new
+    keys = _row_keys(np.concatenate((np.asarray(old), np.asarray(new))))
+    _, first = np.unique(keys, return_index=True)
+    keep = np.sort(first[first >= len(old)]) - len(old)
+    return np.asarray(new)[keep]
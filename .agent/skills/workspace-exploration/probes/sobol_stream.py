@@ -0,0 +1,121 @@
+"""Lazy, shardable Sobol sequence of joint configs.
+
+A scrambled Sobol sequence is most uniform over aligned power-of-two blocks:
+points [k * 2^m, (k + 1) * 2^m) form a (t, m, s)-net. SobolStream draws the
+seed's sequence in exactly those blocks, one at a time, so a probe holds one
+block (plus one batch) on the device instead of all n configs:
+
+    stream = SobolStream(lo, hi, seed=0, start=0, stop=n)
+    for index, configs in stream.batches(num_envs):   # (<= num_envs, J)
+        labels[index - stream.start: ...] = labeler(configs)
+
+Index ranges make the stream deterministic under any split:
+
+    stream.resume(offset)       the same sequence from `offset` on (a crashed
+                                or extended run continues where it stopped)
+    stream.shard(i, k)          worker i's contiguous share of [start, stop),
+                                cut at block boundaries
+
+Point j is the same in every view, so shards concatenated in order, or a
+run and its resumption, equal one unsplit draw.
+"""
+from typing import Iterator, Optional
+
+import torch
+
+# SobolEngine supports indices below 2^30
+MAX_INDEX = 1 << 30
+
+
+class SobolStream:
+    """Scrambled Sobol points [start, stop) of `seed`, mapped to [lo, hi].
+
+    Args:
+        lo, hi: shape (J,), per-joint bounds; output has their device / dtype.
+        seed: scramble seed (same seed -> same sequence).
+        start: index of the first point.
+        stop: one past the last index; None streams until MAX_INDEX.
+        block_log2: blocks are 2^block_log2 points, aligned to multiples of
+            that size (the first one is partial if `start` is not aligned).
+    """
+
+    def __init__(self, lo: torch.Tensor, hi: torch.Tensor, seed: int = 0, start: int = 0,
+                 stop: Optional[int] = None, block_log2: int = 10):
+        stop = MAX_INDEX if stop is None else stop
+        if not 0 <= start <= stop <= MAX_INDEX:
+            raise ValueError(f"Need 0 <= start <= stop <= 2^30, got [{start}, {stop})")
+        self.lo, self.hi = lo, hi
+        self.seed = seed
+        self.start, self.stop = int(start), int(stop)
+        self.block_log2 = block_log2
+
+    @property
+    def block_size(self) -> int:
+        return 1 << self.block_log2
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def _view(self, start: int, stop: int) -> "SobolStream":
+        return SobolStream(self.lo, self.hi, self.seed, start, stop, self.block_log2)
+
+    def _engine(self, at: int) -> torch.quasirandom.SobolEngine:
+        engine = torch.quasirandom.SobolEngine(dimension=self.lo.shape[0], scramble=True,
+                                               seed=self.seed)
+        if at:
+            engine.fast_forward(at)
+        return engine
+
+    def _scale(self, u: torch.Tensor) -> torch.Tensor:
+        u = u.to(device=self.lo.device, dtype=self.lo.dtype)   # (n, J) in [0, 1]
+        return self.lo + u * (self.hi - self.lo)
+
+    def take(self, n: int) -> torch.Tensor:
+        """The first n points of the stream in one tensor, shape (n, J)."""
+        if n > len(self):
+            raise ValueError(f"take({n}) past the end of a stream of {len(self)} points")
+        return self._scale(self._engine(self.start).draw(n))
+
+    def blocks(self) -> Iterator[tuple]:
+        """Yield (index, configs) per aligned power-of-two block, lazily."""
+        engine = self._engine(self.start)
+        index = self.start
+        while index < self.stop:
+            end = min((index // self.block_size + 1) * self.block_size, self.stop)
+            yield index, self._scale(engine.draw(end - index))
+            index = end
+
+    def batches(self, batch_size: int) -> Iterator[tuple]:
+        """Yield (index, configs) in batches of batch_size (the last may be
+        shorter), drawn block by block."""
+        pending, first = [], self.start
+        n_pending = 0
+        for _, block in self.blocks():
+            pending.append(block)
+            n_pending += block.shape[0]
+            while n_pending >= batch_size:
+                buf = torch.cat(pending) if len(pending) > 1 else pending[0]
+                yield first, buf[:batch_size]
+                first += batch_size
+                n_pending -= batch_size
+                pending = [buf[batch_size:]] if n_pending else []
+        if n_pending:
+            yield first, torch.cat(pending)
+
+    def resume(self, offset: int) -> "SobolStream":
+        """The same stream from index `offset` (e.g. a SafeSet's sobol_next)."""
+        return self._view(offset, self.stop)
+
+    def shard(self, worker: int, n_workers: int) -> "SobolStream":
+        """Worker `worker`'s contiguous share of [start, stop): whole blocks,
+        split as evenly as the block count allows. Shards 0..n_workers-1
+        tile the range in order."""
+        if not 0 <= worker < n_workers:
+            raise ValueError(f"worker must be in [0, {n_workers}), got {worker}")
+        if self.stop == MAX_INDEX:
+            raise ValueError("shard() needs a bounded stream (stop=...)")
+        first = self.start // self.block_size
+        n_blocks = -(-self.stop // self.block_size) - first
+        cut = lambda i: min(max((first + i * n_blocks // n_workers) * self.block_size,
+                                self.start), self.stop)
+        return self._view(cut(worker), cut(worker + 1))
@@ -0,0 +1,83 @@
+"""Constant-memory accumulators for probes that stream FK batches.
+
+All state stays on the device the batches arrive on; nothing syncs to the
+host until the final read-out (except MemmapCloud, which is opt-in).
+"""
+import numpy as np
+import torch
+
+
+class RunningAABB:
+    """Per-axis running min/max over (N, D) batches."""
+
+    def __init__(self, dim: int = 3, device="cpu", dtype=torch.float32):
+        self.lo = torch.full((dim,), float("inf"), device=device, dtype=dtype)
+        self.hi = torch.full((dim,), float("-inf"), device=device, dtype=dtype)
+        self.count = 0
+
+    def update(self, points: torch.Tensor):
+        torch.minimum(self.lo, points.amin(dim=0), out=self.lo)
+        torch.maximum(self.hi, points.amax(dim=0), out=self.hi)
+        self.count += points.shape[0]
+
+    def bounds(self) -> dict:
+        """Same layout as workspace_probe.fit_aabb."""
+        lo, hi = self.lo.tolist(), self.hi.tolist()
+        return {axis: [lo[i], hi[i]] for i, axis in enumerate("xyz"[:len(lo)])}
+
+
+class Reservoir:
+    """Fixed-size uniform sample (without replacement) of a point stream.
+
+    Bottom-k / random-key reservoir: every incoming point gets a uniform
+    key, and the `capacity` points with the largest keys seen so far are
+    kept. One topk per batch, fully on device.
+
+    Keys are float64: after n points the survivors' keys lie in about
+    [1 - capacity / n, 1). With float32 (steps of 2^-24 there) a 20k
+    reservoir has ~33k key values left at n = 10^7 and ~3k at 10^8, so ties,
+    broken by topk rather than at random, would decide which points survive.
+    """
+
+    def __init__(self, capacity: int, dim: int = 3, seed: int = 0, device="cpu",
+                 dtype=torch.float32):
+        self.capacity = capacity
+        self.points = torch.empty((0, dim), device=device, dtype=dtype)
+        self.keys = torch.empty((0,), device=device, dtype=torch.float64)
+        self.generator = torch.Generator(device=device).manual_seed(seed)
+
+    def update(self, points: torch.Tensor):
+        keys = torch.rand(points.shape[0], generator=self.generator, device=points.device,
+                          dtype=torch.float64)
+        all_keys = torch.cat((self.keys, keys))
+        all_points = torch.cat((self.points, points))
+        if all_keys.shape[0] > self.capacity:
+            all_keys, idx = all_keys.topk(self.capacity, sorted=False)
+            all_points = all_points[idx]
+        self.keys, self.points = all_keys, all_points
+
+    def sample(self) -> np.ndarray:
+        return self.points.cpu().numpy()
+
+
+class MemmapCloud:
+    """Full point cloud written batch by batch to an on-disk .npy memmap.
+
+    The file is a regular .npy, so `np.load(path, mmap_mode="r")` reads it
+    back without loading it into RAM.
+    """
+
+    def __init__(self, path: str, n_total: int, dim: int = 3, dtype=np.float32):
+        self.path = str(path)
+        self.array = np.lib.format.open_memmap(self.path, mode="w+", dtype=dtype,
+                                               shape=(n_total, dim))
+        self.offset = 0
+
+    def append(self, points: torch.Tensor):
+        n = points.shape[0]
+        self.array[self.offset:self.offset + n] = points.cpu().numpy()
+        self.offset += n
+
+    def close(self):
+        self.array.flush()
+        del self.array
@@ -5,13 +5,44 @@ Position-only DLS oracle: sample target positions, drive the arm to each with
 Isaac Lab's differential-IK controller under gravity, measure settled EE error,
 take a percentile (p90) as the threshold.
 
+Targets come from the workspace-probe point cloud, or, if a voxel
+ReachabilityMap is passed, uniformly from its reachable voxels (covers the
+reachable volume rather than only the FK sample points).
+
+early_exit=True streams targets through the envs instead of running every
+batch for all n_steps: an env whose EE moved less than settle_tol_m per step
+for settle_patience consecutive steps is measured and reset to home with the
+next target (probes.joint_limits_probe.SlotScheduler), so IK steps scale with
+actual settling time rather than the worst case. Settling is checked every
+settle_check_every IK steps, the only host syncs of the loop; a refill costs
+one extra physics step so the new targets start from a fresh home EE pose
+and Jacobian.
+
 DEBUG SCAFFOLDING (temporary):
   ISOLATION_TEST=True  -> targets are FK of small perturbations around home,
                           i.e. provably reachable with a known-good solution.
                           Used to tell "distribution problem" from "solver bug".
-  DEBUG=True           -> per-step trace on batch 0.
+  DEBUG=True           -> per-step trace (every 25 steps) of the first batch.
 Remove both once the probe is validated.
+
+The fixed-budget IK loop does no host sync: arm joints are selected with a
+slice view when they are contiguous (precomputed once), the DEBUG trace is
+written into a preallocated device buffer, and everything is read back
+once per batch. scripts/bench_ik_loop_overhead.py measures the difference.
+
+Error percentiles come from a streaming QuantileSketch (common/quantile_sketch.py)
+updated per batch: exact (np.percentile) up to its exact_limit, bounded memory
+beyond it, and serialized into the result so runs can be merged.
+keep_errors=False drops the per-target error / target arrays as well.
+
+With an analytical `chain` (kinematics/), every target is also solved by the
+same position DLS in pure torch (kinematics/ik.py: perfect joint tracking,
+no gravity, no PD lag). Its residual percentiles are a kinematic lower bound
+for the threshold, and prescreen_tol_m drops targets whose kinematic residual
+exceeds it (redrawn from the same source) before any PhysX rollout.
 """
+import os
+import sys
 import time
 from dataclasses import dataclass
 from typing import Optional
@@ -19,9 +50,16 @@ from typing import Optional
 import numpy as np
 import torch
 
-DEBUG = True
+_SKILLS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _SKILLS_DIR not in sys.path:
+    sys.path.insert(0, _SKILLS_DIR)
+from common.quantile_sketch import QuantileSketch  # noqa: E402
+from kinematics.ik import IKResult, solve_position_ik  # noqa: E402
+
+DEBUG = False
 ISOLATION_TEST = True          # True: near-home reachable targets (bug-isolation)
 ISO_DELTA_RAD = 0.3            # perturbation magnitude around home for the test
+PRESCREEN_ROUNDS = 4           # redraws to replace targets dropped by the prescreen
 
 
 @dataclass
@@ -40,8 +78,15 @@ class SuccessThresholdProbeResult:
     units: str
     seed: int
     runtime_seconds: float
-    errors_m: np.ndarray
-    targets_base: np.ndarray
+    errors_m: Optional[np.ndarray]      # None with keep_errors=False
+    targets_base: Optional[np.ndarray]
+    error_sketch: Optional[dict] = None   # QuantileSketch.to_dict() of errors_m
+    n_ik_steps: int = 0                 # IK iterations run (each 4 physics steps), all batches
+    steps_to_settle: Optional[np.ndarray] = None   # (n_targets,) early_exit only
+    kinematic_residual_percentiles_m: Optional[dict] = None   # analytic DLS, chain only
+    kinematic_lower_bound_m: Optional[float] = None           # its `statistic` entry
+    kinematic_convergence_rate: Optional[float] = None
+    n_prescreened_out: int = 0          # drawn targets dropped by prescreen_tol_m
 
 
 def _read_gravity_z(sim) -> Optional[float]:
@@ -51,21 +96,86 @@ def _read_gravity_z(sim) -> Optional[float]:
         return None
 
 
-def _percentiles(values: np.ndarray) -> dict:
-    ps = [50, 75, 90, 95, 99]
-    out = {f"p{p}": float(np.percentile(values, p)) for p in ps}
-    out["mean"] = float(values.mean())
-    out["max"] = float(values.max())
-    return out
+def _home(sim, scene, robot, default_q, zero_vel, dt, env_ids=None, step=True):
+    q = default_q if env_ids is None else default_q[env_ids]
+    v = zero_vel if env_ids is None else zero_vel[env_ids]
+    robot.write_joint_state_to_sim(q, v, env_ids=env_ids)
+    robot.set_joint_position_target(q, env_ids=env_ids)
+    scene.write_data_to_sim()
+    if step:
+        sim.step(render=False)
+        scene.update(dt)
+
+
+def _ee_pose_b(robot, ee_idx, subtract_frame_transforms):
+    return subtract_frame_transforms(
+        robot.data.root_pos_w, robot.data.root_quat_w,
+        robot.data.body_pos_w[:, ee_idx], robot.data.body_quat_w[:, ee_idx],
+    )
+
+
+def _arm_selector(arm_ids, device):
+    """Index for the arm-joint columns: a slice (view, no gather) when the ids
+    are contiguous and ascending, else a device index tensor."""
+    if list(arm_ids) == list(range(arm_ids[0], arm_ids[0] + len(arm_ids))):
+        return slice(arm_ids[0], arm_ids[0] + len(arm_ids))
+    return torch.as_tensor(arm_ids, device=device, dtype=torch.long)
+
+
+DEBUG_EVERY = 25
+_DEBUG_COLS = ("med_err", "cmd_gap", "des_gap", "sol_gap")
+
+
+def _record_debug(buf, row, ee_rel, p_t, ee_pos_b, joint_pos_des, joint_pos, q_known_arm):
+    """Write one trace row into the device buffer; no host sync."""
+    buf[row, 0] = torch.linalg.norm(ee_rel - p_t, dim=-1).median()
+    buf[row, 1] = torch.linalg.norm(ee_pos_b - p_t, dim=-1).median()
+    buf[row, 2] = torch.linalg.norm(joint_pos_des - joint_pos, dim=-1).median()
+    if q_known_arm is not None:
+        buf[row, 3] = torch.linalg.norm(joint_pos_des - q_known_arm, dim=-1).median()
+
+
+def _print_debug(buf, batch):
+    for row, (med_err, cmd_gap, des_gap, sol_gap) in enumerate(buf.tolist()):
+        msg = (f"[debug] batch {batch} step {row * DEBUG_EVERY:4d}  "
+               f"med_err={med_err*1000:7.1f}mm  cmd_gap={cmd_gap*1000:7.1f}mm  "
+               f"des_gap={des_gap:.4f}")
+        if sol_gap == sol_gap:                 # not NaN: isolation test
+            msg += f"  sol_gap={sol_gap:.4f}rad"
+        print(msg)
+
+
+def _ik_step(sim, scene, robot, diff_ik, ee_idx, ee_jacobi_idx, arm_ids, arm_sel, dt,
+             subtract_frame_transforms):
+    """One DLS update + 4 physics substeps. Returns (joint_pos_des, ee_pos_b)."""
+    ee_pos_b, ee_quat_b = _ee_pose_b(robot, ee_idx, subtract_frame_transforms)
+    jacobian = robot.root_physx_view.get_jacobians()[:, ee_jacobi_idx, :, arm_sel]
+    joint_pos = robot.data.joint_pos[:, arm_sel]
+
+    joint_pos_des = diff_ik.compute(ee_pos_b, ee_quat_b, jacobian, joint_pos)
+    robot.set_joint_position_target(
+        joint_pos_des, joint_ids=arm_sel if isinstance(arm_sel, slice) else arm_ids)
+    scene.write_data_to_sim()
+    for _sub in range(4):                     # let the PD reach q_des
+        sim.step(render=False)
+        scene.update(dt)
+    return joint_pos_des, ee_pos_b
 
 
 def success_threshold_probe(sim, scene, robot, workspace_points, *,
                             n_targets: int, seed: int = 0,
+                            reachability=None,
                             ee_body_name: str = "panda_hand",
                             arm_joint_expr: str = "panda_joint.*",
                             statistic: str = "p90",
                             n_steps: int = 200,
-                            settle_tol_m: float = 1e-4) -> SuccessThresholdProbeResult:
+                            settle_tol_m: float = 1e-4,
+                            early_exit: bool = False,
+                            settle_patience: int = 3,
+                            settle_check_every: int = 5,
+                            keep_errors: bool = True,
+                            chain=None,
+                            prescreen_tol_m: Optional[float] = None) -> SuccessThresholdProbeResult:
     from isaaclab.controllers import DifferentialIKController, DifferentialIKControllerCfg
     from isaaclab.utils.math import subtract_frame_transforms
 
@@ -96,109 +206,92 @@ def success_threshold_probe(sim, scene, robot, workspace_points, *,
     )
     diff_ik = DifferentialIKController(ik_cfg, num_envs=num_envs, device=device)
 
-    pts = torch.as_tensor(np.asarray(workspace_points), device=device, dtype=torch.float32)
     n_batches = (n_targets + num_envs - 1) // num_envs
     n_actual = n_batches * num_envs
     cpu_gen = torch.Generator().manual_seed(seed)
-    sample_idx = torch.randint(0, pts.shape[0], (n_actual,), generator=cpu_gen)
+    if reachability is not None:
+        draw = lambda n: reachability.sample_reachable(n, generator=cpu_gen).to(device)
+    else:
+        pts = torch.as_tensor(np.asarray(workspace_points), device=device, dtype=torch.float32)
+        draw = lambda n: pts[torch.randint(0, pts.shape[0], (n,), generator=cpu_gen).to(device)]
     torch.manual_seed(seed)
-
-    err_chunks, tgt_chunks, settled_chunks = [], [], []
-
-    for b in range(n_batches):
-        # q_known is only defined in the isolation branch; None otherwise.
-        q_known = None
-
-        if ISOLATION_TEST:
-            # Target = FK of a small perturbation around home: provably reachable,
-            # known-good joint solution (q_known), inside the DLS basin.
+    if prescreen_tol_m is not None and chain is None:
+        raise ValueError("prescreen_tol_m needs an analytical chain")
+    if chain is not None:
+        if ee_body_name != chain.ee_name:
+            raise ValueError(f"Analytical chain ends at '{chain.ee_name}', not '{ee_body_name}'")
+        chain = chain.to(device=device)
+        q_home_arm = default_q[0, arm_ids_t]
+
+    # --- Targets, all up front: (n_actual, 3) base frame ---
+    # q_known is only defined in the isolation branch; None otherwise.
+    q_known = None
+    if ISOLATION_TEST:
+        # Target = FK of a small perturbation around home: provably reachable,
+        # known-good joint solution (q_known), inside the DLS basin.
+        tgt_chunks, q_chunks = [], []
+        for b in range(n_batches):
             delta = ISO_DELTA_RAD * (2 * torch.rand((num_envs, len(arm_ids)), device=device) - 1)
-            q_known = default_q.clone()
-            q_known[:, arm_ids_t] = default_q[:, arm_ids_t] + delta
-            robot.write_joint_state_to_sim(q_known, zero_vel)
-            robot.set_joint_position_target(q_known)
+            q_b = default_q.clone()
+            q_b[:, arm_ids_t] = default_q[:, arm_ids_t] + delta
+            robot.write_joint_state_to_sim(q_b, zero_vel)
+            robot.set_joint_position_target(q_b)
             scene.write_data_to_sim()
             sim.step(render=False)
             scene.update(dt)
-            p_t = (robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w).clone()
-        else:
-            p_t = pts[sample_idx[b * num_envs:(b + 1) * num_envs].to(device)]
-
-        # reset arm to home; rollout always starts here
-        robot.write_joint_state_to_sim(default_q, zero_vel)
-        robot.set_joint_position_target(default_q)
-        scene.write_data_to_sim()
-        sim.step(render=False)
-        scene.update(dt)
-
-        cur_pos_b, cur_quat_b = subtract_frame_transforms(
-            robot.data.root_pos_w, robot.data.root_quat_w,
-            robot.data.body_pos_w[:, ee_idx], robot.data.body_quat_w[:, ee_idx],
-        )
-        diff_ik.reset()
-        diff_ik.set_command(p_t, ee_pos=cur_pos_b, ee_quat=cur_quat_b)
-
-        prev_ee_w = robot.data.body_pos_w[:, ee_idx].clone()
-        last_step_disp = torch.full((num_envs,), float("inf"), device=device)
-
-        for step in range(n_steps):
-            ee_pos_w = robot.data.body_pos_w[:, ee_idx]
-            ee_quat_w = robot.data.body_quat_w[:, ee_idx]
-            ee_pos_b, ee_quat_b = subtract_frame_transforms(
-                robot.data.root_pos_w, robot.data.root_quat_w, ee_pos_w, ee_quat_w
-            )
-            jacobian = robot.root_physx_view.get_jacobians()[:, ee_jacobi_idx, :, arm_ids_t]
-            joint_pos = robot.data.joint_pos[:, arm_ids_t]
-
-            joint_pos_des = diff_ik.compute(ee_pos_b, ee_quat_b, jacobian, joint_pos)
-            robot.set_joint_position_target(joint_pos_des, joint_ids=arm_ids)
-            scene.write_data_to_sim()
-            for _sub in range(4):                     # let the PD reach q_des
-                sim.step(render=False)
-                scene.update(dt)
-
-            if DEBUG and b == 0 and step % 25 == 0:
-                ee_now = robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w
-                med_err = torch.linalg.norm(ee_now - p_t, dim=-1).median()
-                cmd_gap = torch.linalg.norm(ee_pos_b - p_t, dim=-1).median()
-                des_gap = torch.linalg.norm(
-                    joint_pos_des - robot.data.joint_pos[:, arm_ids_t], dim=-1
-                ).median()
-                msg = (f"[debug] step {step:4d}  med_err={med_err*1000:7.1f}mm  "
-                       f"cmd_gap={cmd_gap*1000:7.1f}mm  des_gap={des_gap:.4f}")
-                if q_known is not None:
-                    sol_gap = torch.linalg.norm(
-                        joint_pos_des - q_known[:, arm_ids_t], dim=-1
-                    ).median()
-                    msg += f"  sol_gap={sol_gap:.4f}rad"
-                print(msg)
-
-            cur_ee_w = robot.data.body_pos_w[:, ee_idx]
-            last_step_disp = torch.linalg.norm(cur_ee_w - prev_ee_w, dim=-1)
-            prev_ee_w = cur_ee_w.clone()
-
-        ee_rel = robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w
-        err = torch.linalg.norm(ee_rel - p_t, dim=-1)
-
-        err_chunks.append(err)
-        tgt_chunks.append(p_t)
-        settled_chunks.append(last_step_disp < settle_tol_m)
-
-    errors = torch.cat(err_chunks).cpu().numpy()
-    targets = torch.cat(tgt_chunks).cpu().numpy()
-    settled_all = torch.cat(settled_chunks)
-
-    n_measured = int(errors.shape[0])
+            tgt_chunks.append(robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w)
+            q_chunks.append(q_b)
+        targets_all = torch.cat(tgt_chunks)
+        q_known = torch.cat(q_chunks)
+    else:
+        targets_all = draw(n_actual)
+
+    kin, n_prescreened_out = None, 0
+    if chain is not None:
+        kin = solve_position_ik(chain, targets_all, q_home_arm)
+        if prescreen_tol_m is not None and not ISOLATION_TEST:
+            targets_all, kin, n_prescreened_out = _prescreen(
+                chain, q_home_arm, targets_all, kin, draw, prescreen_tol_m)
+
+    ik = (sim, scene, robot, diff_ik, ee_idx, ee_jacobi_idx, arm_ids,
+          _arm_selector(arm_ids, device), dt, subtract_frame_transforms)
+    sketch = QuantileSketch()
+    if early_exit:
+        errors_t, settled_all, n_ik_steps, steps_used = _rollout_streaming(
+            ik, targets_all, default_q, zero_vel, n_steps, settle_tol_m, settle_patience,
+            settle_check_every)
+        sketch.update(errors_t)
+        steps_to_settle = steps_used.cpu().numpy()
+    else:
+        errors_t, settled_all, n_ik_steps = _rollout_batches(
+            ik, targets_all, q_known, default_q, zero_vel, n_steps, settle_tol_m,
+            sketch, keep_errors)
+        steps_to_settle = None
+
+    errors = errors_t.cpu().numpy() if keep_errors else None
+    targets = targets_all.cpu().numpy() if keep_errors else None
+
+    n_measured = sketch.n
     convergence_rate = float(settled_all.float().mean().item())
     if convergence_rate < 0.8:
         print(f"⚠️  success-threshold probe: only {convergence_rate:.0%} of targets "
               f"settled within n_steps={n_steps}. Consider raising n_steps.")
 
-    pct = _percentiles(errors)
+    pct = sketch.percentiles()
     if statistic not in pct:
         raise ValueError(f"statistic must be one of {list(pct)}, got {statistic!r}")
     threshold = pct[statistic]
 
+    kin_pct = kin_bound = kin_rate = None
+    if kin is not None:
+        kin_pct = QuantileSketch().update(kin.residual_m).percentiles()
+        kin_bound = kin_pct[statistic]
+        kin_rate = float(kin.converged.float().mean())
+        if DEBUG and ISOLATION_TEST:
+            # Near-home targets: both paths should converge; a gap here is a solver bug
+            print(f"[debug] isolation: kinematic {statistic}={kin_bound * 1000:.3f}mm "
+                  f"(converged {kin_rate:.1%})  PhysX {statistic}={threshold * 1000:.3f}mm")
+
     return SuccessThresholdProbeResult(
         threshold_m=threshold,
         statistic=statistic,
@@ -215,6 +308,157 @@ def success_threshold_probe(sim, scene, robot, workspace_points, *,
         runtime_seconds=time.time() - start,
         errors_m=errors,
         targets_base=targets,
+        error_sketch=sketch.to_dict(),
         command_type=ik_cfg.command_type,
+        n_ik_steps=n_ik_steps,
+        steps_to_settle=steps_to_settle,
+        kinematic_residual_percentiles_m=kin_pct,
+        kinematic_lower_bound_m=kin_bound,
+        kinematic_convergence_rate=kin_rate,
+        n_prescreened_out=n_prescreened_out,
+    )
+
+
+def _prescreen(chain, q_home_arm, targets, kin, draw, tol_m):
+    """Replace targets whose kinematic residual exceeds tol_m with fresh draws
+    that pass (up to PRESCREEN_ROUNDS rounds; if still short, passing targets
+    are repeated). Returns (targets, kin, n_dropped)."""
+    n = targets.shape[0]
+    parts = [(targets, kin)]
+    n_kept = int((kin.residual_m <= tol_m).sum())
+    for _ in range(PRESCREEN_ROUNDS):
+        if n_kept >= n:
+            break
+        cand = draw(2 * (n - n_kept))
+        r = solve_position_ik(chain, cand, q_home_arm)
+        parts.append((cand, r))
+        n_kept += int((r.residual_m <= tol_m).sum())
+    if n_kept == 0:
+        raise RuntimeError(f"prescreen: no target within {tol_m} m of a kinematic IK solution")
+    if n_kept < n:
+        print(f"⚠️  success-threshold prescreen: only {n_kept} of {n} targets pass; "
+              f"repeating some.")
+
+    cat = lambda get: torch.cat([get(t, r)[r.residual_m <= tol_m] for t, r in parts])
+    n_drawn = sum(t.shape[0] for t, _ in parts)
+    idx = torch.arange(n, device=targets.device) % n_kept
+    kin = IKResult(q=cat(lambda t, r: r.q)[idx],
+                   residual_m=cat(lambda t, r: r.residual_m)[idx],
+                   converged=cat(lambda t, r: r.converged)[idx],
+                   n_iters=cat(lambda t, r: r.n_iters)[idx])
+    return cat(lambda t, r: t)[idx], kin, n_drawn - n_kept
+
+
+def _rollout_batches(ik, targets_all, q_known_all, default_q, zero_vel, n_steps, settle_tol_m,
+                     sketch, keep_errors=True):
+    """Fixed budget: every batch of num_envs targets runs all n_steps.
+    Feeds each batch's errors to `sketch`. Returns (errors or None, settled,
+    n_ik_steps)."""
+    (sim, scene, robot, diff_ik, ee_idx, ee_jacobi_idx, arm_ids, arm_sel, dt,
+     subtract_frame_transforms) = ik
+    num_envs = scene.num_envs
+    device = targets_all.device
+    err_chunks, settled_chunks = [], []
+    prev_ee_w = torch.empty((num_envs, 3), device=device)
+    last_step_disp = torch.empty(num_envs, device=device)
+    debug_buf = torch.empty((-(-n_steps // DEBUG_EVERY), len(_DEBUG_COLS)), device=device)
+
+    for b, p_t in enumerate(targets_all.split(num_envs)):
+        q_known_arm = (None if q_known_all is None
+                       else q_known_all[b * num_envs:(b + 1) * num_envs, arm_sel])
+
+        # reset arm to home; rollout always starts here
+        _home(sim, scene, robot, default_q, zero_vel, dt)
+        cur_pos_b, cur_quat_b = _ee_pose_b(robot, ee_idx, subtract_frame_transforms)
+        diff_ik.reset()
+        diff_ik.set_command(p_t, ee_pos=cur_pos_b, ee_quat=cur_quat_b)
+
+        prev_ee_w.copy_(robot.data.body_pos_w[:, ee_idx])
+        last_step_disp.fill_(float("inf"))
+        trace = DEBUG and b == 0
+        if trace:
+            debug_buf.fill_(float("nan"))
+
+        for step in range(n_steps):
+            joint_pos_des, ee_pos_b = _ik_step(*ik)
+
+            cur_ee_w = robot.data.body_pos_w[:, ee_idx]
+            if trace and step % DEBUG_EVERY == 0:
+                _record_debug(debug_buf, step // DEBUG_EVERY,
+                              cur_ee_w - robot.data.root_pos_w, p_t, ee_pos_b,
+                              joint_pos_des, robot.data.joint_pos[:, arm_sel], q_known_arm)
+            torch.linalg.vector_norm(cur_ee_w - prev_ee_w, dim=-1, out=last_step_disp)
+            prev_ee_w.copy_(cur_ee_w)
 
-    )
\ No newline at end of file
+        ee_rel = robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w
+        err = torch.linalg.norm(ee_rel - p_t, dim=-1)
+        sketch.update(err)                           # one readback per batch
+        if keep_errors:
+            err_chunks.append(err)
+        settled_chunks.append(last_step_disp < settle_tol_m)
+        if trace:
+            _print_debug(debug_buf, b)
+
+    n_batches = len(settled_chunks)
+    errors = torch.cat(err_chunks) if keep_errors else None
+    return errors, torch.cat(settled_chunks), n_batches * n_steps
+
+
+def _rollout_streaming(ik, targets_all, default_q, zero_vel, n_steps, settle_tol_m,
+                       settle_patience, check_every=5):
+    """Early exit + refill: a target is done once its EE has moved less than
+    settle_tol_m per step for settle_patience consecutive steps (settled) or
+    after n_steps (not settled); its env then restarts from home on the next
+    target. Done-ness is checked every `check_every` IK steps, so steps_used
+    and the n_steps cutoff round up to a multiple of it.
+    Returns (errors, settled, n_ik_steps, steps_used)."""
+    from probes.joint_limits_probe import SlotScheduler
+
+    (sim, scene, robot, diff_ik, ee_idx, ee_jacobi_idx, arm_ids, arm_sel, dt,
+     subtract_frame_transforms) = ik
+    num_envs = scene.num_envs
+    device = targets_all.device
+    sched = SlotScheduler(targets_all.shape[0], num_envs, n_steps, device=device)
+    errors = torch.zeros(targets_all.shape[0], device=device)
+
+    slots, items = sched.fill(torch.arange(num_envs, device=device))
+    p_cmd = targets_all[:1].expand(num_envs, -1).clone()
+    p_cmd[slots] = targets_all[items]
+    _home(sim, scene, robot, default_q, zero_vel, dt)
+    cur_pos_b, cur_quat_b = _ee_pose_b(robot, ee_idx, subtract_frame_transforms)
+    diff_ik.reset()
+    diff_ik.set_command(p_cmd, ee_pos=cur_pos_b, ee_quat=cur_quat_b)
+
+    prev_ee_w = robot.data.body_pos_w[:, ee_idx].clone()
+    calm = torch.zeros(num_envs, dtype=torch.long, device=device)
+    n_ik_steps = 0
+    while not sched.finished:
+        # No host sync inside the k steps: calm is a device counter
+        for _ in range(check_every):
+            _ik_step(*ik)
+            n_ik_steps += 1
+            cur_ee_w = robot.data.body_pos_w[:, ee_idx]
+            disp = torch.linalg.norm(cur_ee_w - prev_ee_w, dim=-1)
+            prev_ee_w.copy_(cur_ee_w)
+            calm = torch.where(disp < settle_tol_m, calm + 1, torch.zeros_like(calm))
+
+        # Error of every in-flight target now; for the ones finishing here
+        # it is their measurement
+        active = sched.slot_item >= 0
+        err = torch.linalg.norm(cur_ee_w - robot.data.root_pos_w - p_cmd, dim=-1)
+        errors[sched.slot_item[active]] = err[active]
+
+        done = sched.observe(calm >= settle_patience, steps=check_every)
+        if done.numel():
+            slots, items = sched.fill(done)
+            if slots.numel():
+                p_cmd[slots] = targets_all[items]
+                calm[slots] = 0
+                # Step once so the refilled envs' EE pose and Jacobian are
+                # read at home, not at the previous target
+                _home(sim, scene, robot, default_q, zero_vel, dt, env_ids=slots)
+                prev_ee_w[slots] = robot.data.body_pos_w[slots, ee_idx]
+                cur_pos_b, cur_quat_b = _ee_pose_b(robot, ee_idx, subtract_frame_transforms)
+                diff_ik.set_command(p_cmd, ee_pos=cur_pos_b, ee_quat=cur_quat_b)
+
+    return errors, sched.labels, n_ik_steps, sched.steps_used
@@ -2,9 +2,27 @@
 
 Algorithm:
 1. Sample N joint configurations uniformly within URDF joint limits.
-2. Write configs to parallel envs and read back EE positions.
+2. Write configs to parallel envs and read back EE positions
+   (backend="physx"), or evaluate them with the analytical chain in
+   kinematics/ (backend="analytic", no simulator needed).
 3. Convert to robot-base-relative coordinates.
-4. Fit axis-aligned bounding box.
+4. Fit axis-aligned bounding box. With stream=True the box is a running
+   on-device min/max and only a fixed-size reservoir of points (plus an
+   optional on-disk memmap of the full cloud) is kept, so memory does not
+   grow with n_samples.
+5. Optionally (voxel_size=...) bin every FK sample into a voxel
+   reachability map (probes/reachability.py), a much tighter description
+   of the reachable region than the box. With orientation_bins=m as well,
+   the EE orientation of the same FK samples is binned too, into a
+   PoseReachabilityMap over (voxel, SO(3) cell) for 6-DoF target checks.
+
+sampler="adaptive" replaces step 1 with a uniform warm-up followed by a
+per-face local search around the current extreme configs
+(probes/adaptive_sampling.py); the box converges with far fewer FK calls.
+
+workspace_probe_incremental runs one stream per seed and records the box at
+a list of sample counts along the way (with an optional stopping rule), for
+convergence studies.
 """
 import time
 from dataclasses import dataclass
@@ -12,6 +30,11 @@ from dataclasses import dataclass
 import numpy as np
 import torch
 
+from kinematics.chain import matrix_to_quat
+from probes.streaming import RunningAABB, Reservoir, MemmapCloud
+from probes.reachability import (VoxelAccumulator, ReachabilityMap, PoseAccumulator,
+                                 PoseReachabilityMap)
+
 
 @dataclass
 class WorkspaceProbeResult:
@@ -21,6 +44,9 @@ class WorkspaceProbeResult:
     n_valid: int             # equals n_sampled in v1 (no filtering)
     runtime_seconds: float
     ee_frame: str
+    cloud_path: str | None = None  # full on-disk cloud (.npy memmap), streaming mode only
+    reachability: ReachabilityMap | None = None  # voxel reach counts, if voxel_size was given
+    pose_reachability: PoseReachabilityMap | None = None  # if orientation_bins was given too
 
 def sample_configs(lo: torch.Tensor, hi: torch.Tensor, num_envs: int,
                    generator: torch.Generator) -> torch.Tensor:
@@ -76,49 +102,383 @@ def run_fk_batch(scene, robot, configs: torch.Tensor, ee_body_idx: int) -> torch
     base_pos_w = robot.data.root_pos_w
     return ee_pos_w - base_pos_w
 
+def run_fk_batch_pose(scene, robot, configs: torch.Tensor, ee_body_idx: int) -> torch.Tensor:
+    """run_fk_batch plus EE orientation.
+
+    Returns:
+        ee_pose_rel: shape (num_envs, 7), position then quaternion (w, x, y, z),
+            in robot-base frame
+    """
+    from isaaclab.utils.math import quat_conjugate, quat_mul
+
+    ee_pos_rel = run_fk_batch(scene, robot, configs, ee_body_idx)
+    ee_quat_rel = quat_mul(quat_conjugate(robot.data.root_quat_w),
+                           robot.data.body_quat_w[:, ee_body_idx])
+    return torch.cat((ee_pos_rel, ee_quat_rel), dim=1)
+
+def run_fk_batch_analytic(chain, configs: torch.Tensor) -> torch.Tensor:
+    """Analytical counterpart of run_fk_batch.
+
+    Args:
+        chain: kinematics.chain.SerialChain for the robot's arm joints
+        configs: shape (batch, chain.n_joints)
+
+    Returns:
+        ee_pos_rel: shape (batch, 3), in robot-base frame
+    """
+    return chain.ee_position(configs)
+
+
+def run_fk_batch_analytic_pose(chain, configs: torch.Tensor) -> torch.Tensor:
+    """Analytical counterpart of run_fk_batch_pose, shape (batch, 7)."""
+    pos, rot = chain.forward(configs)
+    return torch.cat((pos, matrix_to_quat(rot)), dim=1)
+
+
+def _analytic_fk(robot, ee_body_name, chain, pose: bool = False):
+    """(fk, lo, hi): configs -> EE positions (or (N, 7) poses) via the analytical chain."""
+    if chain is None:
+        from kinematics.robots import get_chain
+        chain = get_chain("franka")
+    if ee_body_name != chain.ee_name:
+        raise ValueError(
+            f"Analytical chain ends at '{chain.ee_name}', not '{ee_body_name}'"
+        )
+
+    if robot is not None:
+        # Same limits the PhysX path samples from, restricted to the chain's joints
+        chain = chain.to(device=robot.device)
+        idx = [robot.joint_names.index(name) for name in chain.joint_names]
+        limits = robot.data.soft_joint_pos_limits[0, idx]
+        lo, hi = limits[:, 0], limits[:, 1]
+    else:
+        lo, hi = chain.lower, chain.upper
+    run = run_fk_batch_analytic_pose if pose else run_fk_batch_analytic
+    return (lambda configs: run(chain, configs)), lo, hi
+
+
+def _physx_fk(scene, robot, ee_body_name, pose: bool = False):
+    """(fk, lo, hi): configs -> EE positions (or (N, 7) poses) via the PhysX scene.
+
+    fk accepts any number of configs; they go through the scene num_envs
+    at a time, with the last chunk padded.
+    """
+    num_envs = scene.num_envs
+    joint_limits = robot.data.soft_joint_pos_limits[0]
+    lo, hi = joint_limits[:, 0], joint_limits[:, 1]
+    ee_body_idx = robot.body_names.index(ee_body_name)
+    run = run_fk_batch_pose if pose else run_fk_batch
+
+    def fk(configs):
+        out = []
+        for chunk in configs.split(num_envs):
+            n = chunk.shape[0]
+            if n < num_envs:
+                chunk = torch.cat((chunk, chunk[-1:].expand(num_envs - n, -1)))
+            out.append(run(scene, robot, chunk, ee_body_idx)[:n])
+        return torch.cat(out)
+    return fk, lo, hi
+
+
+def _analytic_batches(robot, seed, ee_body_name, chain, batch_size, n_batches, pose):
+    fk, lo, hi = _analytic_fk(robot, ee_body_name, chain, pose)
+    rng = torch.Generator(device=lo.device).manual_seed(seed)
+    for _ in range(n_batches):
+        yield fk(sample_configs(lo, hi, batch_size, rng))
+
+
+def _physx_batches(scene, robot, seed, ee_body_name, n_batches, pose):
+    fk, lo, hi = _physx_fk(scene, robot, ee_body_name, pose)
+    rng = torch.Generator(device=robot.device).manual_seed(seed)
+    for _ in range(n_batches):
+        yield fk(sample_configs(lo, hi, scene.num_envs, rng))
+
+
+def _fk_batches(scene, robot, n_samples, seed, ee_body_name, backend, chain, batch_size,
+                pose=False):
+    """(generator of (batch, 3) EE positions, total samples it will yield).
+
+    With pose=True the batches are (batch, 7): position + quaternion. The
+    stream for a given seed does not depend on n_samples, so a shorter run
+    is always a prefix of a longer one.
+    """
+    if backend == "analytic":
+        n_batches = (n_samples + batch_size - 1) // batch_size
+        batches = _analytic_batches(robot, seed, ee_body_name, chain, batch_size, n_batches,
+                                    pose)
+        return batches, n_batches * batch_size
+    if backend == "physx":
+        n_batches = (n_samples + scene.num_envs - 1) // scene.num_envs
+        batches = _physx_batches(scene, robot, seed, ee_body_name, n_batches, pose)
+        return batches, n_batches * scene.num_envs
+    raise ValueError(f"Unknown FK backend {backend!r}; expected 'physx' or 'analytic'")
+
+
+def _accumulating(batches, voxels: VoxelAccumulator):
+    """Pass batches through unchanged, binning each into `voxels`."""
+    for ee_pos_rel in batches:
+        voxels.update(ee_pos_rel)
+        yield ee_pos_rel
+
+
+def _pose_accumulating(batches, poses: PoseAccumulator):
+    """Bin each (batch, 7) pose batch into `poses`, pass on the positions."""
+    for ee_pose_rel in batches:
+        poses.update(ee_pose_rel[:, :3], ee_pose_rel[:, 3:])
+        yield ee_pose_rel[:, :3]
+
+
+def _adaptive_probe(scene, robot, n_samples, seed, ee_body_name, backend, chain,
+                    stream, voxel_size, orientation_bins):
+    from probes.adaptive_sampling import adaptive_bounds
+
+    if stream or voxel_size is not None or orientation_bins is not None:
+        raise ValueError("sampler='adaptive' does not support stream, voxel_size "
+                         "or orientation_bins")
+    if backend == "analytic":
+        fk, lo, hi = _analytic_fk(robot, ee_body_name, chain)
+    elif backend == "physx":
+        fk, lo, hi = _physx_fk(scene, robot, ee_body_name)
+    else:
+        raise ValueError(f"Unknown FK backend {backend!r}; expected 'physx' or 'analytic'")
+
+    rng = torch.Generator(device=lo.device).manual_seed(seed)
+    r = adaptive_bounds(fk, lo, hi, max_evals=n_samples,
+                        n_warmup=min(4096, n_samples), generator=rng)
+    return WorkspaceProbeResult(
+        bounds=r.bounds, point_cloud=r.warmup_points,
+        n_sampled=r.n_evals, n_valid=r.n_evals,
+        runtime_seconds=r.runtime_seconds,
+        ee_frame=ee_body_name,
+    )
+
+
 def workspace_probe(scene, robot, n_samples: int, seed: int = 0,
-                    ee_body_name: str = "panda_hand") -> WorkspaceProbeResult:
+                    ee_body_name: str = "panda_hand", backend: str = "physx",
+                    chain=None, batch_size: int = 65536, stream: bool = False,
+                    reservoir_size: int = 20000,
+                    cloud_path: str | None = None,
+                    voxel_size: float | None = None,
+                    orientation_bins: int | None = None,
+                    sampler: str = "uniform") -> WorkspaceProbeResult:
     """Probe the reachable workspace of `robot` in `scene` via random-config FK.
     
     Args:
         scene: an Isaac Lab InteractiveScene with `num_envs` parallel envs.
-        robot: the Articulation handle inside the scene.
+            Unused (may be None) with backend="analytic".
+        robot: the Articulation handle inside the scene. With
+            backend="analytic" it only supplies joint limits and device, and
+            may be None (the chain's URDF limits are used, on CPU).
         n_samples: total number of joint configs to sample. Padded up to a
-            multiple of `scene.num_envs` if not already.
+            multiple of the batch size (`scene.num_envs` for PhysX).
         seed: RNG seed for reproducibility.
         ee_body_name: name of the end-effector body to read position from.
+        backend: "physx" (write joints to the sim, read body poses) or
+            "analytic" (batched torch FK from kinematics/).
+        chain: SerialChain for backend="analytic". Default: the Franka chain.
+        batch_size: configs per FK batch for backend="analytic".
+        stream: keep running min/max + a reservoir instead of every point.
+            `point_cloud` is then a uniform subsample of `reservoir_size`
+            points; `bounds` are still exact.
+        reservoir_size: points kept for plotting / target sampling when streaming.
+        cloud_path: when streaming, also write the full cloud to this .npy
+            memmap (read back with np.load(path, mmap_mode="r")).
+        voxel_size: if set, also accumulate every FK sample (streaming or
+            not) into a ReachabilityMap with this voxel edge length (m).
+        orientation_bins: if set (needs voxel_size), also read the EE
+            orientation of every FK sample and build a PoseReachabilityMap
+            with 4 * orientation_bins^3 SO(3) cells per voxel.
+        sampler: "uniform" (i.i.d. in joint space) or "adaptive" (uniform
+            warm-up, then per-face local search, probes/adaptive_sampling.py).
+            With "adaptive", n_samples is the FK budget, `bounds` converge
+            far faster, and `point_cloud` is only the uniform warm-up
+            sample; stream / voxel_size are not supported (the search
+            samples are biased toward the faces).
     
     Returns:
         WorkspaceProbeResult.
     """
     start = time.time()
-    device = robot.device
-    num_envs = scene.num_envs
-    
-    n_batches = (n_samples + num_envs - 1) // num_envs
-    n_actual = n_batches * num_envs
-    
-    joint_limits = robot.data.soft_joint_pos_limits[0]
-    lo, hi = joint_limits[:, 0], joint_limits[:, 1]
-    
-    ee_body_idx = robot.body_names.index(ee_body_name)
-    
-    rng = torch.Generator(device=device).manual_seed(seed)
-    all_ee_positions = []
-    
-    for batch_idx in range(n_batches):
-        configs = sample_configs(lo, hi, num_envs, rng)
-        
-        ee_pos_rel = run_fk_batch(scene, robot, configs, ee_body_idx)
-        
-        all_ee_positions.append(ee_pos_rel.cpu().numpy())
-    
-    point_cloud = np.concatenate(all_ee_positions, axis=0)
-    bounds = fit_aabb(point_cloud)
-    
+    if sampler == "adaptive":
+        return _adaptive_probe(scene, robot, n_samples, seed, ee_body_name, backend,
+                               chain, stream, voxel_size, orientation_bins)
+    if sampler != "uniform":
+        raise ValueError(f"Unknown sampler {sampler!r}; expected 'uniform' or 'adaptive'")
+    if orientation_bins is not None and voxel_size is None:
+        raise ValueError("orientation_bins needs voxel_size")
+    batches, n_actual = _fk_batches(scene, robot, n_samples, seed, ee_body_name,
+                                    backend, chain, batch_size,
+                                    pose=orientation_bins is not None)
+
+    poses = None
+    if orientation_bins is not None:
+        poses = PoseAccumulator(voxel_size, orientation_bins)
+        batches = _pose_accumulating(batches, poses)
+
+    voxels = VoxelAccumulator(voxel_size) if voxel_size is not None else None
+    if voxels is not None:
+        batches = _accumulating(batches, voxels)
+
+    if not stream:
+        point_cloud = np.concatenate([b.cpu().numpy() for b in batches], axis=0)
+        bounds = fit_aabb(point_cloud)
+        cloud_path = None
+    else:
+        aabb = reservoir = None
+        cloud = MemmapCloud(cloud_path, n_actual) if cloud_path else None
+        for ee_pos_rel in batches:
+            if aabb is None:
+                aabb = RunningAABB(device=ee_pos_rel.device, dtype=ee_pos_rel.dtype)
+                reservoir = Reservoir(reservoir_size, seed=seed, device=ee_pos_rel.device,
+                                      dtype=ee_pos_rel.dtype)
+            aabb.update(ee_pos_rel)
+            reservoir.update(ee_pos_rel)
+            if cloud is not None:
+                cloud.append(ee_pos_rel)
+        if cloud is not None:
+            cloud.close()
+        bounds = aabb.bounds()
+        point_cloud = reservoir.sample()
+
     return WorkspaceProbeResult(
         bounds=bounds, point_cloud=point_cloud,
         n_sampled=n_actual, n_valid=n_actual,
         runtime_seconds=time.time() - start,
         ee_frame=ee_body_name,
-    )
\ No newline at end of file
+        cloud_path=cloud_path,
+        reachability=voxels.to_map() if voxels is not None else None,
+        pose_reachability=poses.to_map() if poses is not None else None,
+    )
+
+
+@dataclass
+class ConvergenceCheckpoint:
+    n: int                  # samples seen when this was recorded
+    bounds: dict            # AABB of the first n samples
+    volume: float           # m^3
+    volume_rel_change: float   # |dV| / V vs the previous checkpoint (inf for the first)
+    max_face_shift: float      # largest |d face| (m) vs the previous checkpoint
+    elapsed_seconds: float
+
+
+@dataclass
+class IncrementalProbeResult:
+    checkpoints: list       # list[ConvergenceCheckpoint], in increasing n
+    bounds: dict            # bounds at the last checkpoint
+    n_sampled: int          # samples consumed (== last checkpoint's n)
+    converged: bool         # True if the stopping rule fired
+    runtime_seconds: float
+    ee_frame: str
+
+
+def bbox_volume(bounds: dict) -> float:
+    return float(np.prod([hi - lo for lo, hi in bounds.values()]))
+
+
+def doubling_checkpoints(first: int, max_samples: int) -> list:
+    """first, 2*first, 4*first, ... up to and including max_samples."""
+    out, n = [], first
+    while n < max_samples:
+        out.append(n)
+        n *= 2
+    return out + [max_samples]
+
+
+def workspace_probe_incremental(scene, robot, checkpoints=None, seed: int = 0,
+                                ee_body_name: str = "panda_hand",
+                                backend: str = "physx", chain=None,
+                                batch_size: int = 65536,
+                                max_samples: int | None = None,
+                                volume_rtol: float | None = None,
+                                face_tol_m: float | None = None,
+                                patience: int = 2) -> IncrementalProbeResult:
+    """One sample stream, AABB recorded at each checkpoint N along the way.
+
+    The bounds recorded at each N in `checkpoints` are those of exactly the
+    first N samples of the seed's stream, at the cost of a single run to
+    max(checkpoints). workspace_probe(n_samples=N, seed=seed) rounds N up to
+    whole batches, so it matches only when N is a multiple of the batch size.
+
+    Stopping rule: if `volume_rtol` and/or `face_tol_m` is given, sampling
+    ends once `patience` consecutive checkpoints each changed the volume by
+    at most volume_rtol (relative) and moved no face by more than
+    face_tol_m (m), whichever criteria are set.
+
+    Args:
+        scene, robot, seed, ee_body_name, backend, chain, batch_size: as for
+            workspace_probe.
+        checkpoints: increasing sample counts to record at. Default:
+            doubling from one batch up to max_samples.
+        max_samples: sampling budget. Default: max(checkpoints).
+        volume_rtol: relative volume-change tolerance of the stopping rule.
+        face_tol_m: per-face movement tolerance of the stopping rule.
+        patience: consecutive stable checkpoints required to stop.
+
+    Returns:
+        IncrementalProbeResult.
+    """
+    start = time.time()
+    if checkpoints is None:
+        if max_samples is None:
+            raise ValueError("Give checkpoints and/or max_samples")
+        first = batch_size if backend == "analytic" else scene.num_envs
+        checkpoints = doubling_checkpoints(first, max_samples)
+    checkpoints = sorted(int(n) for n in checkpoints)
+    if max_samples is None:
+        max_samples = checkpoints[-1]
+    checkpoints = [n for n in checkpoints if n <= max_samples]
+    auto_stop = volume_rtol is not None or face_tol_m is not None
+
+    batches, _ = _fk_batches(scene, robot, max_samples, seed, ee_body_name,
+                             backend, chain, batch_size)
+    aabb = None
+    seen = 0
+    stable = 0
+    records = []
+    pending = list(checkpoints)
+    converged = False
+    for ee_pos_rel in batches:
+        if aabb is None:
+            aabb = RunningAABB(device=ee_pos_rel.device, dtype=ee_pos_rel.dtype)
+        offset = 0
+        # A batch can straddle one or more checkpoints: split it at each.
+        while pending and pending[0] - seen <= ee_pos_rel.shape[0] - offset:
+            take = pending.pop(0) - seen
+            if take > 0:
+                aabb.update(ee_pos_rel[offset:offset + take])
+                offset += take
+                seen += take
+            bounds = aabb.bounds()
+            volume = bbox_volume(bounds)
+            if records:
+                prev = records[-1]
+                rel = abs(volume - prev.volume) / max(prev.volume, 1e-12)
+                shift = max(abs(b - a) for axis in bounds
+                            for a, b in zip(prev.bounds[axis], bounds[axis]))
+            else:
+                rel = shift = float("inf")
+            records.append(ConvergenceCheckpoint(
+                n=seen, bounds=bounds, volume=volume, volume_rel_change=rel,
+                max_face_shift=shift, elapsed_seconds=time.time() - start,
+            ))
+            if auto_stop:
+                ok = ((volume_rtol is None or rel <= volume_rtol)
+                      and (face_tol_m is None or shift <= face_tol_m))
+                stable = stable + 1 if ok else 0
+                if stable >= patience:
+                    converged = True
+                    pending = []
+        if not pending:
+            break
+        if offset < ee_pos_rel.shape[0]:
+            aabb.update(ee_pos_rel[offset:])
+            seen += ee_pos_rel.shape[0] - offset
+
+    return IncrementalProbeResult(
+        checkpoints=records,
+        bounds=records[-1].bounds if records else aabb.bounds(),
+        n_sampled=seen,
+        converged=converged,
+        runtime_seconds=time.time() - start,
+        ee_frame=ee_body_name,
+    )
@@ -0,0 +1,79 @@
+"""Benchmark: FK evaluations to reach the workspace bounds, uniform vs adaptive.
+
+Analytic FK only (no Isaac Lab needed). The reference box is the outermost
+face found by any run; each sampler is scored by the FK evaluations it
+needs until every face is within --tol of the reference.
+
+Usage:
+    python scripts/bench_adaptive_sampling.py
+    python scripts/bench_adaptive_sampling.py --tol 0.001 --max_uniform 50000000 --device cuda
+"""
+import argparse
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinematics.robots import get_chain  # noqa: E402
+from probes.adaptive_sampling import adaptive_bounds  # noqa: E402
+from probes.workspace_probe import doubling_checkpoints, workspace_probe_incremental  # noqa: E402
+
+
+def _face_error(bounds: dict, ref: dict) -> float:
+    return max(abs(b - r) for axis in ref for b, r in zip(bounds[axis], ref[axis]))
+
+
+def _outermost(all_bounds) -> dict:
+    return {axis: [min(b[axis][0] for b in all_bounds), max(b[axis][1] for b in all_bounds)]
+            for axis in "xyz"}
+
+
+def _evals_to_tol(history, ref, tol):
+    """First n whose bounds are within tol of ref, or None."""
+    for n, bounds in history:
+        if _face_error(bounds, ref) <= tol:
+            return n
+    return None
+
+
+def main(args):
+    chain = get_chain("franka", device=args.device)
+    adaptive, uniform = [], []
+    for seed in range(args.n_seeds):
+        g = torch.Generator(device=args.device).manual_seed(seed)
+        adaptive.append(adaptive_bounds(chain.ee_position, chain.lower, chain.upper,
+                                        max_evals=args.max_adaptive, generator=g))
+        inc = workspace_probe_incremental(
+            None, None, seed=seed, backend="analytic", chain=chain,
+            batch_size=args.batch_size,
+            checkpoints=doubling_checkpoints(4096, args.max_uniform),
+        )
+        uniform.append(inc)
+
+    ref = _outermost([r.bounds for r in adaptive] + [r.bounds for r in uniform])
+    print(f"Reference bounds: { {k: [round(v, 4) for v in b] for k, b in ref.items()} }")
+    print(f"Tolerance: {args.tol * 1000:.2f} mm per face\n")
+    print(f"{'seed':>4} {'uniform evals':>15} {'adaptive evals':>15} {'ratio':>8}")
+    for seed, (a, u) in enumerate(zip(adaptive, uniform)):
+        n_a = _evals_to_tol(a.history, ref, args.tol)
+        n_u = _evals_to_tol([(c.n, c.bounds) for c in u.checkpoints], ref, args.tol)
+        ratio = f"{n_u / n_a:.0f}x" if n_a and n_u else "-"
+        print(f"{seed:>4} {n_u if n_u else f'>{args.max_uniform}':>15} "
+              f"{n_a if n_a else f'>{a.n_evals}':>15} {ratio:>8}")
+        print(f"     final face error: uniform {_face_error(u.bounds, ref) * 1000:.2f} mm "
+              f"({u.runtime_seconds:.1f}s), adaptive {_face_error(a.bounds, ref) * 1000:.2f} mm "
+              f"({a.runtime_seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_seeds", type=int, default=3)
+    parser.add_argument("--tol", type=float, default=0.002,
+                        help="Per-face distance (m) to the reference that counts as reached.")
+    parser.add_argument("--max_uniform", type=int, default=16_777_216)
+    parser.add_argument("--max_adaptive", type=int, default=200_000)
+    parser.add_argument("--batch_size", type=int, default=262_144)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+"""Benchmark: success-threshold IK loop body, per-step host syncs vs sync-free.
+
+No Isaac Lab needed. Synthetic tensors stand in for the PhysX buffers
+(Jacobians, joint positions, body poses), and the DLS update is the
+position-only damped least squares that DifferentialIKController runs, so
+this measures everything in a loop step except the physics substeps:
+
+    before: fancy-indexed Jacobian / joint_pos gathers, list joint_ids,
+            per-step prev_ee_w.clone(), DEBUG medians formatted into strings
+            every 25 steps (a device -> host sync each time)
+    after:  probes/success_threshold_probe.py's loop: slice views, copy_
+            into preallocated buffers, DEBUG trace into a device buffer read
+            back once per batch
+
+Usage:
+    python scripts/bench_ik_loop_overhead.py
+    python scripts/bench_ik_loop_overhead.py --device cuda --num_envs 16 64 256 1024
+"""
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probes.success_threshold_probe import (  # noqa: E402
+    DEBUG_EVERY, _DEBUG_COLS, _arm_selector, _record_debug,
+)
+
+N_BODIES, N_JOINTS, EE_IDX = 11, 9, 8
+ARM_IDS = list(range(7))
+
+
+def _dls(jacobian, pos_err, lam=0.01):
+    j = jacobian[:, 0:3]
+    jt = j.transpose(1, 2)
+    eye = torch.eye(3, device=j.device, dtype=j.dtype)
+    return (jt @ torch.linalg.inv(j @ jt + lam ** 2 * eye) @ pos_err[..., None]).squeeze(-1)
+
+
+def _state(num_envs, device):
+    g = torch.Generator(device=device).manual_seed(0)
+    rand = lambda *shape: torch.rand(shape, generator=g, device=device)
+    return {
+        "jacobians": rand(num_envs, N_BODIES - 1, 6, N_JOINTS),
+        "joint_pos": rand(num_envs, N_JOINTS),
+        "target": torch.zeros(num_envs, N_JOINTS, device=device),
+        "body_pos": rand(num_envs, N_BODIES, 3),
+        "root_pos": torch.zeros(num_envs, 3, device=device),
+        "p_t": rand(num_envs, 3),
+    }
+
+
+def run_before(st, n_steps):
+    arm_ids_t = torch.as_tensor(ARM_IDS, device=st["p_t"].device)
+    prev = st["body_pos"][:, EE_IDX].clone()
+    for step in range(n_steps):
+        ee = st["body_pos"][:, EE_IDX] - st["root_pos"]
+        jacobian = st["jacobians"][:, EE_IDX - 1, :, arm_ids_t]
+        joint_pos = st["joint_pos"][:, arm_ids_t]
+        q_des = joint_pos + _dls(jacobian, st["p_t"] - ee)
+        st["target"][:, ARM_IDS] = q_des
+        if step % DEBUG_EVERY == 0:
+            med_err = torch.linalg.norm(ee - st["p_t"], dim=-1).median()
+            des_gap = torch.linalg.norm(q_des - st["joint_pos"][:, arm_ids_t], dim=-1).median()
+            _ = f"step {step:4d}  med_err={med_err*1000:7.1f}mm  des_gap={des_gap:.4f}"
+        cur = st["body_pos"][:, EE_IDX]
+        _disp = torch.linalg.norm(cur - prev, dim=-1)
+        prev = cur.clone()
+
+
+def run_after(st, n_steps):
+    device = st["p_t"].device
+    arm_sel = _arm_selector(ARM_IDS, device)
+    prev = torch.empty(st["p_t"].shape[0], 3, device=device)
+    prev.copy_(st["body_pos"][:, EE_IDX])
+    disp = torch.empty(st["p_t"].shape[0], device=device)
+    buf = torch.full((-(-n_steps // DEBUG_EVERY), len(_DEBUG_COLS)), float("nan"), device=device)
+    for step in range(n_steps):
+        ee_pos_b = st["body_pos"][:, EE_IDX] - st["root_pos"]
+        jacobian = st["jacobians"][:, EE_IDX - 1, :, arm_sel]
+        joint_pos = st["joint_pos"][:, arm_sel]
+        q_des = joint_pos + _dls(jacobian, st["p_t"] - ee_pos_b)
+        st["target"][:, arm_sel] = q_des
+        cur = st["body_pos"][:, EE_IDX]
+        if step % DEBUG_EVERY == 0:
+            _record_debug(buf, step // DEBUG_EVERY, cur - st["root_pos"], st["p_t"],
+                          ee_pos_b, q_des, st["joint_pos"][:, arm_sel], None)
+        torch.linalg.vector_norm(cur - prev, dim=-1, out=disp)
+        prev.copy_(cur)
+    buf.tolist()
+
+
+def _steps_per_sec(fn, st, n_steps, repeats, device):
+    fn(st, DEBUG_EVERY)                             # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        t0 = time.perf_counter()
+        fn(st, n_steps)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        best = min(best, time.perf_counter() - t0)
+    return n_steps / best
+
+
+def main(args):
+    print(f"device={args.device}  n_steps={args.n_steps}  (best of {args.repeats})\n")
+    print(f"{'num_envs':>8} {'before steps/s':>15} {'after steps/s':>15} {'speedup':>8}")
+    for n in args.num_envs:
+        st = _state(n, args.device)
+        before = _steps_per_sec(run_before, st, args.n_steps, args.repeats, args.device)
+        after = _steps_per_sec(run_after, st, args.n_steps, args.repeats, args.device)
+        print(f"{n:>8} {before:>15.0f} {after:>15.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[16, 64, 256, 1024])
+    parser.add_argument("--n_steps", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    main(parser.parse_args())
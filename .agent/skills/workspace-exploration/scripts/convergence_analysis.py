@@ -1,12 +1,17 @@
 """One-off experiment: sweep N to find the right value for workspace_probe.
 
-Run once per robot. Outputs three figures:
+Run once per robot. Each seed is one incremental probe run: a single sample
+stream with the bbox recorded at every N in the sweep, so the cost is
+max(N) per seed rather than sum(N).
+
+Outputs three figures:
   - convergence_curve.png     : bbox volume vs N (the headline metric)
   - convergence_per_axis.png  : x_min, x_max, y_min, y_max, z_min, z_max vs N
   - convergence_extents.png   : bbox width, depth, height vs N
 
 Usage:
     python scripts/convergence_analysis.py
+    python scripts/convergence_analysis.py --auto_stop --volume_rtol 0.005 --face_tol 0.002
 """
 import argparse
 import os
@@ -18,6 +23,15 @@ from isaaclab.app import AppLauncher
 parser = argparse.ArgumentParser()
 parser.add_argument("--num_envs", type=int, default=1000)
 parser.add_argument("--n_seeds", type=int, default=3)
+parser.add_argument("--auto_stop", action="store_true",
+                    help="Instead of the fixed sweep, sample each seed (doubling "
+                         "checkpoints) until the bbox stabilizes; report where.")
+parser.add_argument("--max_samples", type=int, default=1_000_000,
+                    help="Per-seed budget for --auto_stop.")
+parser.add_argument("--volume_rtol", type=float, default=0.005,
+                    help="--auto_stop: max relative volume change per checkpoint.")
+parser.add_argument("--face_tol", type=float, default=0.002,
+                    help="--auto_stop: max per-face movement (m) per checkpoint.")
 AppLauncher.add_app_launcher_args(parser)
 args_cli = parser.parse_args()
 args_cli.headless = True
@@ -33,7 +47,7 @@ from isaaclab.sim import SimulationContext, SimulationCfg  # noqa: E402
 from isaaclab.utils import configclass  # noqa: E402
 from isaaclab_assets import FRANKA_PANDA_CFG  # noqa: E402
 
-from probes.workspace_probe import workspace_probe  # noqa: E402
+from probes.workspace_probe import workspace_probe_incremental  # noqa: E402
 
 
 @configclass
@@ -153,17 +167,29 @@ def main():
     print(f"Sweeping N values: {N_values}")
     print(f"Seeds per N: {args_cli.n_seeds}\n")
 
+    if args_cli.auto_stop:
+        for seed in range(args_cli.n_seeds):
+            r = workspace_probe_incremental(
+                scene, robot, seed=seed, max_samples=args_cli.max_samples,
+                volume_rtol=args_cli.volume_rtol, face_tol_m=args_cli.face_tol,
+            )
+            status = "converged" if r.converged else "budget exhausted"
+            print(f"  seed={seed}: {status} at N={r.n_sampled}, "
+                  f"vol={bbox_volume(r.bounds):.4f} m³, runtime={r.runtime_seconds:.2f}s")
+        return
+
     # results[N] is a list of bounds dicts, one per seed.
     results = {N: [] for N in N_values}
 
-    for N in N_values:
-        for seed in range(args_cli.n_seeds):
-            r = workspace_probe(scene, robot, n_samples=N, seed=seed)
-            results[N].append(r.bounds)
-            vol = bbox_volume(r.bounds)
-            print(f"  N={N:>6}, seed={seed}: vol={vol:.4f} m³, "
-                  f"x={r.bounds['x']}, y={r.bounds['y']}, z={r.bounds['z']}, "
-                  f"runtime={r.runtime_seconds:.2f}s")
+    for seed in range(args_cli.n_seeds):
+        r = workspace_probe_incremental(scene, robot, checkpoints=N_values, seed=seed)
+        for c in r.checkpoints:
+            results[c.n].append(c.bounds)
+            print(f"  N={c.n:>6}, seed={seed}: vol={c.volume:.4f} m³, "
+                  f"x={c.bounds['x']}, y={c.bounds['y']}, z={c.bounds['z']}, "
+                  f"elapsed={c.elapsed_seconds:.2f}s")
+    print(f"FK evaluations: {max(N_values) * args_cli.n_seeds} "
+          f"(independent runs would need {sum(N_values) * args_cli.n_seeds})")
 
     out_dir = "outputs/diagnostics"
     os.makedirs(out_dir, exist_ok=True)
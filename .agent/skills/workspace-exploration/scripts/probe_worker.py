@@ -0,0 +1,62 @@
+"""Worker-process entry point for helpers/probe_dag.py.
+
+Runs one simulator-free probe and pickles its result to --out. Never imports
+Isaac Lab, so it starts in about a second and runs next to the process that
+owns the simulator.
+
+Usage (normally invoked by ProbeDAG):
+    python scripts/probe_worker.py workspace --params '{"n_samples": 10000}' --out ws.pkl
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def workspace(params: dict, inputs: dict):
+    """Analytical-FK workspace probe. params: robot, n_samples, seed,
+    ee_body_name, voxel_size, orientation_bins, batch_size, and optionally joint_lower /
+    joint_upper (chain order) to sample the sim's soft limits."""
+    from kinematics.robots import get_chain
+    from probes.workspace_probe import workspace_probe
+
+    chain = get_chain(params.get("robot", "franka"))
+    if params.get("joint_lower") is not None:
+        chain = chain.with_limits(params["joint_lower"], params["joint_upper"])
+    return workspace_probe(
+        None, None, n_samples=params["n_samples"], seed=params.get("seed", 0),
+        ee_body_name=params.get("ee_body_name", chain.ee_name), backend="analytic",
+        chain=chain, batch_size=params.get("batch_size", 65536),
+        voxel_size=params.get("voxel_size"), orientation_bins=params.get("orientation_bins"),
+    )
+
+
+WORKERS = {"workspace": workspace}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("worker", choices=sorted(WORKERS))
+    parser.add_argument("--params", type=str, default="{}", help="JSON object.")
+    parser.add_argument("--input", action="append", default=[],
+                        help="dep=path of a pickled dependency result (repeatable).")
+    parser.add_argument("--out", type=str, required=True)
+    args = parser.parse_args(argv)
+
+    inputs = {}
+    for spec in args.input:
+        name, path = spec.split("=", 1)
+        with open(path, "rb") as f:
+            inputs[name] = pickle.load(f)
+    result = WORKERS[args.worker](json.loads(args.params), inputs)
+    tmp = args.out + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f)
+    os.replace(tmp, args.out)        # the DAG never sees a half-written result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Probe every registered robot in one warm simulator session.
+
+For each robot in parser.task_parser.ROBOT_REGISTRY (or --robots), back to
+back in the same Isaac Sim app:
+
+    gravity off:  workspace probe -> joint-limits probe
+    gravity on:   success-threshold probe (targets from the workspace map)
+
+and write outputs/robots/<robot>/discovered_config.json plus that robot's
+diagnostics. App start-up (the bulk of a short probe run) is paid once;
+between phases only the stage, SimulationContext and scene are rebuilt.
+Robots run sequentially rather than as env groups of one InteractiveScene:
+the scene replicates a single env template, and the probes need different
+gravity per phase anyway.
+
+Usage:
+    python scripts/run_multi_robot.py
+    python scripts/run_multi_robot.py --robots franka ur10 --num_envs 512 --n_samples 10000
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import MISSING
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--robots", type=str, nargs="+", default=None,
+                    help="Registry robots to probe. Default: all of ROBOT_REGISTRY.")
+parser.add_argument("--num_envs", type=int, default=1000)
+parser.add_argument("--n_samples", type=int, default=2000)
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--labeler", type=str, default="physx",
+                    choices=["physx", "capsule", "capsule+physx"],
+                    help="Joint-limits labeler; capsule models fall back to PhysX for "
+                         "robots without one.")
+parser.add_argument("--safe_set_dtype", type=str, default="float32",
+                    choices=["float32", "float16", "uint16"])
+parser.add_argument("--voxel_size", type=float, default=0.0,
+                    help="If > 0, also build a voxel reachability map with this edge (m). "
+                         "Needs ~1M+ --n_samples at 0.02 to cover the workspace; "
+                         "a sparse map is reported and ignored downstream.")
+parser.add_argument("--n_targets", type=int, default=500,
+                    help="Success-threshold targets per robot.")
+parser.add_argument("--st_n_steps", type=int, default=200)
+parser.add_argument("--st_statistic", type=str, default="p90")
+parser.add_argument("--skip-success-threshold", action="store_true",
+                    help="Only run the gravity-off probes.")
+
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+args_cli.headless = True
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import isaaclab_assets
+from isaaclab.assets import ArticulationCfg
+from isaaclab.scene import InteractiveScene, InteractiveSceneCfg
+from isaaclab.sensors import ContactSensorCfg
+from isaaclab.sim import SimulationContext, SimulationCfg
+from isaaclab.sim.schemas import ArticulationRootPropertiesCfg
+from isaaclab.sim.utils import create_new_stage
+from isaaclab.utils import configclass
+
+from parser.task_parser import ROBOT_REGISTRY
+from probes.workspace_probe import workspace_probe
+from probes.joint_limits_probe import joint_limits_probe, make_labeler
+from probes.success_threshold_probe import success_threshold_probe
+from probes.reachability import MIN_COVERAGE
+from probes.safe_set import SafeSet
+from kinematics.robots import get_chain
+from helpers.io import save_json, save_scatter_plot, SKILL_ROOT
+
+_SKILLS_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, _SKILLS_DIR)
+from common.schemas import (
+    DiscoveredConfig, RobotConfig, ProbeResults,
+    WorkspaceProbeResult, JointLimitsProbeResult, SuccessThresholdProbeResult,
+)
+
+GRAVITY_Z = -9.81
+
+
+def _make_robot_cfg(robot_name: str) -> ArticulationCfg:
+    cfg = getattr(isaaclab_assets, ROBOT_REGISTRY[robot_name]["asset_cfg"])
+    cfg = cfg.replace(prim_path="{ENV_REGEX_NS}/Robot")
+    if cfg.spawn.articulation_props is None:
+        cfg.spawn.articulation_props = ArticulationRootPropertiesCfg()
+    cfg.spawn.articulation_props.enabled_self_collisions = True
+    cfg.spawn.activate_contact_sensors = True   # required for ContactSensor to report
+    return cfg
+
+
+@configclass
+class ProbeSceneCfg(InteractiveSceneCfg):
+    robot: ArticulationCfg = MISSING
+    contact_forces = ContactSensorCfg(
+        prim_path="{ENV_REGEX_NS}/Robot/.*",
+        history_length=0,
+        track_air_time=False,
+    )
+
+
+def open_scene(robot_name: str, num_envs: int, gravity_z: float):
+    """Fresh stage + SimulationContext + scene with `num_envs` copies of the robot."""
+    create_new_stage()
+    sim = SimulationContext(SimulationCfg(device="cuda:0", gravity=(0.0, 0.0, gravity_z)))
+    scene = InteractiveScene(ProbeSceneCfg(num_envs=num_envs, env_spacing=2.0,
+                                           robot=_make_robot_cfg(robot_name)))
+    sim.reset()
+    return sim, scene, scene["robot"]
+
+
+def close_scene(sim):
+    """Release the SimulationContext singleton so the next scene can be built."""
+    sim.stop()
+    sim.clear_all_callbacks()
+    sim.clear_instance()
+
+
+def _chain_or_none(robot_name: str, ee_body_name: str):
+    try:
+        chain = get_chain(robot_name)
+    except ValueError:
+        return None
+    return chain if chain.ee_name == ee_body_name else None
+
+
+_plots = []    # background scatter-plot renders, waited on before exit
+
+
+def probe_robot(robot_name: str):
+    info = ROBOT_REGISTRY[robot_name]
+    out_dir = os.path.join("outputs", "robots", robot_name)
+    diag_dir = os.path.join(out_dir, "diagnostics")
+    os.makedirs(os.path.join(SKILL_ROOT, diag_dir), exist_ok=True)
+
+    # --- gravity off: workspace + joint limits ---
+    sim, scene, robot = open_scene(robot_name, args_cli.num_envs, 0.0)
+    print(f"\n=== {robot_name}: {scene.num_envs} envs, {robot.num_joints} joints ===")
+    ws_result = workspace_probe(
+        scene=scene, robot=robot, n_samples=args_cli.n_samples, seed=args_cli.seed,
+        ee_body_name=info["ee_body_name"], voxel_size=args_cli.voxel_size or None,
+    )
+    kind = args_cli.labeler
+    try:
+        labeler = make_labeler(kind, sim, scene, robot, robot_name=robot_name)
+    except ValueError as e:
+        print(f"({e}; labeling with PhysX)")
+        kind = "physx"
+        labeler = make_labeler(kind, sim, scene, robot)
+    jl_result = joint_limits_probe(
+        sim=sim, scene=scene, robot=robot, n_samples=args_cli.n_samples,
+        seed=args_cli.seed, labeler=labeler,
+        label_batch_size=min(args_cli.n_samples, 65536) if kind != "physx" else None,
+    )
+    joint_names = list(robot.joint_names)
+    close_scene(sim)
+
+    safe_path = os.path.join(SKILL_ROOT, diag_dir, "safe_configs.safeset")
+    safe_set = SafeSet.from_probe_result(jl_result, dtype=args_cli.safe_set_dtype,
+                                         robot=robot_name, joint_names=joint_names)
+    safe_set.save(safe_path)
+    map_path = None
+    if ws_result.reachability is not None:
+        map_path = os.path.join(SKILL_ROOT, diag_dir, "reachability_map.npz")
+        ws_result.reachability.save(map_path)
+        coverage = ws_result.reachability.coverage()
+        sparse = f" (< {MIN_COVERAGE}, reach_task will ignore it)" if coverage < MIN_COVERAGE else ""
+        print(f"Reachability map coverage: {coverage:.3f}{sparse}")
+    _plots.append(save_scatter_plot(ws_result, os.path.join(diag_dir, "workspace_scatter.png"),
+                                    title_suffix=robot_name, background=True))
+    print(f"Workspace: x={ws_result.bounds['x']} y={ws_result.bounds['y']} "
+          f"z={ws_result.bounds['z']}")
+    print(f"Joint-limits: {len(safe_set)}/{safe_set.n_sampled} safe "
+          f"({safe_set.collision_rate:.1%} collide)")
+
+    # --- gravity on: success threshold ---
+    st = None
+    if not args_cli.skip_success_threshold:
+        sim, scene, robot = open_scene(robot_name, args_cli.num_envs, GRAVITY_Z)
+        st_result = success_threshold_probe(
+            sim=sim, scene=scene, robot=robot,
+            workspace_points=ws_result.point_cloud,
+            reachability=ws_result.reachability,
+            n_targets=args_cli.n_targets, seed=args_cli.seed,
+            ee_body_name=info["ee_body_name"], arm_joint_expr=info["arm_joint_expr"],
+            statistic=args_cli.st_statistic, n_steps=args_cli.st_n_steps,
+            keep_errors=False,
+            chain=_chain_or_none(robot_name, info["ee_body_name"]),
+        )
+        close_scene(sim)
+        st = SuccessThresholdProbeResult(
+            ee_frame=st_result.ee_frame,
+            threshold_m=st_result.threshold_m,
+            statistic=st_result.statistic,
+            position_error_percentiles_m=st_result.position_error_percentiles_m,
+            position_error_sketch=st_result.error_sketch,
+            n_targets=st_result.n_targets,
+            n_measured=st_result.n_measured,
+            convergence_rate=st_result.convergence_rate,
+            command_type=st_result.command_type,
+            n_steps=st_result.n_steps,
+            physics_dt=st_result.physics_dt,
+            gravity_z=st_result.gravity_z,
+            units=st_result.units,
+            seed=st_result.seed,
+        )
+        print(f"Success threshold ({st.statistic}): {st.threshold_m * 1000:.2f} mm")
+
+    discovered = DiscoveredConfig(
+        robot=RobotConfig(name=robot_name),
+        probes=ProbeResults(
+            workspace=WorkspaceProbeResult(
+                x=tuple(ws_result.bounds["x"]),
+                y=tuple(ws_result.bounds["y"]),
+                z=tuple(ws_result.bounds["z"]),
+                reachability_map_path=map_path,
+                voxel_size_m=args_cli.voxel_size or None,
+                reachability_coverage=(ws_result.reachability.coverage()
+                                       if ws_result.reachability is not None else None),
+            ),
+            joint_limits=JointLimitsProbeResult(
+                n_sampled=safe_set.n_sampled,
+                n_safe=len(safe_set),
+                collision_rate=safe_set.collision_rate,
+                seed=jl_result.seed,
+                joint_lower=jl_result.joint_lower.tolist(),
+                joint_upper=jl_result.joint_upper.tolist(),
+                safe_config_path=safe_path,
+            ),
+            success_threshold=st,
+        ),
+    )
+    save_json(discovered.model_dump(), os.path.join(out_dir, "discovered_config.json"))
+    return os.path.join(out_dir, "discovered_config.json")
+
+
+def main():
+    robots = args_cli.robots or list(ROBOT_REGISTRY)
+    unknown = [r for r in robots if r not in ROBOT_REGISTRY]
+    if unknown:
+        raise ValueError(f"Robots {unknown} are not in registry. "
+                         f"Supported: {list(ROBOT_REGISTRY.keys())}")
+    written = []
+    for robot_name in robots:
+        start = time.time()
+        written.append(probe_robot(robot_name))
+        print(f"{robot_name}: {time.time() - start:.1f}s")
+    failed = [p.args[3] for p in _plots if p.wait() != 0]
+    if failed:
+        print(f"[warn] scatter plots failed: {failed}")
+
+    print("\nOutputs written:")
+    for path in written:
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        simulation_app.close()
@@ -10,6 +10,7 @@ Usage:
     ./python scripts/run_probe.py --success-threshold --n_targets 1000 --st_n_steps 250
 """
 import argparse
+import json
 import os
 import sys
 import numpy as np
@@ -27,8 +28,40 @@ parser.add_argument("--n_validate", type=int, default=50,
                     help="Number of random configs for FK validation.")
 parser.add_argument("--validate-collision", action="store_true",
                     help="Run collision validation against CuRobo before probing.")
+parser.add_argument("--labeler", type=str, default="physx",
+                    choices=["physx", "capsule", "capsule+physx"],
+                    help="Joint-limits self-collision labeler: PhysX contacts, analytical "
+                         "capsules (CPU, no physics steps), or capsules with borderline "
+                         "configs re-checked in PhysX.")
+parser.add_argument("--label_band", type=float, default=0.01,
+                    help="capsule+physx: clearance band (m) around contact sent to PhysX.")
+parser.add_argument("--settle_steps", type=int, default=1,
+                    help="PhysX labeler: physics steps per config before contacts are read.")
+parser.add_argument("--early_exit", action="store_true",
+                    help="PhysX labeler: check contacts every step, finish a config at its "
+                         "first contact and refill its env with the next config at once.")
+parser.add_argument("--active_labeling", action="store_true",
+                    help="Joint-limits probe labels a seed set, fits a collision classifier "
+                         "and only labels configs it is unsure about.")
 parser.add_argument("--ee_body_name", type=str, default="panda_hand",
                     help="EE body ALL probes measure at.")
+parser.add_argument("--fk_backend", type=str, default="physx", choices=["physx", "analytic"],
+                    help="Workspace-probe FK: PhysX scene or analytical torch chain.")
+parser.add_argument("--sampler", type=str, default="uniform", choices=["uniform", "adaptive"],
+                    help="Workspace-probe joint sampling. 'adaptive' searches around the "
+                         "box faces; --n_samples is then its FK budget.")
+parser.add_argument("--stream", action="store_true",
+                    help="Constant-memory workspace probe: running AABB + reservoir sample.")
+parser.add_argument("--reservoir_size", type=int, default=20000,
+                    help="Points kept for plotting when --stream is set.")
+parser.add_argument("--cloud_path", type=str, default=None,
+                    help="With --stream, also write the full cloud to this .npy memmap.")
+parser.add_argument("--voxel_size", type=float, default=0.0,
+                    help="If > 0, also build a voxel reachability map with this edge (m); "
+                         "the success-threshold probe then samples targets from it.")
+parser.add_argument("--orientation_bins", type=int, default=0,
+                    help="If > 0 (with --voxel_size), also build a (voxel, SO(3) cell) pose "
+                         "reachability map with 4*m^3 orientation cells per voxel.")
 
 # --- success-threshold probe ---
 parser.add_argument("--success-threshold", action="store_true",
@@ -39,6 +72,17 @@ parser.add_argument("--n_targets", type=int, default=500,
                          "multiple of num_envs).")
 parser.add_argument("--st_n_steps", type=int, default=200,
                     help="Oracle rollout horizon for the success-threshold probe.")
+parser.add_argument("--st_early_exit", action="store_true",
+                    help="Success-threshold probe: measure each target once its EE settles "
+                         "and refill the env with the next target, instead of running "
+                         "every batch for --st_n_steps.")
+parser.add_argument("--st_no_keep_errors", action="store_true",
+                    help="Success-threshold probe: keep only the streaming percentile sketch, "
+                         "not the per-target errors (no errors .npy / histogram).")
+parser.add_argument("--st_prescreen_tol", type=float, default=None,
+                    help="Success-threshold probe: drop (and redraw) targets the analytical "
+                         "DLS cannot reach from home within this many meters, before the "
+                         "PhysX rollout.")
 parser.add_argument("--st_statistic", type=str, default="p90",
                     help="Percentile of the error distribution to use as threshold.")
 parser.add_argument("--gravity_z", type=float, default=None,
@@ -64,9 +108,13 @@ from isaaclab.utils import configclass
 from isaaclab_assets import FRANKA_PANDA_CFG
 
 from probes.workspace_probe import workspace_probe
-from probes.joint_limits_probe import joint_limits_probe
+from probes.joint_limits_probe import joint_limits_probe, make_labeler
+from probes.active_labeling import active_joint_limits_probe
 from probes.success_threshold_probe import success_threshold_probe
+from probes.reachability import MIN_COVERAGE, REACH_COMMAND_RANGES, euler_range_cells
+from probes.safe_set import SafeSet
 from helpers.io import save_scatter_plot
+from kinematics.robots import get_chain
 
 from isaaclab.sensors import ContactSensorCfg
 from isaaclab.sim.schemas import ArticulationRootPropertiesCfg
@@ -132,12 +180,20 @@ def main():
     # FK validation (optional; bails before probe runs if it fails)
     if args_cli.validate_fk:
         try:
-            from tests.test_workspace_integration import run_integration_test
+            from tests.test_workspace_integration import (
+                run_integration_test, run_analytic_fk_test,
+            )
             run_integration_test(
                 scene, robot,
                 n_configs=args_cli.n_validate,
                 seed=args_cli.seed,
             )
+            if args_cli.fk_backend == "analytic":
+                run_analytic_fk_test(
+                    scene, robot,
+                    n_configs=args_cli.n_validate,
+                    seed=args_cli.seed,
+                )
         except AssertionError as e:
             print(f"\n❌ FK Validation Failed! Continuing to next steps...\nError: {e}")
 
@@ -162,6 +218,13 @@ def main():
         n_samples=args_cli.n_samples,
         seed=args_cli.seed,
         ee_body_name=args_cli.ee_body_name, # "panda_hand"
+        backend=args_cli.fk_backend,
+        stream=args_cli.stream,
+        reservoir_size=args_cli.reservoir_size,
+        cloud_path=args_cli.cloud_path,
+        voxel_size=args_cli.voxel_size or None,
+        orientation_bins=args_cli.orientation_bins or None,
+        sampler=args_cli.sampler,
     )
 
     print(f"\n=== Workspace Probe Results ===")
@@ -172,26 +235,71 @@ def main():
     print(f"  y: [{ws_result.bounds['y'][0]:+.3f}, {ws_result.bounds['y'][1]:+.3f}]")
     print(f"  z: [{ws_result.bounds['z'][0]:+.3f}, {ws_result.bounds['z'][1]:+.3f}]")
 
-    # Save the scatter plot.
-    save_scatter_plot(ws_result, "outputs/diagnostics/workspace_scatter.png",
-                      title_suffix="Franka, run_probe.py")
-    print(f"\nScatter plot saved to outputs/diagnostics/workspace_scatter.png")
+    # Render the scatter plot in a separate process while the other probes run.
+    plot_proc = save_scatter_plot(ws_result, "outputs/diagnostics/workspace_scatter.png",
+                                  title_suffix="Franka, run_probe.py", background=True)
+
+    if ws_result.reachability is not None:
+        reach = ws_result.reachability
+        print(f"Reachable voxels: {reach.n_occupied} of {int(np.prod(reach.shape))} "
+              f"({reach.occupied_volume_m3:.3f} m^3 at {reach.voxel_size * 100:.1f} cm, "
+              f"coverage {reach.coverage():.3f})")
+        if reach.coverage() < MIN_COVERAGE:
+            print(f"[warn] coverage < {MIN_COVERAGE}: the map misses part of the reachable "
+                  f"set; raise --n_samples or --voxel_size")
+        reach.save("outputs/diagnostics/reachability_map.npz")
+        print("Reachability map saved to outputs/diagnostics/reachability_map.npz")
+    if ws_result.pose_reachability is not None:
+        pose = ws_result.pose_reachability
+        print(f"Reachable (voxel, orientation) cells: {pose.n_occupied} "
+              f"({pose.n_cells} orientation cells per voxel)")
+        reach_cells = euler_range_cells(*REACH_COMMAND_RANGES, pose.orientation_bins)
+        reach_pose = pose.for_command(reach_cells)
+        if reach_pose is not None:
+            print(f"  reach-command orientations: coverage {reach_pose.coverage(reach_cells):.3f} "
+                  f"on {reach_pose.voxel_size:.2f} m blocks")
+        else:
+            print(f"[warn] pose map coverage over the reach-command orientations < "
+                  f"{MIN_COVERAGE} on any block: raise --n_samples or lower --orientation_bins")
+        pose.save("outputs/diagnostics/pose_reachability_map.npz")
+        print("Pose reachability map saved to outputs/diagnostics/pose_reachability_map.npz")
 
     # --- Joint-limits probe ---
     # validated gravity-OFF; skip when gravity is on -> gravity off isolates
     # the variables joint limits probe is testing. 
     if abs(gravity_z) < 1e-6:
-        jl_result = joint_limits_probe(
+        labeler = make_labeler(args_cli.labeler, sim, scene, robot, band_m=args_cli.label_band,
+                               n_settle_steps=args_cli.settle_steps,
+                               early_exit=args_cli.early_exit)
+        probe_fn = active_joint_limits_probe if args_cli.active_labeling else joint_limits_probe
+        jl_result = probe_fn(
             sim=sim, scene=scene, robot=robot,
             n_samples=args_cli.n_samples, seed=args_cli.seed,
+            labeler=labeler,
+            label_batch_size=(min(args_cli.n_samples, 65536)
+                              if args_cli.labeler != "physx" or args_cli.early_exit else None),
         )
         print(f"\n=== Joint-Limits Probe Results ===")
+        print(f"Labeler:        {args_cli.labeler}")
+        if args_cli.labeler == "capsule+physx":
+            print(f"Sent to PhysX:  {labeler.n_escalated} / {labeler.n_labeled} "
+                  f"(|clearance| <= {args_cli.label_band * 1000:.0f} mm)")
+        physx = labeler if args_cli.labeler == "physx" else getattr(labeler, "fallback", None)
+        if physx is not None and physx.n_labeled:
+            print(f"PhysX steps:    {physx.n_steps} "
+                  f"({physx.n_steps * scene.num_envs / physx.n_labeled:.2f} env-steps/config)")
         print(f"N sampled:      {jl_result.n_sampled}")
+        if jl_result.n_label_calls is not None:
+            print(f"Labeled:        {jl_result.n_label_calls} "
+                  f"({jl_result.n_sampled - jl_result.n_label_calls} calls saved)")
+            print(f"Holdout acc:    {jl_result.classifier_holdout_accuracy:.1%}")
         print(f"N safe:         {jl_result.n_safe}")
         print(f"Collision rate: {jl_result.collision_rate:.1%}")
         print(f"Runtime:        {jl_result.runtime_seconds:.2f}s")
-        np.save("outputs/diagnostics/safe_configs.npy", jl_result.safe_configs)
-        print("Safe configs saved to outputs/diagnostics/safe_configs.npy")
+        SafeSet.from_probe_result(
+            jl_result, robot="franka", joint_names=list(robot.joint_names),
+        ).save("outputs/diagnostics/safe_configs.safeset")
+        print("Safe configs saved to outputs/diagnostics/safe_configs.safeset")
     else:
         print("\n(joint-limits probe skipped: gravity is on, which is not its "
               "validated condition. Run it in a separate gravity-off invocation.)")
@@ -201,11 +309,16 @@ def main():
         st_result = success_threshold_probe(
             sim=sim, scene=scene, robot=robot,
             workspace_points=ws_result.point_cloud,
+            reachability=ws_result.reachability,
             n_targets=args_cli.n_targets,
             seed=args_cli.seed,
             ee_body_name=args_cli.ee_body_name,
             statistic=args_cli.st_statistic,
             n_steps=args_cli.st_n_steps,
+            early_exit=args_cli.st_early_exit,
+            keep_errors=not args_cli.st_no_keep_errors,
+            chain=get_chain("franka") if args_cli.ee_body_name == "panda_hand" else None,
+            prescreen_tol_m=args_cli.st_prescreen_tol,
         )
         print(f"\n=== Success-Threshold Probe Results ===")
         print(f"Threshold ({st_result.statistic}): "
@@ -213,17 +326,34 @@ def main():
         print(f"Targets measured: {st_result.n_measured} / {st_result.n_targets}")
         print(f"Convergence rate: {st_result.convergence_rate:.1%} "
               f"(settled within n_steps={st_result.n_steps})")
+        if st_result.kinematic_lower_bound_m is not None:
+            print(f"Kinematic bound:  {st_result.kinematic_lower_bound_m * 1000:.2f} mm "
+                  f"(analytic DLS, {st_result.kinematic_convergence_rate:.1%} converged, "
+                  f"{st_result.n_prescreened_out} prescreened out)")
         print(f"EE frame:         {st_result.ee_frame}")
         print(f"Gravity z:        {st_result.gravity_z}")
         print(f"Position error percentiles (mm):")
         for k, v in st_result.position_error_percentiles_m.items():
             print(f"  {k:>4}: {v * 1000:7.2f}")
+        print(f"IK steps:         {st_result.n_ik_steps} "
+              f"(fixed budget: {st_result.n_targets // scene.num_envs * st_result.n_steps})")
+        if st_result.steps_to_settle is not None:
+            print(f"Steps to settle:  median {int(np.median(st_result.steps_to_settle))}, "
+                  f"max {int(st_result.steps_to_settle.max())}")
         print(f"Runtime:          {st_result.runtime_seconds:.2f}s")
  
-        np.save("outputs/diagnostics/success_threshold_errors.npy", st_result.errors_m)
-        _save_error_hist(st_result.errors_m,
-                         "outputs/diagnostics/success_threshold_hist.png",
-                         st_result.threshold_m, st_result.statistic)
+        with open("outputs/diagnostics/success_threshold_sketch.json", "w") as f:
+            json.dump(st_result.error_sketch, f)
+        if st_result.errors_m is not None:
+            np.save("outputs/diagnostics/success_threshold_errors.npy", st_result.errors_m)
+            _save_error_hist(st_result.errors_m,
+                             "outputs/diagnostics/success_threshold_hist.png",
+                             st_result.threshold_m, st_result.statistic)
+
+    if plot_proc.wait() == 0:
+        print(f"\nScatter plot saved to outputs/diagnostics/workspace_scatter.png")
+    else:
+        print(f"\n[warn] workspace scatter plot failed (exit {plot_proc.returncode})")
 
 
 if __name__ == "__main__":
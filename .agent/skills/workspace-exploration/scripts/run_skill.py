@@ -6,7 +6,6 @@ Usage:
 import argparse
 import os
 import sys
-import numpy as np
 
 from isaaclab.app import AppLauncher
 
@@ -19,6 +18,46 @@ parser.add_argument("--seed", type=int, default=42)
 parser.add_argument("--skip-validation", action="store_true",
                     help="Skip FK validation (CuRobo check). Default: validation runs.")
 parser.add_argument("--n_validate", type=int, default=50)
+parser.add_argument("--labeler", type=str, default="physx",
+                    choices=["physx", "capsule", "capsule+physx"],
+                    help="Joint-limits self-collision labeler: PhysX contacts, analytical "
+                         "capsules (CPU, no physics steps), or capsules with borderline "
+                         "configs re-checked in PhysX.")
+parser.add_argument("--label_band", type=float, default=0.01,
+                    help="capsule+physx: clearance band (m) around contact sent to PhysX.")
+parser.add_argument("--settle_steps", type=int, default=1,
+                    help="PhysX labeler: physics steps per config before contacts are read.")
+parser.add_argument("--early_exit", action="store_true",
+                    help="PhysX labeler: check contacts every step, finish a config at its "
+                         "first contact and refill its env with the next config at once.")
+parser.add_argument("--safe_set_dtype", type=str, default="float32",
+                    choices=["float32", "float16", "uint16"],
+                    help="Storage of the safe-set file; float16/uint16 halve it "
+                         "(uint16: codes over the joint limits, < 0.1 mrad error).")
+parser.add_argument("--grow-safe-set", action="store_true",
+                    help="Continue the existing safe set's Sobol sequence (same seed), "
+                         "label only the new points and merge them into it instead of "
+                         "replacing it.")
+parser.add_argument("--voxel_size", type=float, default=0.0,
+                    help="If > 0, also build a voxel reachability map with this edge (m). "
+                         "Needs ~1M+ --n_samples at 0.02 to cover the workspace; "
+                         "a sparse map is reported and ignored downstream.")
+parser.add_argument("--orientation_bins", type=int, default=0,
+                    help="If > 0 (needs --voxel_size > 0), also bin EE orientations into a "
+                         "(voxel, SO(3) cell) pose map with 4*m^3 cells per voxel. "
+                         "4 with --voxel_size 0.02 and 2M --n_samples is enough for "
+                         "reach_task to check target orientations.")
+parser.add_argument("--refresh", action="store_true",
+                    help="Ignore cached probe results (outputs/cache) and probe again; "
+                         "the new results replace the cache entries.")
+parser.add_argument("--fk_backend", type=str, default="physx", choices=["physx", "analytic"],
+                    help="Workspace-probe FK: PhysX scene or the robot's analytical torch "
+                         "chain (sampling the sim's soft joint limits).")
+parser.add_argument("--parallel", action="store_true",
+                    help="Run the workspace probe in a worker process, concurrently with "
+                         "FK validation and the joint-limits probe in the simulator. Only "
+                         "changes where the probe runs: needs --fk_backend analytic, since a "
+                         "PhysX probe has to run in the process that owns the simulator.")
 
 AppLauncher.add_app_launcher_args(parser)
 args_cli = parser.parse_args()
@@ -36,8 +75,23 @@ from isaaclab_assets import FRANKA_PANDA_CFG
 
 from parser.task_parser import parse_task_description
 from probes.workspace_probe import workspace_probe
-from probes.joint_limits_probe import joint_limits_probe
+from probes.joint_limits_probe import joint_limits_probe, make_labeler
+from probes.reachability import MIN_COVERAGE, REACH_COMMAND_RANGES, euler_range_cells
+from probes.safe_set import SafeSet
+from kinematics.robots import get_chain
 from helpers.io import save_json, save_scatter_plot
+from helpers.probe_dag import ProbeDAG
+from helpers.probe_cache import ProbeCache, asset_fingerprint, code_version
+from scripts.probe_worker import workspace as analytic_workspace_probe
+import kinematics.chain
+import kinematics.collision
+import kinematics.robots
+import probes.joint_limits_probe
+import probes.reachability
+import probes.safe_set
+import probes.sobol_stream
+import probes.streaming
+import probes.workspace_probe
 
 from isaaclab.sensors import ContactSensorCfg
 from isaaclab.sim.schemas import ArticulationRootPropertiesCfg
@@ -98,53 +152,94 @@ def setup_scene(robot_name: str, num_envs: int):
     return sim, scene, scene["robot"]
 
 
-def main(user_description: str, num_envs: int, n_samples: int, seed: int):
-    # === Stage 1: Parse ===
-    task_spec = parse_task_description(user_description)
-    save_json(task_spec, "outputs/task_spec.json")
-    print(f"Parsed: {task_spec.task_type} on {task_spec.robot_name}")
-    if task_spec.constraints:
-        print(f"Constraints: {task_spec.constraints}")
-
-    # === Stage 2: Spawn sim ===
-    sim, scene, robot = setup_scene(task_spec.robot_name, num_envs)
-    print(f"Spawned {scene.num_envs} parallel envs.")
-
-    # Validate FK before any probe runs. Catches silent kinematics regressions
-    # (URDF/Isaac Lab version drift) before they poison downstream stages.
-    if not args_cli.skip_validation:
-        from tests.test_workspace_integration import run_integration_test
-        run_integration_test(
-            scene, robot,
-            n_configs=args_cli.n_validate,
-            seed=args_cli.seed,
-        )
-
-    # === Stage 3: Run probes ===
-    if task_spec.task_type != "reach":
-        raise NotImplementedError(
-            f"Task type {task_spec.task_type!r} not supported in v1"
-        )
-
-    ws_result = workspace_probe(
-        scene=scene,
-        robot=robot,
-        n_samples=n_samples,
-        seed=seed,
-        ee_body_name=task_spec.ee_body_name,
-    )
+def run_joint_limits(sim, scene, robot, robot_name, n_samples, seed, safe_path):
+    """Joint-limits probe + safe-set file (replaced, or grown with --grow-safe-set).
+    Returns (jl_result, safe_set)."""
+    jl_seed, sobol_offset = seed, 0
+    if args_cli.grow_safe_set and os.path.exists(safe_path):
+        previous = SafeSet.load(safe_path)
+        if previous.sobol_next is None:
+            raise ValueError(f"{safe_path} has no Sobol range to continue; "
+                             f"rerun without --grow-safe-set to replace it")
+        jl_seed, sobol_offset = previous.seed, previous.sobol_next
+        print(f"Growing safe set: {len(previous)} configs from {previous.n_sampled} "
+              f"samples, continuing Sobol seed {jl_seed} at {sobol_offset}")
     jl_result = joint_limits_probe(
         sim=sim, scene=scene, robot=robot,
-        n_samples=n_samples, seed=seed,
+        n_samples=n_samples, seed=jl_seed,
+        labeler=make_labeler(args_cli.labeler, sim, scene, robot,
+                             robot_name=robot_name,
+                             band_m=args_cli.label_band,
+                             n_settle_steps=args_cli.settle_steps,
+                             early_exit=args_cli.early_exit),
+        label_batch_size=(min(args_cli.n_samples, 65536)
+                          if args_cli.labeler != "physx" or args_cli.early_exit else None),
+        sobol_offset=sobol_offset,
     )
+    new_set = SafeSet.from_probe_result(
+        jl_result, dtype=args_cli.safe_set_dtype, robot=robot_name,
+        joint_names=list(robot.joint_names),
+    )
+    if args_cli.grow_safe_set:
+        safe_set = new_set.append_to(safe_path)
+    else:
+        new_set.save(safe_path)
+        safe_set = new_set
+    print(f"Joint-limits: {len(safe_set)}/{safe_set.n_sampled} safe "
+          f"({safe_set.collision_rate:.1%} collide)")
+    return jl_result, safe_set
 
-    # Absolute path: reach_task.py loads this inside the Isaac Sim server
-    # process, which may not share this process's working directory.
-    os.makedirs("outputs/diagnostics", exist_ok=True)
-    safe_path = os.path.abspath("outputs/diagnostics/safe_configs.npy")
-    np.save(safe_path, jl_result.safe_configs)
-    print(f"Joint-limits: {jl_result.n_safe}/{jl_result.n_sampled} safe "
-          f"({jl_result.collision_rate:.1%} collide)")
+
+def analytic_workspace_params(task_spec, robot, n_samples, seed):
+    """probe_worker.py "workspace" params for --fk_backend analytic.
+
+    Raises:
+        ValueError: if the robot has no analytical chain ending at its EE body.
+    """
+    chain = get_chain(task_spec.robot_name)
+    if chain.ee_name != task_spec.ee_body_name:
+        raise ValueError(f"--fk_backend analytic: {task_spec.robot_name!r} chain ends at "
+                         f"{chain.ee_name!r}, not the EE body {task_spec.ee_body_name!r}")
+    # Same soft limits the PhysX path samples from, in chain joint order
+    idx = [robot.joint_names.index(name) for name in chain.joint_names]
+    limits = robot.data.soft_joint_pos_limits[0, idx].cpu()
+    return {
+        "robot": task_spec.robot_name, "n_samples": n_samples, "seed": seed,
+        "ee_body_name": task_spec.ee_body_name, "voxel_size": args_cli.voxel_size or None,
+        "orientation_bins": args_cli.orientation_bins or None,
+        "joint_lower": limits[:, 0].tolist(), "joint_upper": limits[:, 1].tolist(),
+    }
+
+
+def write_outputs(task_spec, ws_result, jl_result, safe_set, safe_path):
+    map_path = None
+    if ws_result.reachability is not None:
+        map_path = os.path.abspath("outputs/diagnostics/reachability_map.npz")
+        ws_result.reachability.save(map_path)
+        print(f"Reachability map: {ws_result.reachability.n_occupied} voxels "
+              f"({ws_result.reachability.occupied_volume_m3:.3f} m^3, "
+              f"coverage {ws_result.reachability.coverage():.3f}) -> {map_path}")
+        if ws_result.reachability.coverage() < MIN_COVERAGE:
+            print(f"[warn] reachability map coverage < {MIN_COVERAGE}: too few --n_samples "
+                  f"for --voxel_size {args_cli.voxel_size}; reach_task will ignore it")
+    pose_map_path = pose_coverage = pose_block = None
+    if ws_result.pose_reachability is not None:
+        pose = ws_result.pose_reachability
+        pose_map_path = os.path.abspath("outputs/diagnostics/pose_reachability_map.npz")
+        pose.save(pose_map_path)
+        reach_cells = euler_range_cells(*REACH_COMMAND_RANGES, pose.orientation_bins)
+        reach_pose = pose.for_command(reach_cells)
+        pose_coverage = (reach_pose or pose).coverage(reach_cells)
+        pose_block = reach_pose.voxel_size if reach_pose is not None else None
+        print(f"Pose reachability map: {pose.n_occupied} (voxel, orientation) cells "
+              f"-> {pose_map_path}")
+        if reach_pose is not None:
+            print(f"  reach-command orientations: coverage {pose_coverage:.3f} on "
+                  f"{pose_block:.2f} m blocks")
+        else:
+            print(f"[warn] pose map coverage over the reach-command orientations < "
+                  f"{MIN_COVERAGE} on any block: too few --n_samples for --orientation_bins "
+                  f"{args_cli.orientation_bins}; reach_task will not check orientations")
 
     # === Stage 4: Apply constraints ===
     if task_spec.constraints.get("surface") == "table":
@@ -161,11 +256,19 @@ def main(user_description: str, num_envs: int, n_samples: int, seed: int):
                 x=tuple(ws_result.bounds["x"]),
                 y=tuple(ws_result.bounds["y"]),
                 z=(z_lo, z_hi),
+                reachability_map_path=map_path,
+                voxel_size_m=args_cli.voxel_size or None,
+                reachability_coverage=(ws_result.reachability.coverage()
+                                       if ws_result.reachability is not None else None),
+                pose_reachability_map_path=pose_map_path,
+                orientation_bins=args_cli.orientation_bins or None,
+                pose_reachability_coverage=pose_coverage,
+                pose_block_m=pose_block,
             ),
             joint_limits=JointLimitsProbeResult(
-                n_sampled=jl_result.n_sampled,
-                n_safe=jl_result.n_safe,
-                collision_rate=jl_result.collision_rate,
+                n_sampled=safe_set.n_sampled,
+                n_safe=len(safe_set),
+                collision_rate=safe_set.collision_rate,
                 seed=jl_result.seed,
                 joint_lower=jl_result.joint_lower.tolist(),
                 joint_upper=jl_result.joint_upper.tolist(),
@@ -182,11 +285,130 @@ def main(user_description: str, num_envs: int, n_samples: int, seed: int):
     )
     print("\n=== Discovered Config ===")
     print(f"Workspace bounds: {discovered.probes.workspace}")
-    print(f"Safe configs:     {jl_result.n_safe} -> {safe_path}")
+    print(f"Safe configs:     {len(safe_set)} -> {safe_path}")
     print("\nOutputs written:")
     print("  outputs/task_spec.json")
     print("  outputs/discovered_config.json")
     print("  outputs/diagnostics/workspace_scatter.png")
+    print("  outputs/diagnostics/safe_configs.safeset")
+    if map_path:
+        print("  outputs/diagnostics/reachability_map.npz")
+    if pose_map_path:
+        print("  outputs/diagnostics/pose_reachability_map.npz")
+    return discovered
+
+
+def main(user_description: str, num_envs: int, n_samples: int, seed: int):
+    # === Stage 1: Parse ===
+    task_spec = parse_task_description(user_description)
+    save_json(task_spec, "outputs/task_spec.json")
+    print(f"Parsed: {task_spec.task_type} on {task_spec.robot_name}")
+    if task_spec.constraints:
+        print(f"Constraints: {task_spec.constraints}")
+    if task_spec.task_type != "reach":
+        raise NotImplementedError(
+            f"Task type {task_spec.task_type!r} not supported in v1"
+        )
+
+    # === Stage 2: Spawn sim ===
+    sim, scene, robot = setup_scene(task_spec.robot_name, num_envs)
+    print(f"Spawned {scene.num_envs} parallel envs.")
+
+    # Absolute path: reach_task.py loads this inside the Isaac Sim server
+    # process, which may not share this process's working directory.
+    os.makedirs("outputs/diagnostics", exist_ok=True)
+    safe_path = os.path.abspath("outputs/diagnostics/safe_configs.safeset")
+
+    # === Stage 3: Run probes (helpers/probe_dag.py) ===
+    # Sim-bound tasks run here, in order; with --parallel (analytic backend
+    # only) the workspace probe runs in a worker process at the same time.
+    dag = ProbeDAG(os.path.abspath("outputs/diagnostics/dag"))
+    gate = ()
+    if not args_cli.skip_validation:
+        # Validate FK before any sim probe runs. Catches silent kinematics
+        # regressions (URDF/Isaac Lab version drift) before they poison
+        # downstream stages.
+        from tests.test_workspace_integration import run_integration_test
+        dag.add("fk_validation", lambda _: run_integration_test(
+            scene, robot, n_configs=args_cli.n_validate, seed=args_cli.seed))
+        gate = ("fk_validation",)
+
+    # Probe cache (helpers/probe_cache.py): same asset, soft limits, params
+    # and probe code -> restore the result instead of probing again.
+    cache = ProbeCache(os.path.abspath("outputs/cache"))
+    # Remote assets are hashed through omni.client when it can read them;
+    # the joint/body layout guards the URL-only fallback.
+    asset = asset_fingerprint(robot.cfg.spawn.usd_path,
+                              layout={"joint_names": list(robot.joint_names),
+                                      "body_names": list(robot.body_names)})
+    limits = robot.data.soft_joint_pos_limits[0]
+    to_store = []
+
+    if args_cli.parallel and args_cli.fk_backend != "analytic":
+        print("(--parallel: the PhysX workspace probe needs the simulator and stays "
+              "in-process; pass --fk_backend analytic to run it in a worker)")
+    analytic_params = (analytic_workspace_params(task_spec, robot, n_samples, seed)
+                       if args_cli.fk_backend == "analytic" else None)
+    ws_key = ProbeCache.key(
+        "workspace", asset=asset, limits=limits,
+        params={"n_samples": n_samples, "seed": seed, "num_envs": num_envs,
+                "ee_body_name": task_spec.ee_body_name,
+                "voxel_size": args_cli.voxel_size or None,
+                "orientation_bins": args_cli.orientation_bins or None,
+                "backend": args_cli.fk_backend},
+        code=code_version(probes.workspace_probe, probes.streaming, probes.reachability,
+                          kinematics.chain, kinematics.robots),
+    )
+    ws_hit = None if args_cli.refresh else cache.load(ws_key)
+    if ws_hit is not None:
+        print(f"Workspace probe: cache hit ({ws_key[:12]})")
+        dag.add("workspace", lambda _: ws_hit)
+    elif analytic_params is not None and args_cli.parallel:
+        dag.add("workspace", worker="workspace", params=analytic_params)
+        to_store.append((ws_key, lambda r: r["workspace"], {}))
+    elif analytic_params is not None:
+        dag.add("workspace", lambda _: analytic_workspace_probe(analytic_params, {}),
+                deps=gate)
+        to_store.append((ws_key, lambda r: r["workspace"], {}))
+    else:
+        dag.add("workspace", lambda _: workspace_probe(
+            scene=scene, robot=robot, n_samples=n_samples, seed=seed,
+            ee_body_name=task_spec.ee_body_name,
+            voxel_size=args_cli.voxel_size or None,
+            orientation_bins=args_cli.orientation_bins or None,
+        ), deps=gate)
+        to_store.append((ws_key, lambda r: r["workspace"], {}))
+
+    # A grown safe set depends on the file already on disk: never cached
+    jl_key = ProbeCache.key(
+        "joint_limits", asset=asset, limits=limits,
+        params={"n_samples": n_samples, "seed": seed, "num_envs": num_envs,
+                "labeler": args_cli.labeler, "label_band": args_cli.label_band,
+                "settle_steps": args_cli.settle_steps, "early_exit": args_cli.early_exit,
+                "safe_set_dtype": args_cli.safe_set_dtype,
+                "joint_names": list(robot.joint_names)},
+        code=code_version(probes.joint_limits_probe, probes.sobol_stream, probes.safe_set,
+                          kinematics.chain, kinematics.collision, kinematics.robots),
+    )
+    jl_hit = (None if args_cli.refresh or args_cli.grow_safe_set
+              else cache.load(jl_key, restore={"safe_configs.safeset": safe_path}))
+    if jl_hit is not None:
+        print(f"Joint-limits probe: cache hit ({jl_key[:12]})")
+        dag.add("joint_limits", lambda _: (jl_hit, SafeSet.load(safe_path)))
+    else:
+        dag.add("joint_limits", lambda _: run_joint_limits(
+            sim, scene, robot, task_spec.robot_name, n_samples, seed, safe_path), deps=gate)
+        if not args_cli.grow_safe_set:
+            to_store.append((jl_key, lambda r: r["joint_limits"][0],
+                             {"safe_configs.safeset": safe_path}))
+
+    def outputs(r):
+        for key, result_of, artifacts in to_store:
+            cache.store(key, result_of(r), artifacts)
+        return write_outputs(task_spec, r["workspace"], *r["joint_limits"], safe_path)
+
+    dag.add("outputs", outputs, deps=("workspace", "joint_limits"))
+    dag.run()
 
 
 if __name__ == "__main__":
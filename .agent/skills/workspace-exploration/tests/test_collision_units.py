@@ -0,0 +1,158 @@
+"""Unit tests for the capsule self-collision labeler. Runs without Isaac Lab."""
+import numpy as np
+import torch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinematics.collision import segment_distance, checked_pairs
+from kinematics.robots import (FRANKA_PANDA_CAPSULES, FRANKA_SELF_COLLISION_IGNORE,
+                               get_chain, get_self_collision_labeler)
+from probes.joint_limits_probe import sample_configs_sobol, joint_limits_probe
+from probes.active_labeling import active_label
+
+HOME = torch.tensor([[0.0, -0.785, 0.0, -2.356, 0.0, 1.571, 0.785]])
+
+
+def _folded():
+    # Same fold as tests/check_labeler.py: shoulder up, elbow and wrist folded hard
+    q = HOME.clone()
+    q[0, 1], q[0, 3], q[0, 5] = 1.5, -3.0, 3.0
+    return q
+
+
+def _brute_segment_distance(p1, q1, p2, q2, n=401):
+    s = np.linspace(0, 1, n)
+    a = p1 + s[:, None] * (q1 - p1)
+    b = p2 + s[:, None] * (q2 - p2)
+    return np.linalg.norm(a[:, None] - b[None], axis=-1).min()
+
+
+def test_segment_distance_matches_brute_force():
+    rng = np.random.default_rng(0)
+    pts = rng.uniform(-1, 1, (200, 4, 3))
+    pts[:20, 1] = pts[:20, 0]            # first segment degenerate (point)
+    pts[20:40, 3] = pts[20:40, 2]        # second segment degenerate
+    pts[40:60, 3] = pts[40:60, 2] + (pts[40:60, 1] - pts[40:60, 0])  # parallel
+    d = segment_distance(*torch.as_tensor(pts, dtype=torch.float64).unbind(1)).numpy()
+    ref = np.array([_brute_segment_distance(*p) for p in pts])
+    # brute force only overestimates, by at most its grid spacing
+    assert np.all(d <= ref + 1e-9)
+    np.testing.assert_allclose(d, ref, atol=5e-3)
+
+
+def test_checked_pairs_respect_ignore():
+    pairs = checked_pairs(FRANKA_PANDA_CAPSULES, FRANKA_SELF_COLLISION_IGNORE)
+    bodies = {frozenset((FRANKA_PANDA_CAPSULES[i].body, FRANKA_PANDA_CAPSULES[j].body))
+              for i, j in pairs}
+    assert frozenset(("panda_link0", "panda_link1")) not in bodies
+    assert frozenset(("panda_hand", "panda_link7")) not in bodies
+    assert frozenset(("panda_link0", "panda_link2")) in bodies
+    assert frozenset(("panda_link5", "panda_hand")) in bodies
+    assert all(len(b) == 2 for b in bodies)
+
+
+def test_home_clear_and_folded_colliding():
+    labeler = get_self_collision_labeler("franka")
+    assert not labeler(HOME).item()
+    assert labeler(_folded()).item()
+    assert labeler.clearance(HOME).item() > 0.02
+
+
+def test_cutoff_is_exact_below_and_bounded_above():
+    labeler = get_self_collision_labeler("franka")
+    chain = get_chain("franka")
+    q = sample_configs_sobol(chain.lower, chain.upper, 4096, seed=0)
+    exact = labeler.clearance(q)
+    cut = labeler.clearance(q, cutoff=0.01)
+    below = exact < 0.01
+    torch.testing.assert_close(cut[below], exact[below])
+    assert (cut[~below] >= 0.01).all()
+
+
+def test_arm_joint_ids_select_columns():
+    """Isaac Lab's Franka vector has 2 finger joints after the 7 arm joints."""
+    q9 = torch.cat((torch.cat((HOME, _folded())), torch.full((2, 2), 0.04)), dim=1)
+    labeler = get_self_collision_labeler("franka", arm_joint_ids=range(7))
+    assert labeler(q9).tolist() == [False, True]
+    shuffled = q9[:, [8, 0, 1, 2, 3, 4, 5, 6, 7]]
+    labeler = get_self_collision_labeler("franka", arm_joint_ids=range(1, 8))
+    assert labeler(shuffled).tolist() == [False, True]
+
+
+def test_fallback_only_sees_borderline_in_fixed_batches():
+    calls = []
+
+    def fallback(configs):
+        calls.append(configs.shape[0])
+        return torch.zeros(configs.shape[0], dtype=torch.bool)   # "PhysX says clear"
+
+    chain = get_chain("franka")
+    q = sample_configs_sobol(chain.lower, chain.upper, 8192, seed=1)
+    plain = get_self_collision_labeler("franka")
+    escalating = get_self_collision_labeler("franka", fallback=fallback, band_m=0.01,
+                                            fallback_batch_size=64)
+    clearance = plain.clearance(q)
+    border = clearance.abs() <= 0.01
+
+    labels = escalating(q)
+    assert escalating.n_escalated == int(border.sum()) > 0
+    assert set(calls) == {64}
+    assert not labels[border].any()                    # fallback's verdict used
+    assert torch.equal(labels[~border], clearance[~border] < 0)
+
+
+def test_probe_with_capsule_labeler_large_batches():
+    class _Data:
+        soft_joint_pos_limits = torch.stack((get_chain("franka").lower,
+                                             get_chain("franka").upper), dim=1)[None]
+
+    class _Robot:
+        device = "cpu"
+        data = _Data()
+
+    class _Scene:
+        num_envs = 64
+
+    res = joint_limits_probe(None, _Scene(), _Robot(), n_samples=20000, seed=0,
+                             labeler=get_self_collision_labeler("franka"),
+                             label_batch_size=8192)
+    assert res.n_sampled == 20000                 # capsules take any batch: no padding
+    assert 0.02 < res.collision_rate < 0.3
+
+
+def test_active_labeling_saves_calls_and_stays_safe():
+    """Capsule labeler as a cheap stand-in for the PhysX oracle."""
+    chain = get_chain("franka")
+    labeler = get_self_collision_labeler("franka")
+    q = sample_configs_sobol(chain.lower, chain.upper, 32768, seed=0)
+    truth = labeler(q)
+    calls = []
+
+    def oracle(configs):
+        calls.append(configs.shape[0])
+        return labeler(configs)
+
+    r = active_label(q, oracle, chain.lower, chain.upper, label_batch_size=512,
+                     seed_size=2048, query_size=1024, holdout_size=1024)
+    assert set(calls) == {512}
+    assert r.n_label_calls == sum(calls) == int(r.verified.sum()) < q.shape[0] // 2
+    assert torch.equal(r.labels[r.verified], truth[r.verified])
+    assert r.holdout_accuracy > 0.9
+    assert not (r.safe & truth).any()
+    assert r.safe.sum() > 0.8 * (~truth).sum()
+
+
+if __name__ == "__main__":
+    test_segment_distance_matches_brute_force(); print("✓ segment_distance_matches_brute_force")
+    test_checked_pairs_respect_ignore(); print("✓ checked_pairs_respect_ignore")
+    test_home_clear_and_folded_colliding(); print("✓ home_clear_and_folded_colliding")
+    test_cutoff_is_exact_below_and_bounded_above(); print("✓ cutoff_is_exact_below_and_bounded_above")
+    test_arm_joint_ids_select_columns(); print("✓ arm_joint_ids_select_columns")
+    test_fallback_only_sees_borderline_in_fixed_batches()
+    print("✓ fallback_only_sees_borderline_in_fixed_batches")
+    test_probe_with_capsule_labeler_large_batches(); print("✓ probe_with_capsule_labeler_large_batches")
+    test_active_labeling_saves_calls_and_stays_safe()
+    print("✓ active_labeling_saves_calls_and_stays_safe")
+    print("\nAll unit tests passed.")
@@ -0,0 +1,68 @@
+"""Unit tests for the workspace scatter/density plot. Runs without Isaac Lab."""
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers.io import _decimate, save_scatter_plot
+
+
+def _result(n, seed=0):
+    pc = np.random.default_rng(seed).normal(0.0, 0.3, (n, 3)).astype(np.float32)
+    bounds = {ax: [float(pc[:, i].min()), float(pc[:, i].max())] for i, ax in enumerate("xyz")}
+    return SimpleNamespace(point_cloud=pc, bounds=bounds, n_sampled=n)
+
+
+def test_decimate_is_seeded_subset():
+    pc = np.arange(30_000, dtype=np.float32).reshape(-1, 3)
+    a, b = _decimate(pc, 1000, seed=4), _decimate(pc, 1000, seed=4)
+    np.testing.assert_array_equal(a, b)
+    assert len(a) == 1000 and len(np.unique(a[:, 0])) == 1000
+    assert np.isin(a[:, 0], pc[:, 0]).all()
+    assert _decimate(pc, None, seed=0) is pc
+    assert _decimate(pc, 10**6, seed=0) is pc
+
+
+def test_density_mode_on_large_cloud_is_fast():
+    res = _result(2_000_000)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "ws.png")
+        start = time.monotonic()
+        save_scatter_plot(res, path)                       # auto -> density above 200k points
+        elapsed = time.monotonic() - start
+        assert os.path.getsize(path) > 0
+    assert elapsed < 10.0, f"density plot took {elapsed:.1f}s"
+
+
+def test_rejects_unknown_mode():
+    with tempfile.TemporaryDirectory() as d:
+        try:
+            save_scatter_plot(_result(100), os.path.join(d, "ws.png"), mode="hexbin")
+        except ValueError as e:
+            assert "hexbin" in str(e)
+        else:
+            raise AssertionError("expected ValueError")
+
+
+def test_background_render_writes_plot_and_cleans_up():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "sub", "ws.png")
+        proc = save_scatter_plot(_result(5000), path, mode="density", background=True)
+        npz = proc.args[2]
+        assert proc.wait(timeout=120) == 0
+        assert os.path.getsize(path) > 0
+        assert not os.path.exists(npz)
+
+
+if __name__ == "__main__":
+    test_decimate_is_seeded_subset(); print("✓ decimate_is_seeded_subset")
+    test_density_mode_on_large_cloud_is_fast(); print("✓ density_mode_on_large_cloud_is_fast")
+    test_rejects_unknown_mode(); print("✓ rejects_unknown_mode")
+    test_background_render_writes_plot_and_cleans_up()
+    print("✓ background_render_writes_plot_and_cleans_up")
+    print("\nAll unit tests passed.")
@@ -11,7 +11,8 @@ import torch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from probes.joint_limits_probe import sample_configs_sobol, joint_limits_probe
+from probes.joint_limits_probe import (sample_configs_sobol, joint_limits_probe,
+                                       SlotScheduler, PhysxSelfCollisionLabeler)
 
 # Franka URDF joint limits (7 arm joints)
 FRANKA_LIMITS = torch.tensor([
@@ -94,11 +95,40 @@ def _collide_when_joint3_high(threshold):
     return labeler
 
 
-def test_probe_pads_to_multiple_of_num_envs():
+class _FullBatchLabeler:
+    """Fake labeler that, like fixed-step PhysX, takes exactly num_envs rows."""
+    needs_full_batch = True
+
+    def __init__(self, num_envs, threshold=-1.5):
+        self.num_envs = num_envs
+        self.inner = _collide_when_joint3_high(threshold)
+
+    def __call__(self, configs):
+        assert configs.shape[0] == self.num_envs
+        return self.inner(configs)
+
+
+def test_probe_draws_exactly_n_samples():
+    robot, scene = _FakeRobot(FRANKA_LIMITS), _FakeScene(num_envs=64)
+    inner, calls = _collide_when_joint3_high(-1.5), []
+
+    def labeler(configs):
+        calls.append(configs.shape[0])
+        return inner(configs)
+
+    res = joint_limits_probe(sim=None, scene=scene, robot=robot,
+                             n_samples=100, seed=0, label_batch_size=65536,
+                             labeler=labeler)
+    assert calls == [100]                   # one call of n_samples, not 65536
+    assert res.n_sampled == 100
+    assert res.all_configs.shape == (100, 7)
+
+
+def test_probe_pads_to_multiple_of_num_envs_for_full_batch_labelers():
     robot, scene = _FakeRobot(FRANKA_LIMITS), _FakeScene(num_envs=64)
     res = joint_limits_probe(sim=None, scene=scene, robot=robot,
                              n_samples=100, seed=0,            # 100 -> padded to 128
-                             labeler=_collide_when_joint3_high(-1.5))
+                             labeler=_FullBatchLabeler(64))
     assert res.n_sampled == 128
     assert res.all_configs.shape == (128, 7)
 
@@ -131,13 +161,136 @@ def test_probe_determinism():
     np.testing.assert_array_equal(a.safe_configs, b.safe_configs)
 
 
+def test_probe_streams_the_one_shot_sobol_sample():
+    robot, scene = _FakeRobot(FRANKA_LIMITS), _FakeScene(num_envs=64)
+    res = joint_limits_probe(sim=None, scene=scene, robot=robot, n_samples=3000, seed=5,
+                             labeler=_collide_when_joint3_high(-1.5), sobol_offset=777)
+    ref = sample_configs_sobol(FRANKA_LO, FRANKA_HI, 3000, seed=5, offset=777)
+    np.testing.assert_array_equal(res.all_configs, ref.numpy())
+
+
+def test_probe_shards_tile_the_unsharded_run():
+    robot, scene = _FakeRobot(FRANKA_LIMITS), _FakeScene(num_envs=100)
+    labeler = _FullBatchLabeler(100)            # short shard tails are padded
+    kw = dict(sim=None, scene=scene, robot=robot, n_samples=4100, seed=3, labeler=labeler)
+    full = joint_limits_probe(**kw)
+    shards = [joint_limits_probe(shard=(i, 3), **kw) for i in range(3)]
+    assert [r.sobol_offset for r in shards] == [0, 1024, 3072]
+    assert sum(r.n_sampled for r in shards) == full.n_sampled == 4100
+    np.testing.assert_array_equal(np.concatenate([r.all_configs for r in shards]),
+                                  full.all_configs)
+    np.testing.assert_array_equal(np.concatenate([r.labels for r in shards]), full.labels)
+
+
+# ---------- Early-exit PhysX labeling (fake sim) ----------
+
+def test_slot_scheduler_refills_finished_slots():
+    # item i collides at step (i % 3) + 1 if i is even, else stays clear
+    n_items, max_steps = 10, 4
+    hit_step = {i: (i % 3) + 1 for i in range(0, n_items, 2)}
+    sched = SlotScheduler(n_items, n_slots=3, max_steps=max_steps)
+    sched.fill(torch.arange(3))
+    n_steps = 0
+    while not sched.finished:
+        n_steps += 1
+        item = sched.slot_item
+        hit = torch.tensor([i >= 0 and hit_step.get(int(i)) == int(s) + 1
+                            for i, s in zip(item, sched.slot_steps)])
+        sched.fill(sched.observe(hit))
+    assert sched.labels.tolist() == [i in hit_step for i in range(n_items)]
+    assert sched.steps_used.tolist() == [hit_step.get(i, max_steps) for i in range(n_items)]
+    # 26 slot-steps of work on 3 slots; a fixed-batch loop would take 4 * 4 = 16 steps
+    assert n_steps < 16
+
+
+class _FakeSim:
+    def __init__(self, scene):
+        self.scene = scene
+
+    def get_physics_dt(self):
+        return 0.01
+
+    def step(self, render=False):
+        self.scene.robot.steps_held += 1
+
+
+class _FakeContactData:
+    def __init__(self, robot):
+        self.robot = robot
+
+    @property
+    def net_forces_w(self):
+        # joint 2 > 0 collides, from step ceil(|joint 0|) of holding the pose
+        r = self.robot
+        on = (r.q[:, 2] > 0) & (r.steps_held >= r.q[:, 0].abs().ceil().clamp(min=1))
+        return on[:, None, None].float().expand(-1, 2, 3)
+
+
+class _FakeSimRobot(_FakeRobot):
+    def __init__(self, limits, num_envs):
+        super().__init__(limits)
+        self.q = torch.zeros(num_envs, limits.shape[0])
+        self.steps_held = torch.zeros(num_envs)
+
+    def write_joint_state_to_sim(self, q, v, env_ids=None):
+        ids = slice(None) if env_ids is None else env_ids
+        self.q[ids] = q
+        self.steps_held[ids] = 0
+
+    def set_joint_position_target(self, q, env_ids=None):
+        pass
+
+
+class _FakeSimScene(_FakeScene):
+    def __init__(self, robot, num_envs):
+        super().__init__(num_envs)
+        self.robot = robot
+        self.sensor = type("Sensor", (), {"data": _FakeContactData(robot)})()
+
+    def __getitem__(self, key):
+        return self.sensor
+
+    def write_data_to_sim(self):
+        pass
+
+    def update(self, dt):
+        pass
+
+
+def test_early_exit_labeler_matches_fixed_steps():
+    configs = sample_configs_sobol(FRANKA_LO, FRANKA_HI, 300, seed=0)
+    n_steps = 4   # every fake contact shows up within |q0| <= 2.9 -> 3 steps
+
+    def run(early_exit):
+        robot = _FakeSimRobot(FRANKA_LIMITS, num_envs=32)
+        scene = _FakeSimScene(robot, num_envs=32)
+        labeler = PhysxSelfCollisionLabeler(_FakeSim(scene), scene, robot,
+                                            n_settle_steps=n_steps, early_exit=early_exit)
+        res = joint_limits_probe(None, scene, robot, n_samples=300, seed=0, labeler=labeler,
+                                 label_batch_size=None if not early_exit else 320)
+        return res, labeler
+
+    fixed, fixed_labeler = run(False)
+    early, early_labeler = run(True)
+    assert (fixed.n_sampled, early.n_sampled) == (320, 300)     # only fixed-step PhysX pads
+    np.testing.assert_array_equal(fixed.labels[:300], early.labels)
+    assert 0.3 < early.labels.mean() < 0.7
+    assert early_labeler.n_steps < fixed_labeler.n_steps
+
+
 if __name__ == "__main__":
     test_sobol_within_limits(); print("✓ sobol_within_limits")
     test_sobol_determinism(); print("✓ sobol_determinism")
     test_sobol_seed_changes_sample(); print("✓ sobol_seed_changes_sample")
     test_sobol_coverage(); print("✓ sobol_coverage")
     test_sobol_low_discrepancy_mean(); print("✓ sobol_low_discrepancy_mean")
-    test_probe_pads_to_multiple_of_num_envs(); print("✓ probe_pads_to_multiple_of_num_envs")
+    test_probe_draws_exactly_n_samples(); print("✓ probe_draws_exactly_n_samples")
+    test_probe_pads_to_multiple_of_num_envs_for_full_batch_labelers()
+    print("✓ probe_pads_to_multiple_of_num_envs_for_full_batch_labelers")
     test_probe_safe_set_matches_labels(); print("✓ probe_safe_set_matches_labels")
     test_probe_determinism(); print("✓ probe_determinism")
+    test_probe_streams_the_one_shot_sobol_sample(); print("✓ probe_streams_the_one_shot_sobol_sample")
+    test_probe_shards_tile_the_unsharded_run(); print("✓ probe_shards_tile_the_unsharded_run")
+    test_slot_scheduler_refills_finished_slots(); print("✓ slot_scheduler_refills_finished_slots")
+    test_early_exit_labeler_matches_fixed_steps(); print("✓ early_exit_labeler_matches_fixed_steps")
     print("\nAll unit tests passed.")
\ No newline at end of file
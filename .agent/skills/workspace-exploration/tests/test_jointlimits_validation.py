@@ -25,26 +25,16 @@ import torch
 
 from curobo.util_file import get_robot_configs_path, join_path, load_yaml
 from curobo.wrap.model.robot_world import RobotWorld, RobotWorldConfig
+from kinematics.robots import FRANKA_SELF_COLLISION_IGNORE
 from probes.joint_limits_probe import sample_configs_sobol, PhysxSelfCollisionLabeler
 
 
 # Relaxed self-collision ignore matrix: keep ONLY joint-connected / rigid pairs
 # excluded (these are what PhysX also auto-excludes). Everything else -- notably
 # link5/link6 vs hand & fingers, plus arm pairs (0,2),(1,3),(1,4),(2,4),(3,6),
-# (4,6),(4,7),(5,7) -- is now CHECKED, matching PhysX's pair set.
-_RELAXED_SELF_COLLISION_IGNORE = {
-    "panda_link0": ["panda_link1"],
-    "panda_link1": ["panda_link2"],
-    "panda_link2": ["panda_link3"],
-    "panda_link3": ["panda_link4"],
-    "panda_link4": ["panda_link5", "panda_link8"],
-    "panda_link5": ["panda_link6"],
-    "panda_link6": ["panda_link7"],
-    "panda_link7": ["panda_hand", "panda_leftfinger", "panda_rightfinger", "attached_object"],
-    "panda_hand": ["panda_leftfinger", "panda_rightfinger", "attached_object"],
-    "panda_leftfinger": ["panda_rightfinger", "attached_object"],
-    "panda_rightfinger": ["attached_object"],
-}
+# (4,6),(4,7),(5,7) -- is now CHECKED, matching PhysX's pair set. Shared with
+# the capsule labeler in kinematics/collision.py so all three check one pair set.
+_RELAXED_SELF_COLLISION_IGNORE = FRANKA_SELF_COLLISION_IGNORE
 
 
 def _make_robot_dict():
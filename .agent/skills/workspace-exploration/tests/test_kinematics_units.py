@@ -0,0 +1,208 @@
+"""Unit tests for the analytical FK in kinematics/. Runs without Isaac Lab.
+
+The reference is an independent modified-DH (Craig) model of the Panda from
+Franka's published parameters, so a mistake in the URDF-style chain values
+would not be mirrored in the reference.
+"""
+import math
+
+import numpy as np
+import torch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinematics.chain import JointSpec, SerialChain, matrix_to_quat
+from kinematics.ik import solve_position_ik
+from kinematics.robots import get_chain
+from probes.workspace_probe import workspace_probe
+
+
+# Franka modified-DH: (a_{i-1}, d_i, alpha_{i-1}), plus flange d = 0.107.
+PANDA_MDH = [
+    (0.0,     0.333,  0.0),
+    (0.0,     0.0,   -math.pi / 2),
+    (0.0,     0.316,  math.pi / 2),
+    (0.0825,  0.0,    math.pi / 2),
+    (-0.0825, 0.384, -math.pi / 2),
+    (0.0,     0.0,    math.pi / 2),
+    (0.088,   0.0,    math.pi / 2),
+]
+FLANGE_D = 0.107
+# FRANKA_PANDA_CFG init_state, arm joints: the success-threshold probe's home
+ISAACLAB_HOME = torch.tensor([0.0, -0.569, 0.0, -2.810, 0.0, 3.037, 0.741])
+
+
+def _mdh(a, d, alpha, theta):
+    ca, sa = math.cos(alpha), math.sin(alpha)
+    ct, st = math.cos(theta), math.sin(theta)
+    return np.array([
+        [ct,      -st,      0.0,  a],
+        [st * ca,  ct * ca, -sa, -sa * d],
+        [st * sa,  ct * sa,  ca,  ca * d],
+        [0.0,      0.0,      0.0, 1.0],
+    ])
+
+
+def _reference_hand_pose(q):
+    T = np.eye(4)
+    for (a, d, alpha), theta in zip(PANDA_MDH, q):
+        T = T @ _mdh(a, d, alpha, theta)
+    T = T @ _mdh(0.0, FLANGE_D, 0.0, -math.pi / 4)   # flange, then hand yaw
+    return T
+
+
+def _random_configs(n, seed=0):
+    chain = get_chain("franka")
+    rng = torch.Generator().manual_seed(seed)
+    u = torch.rand((n, 7), generator=rng, dtype=torch.float64)
+    return chain.lower.double() + u * (chain.upper.double() - chain.lower.double())
+
+
+def test_zero_config_hand_position():
+    pos, _ = get_chain("franka", dtype=torch.float64).forward(torch.zeros(7, dtype=torch.float64))
+    np.testing.assert_allclose(pos.numpy(), [0.088, 0.0, 0.926], atol=1e-12)
+
+
+def test_matches_modified_dh_reference():
+    chain = get_chain("franka", dtype=torch.float64)
+    q = _random_configs(200)
+    pos, rot = chain.forward(q)
+    for i in range(q.shape[0]):
+        T = _reference_hand_pose(q[i].tolist())
+        np.testing.assert_allclose(pos[i].numpy(), T[:3, 3], atol=1e-9)
+        np.testing.assert_allclose(rot[i].numpy(), T[:3, :3], atol=1e-9)
+
+
+def test_float32_close_to_float64():
+    q = _random_configs(1000)
+    p64 = get_chain("franka", dtype=torch.float64).ee_position(q)
+    p32 = get_chain("franka").ee_position(q.float())
+    assert (p64 - p32.double()).norm(dim=1).max() < 1e-5
+
+
+def test_batch_shapes():
+    chain = get_chain("franka")
+    q = torch.zeros(4, 5, 7)
+    pos, rot = chain.forward(q)
+    assert pos.shape == (4, 5, 3) and rot.shape == (4, 5, 3, 3)
+    lp, lr = chain.link_poses(q)
+    assert lp.shape == (4, 5, 8, 3) and lr.shape == (4, 5, 8, 3, 3)
+    assert chain.jacobian(q).shape == (4, 5, 6, 7)
+
+
+def test_link_poses_end_at_ee():
+    chain = get_chain("franka", dtype=torch.float64)
+    q = _random_configs(50)
+    lp, lr = chain.link_poses(q)
+    pos, rot = chain.forward(q)
+    torch.testing.assert_close(lp[:, -1], pos)
+    torch.testing.assert_close(lr[:, -1], rot)
+
+
+def test_jacobian_matches_finite_differences():
+    chain = get_chain("franka", dtype=torch.float64)
+    q = _random_configs(20)
+    J = chain.jacobian(q)
+    eps = 1e-6
+    for j in range(7):
+        dq = torch.zeros(7, dtype=torch.float64)
+        dq[j] = eps
+        dp = (chain.ee_position(q + dq) - chain.ee_position(q - dq)) / (2 * eps)
+        torch.testing.assert_close(J[:, :3, j], dp, atol=1e-7, rtol=0)
+
+
+def test_general_axis_matches_z_fast_path():
+    """Rodrigues path (axis given as -z, q negated) == z-axis fast path."""
+    joints_z = [JointSpec("a", xyz=(0.1, 0.0, 0.2), rpy=(0.3, 0.0, 0.0)),
+                JointSpec("b", xyz=(0.0, 0.3, 0.0), rpy=(0.0, 0.4, 0.1))]
+    joints_neg = [JointSpec(j.name, xyz=j.xyz, rpy=j.rpy, axis=(0.0, 0.0, -1.0))
+                  for j in joints_z]
+    q = torch.rand(64, 2, dtype=torch.float64) * 4 - 2
+    pz, rz = SerialChain(joints_z, dtype=torch.float64).forward(q)
+    pn, rn = SerialChain(joints_neg, dtype=torch.float64).forward(-q)
+    torch.testing.assert_close(pz, pn)
+    torch.testing.assert_close(rz, rn)
+
+
+def test_analytic_workspace_probe_without_sim():
+    r = workspace_probe(None, None, n_samples=20000, seed=0, backend="analytic",
+                        batch_size=4096)
+    assert r.n_sampled == 20480 and r.point_cloud.shape == (20480, 3)
+    # Panda reach is ~0.855 m from the shoulder (z = 0.333)
+    assert 0.8 < r.bounds["x"][1] < 0.86
+    assert 1.1 < r.bounds["z"][1] < 1.2
+
+
+def test_dls_ik_solves_near_home_isolation_targets():
+    """The probe's ISOLATION_TEST targets: FK of home + U(-0.3, 0.3) rad."""
+    chain = get_chain("franka")
+    g = torch.Generator().manual_seed(0)
+    q_known = (ISAACLAB_HOME + 0.3 * (2 * torch.rand(4096, 7, generator=g) - 1)).clamp(
+        chain.lower, chain.upper)
+    r = solve_position_ik(chain, chain.ee_position(q_known), ISAACLAB_HOME)
+    assert r.converged.all() and (r.residual_m <= 1e-4).all()
+    assert ((r.q >= chain.lower) & (r.q <= chain.upper)).all()
+    torch.testing.assert_close(chain.ee_position(r.q), chain.ee_position(q_known),
+                               atol=1e-4, rtol=0)
+
+
+def test_dls_ik_step_is_isaac_lab_dls_update():
+    chain = get_chain("franka", dtype=torch.float64)
+    target = chain.ee_position(ISAACLAB_HOME.double() + 0.2)[None]
+    r = solve_position_ik(chain, target, ISAACLAB_HOME, max_iters=1, respect_limits=False)
+    J = chain.jacobian(ISAACLAB_HOME.double())[:3]
+    err = target[0] - chain.ee_position(ISAACLAB_HOME.double())
+    dq = J.T @ torch.linalg.inv(J @ J.T + 0.01 ** 2 * torch.eye(3, dtype=torch.float64)) @ err
+    torch.testing.assert_close(r.q[0], ISAACLAB_HOME.double() + dq)
+    assert r.n_iters[0] == 1
+
+
+def test_dls_ik_per_target_results_independent_of_batch():
+    chain = get_chain("franka", dtype=torch.float64)
+    targets = torch.cat((_random_configs(63, seed=4), ISAACLAB_HOME[None].double()))
+    targets = chain.ee_position(targets)
+    targets[5] = torch.tensor([2.0, 0.0, 0.3], dtype=torch.float64)     # out of reach
+    batch = solve_position_ik(chain, targets, ISAACLAB_HOME)
+    for i in (0, 5, 63):
+        alone = solve_position_ik(chain, targets[i:i + 1], ISAACLAB_HOME)
+        torch.testing.assert_close(alone.q[0], batch.q[i])
+        assert alone.n_iters[0] == batch.n_iters[i]
+    assert not batch.converged[5] and batch.residual_m[5] > 2.0 - 0.86   # reach ~0.855 m
+    assert batch.converged[63] and batch.n_iters[63] == 0
+
+
+def test_matrix_to_quat_round_trip():
+    q = torch.randn(4096, 4, dtype=torch.float64, generator=torch.Generator().manual_seed(0))
+    q[:4] = torch.eye(4, dtype=torch.float64)        # identity and the 180-degree turns
+    q = q / q.norm(dim=1, keepdim=True)
+    q = torch.where(q[:, :1] < 0, -q, q)
+    w, x, y, z = q.unbind(1)
+    R = torch.stack((
+        1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+        2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+        2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y),
+    ), dim=1).reshape(-1, 3, 3)
+    out = matrix_to_quat(R.reshape(64, 64, 3, 3)).reshape(-1, 4)
+    # q and -q are the same rotation; w = 0 leaves the sign free
+    sign = torch.where((out * q).sum(dim=1, keepdim=True) < 0, -1.0, 1.0)
+    torch.testing.assert_close(out * sign, q)
+
+
+if __name__ == "__main__":
+    test_zero_config_hand_position(); print("✓ zero_config_hand_position")
+    test_matches_modified_dh_reference(); print("✓ matches_modified_dh_reference")
+    test_float32_close_to_float64(); print("✓ float32_close_to_float64")
+    test_batch_shapes(); print("✓ batch_shapes")
+    test_link_poses_end_at_ee(); print("✓ link_poses_end_at_ee")
+    test_jacobian_matches_finite_differences(); print("✓ jacobian_matches_finite_differences")
+    test_general_axis_matches_z_fast_path(); print("✓ general_axis_matches_z_fast_path")
+    test_analytic_workspace_probe_without_sim(); print("✓ analytic_workspace_probe_without_sim")
+    test_dls_ik_solves_near_home_isolation_targets()
+    print("✓ dls_ik_solves_near_home_isolation_targets")
+    test_dls_ik_step_is_isaac_lab_dls_update(); print("✓ dls_ik_step_is_isaac_lab_dls_update")
+    test_dls_ik_per_target_results_independent_of_batch()
+    print("✓ dls_ik_per_target_results_independent_of_batch")
+    test_matrix_to_quat_round_trip(); print("✓ matrix_to_quat_round_trip")
+    print("\nAll unit tests passed.")
@@ -0,0 +1,146 @@
+"""Unit tests for the content-addressed probe cache. Runs without Isaac Lab."""
+import os
+import tempfile
+import types
+
+import numpy as np
+import torch
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import probes.safe_set
+import probes.workspace_probe
+from helpers.probe_cache import ProbeCache, asset_fingerprint, code_version
+from probes.safe_set import SafeSet
+from probes.workspace_probe import workspace_probe
+
+LIMITS = torch.tensor([[-2.9, 2.9], [-1.76, 1.76]])
+PARAMS = {"n_samples": 2048, "seed": 0, "voxel_size": 0.05}
+
+
+def _key(**overrides):
+    fields = dict(asset="path:franka.usd", limits=LIMITS, params=PARAMS,
+                  code=code_version(probes.workspace_probe))
+    fields.update(overrides)
+    return ProbeCache.key("workspace", **fields)
+
+
+def test_key_is_stable_and_sensitive_to_every_field():
+    assert _key() == _key(limits=LIMITS.numpy().tolist(), params=dict(reversed(PARAMS.items())))
+    variants = [
+        _key(asset="path:ur10.usd"),
+        _key(limits=LIMITS * 0.95),
+        _key(params={**PARAMS, "seed": 1}),
+        _key(code=code_version(probes.workspace_probe, probes.safe_set)),
+        ProbeCache.key("joint_limits", asset="path:franka.usd", limits=LIMITS, params=PARAMS,
+                       code=code_version(probes.workspace_probe)),
+    ]
+    assert len({_key(), *variants}) == len(variants) + 1
+
+
+def test_asset_fingerprint_hashes_local_file_contents():
+    with tempfile.TemporaryDirectory() as d:
+        a, b = os.path.join(d, "a.usd"), os.path.join(d, "b.usd")
+        for path in (a, b):
+            with open(path, "wb") as f:
+                f.write(b"#usda 1.0\n")
+        assert asset_fingerprint(a) == asset_fingerprint(b)
+        with open(b, "ab") as f:
+            f.write(b"def Xform {}\n")
+        assert asset_fingerprint(a) != asset_fingerprint(b)
+    url = "https://example.com/Robots/FrankaEmika/panda_instanceable.usd"
+    assert asset_fingerprint(url) == "path:" + url
+
+
+class _FakeOmniClient:
+    """Stands in for omni.client: serves `files`, stats `stamps`."""
+
+    class Result:
+        OK, ERROR_NOT_FOUND = 0, 1
+
+    class _Entry:
+        def __init__(self, version):
+            self.version, self.hash, self.modified_time, self.size = version, "", None, 0
+
+    def __init__(self, files, stamps=()):
+        self.files, self.stamps = files, dict(stamps)
+
+    def read_file(self, url):
+        if url in self.files:
+            return self.Result.OK, "", memoryview(self.files[url])
+        return self.Result.ERROR_NOT_FOUND, "", None
+
+    def stat(self, url):
+        if url in self.stamps:
+            return self.Result.OK, self._Entry(self.stamps[url])
+        return self.Result.ERROR_NOT_FOUND, None
+
+
+def test_asset_fingerprint_hashes_remote_asset_contents():
+    url = "https://example.com/Robots/FrankaEmika/panda_instanceable.usd"
+    stat_only = "omniverse://server/franka.usd"
+    client = _FakeOmniClient({url: b"#usda 1.0\n"}, {stat_only: "v1"})
+    omni = types.ModuleType("omni")
+    omni.client = client
+    saved = {name: sys.modules.get(name) for name in ("omni", "omni.client")}
+    sys.modules.update({"omni": omni, "omni.client": client})
+    try:
+        before = asset_fingerprint(url)
+        assert before.startswith("sha256:")
+        client.files[url] += b"def Xform {}\n"         # new USD, same URL
+        assert asset_fingerprint(url) != before
+
+        stamped = asset_fingerprint(stat_only)
+        client.stamps[stat_only] = "v2"
+        assert asset_fingerprint(stat_only) != stamped
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+    # Layout changes miss even when the asset is keyed by URL only
+    layout = {"joint_names": ["j1", "j2"], "body_names": ["base", "hand"]}
+    assert asset_fingerprint(url, layout) != asset_fingerprint(url)
+    assert asset_fingerprint(url, layout) != asset_fingerprint(
+        url, {**layout, "joint_names": ["j1", "j2", "finger"]})
+
+
+def test_round_trip_restores_result_and_artifacts():
+    result = workspace_probe(None, None, n_samples=2048, seed=0, backend="analytic",
+                             voxel_size=0.05)
+    with tempfile.TemporaryDirectory() as d:
+        cache = ProbeCache(os.path.join(d, "cache"))
+        safe_path = os.path.join(d, "safe_configs.safeset")
+        configs = np.random.default_rng(0).uniform(-1, 1, (100, 2)).astype(np.float32)
+        SafeSet.from_configs(configs, [-1, -1], [1, 1]).save(safe_path)
+
+        key = _key()
+        assert cache.load(key) is None
+        cache.store(key, result, {"safe_configs.safeset": safe_path})
+        os.remove(safe_path)
+
+        hit = cache.load(key)
+        np.testing.assert_array_equal(hit.point_cloud, result.point_cloud)
+        assert hit.bounds == result.bounds
+        assert hit.reachability.n_occupied == result.reachability.n_occupied
+        np.testing.assert_array_equal(SafeSet.load(safe_path).data, configs)
+
+        elsewhere = os.path.join(d, "restored", "safe.safeset")
+        cache.load(key, restore={"safe_configs.safeset": elsewhere})
+        np.testing.assert_array_equal(SafeSet.load(elsewhere).data, configs)
+
+        cache.store(key, "refreshed")                 # --refresh overwrites the entry
+        assert cache.load(key) == "refreshed"
+        assert not [n for n in os.listdir(os.path.dirname(cache._dir(key))) if n.startswith(".tmp")]
+
+
+if __name__ == "__main__":
+    test_key_is_stable_and_sensitive_to_every_field(); print("✓ key_is_stable_and_sensitive_to_every_field")
+    test_asset_fingerprint_hashes_local_file_contents()
+    print("✓ asset_fingerprint_hashes_local_file_contents")
+    test_asset_fingerprint_hashes_remote_asset_contents()
+    print("✓ asset_fingerprint_hashes_remote_asset_contents")
+    test_round_trip_restores_result_and_artifacts(); print("✓ round_trip_restores_result_and_artifacts")
+    print("\nAll unit tests passed.")
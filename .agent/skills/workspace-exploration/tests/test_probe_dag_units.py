@@ -0,0 +1,82 @@
+"""Unit tests for the probe DAG executor and its worker. Runs without Isaac Lab."""
+import tempfile
+import time
+
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers.probe_dag import ProbeDAG
+from probes.workspace_probe import workspace_probe
+
+
+def _expect(exc, fn, match):
+    try:
+        fn()
+    except exc as e:
+        assert match in str(e), str(e)
+        return
+    raise AssertionError(f"expected {exc.__name__}")
+
+
+def test_in_process_tasks_run_in_dependency_order():
+    calls = []
+
+    def task(name, value):
+        def fn(inputs):
+            calls.append((name, dict(inputs)))
+            return value
+        return fn
+
+    with tempfile.TemporaryDirectory() as d:
+        dag = ProbeDAG(d)
+        dag.add("write", task("write", 3), deps=("a", "b"))
+        dag.add("b", task("b", 2), deps=("a",))
+        dag.add("a", task("a", 1))
+        results = dag.run()
+    assert [c[0] for c in calls] == ["a", "b", "write"]
+    assert calls[2][1] == {"a": 1, "b": 2}
+    assert results == {"a": 1, "b": 2, "write": 3}
+
+
+def test_rejects_cycles_and_unknown_deps():
+    with tempfile.TemporaryDirectory() as d:
+        _expect(ValueError, lambda: ProbeDAG(d).add("a", lambda _: 0, deps=("b",))
+                .add("b", lambda _: 0, deps=("a",)).run(), "cycle")
+        _expect(ValueError, lambda: ProbeDAG(d).add("a", lambda _: 0, deps=("missing",)).run(),
+                "unknown")
+        _expect(ValueError, lambda: ProbeDAG(d).add("a"), "exactly one")
+
+
+def test_worker_overlaps_in_process_task_and_feeds_dependents():
+    params = {"n_samples": 4096, "seed": 3, "voxel_size": 0.05}
+    with tempfile.TemporaryDirectory() as d:
+        dag = ProbeDAG(d)
+        dag.add("workspace", worker="workspace", params=params)
+        dag.add("sim_bound", lambda _: time.sleep(1.0) or "labels")
+        dag.add("outputs", lambda r: (r["workspace"], r["sim_bound"]),
+                deps=("workspace", "sim_bound"))
+        ws, labels = dag.run()["outputs"]
+        assert dag.timings["workspace"][0] < dag.timings["sim_bound"][1]
+    ref = workspace_probe(None, None, n_samples=4096, seed=3, backend="analytic",
+                          voxel_size=0.05)
+    assert labels == "labels"
+    np.testing.assert_array_equal(ws.point_cloud, ref.point_cloud)
+    assert ws.reachability.n_occupied == ref.reachability.n_occupied
+
+
+def test_worker_failure_raises_with_log():
+    with tempfile.TemporaryDirectory() as d:
+        dag = ProbeDAG(d).add("workspace", worker="workspace", params={"seed": 0})
+        _expect(RuntimeError, dag.run, "n_samples")
+
+
+if __name__ == "__main__":
+    test_in_process_tasks_run_in_dependency_order(); print("✓ in_process_tasks_run_in_dependency_order")
+    test_rejects_cycles_and_unknown_deps(); print("✓ rejects_cycles_and_unknown_deps")
+    test_worker_overlaps_in_process_task_and_feeds_dependents()
+    print("✓ worker_overlaps_in_process_task_and_feeds_dependents")
+    test_worker_failure_raises_with_log(); print("✓ worker_failure_raises_with_log")
+    print("\nAll unit tests passed.")
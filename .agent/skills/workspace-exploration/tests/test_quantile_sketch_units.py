@@ -0,0 +1,71 @@
+"""Unit tests for the streaming quantile sketch (common/quantile_sketch.py)."""
+import json
+
+import numpy as np
+import torch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from common.quantile_sketch import QuantileSketch
+
+PS = (50, 75, 90, 95, 99)
+
+
+def _rank_error(values, q, estimate):
+    return abs(np.searchsorted(np.sort(values), estimate) / values.size - q)
+
+
+def test_small_runs_match_np_percentile_exactly():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(-5, 1, 3000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 7):
+        sketch.update(torch.as_tensor(chunk))         # tensors are accepted as-is
+    assert sketch.is_exact
+    pct = sketch.percentiles(PS)
+    for p in PS:
+        assert pct[f"p{p}"] == float(np.percentile(values, p))
+    assert pct["max"] == values.max()
+    assert abs(pct["mean"] - values.mean()) < 1e-15
+
+
+def test_large_runs_bounded_memory_and_rank_error():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(-5, 1, 1_000_000)
+    sketch = QuantileSketch(k=256)
+    for chunk in np.array_split(values, 250):
+        sketch.update(chunk)
+    assert not sketch.is_exact
+    assert sketch.n == values.size
+    assert sketch.n_retained < 2000
+    for p in PS:
+        assert _rank_error(values, p / 100, sketch.quantile(p / 100)) < 0.01
+    assert sketch.percentiles()["max"] == values.max()
+
+
+def test_merge_matches_single_stream():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(0, 1, 200_000), rng.normal(3, 1, 100_000)
+    merged = QuantileSketch(seed=1).update(a).merge(QuantileSketch(seed=2).update(b))
+    both = np.concatenate((a, b))
+    assert merged.n == both.size
+    assert merged.min == both.min() and merged.max == both.max()
+    for q in (0.1, 0.5, 0.9):
+        assert _rank_error(both, q, merged.quantile(q)) < 0.01
+
+
+def test_dict_round_trip_through_json():
+    sketch = QuantileSketch().update(np.random.default_rng(3).uniform(0, 1, 50_000))
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.n == sketch.n
+    assert restored.percentiles() == sketch.percentiles()
+
+
+if __name__ == "__main__":
+    test_small_runs_match_np_percentile_exactly(); print("✓ small_runs_match_np_percentile_exactly")
+    test_large_runs_bounded_memory_and_rank_error(); print("✓ large_runs_bounded_memory_and_rank_error")
+    test_merge_matches_single_stream(); print("✓ merge_matches_single_stream")
+    test_dict_round_trip_through_json(); print("✓ dict_round_trip_through_json")
+    print("\nAll unit tests passed.")
@@ -0,0 +1,241 @@
+"""Unit tests for the voxel reachability map. Runs without Isaac Lab."""
+import numpy as np
+import torch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kinematics.chain import matrix_to_quat
+from probes.reachability import (VoxelAccumulator, ReachabilityMap, PoseReachabilityMap,
+                                 MIN_COVERAGE, POSE_BLOCK_MAX_M, REACH_COMMAND_RANGES,
+                                 euler_range_cells, orientation_bin, orientation_bin_center)
+from probes.workspace_probe import workspace_probe
+
+
+def _ring_points(n=20000, seed=0):
+    """Points on a thick ring around z: its AABB centre is unreachable."""
+    rng = np.random.default_rng(seed)
+    r = rng.uniform(0.4, 0.6, n)
+    th = rng.uniform(-np.pi, np.pi, n)
+    z = rng.uniform(0.0, 0.3, n)
+    return np.stack((r * np.cos(th), r * np.sin(th), z), axis=1)
+
+
+def test_every_sample_is_reachable():
+    pts = _ring_points()
+    m = ReachabilityMap.from_points(pts, voxel_size=0.02)
+    assert m.is_reachable(pts).all()
+    assert m.count_at(pts).min() >= 1
+    assert int(m.counts.sum()) == len(pts)
+
+
+def test_hole_and_outside_are_unreachable():
+    m = ReachabilityMap.from_points(_ring_points(), voxel_size=0.02)
+    queries = np.array([[0.0, 0.0, 0.15],     # ring centre, inside the AABB
+                        [2.0, 0.0, 0.15],     # outside the grid
+                        [-5.0, -5.0, -5.0]])
+    assert not m.is_reachable(queries).any()
+
+
+def test_streamed_batches_match_one_shot():
+    pts = torch.as_tensor(_ring_points(), dtype=torch.float32)
+    acc = VoxelAccumulator(0.03)
+    for chunk in pts.split(3000):
+        acc.update(chunk)
+    streamed = acc.to_map()
+    one_shot = ReachabilityMap.from_points(pts, voxel_size=0.03)
+    np.testing.assert_array_equal(streamed.counts, one_shot.counts)
+    np.testing.assert_allclose(streamed.origin, one_shot.origin)
+    assert acc.n_points == len(pts)
+
+
+def test_torch_query_keeps_device_and_type():
+    pts = torch.as_tensor(_ring_points(1000), dtype=torch.float32)
+    m = ReachabilityMap.from_points(pts, voxel_size=0.02)
+    out = m.is_reachable(pts.reshape(10, 100, 3))
+    assert isinstance(out, torch.Tensor) and out.shape == (10, 100) and out.all()
+
+
+def test_samples_land_in_reachable_voxels():
+    m = ReachabilityMap.from_points(_ring_points(), voxel_size=0.02)
+    s = m.sample_reachable(5000, generator=torch.Generator().manual_seed(0))
+    assert s.shape == (5000, 3)
+    assert m.is_reachable(s).all()
+    r = s[:, :2].norm(dim=1)
+    assert r.min() > 0.4 - 0.03 and r.max() < 0.6 + 0.03
+
+
+def test_min_count_filters_sparse_voxels():
+    pts = np.array([[0.01, 0.01, 0.01]] * 5 + [[0.11, 0.01, 0.01]])
+    m = ReachabilityMap.from_points(pts, voxel_size=0.1)
+    np.testing.assert_array_equal(m.is_reachable(pts[[0, -1]], min_count=2), [True, False])
+    s = m.sample_reachable(100, min_count=2)
+    assert (s[:, 0] < 0.1).all()
+
+
+def test_save_load_roundtrip(tmp_path):
+    m = ReachabilityMap.from_points(_ring_points(), voxel_size=0.02)
+    path = str(tmp_path / "map.npz")
+    m.save(path)
+    loaded = ReachabilityMap.load(path)
+    np.testing.assert_array_equal(loaded.counts, m.counts)
+    np.testing.assert_array_equal(loaded.origin, m.origin)
+    assert loaded.voxel_size == m.voxel_size
+    assert os.path.getsize(path) < m.counts.nbytes
+
+
+def test_workspace_probe_builds_map_in_both_modes():
+    kw = dict(n_samples=16384, seed=0, backend="analytic", batch_size=4096, voxel_size=0.05)
+    full = workspace_probe(None, None, **kw)
+    streamed = workspace_probe(None, None, stream=True, reservoir_size=1000, **kw)
+    np.testing.assert_array_equal(full.reachability.counts, streamed.reachability.counts)
+    assert int(full.reachability.counts.sum()) == full.n_sampled
+    assert full.reachability.is_reachable(full.point_cloud).all()
+    # Reachable volume is a fraction of the box the AABB claims
+    box = np.prod([hi - lo for lo, hi in full.bounds.values()])
+    assert full.reachability.occupied_volume_m3 < 0.8 * box
+
+
+def _random_quats(n, seed=0):
+    q = torch.randn(n, 4, dtype=torch.float64, generator=torch.Generator().manual_seed(seed))
+    return q / q.norm(dim=1, keepdim=True)
+
+
+def test_coverage_is_good_turing_estimate():
+    pts = np.array([[0.01, 0.01, 0.01]] * 3 + [[0.5, 0.5, 0.5], [0.9, 0.9, 0.9]])
+    m = ReachabilityMap.from_points(pts, voxel_size=0.1)
+    assert abs(m.coverage() - (1 - 2 / 5)) < 1e-12
+    sparse = workspace_probe(None, None, n_samples=4096, seed=0, backend="analytic",
+                             batch_size=4096, voxel_size=0.02).reachability
+    dense = workspace_probe(None, None, n_samples=262144, seed=0, backend="analytic",
+                            voxel_size=0.1).reachability
+    assert sparse.coverage() < 0.5 < MIN_COVERAGE < dense.coverage()
+
+
+def test_orientation_bins_cover_so3_and_identify_antipodes():
+    q = _random_quats(50000)
+    for m in (1, 3, 8):
+        cells = orientation_bin(q, m)
+        assert cells.min() >= 0 and cells.max() < 4 * m ** 3
+        assert len(cells.unique()) == 4 * m ** 3
+        assert torch.equal(orientation_bin(-q, m), cells)
+        assert torch.equal(orientation_bin(orientation_bin_center(cells, m), m), cells)
+
+
+def test_pose_map_checks_orientation_per_voxel():
+    pts = _ring_points()
+    down = torch.tensor([0.0, 0.0, 1.0, 0.0], dtype=torch.float64)   # pitch = pi
+    m = PoseReachabilityMap.from_poses(pts, down.expand(len(pts), 4), voxel_size=0.02)
+    assert m.is_reachable(pts, down).all()
+    assert not m.is_reachable(pts, torch.tensor([1.0, 0.0, 0.0, 0.0])).any()
+    np.testing.assert_array_equal(m.position_map().counts,
+                                  ReachabilityMap.from_points(pts, voxel_size=0.02).counts)
+    s = m.sample_reachable(2000, down, generator=torch.Generator().manual_seed(0))
+    assert m.is_reachable(s, down).all()
+    # one orientation per voxel: same coverage as the position map
+    assert m.coverage() == ReachabilityMap.from_points(pts, voxel_size=0.02).coverage()
+
+
+def test_pose_map_save_load_roundtrip(tmp_path):
+    pts = _ring_points()
+    m = PoseReachabilityMap.from_poses(pts, _random_quats(len(pts)), voxel_size=0.05,
+                                       orientation_bins=4)
+    path = str(tmp_path / "pose.npz")
+    m.save(path)
+    loaded = PoseReachabilityMap.load(path)
+    np.testing.assert_array_equal(loaded.keys, m.keys)
+    np.testing.assert_array_equal(loaded.counts, m.counts)
+    assert (loaded.shape, loaded.orientation_bins) == (m.shape, 4)
+
+
+def test_workspace_probe_pose_map_matches_fk():
+    from kinematics.robots import get_chain
+    from probes.workspace_probe import sample_configs
+
+    kw = dict(n_samples=16384, seed=0, backend="analytic", batch_size=4096, voxel_size=0.05,
+              orientation_bins=6)
+    full = workspace_probe(None, None, **kw)
+    streamed = workspace_probe(None, None, stream=True, reservoir_size=1000, **kw)
+    np.testing.assert_array_equal(full.pose_reachability.keys, streamed.pose_reachability.keys)
+    np.testing.assert_array_equal(full.pose_reachability.position_map().counts,
+                                  full.reachability.counts)
+    # Re-run the probe's first batch: every (position, orientation) it produced is indexed
+    chain = get_chain("franka")
+    q = sample_configs(chain.lower, chain.upper, 4096, torch.Generator().manual_seed(0))
+    pos, rot = chain.forward(q)
+    assert full.pose_reachability.is_reachable(pos, matrix_to_quat(rot)).all()
+
+
+def test_euler_range_cells_hold_float32_reach_commands():
+    # quat_from_euler_xyz(0, pi, yaw) in float32, as the reach command makes them
+    yaw = (2 * torch.rand(100000, generator=torch.Generator().manual_seed(0)) - 1) * np.pi
+    half = torch.full_like(yaw, np.pi / 2)
+    q = torch.stack((torch.cos(yaw / 2) * torch.cos(half), -torch.sin(yaw / 2) * torch.sin(half),
+                     torch.cos(yaw / 2) * torch.sin(half), torch.sin(yaw / 2) * torch.cos(half)),
+                    dim=1)
+    for m in (2, 4, 8):
+        cells = euler_range_cells(*REACH_COMMAND_RANGES, m)
+        assert np.isin(orientation_bin(q.double(), m).numpy(), cells.numpy()).all()
+        assert len(cells) <= 4 * m ** 3 // 2        # a small band of SO(3) for m > 2
+
+
+def test_pose_map_coarsen_keeps_counts():
+    pts = _ring_points()
+    m = PoseReachabilityMap.from_poses(pts, _random_quats(len(pts)), voxel_size=0.02,
+                                       orientation_bins=3)
+    coarse = m.coarsen(4)
+    assert coarse.voxel_size == 0.08 and coarse.counts.sum() == m.counts.sum()
+    np.testing.assert_array_equal(coarse.position_map().counts.sum(), len(pts))
+    # unseen orientations: a coarser block has reached more of them
+    q = _random_quats(len(pts), seed=1)
+    assert coarse.is_reachable(pts, q).mean() > m.is_reachable(pts, q).mean()
+
+
+def test_pose_map_at_documented_settings_checks_reach_commands():
+    # run_skill --voxel_size 0.02 --orientation_bins 4 --n_samples 2000000
+    from kinematics.robots import get_chain
+    from probes.workspace_probe import run_fk_batch_analytic_pose
+
+    pose = workspace_probe(None, None, n_samples=2_000_000, seed=0, backend="analytic",
+                           batch_size=262144, stream=True, reservoir_size=10,
+                           voxel_size=0.02, orientation_bins=4).pose_reachability
+    cells = euler_range_cells(*REACH_COMMAND_RANGES, 4)
+    assert pose.coverage() < 0.2                    # all of SO(3): never applied
+    reach = pose.for_command(cells)
+    assert reach is not None and reach.voxel_size <= POSE_BLOCK_MAX_M
+    assert reach.coverage(cells) >= MIN_COVERAGE
+    # Held-out FK samples in the command cells are reachable: few rejected
+    chain = get_chain("franka")
+    g = torch.Generator().manual_seed(1)
+    q = chain.lower + torch.rand(500_000, 7, generator=g) * (chain.upper - chain.lower)
+    held = run_fk_batch_analytic_pose(chain, q).double()
+    held = held[torch.as_tensor(np.isin(orientation_bin(held[:, 3:], 4).numpy(), cells.numpy()))]
+    assert held.shape[0] > 50_000
+    assert reach.is_reachable(held[:, :3], held[:, 3:]).double().mean() > 0.97
+
+
+if __name__ == "__main__":
+    test_every_sample_is_reachable(); print("✓ every_sample_is_reachable")
+    test_hole_and_outside_are_unreachable(); print("✓ hole_and_outside_are_unreachable")
+    test_streamed_batches_match_one_shot(); print("✓ streamed_batches_match_one_shot")
+    test_torch_query_keeps_device_and_type(); print("✓ torch_query_keeps_device_and_type")
+    test_samples_land_in_reachable_voxels(); print("✓ samples_land_in_reachable_voxels")
+    test_min_count_filters_sparse_voxels(); print("✓ min_count_filters_sparse_voxels")
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_save_load_roundtrip(pathlib.Path(d)); print("✓ save_load_roundtrip")
+    test_workspace_probe_builds_map_in_both_modes(); print("✓ workspace_probe_builds_map_in_both_modes")
+    test_coverage_is_good_turing_estimate(); print("✓ coverage_is_good_turing_estimate")
+    test_orientation_bins_cover_so3_and_identify_antipodes()
+    print("✓ orientation_bins_cover_so3_and_identify_antipodes")
+    test_pose_map_checks_orientation_per_voxel(); print("✓ pose_map_checks_orientation_per_voxel")
+    with tempfile.TemporaryDirectory() as d:
+        test_pose_map_save_load_roundtrip(pathlib.Path(d)); print("✓ pose_map_save_load_roundtrip")
+    test_workspace_probe_pose_map_matches_fk(); print("✓ workspace_probe_pose_map_matches_fk")
+    test_euler_range_cells_hold_float32_reach_commands()
+    print("✓ euler_range_cells_hold_float32_reach_commands")
+    test_pose_map_coarsen_keeps_counts(); print("✓ pose_map_coarsen_keeps_counts")
+    test_pose_map_at_documented_settings_checks_reach_commands()
+    print("✓ pose_map_at_documented_settings_checks_reach_commands")
+    print("\nAll unit tests passed.")
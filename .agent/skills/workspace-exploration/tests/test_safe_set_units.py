@@ -0,0 +1,168 @@
+"""Unit tests for the safe-set artifact format. Runs without Isaac Lab."""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probes.safe_set import SafeSet, HEADER_BYTES
+from probes.joint_limits_probe import sample_configs_sobol, joint_limits_probe
+
+LO = np.array([-2.9, -1.76, -2.9, -3.07, -2.9, -0.02, -2.9, 0.0, 0.0])
+HI = np.array([2.9, 1.76, 2.9, -0.07, 2.9, 3.75, 2.9, 0.04, 0.04])
+NAMES = [f"panda_joint{i}" for i in range(1, 8)] + ["panda_finger_joint1", "panda_finger_joint2"]
+
+
+def _configs(n=5000, seed=0):
+    return np.random.default_rng(seed).uniform(LO, HI, (n, 9)).astype(np.float32)
+
+
+def _roundtrip(configs, tmp, **kwargs):
+    path = os.path.join(tmp, "safe.safeset")
+    SafeSet.from_configs(configs, LO, HI, **kwargs).save(path)
+    return path, SafeSet.load(path)
+
+
+def test_float32_roundtrip_exact_with_header():
+    q = _configs()
+    with tempfile.TemporaryDirectory() as tmp:
+        path, s = _roundtrip(q, tmp, robot="franka", joint_names=NAMES, seed=42)
+        assert isinstance(s.data, np.memmap)
+        assert os.path.getsize(path) == HEADER_BYTES + q.nbytes
+        assert (s.robot, s.joint_names, s.seed, len(s), s.n_joints) == ("franka", NAMES, 42, 5000, 9)
+        np.testing.assert_array_equal(s.joint_lower, LO)
+        np.testing.assert_array_equal(s.to_tensor().numpy(), q)
+
+
+def test_compact_dtypes_halve_size_within_tolerance():
+    q = _configs()
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype, tol in (("float16", 2e-3), ("uint16", (HI - LO).max() / 131070 + 1e-6)):
+            path, s = _roundtrip(q, tmp, dtype=dtype)
+            assert os.path.getsize(path) == HEADER_BYTES + q.nbytes // 2
+            q_hat = s.to_tensor()
+            assert q_hat.dtype == torch.float32
+            assert np.abs(q_hat.numpy() - q).max() <= tol
+
+
+def test_uint16_stays_within_limits():
+    q = np.stack((LO, HI)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        _, s = _roundtrip(q, tmp, dtype="uint16")
+        q_hat = s.to_tensor().numpy()
+    np.testing.assert_allclose(q_hat, q, atol=1e-6)
+
+
+def test_device_tensor_built_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, s = _roundtrip(_configs(100), tmp)
+        assert s.to_tensor("cpu") is s.to_tensor(torch.device("cpu"))
+
+
+def test_legacy_npy_loads():
+    q = _configs(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "safe_configs.npy")
+        np.save(path, q)
+        s = SafeSet.load(path)
+        assert s.robot is None and s.joint_lower is None
+        np.testing.assert_array_equal(s.to_tensor().numpy(), q)
+
+
+def test_empty_set_and_bad_inputs():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, s = _roundtrip(np.zeros((0, 9), dtype=np.float32), tmp)
+        assert len(s) == 0 and s.to_tensor().shape == (0, 9)
+        bad = os.path.join(tmp, "bad")
+        with open(bad, "wb") as f:
+            f.write(b"not a safe set")
+        for call in (lambda: SafeSet.load(bad),
+                     lambda: SafeSet.from_configs(_configs(10), LO, HI, dtype="int8"),
+                     lambda: SafeSet.from_configs(_configs(10), LO[:7], HI[:7])):
+            try:
+                call()
+            except ValueError:
+                continue
+            raise AssertionError("expected ValueError")
+
+
+def test_sobol_offset_continues_sequence():
+    lo, hi = torch.as_tensor(LO), torch.as_tensor(HI)
+    whole = sample_configs_sobol(lo, hi, 3000, seed=5)
+    parts = torch.cat((sample_configs_sobol(lo, hi, 1000, seed=5),
+                       sample_configs_sobol(lo, hi, 2000, seed=5, offset=1000)))
+    assert torch.equal(whole, parts)
+
+
+class _Data:
+    soft_joint_pos_limits = torch.stack((torch.as_tensor(LO), torch.as_tensor(HI)), dim=1)[None]
+
+
+class _Robot:
+    device = "cpu"
+    data = _Data()
+
+
+class _Scene:
+    num_envs = 256
+
+
+def _labeler(configs):
+    # any deterministic config -> label map stands in for PhysX
+    return configs[:, 0] + configs[:, 1] > 1.0
+
+
+def test_grown_safe_set_matches_single_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "safe.safeset")
+        offset = 0
+        for _ in range(3):
+            res = joint_limits_probe(None, _Scene(), _Robot(), 1000, seed=7,
+                                     labeler=_labeler, sobol_offset=offset)
+            grown = SafeSet.from_probe_result(res, robot="franka").append_to(path)
+            offset = grown.sobol_next
+        once = joint_limits_probe(None, _Scene(), _Robot(), 3 * 1000, seed=7, labeler=_labeler)
+        assert (grown.n_sampled, grown.sobol_start, grown.sobol_next) == (3000, 0, 3000)
+        assert grown.collision_rate == once.collision_rate
+        expected = once.safe_configs.astype(np.float32)
+        np.testing.assert_array_equal(grown.to_tensor().numpy(), expected)
+        assert os.path.getsize(path) == HEADER_BYTES + expected.nbytes
+
+
+def test_append_dedupes_and_rejects_overlap():
+    q = _configs(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "safe.safeset")
+        first = SafeSet.from_configs(q[:60], LO, HI, n_sampled=80, n_colliding=20, sobol_start=0)
+        first.append_to(path)
+        more = SafeSet.from_configs(np.concatenate((q[40:], q[40:])), LO, HI,
+                                    n_sampled=100, n_colliding=20, sobol_start=80)
+        merged = more.append_to(path)
+        assert len(merged) == 100 and merged.n_sampled == 180 and merged.sobol_next == 180
+        np.testing.assert_array_equal(merged.to_tensor().numpy(), q)
+        for bad in (first,                                             # overlapping range
+                    SafeSet.from_configs(q, LO, HI, n_sampled=100, n_colliding=0,
+                                         sobol_start=180, dtype="float16")):   # other dtype
+            try:
+                bad.append_to(path)
+            except ValueError:
+                continue
+            raise AssertionError("expected ValueError")
+        assert len(SafeSet.load(path)) == 100
+
+
+if __name__ == "__main__":
+    test_float32_roundtrip_exact_with_header(); print("✓ float32_roundtrip_exact_with_header")
+    test_compact_dtypes_halve_size_within_tolerance()
+    print("✓ compact_dtypes_halve_size_within_tolerance")
+    test_uint16_stays_within_limits(); print("✓ uint16_stays_within_limits")
+    test_device_tensor_built_once(); print("✓ device_tensor_built_once")
+    test_legacy_npy_loads(); print("✓ legacy_npy_loads")
+    test_empty_set_and_bad_inputs(); print("✓ empty_set_and_bad_inputs")
+    test_sobol_offset_continues_sequence(); print("✓ sobol_offset_continues_sequence")
+    test_grown_safe_set_matches_single_run(); print("✓ grown_safe_set_matches_single_run")
+    test_append_dedupes_and_rejects_overlap(); print("✓ append_dedupes_and_rejects_overlap")
+    print("\nAll unit tests passed.")
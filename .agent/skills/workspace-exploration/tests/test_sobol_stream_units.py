@@ -0,0 +1,70 @@
+"""Unit tests for the streaming Sobol sampler. Runs without Isaac Lab."""
+import torch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probes.sobol_stream import SobolStream
+
+LO = torch.tensor([-2.9, -1.76, -2.9, -3.07, -2.9, -0.02, -2.9])
+HI = torch.tensor([2.9, 1.76, 2.9, -0.07, 2.9, 3.75, 2.9])
+
+
+def _stream(**kw):
+    return SobolStream(LO, HI, **{"seed": 3, "start": 100, "stop": 5000, "block_log2": 8, **kw})
+
+
+def test_matches_one_engine_draw():
+    engine = torch.quasirandom.SobolEngine(dimension=7, scramble=True, seed=3)
+    engine.fast_forward(100)
+    ref = LO + engine.draw(4900) * (HI - LO)
+    torch.testing.assert_close(_stream().take(4900), ref, rtol=0, atol=0)
+
+
+def test_blocks_are_aligned_powers_of_two():
+    spans = [(i, c.shape[0]) for i, c in _stream().blocks()]
+    assert spans[0] == (100, 156)                       # partial up to the first boundary
+    assert all(i % 256 == 0 and n == 256 for i, n in spans[1:-1])
+    assert spans[-1][0] + spans[-1][1] == 5000
+
+
+def test_batches_regroup_blocks_without_changing_points():
+    s = _stream()
+    out = list(s.batches(1000))
+    assert [i for i, _ in out] == [100, 1100, 2100, 3100, 4100]
+    assert [c.shape[0] for _, c in out] == [1000] * 4 + [900]
+    torch.testing.assert_close(torch.cat([c for _, c in out]), s.take(len(s)), rtol=0, atol=0)
+
+
+def test_shards_and_resume_reproduce_the_sequence():
+    s = _stream()
+    ref = s.take(len(s))
+    shards = [s.shard(i, 3) for i in range(3)]
+    assert shards[0].start == 100 and shards[-1].stop == 5000
+    assert all(a.stop == b.start and b.start % 256 == 0 for a, b in zip(shards, shards[1:]))
+    torch.testing.assert_close(torch.cat([x.take(len(x)) for x in shards]), ref, rtol=0, atol=0)
+    resumed = s.resume(2345)
+    torch.testing.assert_close(resumed.take(len(resumed)), ref[2245:], rtol=0, atol=0)
+
+
+def test_unbounded_stream_is_lazy_and_cannot_shard():
+    s = SobolStream(LO, HI, seed=0, block_log2=4)
+    first = next(s.batches(10))
+    assert first[0] == 0 and first[1].shape == (10, 7)
+    try:
+        s.shard(0, 2)
+    except ValueError as e:
+        assert "bounded" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_matches_one_engine_draw(); print("✓ matches_one_engine_draw")
+    test_blocks_are_aligned_powers_of_two(); print("✓ blocks_are_aligned_powers_of_two")
+    test_batches_regroup_blocks_without_changing_points()
+    print("✓ batches_regroup_blocks_without_changing_points")
+    test_shards_and_resume_reproduce_the_sequence(); print("✓ shards_and_resume_reproduce_the_sequence")
+    test_unbounded_stream_is_lazy_and_cannot_shard(); print("✓ unbounded_stream_is_lazy_and_cannot_shard")
+    print("\nAll unit tests passed.")
@@ -0,0 +1,101 @@
+"""Unit tests for the success-threshold probe's early-exit rollout. Runs without
+Isaac Lab: a fake robot whose EE position equals its 3 joint positions stands
+in for PhysX, and a fake DLS controller moves the joints onto the command.
+
+Like PhysX, the fake updates joint_pos on a state write but body poses (and so
+the EE pose the IK reads) only on a physics step.
+"""
+import os
+import sys
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probes.success_threshold_probe import _rollout_streaming
+
+N_ENVS = 4
+
+
+class _Data:
+    def __init__(self, n):
+        self.joint_pos = torch.zeros(n, 3)
+        self.body_pos_w = torch.zeros(n, 2, 3)           # body 1 is the EE
+        self.body_quat_w = torch.tensor([1., 0., 0., 0.]).repeat(n, 2, 1)
+        self.root_pos_w = torch.zeros(n, 3)
+        self.root_quat_w = torch.tensor([1., 0., 0., 0.]).repeat(n, 1)
+
+
+class _PhysxView:
+    def get_jacobians(self):
+        return torch.zeros(N_ENVS, 2, 6, 3)
+
+
+class _Robot:
+    device = "cpu"
+
+    def __init__(self):
+        self.data = _Data(N_ENVS)
+        self.target = torch.zeros(N_ENVS, 3)
+        self.root_physx_view = _PhysxView()
+
+    def write_joint_state_to_sim(self, q, v, env_ids=None):
+        self.data.joint_pos[slice(None) if env_ids is None else env_ids] = q
+
+    def set_joint_position_target(self, q, env_ids=None, joint_ids=None):
+        self.target[slice(None) if env_ids is None else env_ids] = q
+
+
+class _Scene:
+    num_envs = N_ENVS
+
+    def write_data_to_sim(self):
+        pass
+
+    def update(self, dt):
+        pass
+
+
+class _Sim:
+    def __init__(self, robot):
+        self.robot = robot
+
+    def step(self, render=False):
+        data = self.robot.data
+        data.joint_pos += 0.5 * (self.robot.target - data.joint_pos)   # PD lag
+        data.body_pos_w[:, 1] = data.joint_pos
+
+
+class _DiffIK:
+    def reset(self):
+        pass
+
+    def set_command(self, command, ee_pos=None, ee_quat=None):
+        self.command = command.clone()
+
+    def compute(self, ee_pos_b, ee_quat_b, jacobian, joint_pos):
+        # A stale EE pose (pre-reset body poses) disagrees with the joints
+        assert torch.allclose(ee_pos_b, joint_pos), "IK read a stale EE pose"
+        return joint_pos + (self.command - ee_pos_b)
+
+
+def test_streaming_rollout_refills_from_a_fresh_home_pose():
+    robot = _Robot()
+    sim, scene = _Sim(robot), _Scene()
+    ik = (sim, scene, robot, _DiffIK(), 1, 1, [0, 1, 2], slice(0, 3), 0.01,
+          lambda rp, rq, bp, bq: (bp - rp, bq))
+    targets = 2 * torch.rand(20, 3, generator=torch.Generator().manual_seed(0)) - 1
+    zero = torch.zeros(N_ENVS, 3)
+    errors, settled, n_ik_steps, steps_used = _rollout_streaming(
+        ik, targets, zero, zero, n_steps=60, settle_tol_m=1e-4, settle_patience=3,
+        check_every=5)
+    assert bool(settled.all())
+    assert float(errors.max()) < 1e-3
+    assert bool((steps_used % 5 == 0).all())
+    assert n_ik_steps < 20 // N_ENVS * 60          # early exit beats the fixed budget
+
+
+if __name__ == "__main__":
+    test_streaming_rollout_refills_from_a_fresh_home_pose()
+    print("✓ streaming_rollout_refills_from_a_fresh_home_pose")
+    print("\nAll unit tests passed.")
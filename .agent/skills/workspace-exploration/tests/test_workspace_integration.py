@@ -140,4 +140,67 @@ def run_integration_test(scene, robot, n_configs: int = 50, seed: int = 0,
         "max_error_mm": max_err_mm,
         "mean_error_mm": mean_err_mm,
         "n_configs": n_configs,
-    }
\ No newline at end of file
+    }
+
+def run_analytic_fk_test(scene, robot, n_configs: int = 50, seed: int = 0,
+                         atol: float = 1e-3) -> dict:
+    """Compare Isaac Lab FK against the analytical chain in kinematics/.
+
+    Same sampling and write-back as `run_integration_test`, so passing both
+    means PhysX, CuRobo and the analytical backend agree on panda_hand.
+
+    Args:
+        scene: Isaac Lab InteractiveScene. Must have num_envs >= n_configs.
+        robot: Articulation handle from scene["robot"].
+        n_configs: number of random joint configs to test.
+        seed: RNG seed for reproducibility.
+        atol: absolute tolerance in meters (default 1 mm).
+
+    Returns:
+        dict with max_error_mm, mean_error_mm, n_configs.
+
+    Raises:
+        AssertionError if max error exceeds atol.
+    """
+    from kinematics.robots import get_chain
+
+    print("\n=== FK Integration Test (Isaac Lab vs analytical chain) ===")
+    chain = get_chain("franka", device=robot.device)
+    assert n_configs <= scene.num_envs, (
+        f"Need scene.num_envs ({scene.num_envs}) >= n_configs ({n_configs})."
+    )
+    idx_tensor = torch.tensor([robot.joint_names.index(j) for j in chain.joint_names],
+                              device=robot.device, dtype=torch.long)
+    ee_idx = robot.body_names.index(chain.ee_name)
+
+    rng = torch.Generator(device=robot.device).manual_seed(seed)
+    arm_limits = torch.index_select(robot.data.soft_joint_pos_limits[0], 0, idx_tensor)
+    lo, hi = arm_limits[:, 0], arm_limits[:, 1]
+    u = torch.rand((n_configs, chain.n_joints), generator=rng, device=robot.device)
+    arm_configs = lo + u * (hi - lo)
+
+    ee_analytic = chain.ee_position(arm_configs)
+
+    full_q = robot.data.default_joint_pos.clone()
+    full_q[:n_configs].index_copy_(1, idx_tensor, arm_configs)
+    robot.write_joint_state_to_sim(full_q, torch.zeros_like(full_q))
+    scene.update(dt=0.0)
+    ee_isaac = (robot.data.body_pos_w[:, ee_idx] - robot.data.root_pos_w)[:n_configs]
+
+    err = (ee_isaac - ee_analytic).norm(dim=1)
+    max_err_mm = err.max().item() * 1000
+    mean_err_mm = err.mean().item() * 1000
+    print(f"  N configs:  {n_configs} (seed={seed})")
+    print(f"  Max error:  {max_err_mm:.3f} mm")
+    print(f"  Mean error: {mean_err_mm:.3f} mm")
+
+    if err.max().item() > atol:
+        raise AssertionError(
+            f"Analytical FK validation failed: max {max_err_mm:.3f} mm > {atol * 1000:.1f} mm"
+        )
+    print(f"  ✓ PASSED — within {atol * 1000:.1f} mm tolerance.\n")
+    return {
+        "max_error_mm": max_err_mm,
+        "mean_error_mm": mean_err_mm,
+        "n_configs": n_configs,
+    }
@@ -6,7 +6,9 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from probes.workspace_probe import sample_configs, fit_aabb
+from probes.workspace_probe import (sample_configs, fit_aabb, workspace_probe,
+                                    workspace_probe_incremental)
+from probes.streaming import RunningAABB, Reservoir, MemmapCloud
 
 
 # Franka URDF joint limits
@@ -69,6 +71,107 @@ def test_bbox_single_point():
     assert bounds == {"x": [1.0, 1.0], "y": [2.0, 2.0], "z": [3.0, 3.0]}
 
 
+def test_running_aabb_matches_fit_aabb():
+    pc = torch.randn(10000, 3)
+    aabb = RunningAABB()
+    for chunk in pc.split(777):
+        aabb.update(chunk)
+    assert aabb.bounds() == fit_aabb(pc.numpy())
+    assert aabb.count == 10000
+
+
+def test_reservoir_keeps_capacity_subset():
+    pts = torch.arange(5000, dtype=torch.float32)[:, None].repeat(1, 3)
+    res = Reservoir(capacity=300, seed=0)
+    for chunk in pts.split(128):
+        res.update(chunk)
+    sample = res.sample()
+    assert sample.shape == (300, 3)
+    ids = sample[:, 0].astype(int)
+    assert len(set(ids.tolist())) == 300, "Reservoir sampled with replacement"
+    assert (sample[:, 0] == sample[:, 1]).all(), "Rows were mixed up"
+
+
+def test_reservoir_uniform_over_stream():
+    """Early and late batches are equally likely to survive."""
+    from scipy.stats import kstest
+    pts = torch.arange(200000, dtype=torch.float32)[:, None].repeat(1, 3)
+    res = Reservoir(capacity=5000, seed=1)
+    for chunk in pts.split(4096):
+        res.update(chunk)
+    stat, p = kstest(res.sample()[:, 0] / 200000, "uniform")
+    assert p > 0.01, f"Reservoir not uniform over the stream (p={p:.4f})"
+
+
+def test_reservoir_keys_stay_distinct_at_large_n():
+    """At 10^7 points the surviving keys are all distinct and the sample is
+    still uniform (with float32 keys about a quarter of them collide here)."""
+    from scipy.stats import kstest
+    n = 10_000_000
+    res = Reservoir(capacity=20000, dim=1, seed=2)
+    for start in range(0, n, 1 << 20):
+        res.update(torch.arange(start, min(start + (1 << 20), n), dtype=torch.float32)[:, None])
+    assert res.keys.unique().numel() == 20000
+    stat, p = kstest(res.sample()[:, 0] / n, "uniform")
+    assert p > 0.01, f"Reservoir not uniform at large n (p={p:.4f})"
+
+
+def test_memmap_cloud_roundtrip(tmp_path):
+    path = tmp_path / "cloud.npy"
+    pc = torch.randn(1000, 3)
+    cloud = MemmapCloud(path, 1000)
+    for chunk in pc.split(300):
+        cloud.append(chunk)
+    cloud.close()
+    np.testing.assert_array_equal(np.load(path, mmap_mode="r"), pc.numpy())
+
+
+def test_streaming_probe_matches_full_probe(tmp_path):
+    kw = dict(n_samples=50000, seed=3, backend="analytic", batch_size=4096)
+    full = workspace_probe(None, None, **kw)
+    streamed = workspace_probe(None, None, stream=True, reservoir_size=2000,
+                               cloud_path=str(tmp_path / "ws.npy"), **kw)
+    assert streamed.bounds == full.bounds
+    assert streamed.point_cloud.shape == (2000, 3)
+    np.testing.assert_array_equal(np.load(streamed.cloud_path, mmap_mode="r"),
+                                  full.point_cloud)
+
+
+def test_incremental_checkpoints_match_independent_runs():
+    """Bounds at each checkpoint == a fresh probe of exactly that many samples."""
+    kw = dict(seed=3, backend="analytic", batch_size=1000)
+    inc = workspace_probe_incremental(None, None, checkpoints=[1000, 2500, 6000], **kw)
+    assert [c.n for c in inc.checkpoints] == [1000, 2500, 6000]
+    full = workspace_probe(None, None, n_samples=6000, **kw).point_cloud
+    for c in inc.checkpoints:
+        assert c.bounds == fit_aabb(full[:c.n])
+    assert inc.checkpoints[0].max_face_shift == float("inf")
+    assert not inc.converged and inc.n_sampled == 6000
+
+
+def test_incremental_stops_when_stable():
+    inc = workspace_probe_incremental(None, None, max_samples=2_000_000, seed=0,
+                                      backend="analytic", batch_size=4096,
+                                      volume_rtol=0.05, face_tol_m=0.05, patience=2)
+    assert inc.converged
+    assert inc.n_sampled < 2_000_000
+    last = inc.checkpoints[-2:]
+    assert all(c.volume_rel_change <= 0.05 and c.max_face_shift <= 0.05 for c in last)
+
+
+def test_adaptive_sampler_beats_10x_uniform_budget():
+    """Adaptive bounds at B evaluations enclose uniform bounds at 10 * B."""
+    kw = dict(seed=0, backend="analytic", batch_size=16384)
+    adaptive = workspace_probe(None, None, n_samples=30000, sampler="adaptive", **kw)
+    uniform = workspace_probe(None, None, n_samples=300000, **kw)
+    assert adaptive.n_sampled <= 30000
+    for axis in "xyz":
+        assert adaptive.bounds[axis][0] <= uniform.bounds[axis][0]
+        assert adaptive.bounds[axis][1] >= uniform.bounds[axis][1]
+    # Still an inner estimate: Panda reach from the shoulder is < 0.86 m
+    assert adaptive.bounds["x"][1] < 0.86
+
+
 if __name__ == "__main__":
     test_samples_within_limits(); print("✓ samples_within_limits")
     test_determinism(); print("✓ determinism")
@@ -76,4 +179,18 @@ if __name__ == "__main__":
     test_bbox_contains_all_points(); print("✓ bbox_contains_all_points")
     test_bbox_tight(); print("✓ bbox_tight")
     test_bbox_single_point(); print("✓ bbox_single_point")
+    test_running_aabb_matches_fit_aabb(); print("✓ running_aabb_matches_fit_aabb")
+    test_reservoir_keeps_capacity_subset(); print("✓ reservoir_keeps_capacity_subset")
+    test_reservoir_uniform_over_stream(); print("✓ reservoir_uniform_over_stream")
+    test_reservoir_keys_stay_distinct_at_large_n(); print("✓ reservoir_keys_stay_distinct_at_large_n")
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_memmap_cloud_roundtrip(pathlib.Path(d)); print("✓ memmap_cloud_roundtrip")
+        test_streaming_probe_matches_full_probe(pathlib.Path(d))
+        print("✓ streaming_probe_matches_full_probe")
+    test_incremental_checkpoints_match_independent_runs()
+    print("✓ incremental_checkpoints_match_independent_runs")
+    test_incremental_stops_when_stable(); print("✓ incremental_stops_when_stable")
+    test_adaptive_sampler_beats_10x_uniform_budget()
+    print("✓ adaptive_sampler_beats_10x_uniform_budget")
     print("\nAll unit tests passed.")
\ No newline at end of file